@@ -5,6 +5,7 @@
 // :::::::::::::::::::::::::::::::::::::::::::::::::::::
 
 #include <iostream>                    // Useful for any kind of text that we would like to print in the terminal
+#include <cstdlib>                     // std::atol for the seed argument
 
 // Geant4 libraries
 #include "G4RunManager.hh"             // The 'heart' of Geant4
@@ -14,6 +15,7 @@
 #include "G4VisExecutive.hh"           
 #include "G4UIExecutive.hh"  
 #include "G4ScoringManager.hh"          
+#include "Randomize.hh"                // Random engine seed
 
 // User-made libraries
 #include "PhysicsList.hh"
@@ -69,6 +71,8 @@ int main(int argc, char** argv)
     else if (argc > 1) 
     {
         // ::: BASH MODE (xecutes the macrofile) :::
+        if (argc > 2) G4Random::setTheSeed(std::atol(argv[2]));    // Seed given after the macro (run.sh). /random/setSeeds in the macro overrides it
+
         G4String command = "/control/execute ";
         G4String macroFile = argv[1];
         UImanager->ApplyCommand(command + macroFile);
@@ -12,265 +12,345 @@
 #       - Opens the Geant4-generated output .csv files: ADAPT_Results_h1_Energy_Deposit.csv and ADAPT_Results_nt_Photons.csv
 #       - Extracts the energy histogram information from ADAPT_Results_h1_Energy_Deposit.csv and plots the energy spectrum
 #       - Extracts the energy deposited information from ADAPT_Results_nt_Photons.csv for each hit inside the detector generating
-#         a 3D-hits map
-#       - Generates a 2D image from the radioactive source seen from the detector using the GammaEnergyDep.csv file. This file may 
-#         contain energy deposited or absorbed dose (depending on the user's choice)
-#            
+#         a 3D-hits map (or, with /adapt/output/hits events, reads ADAPT_Results_nt_Events.csv: one row per event with the total
+#         energy, hit count, energy-weighted centroid and first hit, already summed by Geant4)
+#       - Splits the ntuple by particle (PDG or Particle_Name column): alpha, e-, gamma and recoil ion spectra and energy totals
+#       - Generates a 2D image from the radioactive source seen from the detector using the GammaEnergyDep.csv file. This file may
+#         contain energy deposited or absorbed dose (depending on the user's choice). With several quantities on the mesh
+#         ("mesh_quantities": alpha, e-, gamma, dose...), every dump of the macro is read in one pass and imaged (ScoringMesh.py)
+#       - With --uncertainty, maps the relative statistical uncertainty of every voxel (value^2 columns of the dumps) and reports
+#         the fraction of voxels (or of a region of interest) below a threshold, to know when the simulation can stop
+#
+# Every part of the analysis is a subcommand (run it from the folder with the output files, or give the paths):
+#       python ADAPTnGUIDEAnalysis.py                                   # Same as "report": spectrum, broadening and efficiency
+#       python ADAPTnGUIDEAnalysis.py spectrum --fwhm 0.13 --calibrate MeasuredSpectrum.csv
+#       python ADAPTnGUIDEAnalysis.py efficiency --input-dir run0 --json
+#       python Efficiency.py --input-dir run0                            # Efficiency only, without numpy (fastest)
+#       python ADAPTnGUIDEAnalysis.py hits --output-dir figures          # Figures are saved as .png instead of shown
+#       python ADAPTnGUIDEAnalysis.py mesh --shape cylinder --layer 49
+#       python ADAPTnGUIDEAnalysis.py mesh --uncertainty --threshold 0.05 --roi 40:60,40:60,0:10
+#       python ADAPTnGUIDEAnalysis.py particles --bins 500 --emax 6     # Ntuple written with "hit_columns": ["pdg"]
+#       python ADAPTnGUIDEAnalysis.py report --hits --mesh box --profile-json ADAPT_Profile.json
+#       python ADAPTnGUIDEAnalysis.py runs --input-dir scan0             # Every run of a multi-run macro (/adapt/output/perRun true)
+#       python ADAPTnGUIDEAnalysis.py peaks --lines Ra-224             # Alpha peak centroid, FWHM and net area of every run
+#       python ADAPTnGUIDEAnalysis.py spectrum --run 2                   # Files of the third /run/beamOn (ADAPT_Results_run2_...)
+#       python ADAPTnGUIDEAnalysis.py --input-dir sweep1/runs/00003      # Run folder: inputs/ADAPT.mac and outputs/
+#
+# matplotlib, mpl_toolkits and pandas are only imported by the subcommands that plot or read the ntuple.
+#
 # Author: Víctor Daniel Díaz Martínez
 # ::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::
 
 
 
 # :::::: We import the needed libraries ::::::
-import numpy as np
-import matplotlib.pyplot as plt
-import pandas as pd
+import argparse
+import json
+import os
 import re
-from mpl_toolkits.mplot3d import Axes3D  
-from matplotlib.cm import ScalarMappable
-from VDDColorMap import VDD_cmap          # Import the custom colormap
+import sys
+import numpy as np
+from Profiling import StageProfiler       # Wall time, CPU time, peak memory and throughput of every stage
+from Efficiency import detector_efficiency, find_runs, read_beam_on, read_h1_totals, run_efficiencies   # Standard-library only efficiency path
+from RunFolders import run_paths
+from ScoringMesh import macro_dumps, parse_roi, read_scoring_mesh
 
 
-# ::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::
-# ::::::                                       FLAGS                                     ::::::
-# ::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::
+# :::::: Default names of the Geant4 output files ::::::
+DEFAULT_FILES = {
+    "h1":       "ADAPT_Results_h1_Energy_Deposit.csv",
+    "ntuple":   "ADAPT_Results_nt_Photons.csv",
+    "events":   "ADAPT_Results_nt_Events.csv",
+    "macro":    "ADAPT.mac",
+    "box":      "GammaEnergyDep.csv",
+    "cylinder": "CylinderGammaEnergyDep.csv",
+}
 
-# The following flags enable the visualization of the hits map inside the
-# detector and the reconstructed image, and the broadening of the energy
-# spectrum according to experimental measurements (energy resolution)
+FWHM = 0.13                                                         # Default FWHM of the energy resolution (MeV)
 
-# 1: enables visualization
-# 0: disbales visualization
-#    The more runs in the macro file, the larger the size of the file --> the longer it will take to generate the maps
+# :::::: Particle groups of the per-particle spectra (index = group code) ::::::
+PARTICLE_GROUPS = ("alpha", "e-", "gamma", "recoil ion", "other")
+ALPHA_PDG       = 1000020040
+ION_NAME        = re.compile(r"[A-Z][a-z]?\d+")                    # Geant4 ion names: Np237, Rn220[0.000], ...
 
-visFlag1 = 0  # Hits map
-visFlag2 = 0  # Reconstructed image
-ResFlag  = 1  # Broadening of the energy spectrum
-ShpFlag  = 0  # Box: 0 or Cylinder: 1
 
 
+# ::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::
+# :::                               ENERGY SPECTRUM                                :::
+# ::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::
+
+def read_spectrum(fileName):
+    """Energy axis X and counts of the h1 file, first bin set to 0 (radiation that did not interact inside the detector)."""
+    from Histograms import read_h1
+    histogram = read_h1(fileName)
+    X = np.linspace(histogram.edges[0], histogram.edges[-1], histogram.counts.size)
+    return X, histogram.counts
 
-# ::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::
-# ::::::                                    WELCOMING MESSAGE                                   ::::::
-# ::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::
 
-print('\n')
-print('::::::::::::::::::::::::::::::::::::::::::::::: ADAPTnGUIDE :::::::::::::::::::::::::::::::::::::::::::::::\n')
-print('                                  Welcome to ADAPTnGUIDE Analysis phase!\n')
-print('  I am analyzing your output files. Give me a moment...\n')
+def broaden_spectrum(X, EnergySpectrumHisto, fwhm=FWHM):
+    """Smearing using Gaussian summation: sum of counts * exp(-((Ej - Ei) / sigma)^2) over all bins, sigma = FWHM / 2.355."""
+    from GaussianBroadening import broaden
+    sigmaRes = fwhm / 2.355                                         # Convert FWHM to standard deviation
+    return broaden(X, EnergySpectrumHisto, sigmaRes, X)
 
 
 # ::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::
-# :::                               ENERGY SPECTRUM                                :::
-# :::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::: 
+# :::                                 MACRO FILE                                   :::
+# ::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::
 
-fileName = "ADAPT_Results_h1_Energy_Deposit.csv"                # Name of the csv 
+def read_macro(macFile):
+    """Number of simulated events (last /run/beamOn) and the scoring mesh size and voxels of the macro file."""
+    macro = {"N_simulated": read_beam_on(macFile)[-1], "mesh_size": None, "n_bin": None}
+    with open(macFile, "r") as f:
+        for line in f:
+            tokens = line.split("#")[0].split()                     # Commented commands are ignored
+            if not tokens:
+                continue
+            command, values = tokens[0], [v for v in tokens[1:] if re.fullmatch(r"[-+]?[\d.]+([eE][-+]?\d+)?", v)]
+            if command in ("/score/mesh/boxSize", "/score/mesh/cylinderSize"):
+                macro["mesh_size"] = np.array([float(v) for v in values])
+            elif command == "/score/mesh/nBin":
+                macro["n_bin"] = np.array([int(float(v)) for v in values])
+    return macro
 
-with open(fileName, "r") as file:                               # Open and read the file
-    lines = file.readlines()
 
-# ::: No. of bins, Min and Max Energy :::
-no_bins = None                                                  # Empty variable for the number of bins used later
-x_min = None                                                    # Empty variables for energy ranges used later
-x_max = None 
+# ::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::
+# :::                                   HITS MAP                                   :::
+# ::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::
 
-for line in lines:                                              # Finding the line containing the No. of bins, and energy range information
-    if line.startswith("#axis fixed"):                          # Line where the information is located
-        parts    = line.split()
-        no_bins = int(parts[2])                                 # Getting the Number of bins
-        x_min    = float(parts[3])                              # Getting the Minimum energy value
-        x_max    = float(parts[4])                              # Getting the Maximum energy value
-        break                                                   # Stop after finding the relevant line
+def ntuple_files(fileName):
+    """The ntuple file, or the files of the worker threads of a multithreaded run (<name>_t<N>.csv), in thread order."""
+    folder, name = os.path.split(fileName)
+    stem, ext = os.path.splitext(name)
+    thread = re.compile(re.escape(stem) + r"_t(\d+)" + re.escape(ext))
+    found = []
+    for entry in os.listdir(folder or ".") if os.path.isdir(folder or ".") else []:
+        match = thread.fullmatch(entry)
+        if match:
+            found.append((int(match.group(1)), entry))
+    return [os.path.join(folder, entry) for _, entry in sorted(found)] or [fileName]
 
-if no_bins is None or x_min is None or x_max is None:           # Check if the values were extracted correctly
-    raise ValueError("Could not extract axis information.")
 
-data_lines = lines[7:]                                          # Extract histogram data skipping metadata information
+def read_ntuple(fileName, nrows=None, **options):
+    """Rows of an ntuple (first nrows rows) as a DataFrame, from every worker thread file of a multithreaded run."""
+    import pandas as pd
+    frames = []
+    for name in ntuple_files(fileName):
+        frames.append(pd.read_csv(name, header=None, sep=',', comment='#', nrows=nrows, **options))   # Metadata lines start with '#'
+        if nrows is not None:
+            nrows -= len(frames[-1])
+            if nrows <= 0:
+                break
+    return frames[0] if len(frames) == 1 else pd.concat(frames, ignore_index=True)
 
-# ::: Extracting the numerical data :::
-EnergySpectrumHisto = []                                                    # Empty variable for the number of entries to obtain the Energy Histogram
-for line in data_lines:
-    values = line.strip().split(",")
-    if len(values) >= 1:
-        EnergySpectrumHisto.append(int(values[0]))                          # First column is the event count per bin
 
+def read_hits(fileName, nrows=None):
+    """Columns iEvent, PosX, PosY, PosZ and fEnergyDeposited of the ntuple file (first nrows rows) as numpy arrays."""
+    data = read_ntuple(fileName, nrows, usecols=[0, 1, 2, 3, 4])
+    return tuple(data[column].to_numpy() for column in range(5))
 
-EnergySpectrumHisto = EnergySpectrumHisto[1:-1]                             # Remove underflow and overflow bins. Keep only the bins within the defined range
 
-if len(EnergySpectrumHisto) > 0:                                            # Set the first bin count to 0 since it represents radiation that did not interact inside the detector
-    EnergySpectrumHisto[0] = 0
+def read_events(fileName, nrows=None):
+    """Event summary ntuple (/adapt/output/hits events): iEvent, Edep, nHits, energy-weighted centroid (n, 3) and first hit (n, 3)."""
+    data = read_ntuple(fileName, nrows, usecols=range(9)).to_numpy()
+    return data[:, 0].astype(np.int64), data[:, 1], data[:, 2].astype(np.int64), data[:, 3:6], data[:, 6:9]
 
-# ::: E N E R G Y    H I S T O G R A M :::
-X = np.linspace(x_min, x_max, no_bins)
-bin_edges = np.linspace(x_min, x_max, no_bins + 1)              # Bin edges
-bin_centers = (bin_edges[:-1] + bin_edges[1:]) / 2              # Bin center
-Error = np.sqrt(EnergySpectrumHisto)                                        # Error calculation
 
-plt.figure(1)
-#plt.bar(bin_centers, EnergySpectrumHisto, width=(x_max - x_min) / no_bins, edgecolor='none', alpha=0.7, color='red')  # To plot the energy spectrum in bar format
-plt.plot(X, EnergySpectrumHisto, color = 'b', linestyle = '-', markersize = 4, linewidth = 1)
-plt.title("Energy Spectrum Histogram") 
-plt.xlabel("Energy Deposition (MeV)") 
-plt.ylabel("Number of Counts")
-plt.xlim(0, 1)
-plt.show()
+def energy_per_event(event_numbers, energy):
+    """Events that deposited energy and the total energy deposited by each of them."""
+    unique_events, index = np.unique(event_numbers, return_inverse=True)
+    return unique_events, np.bincount(index.ravel(), weights=energy, minlength=unique_events.size)
 
-                                   
-# ::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::
-# :::                              ENERGY RESOLUTION                               :::
-# ::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::
 
-if ResFlag == 1:
-    # :: E N E R G Y    R E S O L U T I O N :::
-    FWHM = 0.13                                   # FWHM = 0.13 MeV
-    sigmaRes = FWHM / 2.355                       # Convert FWHM to standard deviation
-
-    # ::: S M E A R I N G   U S I N G   G A U S S I A N    S U M M A T I O N :::
-    def spectrum(E, osc, sigma, x):
-        BroadEnergySpectrumHisto = []             # Initialize list for broadened spectrum
-        
-        for Ei in x:
-            total = 0
-            for Ej, os in zip(E, osc):
-                total += os * np.exp(-(((Ej - Ei) / sigma) ** 2))    
-            BroadEnergySpectrumHisto.append(total)
-        return BroadEnergySpectrumHisto
-        
-    BroadEnergySpectrumHisto = spectrum(X, EnergySpectrumHisto, sigmaRes, X)
-
-    # ::: P L O T :::
-    plt.figure(2)
-    plt.plot(X, BroadEnergySpectrumHisto, 'r',linewidth=1, label='Broadened Spectrum')
-    plt.plot(X, EnergySpectrumHisto, 'b', linewidth=1, label='Discrete Spectrum')
-    plt.title('Broadened Energy Spectrum')
-    plt.xlabel('Energy (MeV)')
-    plt.ylabel('Counts')
-    plt.xlim([0, 1])
-    plt.legend()
-    plt.gca().tick_params(direction='out')  
-    plt.show()
+def history_uncertainty(total_energy_per_event, N_detected):
+    """History-by-history uncertainty of the energy deposited per event."""
+    sum_x2 = np.sum(total_energy_per_event**2)/N_detected
+    sum_x  = (np.sum(total_energy_per_event)/N_detected)**2
+    return np.sqrt((sum_x2 - sum_x)/(N_detected - 1))
 
 
+# ::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::
+# :::                                   PARTICLES                                  :::
+# ::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::
 
-# :::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::
-# :::                          DETECTOR  EFFICIENCY   AND  VISUALIZATION                            :::
-# :::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::
+def ntuple_columns(fileName):
+    """Column names of a Geant4 .csv ntuple, from its '#column <type> <name>' header lines."""
+    names = []
+    with open(ntuple_files(fileName)[0], "r") as f:
+        for line in f:
+            if not line.startswith("#"):
+                break
+            if line.startswith("#column"):
+                names.append(line.split()[-1])
+    return names
+
+
+def particle_groups(codes):
+    """Group code (index of PARTICLE_GROUPS) of every PDG encoding: alpha, e-, gamma, recoil ion (other nuclei) or other."""
+    codes = np.asarray(codes)
+    group = np.full(codes.shape, PARTICLE_GROUPS.index("other"), dtype=np.int64)
+    group[codes >= 1000000000] = PARTICLE_GROUPS.index("recoil ion")
+    group[codes == ALPHA_PDG]  = PARTICLE_GROUPS.index("alpha")
+    group[codes == 11]         = PARTICLE_GROUPS.index("e-")
+    group[codes == 22]         = PARTICLE_GROUPS.index("gamma")
+    return group
+
+
+def _name_group(name):
+    if name in ("alpha", "e-", "gamma"):
+        return PARTICLE_GROUPS.index(name)
+    return PARTICLE_GROUPS.index("recoil ion" if ION_NAME.match(name) else "other")
+
+
+def read_particle_hits(fileName):
+    """iEvent, fEnergyDeposited and particle group code of every row of the ntuple (PDG column, or Particle_Name)."""
+    names = ntuple_columns(fileName)
+    if "PDG" in names:
+        data = read_ntuple(fileName, usecols=[0, 4, names.index("PDG")])
+        return data[0].to_numpy(), data[4].to_numpy(), particle_groups(data[names.index("PDG")].to_numpy())
+    if "Particle_Name" in names:                                    # Names are only compared once per distinct particle
+        column = names.index("Particle_Name")
+        data = read_ntuple(fileName, usecols=[0, 4, column], dtype={column: "category"})
+        data[column] = data[column].astype("category")              # Thread files joined: categories merged
+        lookup = np.array([_name_group(name) for name in data[column].cat.categories], dtype=np.int64)
+        return data[0].to_numpy(), data[4].to_numpy(), lookup[data[column].cat.codes.to_numpy()]
+    raise ValueError(f"{fileName} has no PDG or Particle_Name column: simulate with \"hit_columns\": [\"pdg\"] (/adapt/output/columns pdg).")
+
+
+def particle_spectra(event_numbers, energy, group, edges):
+    """Steps, events, total energy and spectrum of the energy deposited per event by every particle group, in one grouped pass."""
+    n_groups = len(PARTICLE_GROUPS)
+    keys, index = np.unique(np.asarray(event_numbers, dtype=np.int64) * n_groups + group, return_inverse=True)
+    per_event = np.bincount(index.ravel(), weights=energy, minlength=keys.size)     # Energy of every (event, group) pair
+    key_group = keys % n_groups
+    spectra, _, _ = np.histogram2d(key_group, per_event, bins=[np.arange(n_groups + 1) - 0.5, edges])
+    return {"steps":   np.bincount(group, minlength=n_groups),
+            "events":  np.bincount(key_group, minlength=n_groups),
+            "E_total": np.bincount(group, weights=energy, minlength=n_groups),
+            "spectra": spectra}
 
 
-mac_file = 'ADAPT.mac'                                                                                        # Read the ADAPT.mac file
-with open(mac_file, 'r') as f:                                                                                # Open and read all lines from the file
-    lines = f.readlines()
+# ::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::
+# :::                          COMMAND-BASED FILES ANALYSIS                        :::
+# ::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::
 
-# ::: NUMBER OF RUNS :::
-target_line = None                                                                                            # Variable to store the line containing /run/beamOn
+def mesh_image(values, shape):
+    """Image of one channel of a ScoringMesh: slices (Y inverted, X, Z) of a box, or matrices (R, Phi, Z) of a cylinder."""
+    if shape == "box":
+        return values.transpose(1, 0, 2)[::-1].copy()               # Dump order iX, iY, iZ; invert Y for reconstruction
+    return values.transpose(2, 1, 0).copy()                         # Dump order iZ, iPhi, iR
 
-for line in lines:
-    if "/run/beamOn" in line:                                                                                 # Search for the line containing "/run/beamOn"
-        target_line = line.strip()                                                                            # Store the line and remove any trailing spaces
-        break 
 
+# ::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::
+# :::                                    PLOTS                                     :::
+# ::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::
 
-if target_line:
-    match = re.search(r'\b\d+\b', target_line)                                                                # Extract the numeric value from the line number
-    if match:
-        N_simulated = int(match.group())                                                                      # Convert the value to an integer
+def _pyplot(output_dir):
+    # Figures are saved without a window when an output folder is given
+    import matplotlib
+    if output_dir:
+        matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    return plt
+
+
+def show_or_save(fig, name, output_dir):
+    plt = _pyplot(output_dir)
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+        fig.savefig(os.path.join(output_dir, name + ".png"), dpi=150)
+        plt.close(fig)
     else:
-        print("No number was found with /run/beamOn.")
-else:
-    print("No line was found with /run/beamOn in the macro file.")
-
+        plt.show()
 
-# ::::::  D E T E C T O R    E F F I C I E N C Y ::::::
-N_detected = sum(EnergySpectrumHisto)                                               # Number of detected events
-Det_e = N_detected/N_simulated
-DetEff = Det_e*100
 
-# ::: E F F I C I E N C Y    U N C E R T A I N T Y :::
-sigma_eff = np.sqrt( (1/N_detected) + (1/N_simulated) ) * 100 * Det_e
+def plot_spectrum(X, EnergySpectrumHisto, output_dir=None):
+    plt = _pyplot(output_dir)
+    fig = plt.figure(1)
+    plt.plot(X, EnergySpectrumHisto, color = 'b', linestyle = '-', markersize = 4, linewidth = 1)
+    plt.title("Energy Spectrum Histogram")
+    plt.xlabel("Energy Deposition (MeV)")
+    plt.ylabel("Number of Counts")
+    plt.xlim(0, 1)
+    return fig
 
 
-# :::::: 3D   E N E R G Y    D E P O S I T I O N    M A P ::::::
-if visFlag1 == 1:
-    file_name = "ADAPT_Results_nt_Photons.csv"                                                   # Load the CSV file
-    data = pd.read_csv(file_name, header=None, sep=',', skiprows=9, usecols=[0, 1, 2, 3, 4])     # Read the csv file skipping the first 11 header lines (metadata)
-
-    # ::: Extract columns for X, Y, Z, and Energy :::
-    event_numbers = data[0]
-    x = data[1]  
-    y = data[2]  
-    z = data[3]  
-    energy = data[4]
-
+def plot_broadened(X, BroadEnergySpectrumHisto, EnergySpectrumHisto, output_dir=None):
+    plt = _pyplot(output_dir)
+    fig = plt.figure(2)
+    plt.plot(X, BroadEnergySpectrumHisto, 'r',linewidth=1, label='Broadened Spectrum')
+    plt.plot(X, EnergySpectrumHisto, 'b', linewidth=1, label='Discrete Spectrum')
+    plt.title('Broadened Energy Spectrum')
+    plt.xlabel('Energy (MeV)')
+    plt.ylabel('Counts')
+    plt.xlim([0, 1])
+    plt.legend()
+    plt.gca().tick_params(direction='out')
+    return fig
 
-    # :::::: E R R O R   C A L C U L A T I O N ::::::
 
-    unique_events = np.unique(event_numbers)                                                                      # Fnd unique events (events that actually deposited energy)
-    total_energy_per_event = np.array([np.sum(energy[event_numbers == event_id]) for event_id in unique_events])  # Total energy deposited per event
+def plot_calibration(Calibration, output_dir=None):
+    plt = _pyplot(output_dir)
+    fig = plt.figure(3)
+    plt.plot(Calibration["fwhms"], Calibration["profile"], 'b', linewidth=1)
+    plt.axvline(Calibration["fwhm"], color='r', linestyle='--')
+    plt.title('FWHM Calibration')
+    plt.xlabel('FWHM (MeV)')
+    plt.ylabel(r'$\chi^2$')
+    return fig
 
-    E_mean = np.mean(total_energy_per_event)                                                                      # Calculate mean energy deposited per event
 
+def plot_peaks(peaks, output_dir=None):
+    plt = _pyplot(output_dir)
+    fig = plt.figure()
+    for label, line in peaks["lines"].items():
+        plt.errorbar(peaks["runs"], line["centroid"] - np.nanmean(line["centroid"]), yerr=line["centroid_err"],
+                     fmt='o', markersize=3, label=f"{label} ({np.nanmean(line['centroid']):.4f} MeV)")
+    plt.title('Peak centroids per run')
+    plt.xlabel('Run')
+    plt.ylabel('Centroid - mean (MeV)')
+    plt.legend()
+    return fig
 
-    # ::: H I S T O R Y - B Y -  H I S T O R Y    M E T H O D :::
-    sum_x2 = np.sum(total_energy_per_event**2)/N_detected
-    sum_x  = (np.sum(total_energy_per_event)/N_detected)**2
-    sigma_Edep = np.sqrt((sum_x2 - sum_x)/(N_detected - 1)) 
 
-    # ::: V I S U A L I Z A T I O N :::   
+def plot_hits(x, y, z, energy, output_dir=None, title='3D Energy Distribution'):
+    plt = _pyplot(output_dir)
+    from mpl_toolkits.mplot3d import Axes3D
+    from VDDColorMap import VDD_cmap
     fig = plt.figure()
     ax = fig.add_subplot(111, projection='3d')
     scatter = ax.scatter(x, y, z, c=energy, cmap=VDD_cmap, s=0.5)         # Scatter plot with energy hits in colormap
     colorbar = plt.colorbar(scatter, ax=ax, shrink=0.5, aspect=10)
     colorbar.set_label('Energy (MeV)')
-    ax.set_xlabel('X (mm)', labelpad=15) 
+    ax.set_xlabel('X (mm)', labelpad=15)
     ax.set_ylabel('Y (mm)', labelpad=15)
     ax.set_zlabel('Z (mm)', labelpad=15)
-    ax.set_title('3D Energy Distribution', pad=20)
+    ax.set_title(title, pad=20)
     ax.view_init(elev=0, azim=90)                                         # View point
     plt.tight_layout()                                                    # Adjust the layout to make better use of space
+    return fig
 
 
-# :::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::
-# :::                 COMMAND-BASED FILES ANALYSIS                  :::
-# :::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::
-
-# ::::::::: BOX :::::::::
-if ((ShpFlag == 0) and (visFlag2 == 1)):
-    GammaData = np.loadtxt('GammaEnergyDep.csv', delimiter=',', skiprows=1)  # Read the CSV file
-    mac_file = 'ADAPT.mac'                                                   # Read the ADAPT.mac file
-
-    with open(mac_file, 'r') as f:
-        lines = f.readlines()
-        
-    # ::: Detector size :::
-    box_size_line = lines[21]                                                # Size of the scoring volume. It says 21 because Python starts counting from 0
-    tokens = re.findall(r'([\d.]+) ([\d.]+) ([\d.]+)', box_size_line)[0]     # Extract x, y, z sizes
-    box_size = np.array([float(val) for val in tokens])                      # Convert strings to floats
-
-    X = 2 * box_size[0]
-    Y = 2 * box_size[1]
-
-    # ::: Voxels :::
-    n_bin_line = lines[22]                                                   # Number of voxels
-    tokens = re.findall(r'([\d.]+) ([\d.]+) ([\d.]+)', n_bin_line)[0]        # Extract nBin values
-    n_bin = np.array([int(float(val)) for val in tokens])                    # Convert to integers
-
-    NumVoxX, NumVoxY, NoVoxZ = n_bin
-
-
-    # :::::::::::::::::::::::::::::::::::::::::::::::::::::::::
-    # :::                 2D Map Generation                 :::
-    # :::::::::::::::::::::::::::::::::::::::::::::::::::::::::
+def plot_particle_spectra(edges, spectra, output_dir=None):
+    plt = _pyplot(output_dir)
+    fig = plt.figure()
+    for name, counts in zip(PARTICLE_GROUPS, spectra):
+        if counts.any():
+            plt.step(edges[:-1], counts, where='post', linewidth=1, label=name)
+    plt.yscale('log')
+    plt.title('Energy Deposited per Event by Particle')
+    plt.xlabel('Energy Deposition (MeV)')
+    plt.ylabel('Number of Counts')
+    plt.legend()
+    return fig
 
-    SlicesTot = np.zeros((NumVoxX, NumVoxY, NoVoxZ))
 
-    # ::: Extraction and storage of the voxels information :::
-    for z in range(NoVoxZ):                                                  # Iterate over Z slices
-        for y in range(NumVoxY):                                             # Iterate over Y rows
-            Idx = (y * NoVoxZ) + z                                           # Calculate index for data extraction
-            vectorTot = GammaData[Idx::(NumVoxY * NoVoxZ), 3]                # Extract 4th column (index 3 in Python)
-            SlicesTot[NumVoxY - y - 1, :, z] = vectorTot                     # Invert for reconstruction
+def plot_box(SlicesTot, output_dir=None, title='Reconstructed Image', label='Energy (MeV)'):
+    plt = _pyplot(output_dir)
+    from matplotlib.cm import ScalarMappable
+    from VDDColorMap import VDD_cmap
+    NumVoxY, NumVoxX, NoVoxZ = SlicesTot.shape
 
-    # ::: 3D Visualization :::
     fig = plt.figure(figsize=(8, 6))
     ax = fig.add_subplot(111, projection='3d')
 
@@ -284,88 +364,31 @@ if ((ShpFlag == 0) and (visFlag2 == 1)):
     sm = ScalarMappable(cmap=VDD_cmap)
     sm.set_clim(vmin, vmax)                                                  # Set the range of the colormap
 
+    X_grid, Y_grid = np.meshgrid(np.arange(NumVoxX), np.arange(NumVoxY))
     for z in range(NoVoxZ):                                                  # Iterate through each slice
         sliceTot = SlicesTot[:, :, z]                                        # Extract XY slice
         face_colors = VDD_cmap((sliceTot - vmin) / (vmax - vmin))            # Scale within the dataset range
 
         # Create a transformed image in 3D space
-        x = np.arange(NumVoxX)
-        y = np.arange(NumVoxY)
-        X_grid, Y_grid = np.meshgrid(x, y)
-
-        ax.plot_surface(X_grid, Y_grid, np.full_like(X_grid, z * z_spacing), 
-                        facecolors=face_colors, 
+        ax.plot_surface(X_grid, Y_grid, np.full_like(X_grid, z * z_spacing),
+                        facecolors=face_colors,
                         rstride=1, cstride=1, antialiased=True, shade=False)
 
     cbar = fig.colorbar(sm, ax=ax, shrink=0.7, aspect=20, pad=0.1)
-    ax.set_title('Reconstructed Image')
-    cbar.set_label('Energy (MeV)')
+    ax.set_title(title)
+    cbar.set_label(label)
     ax.set_xlabel('X')
     ax.set_ylabel('Y')
     ax.set_zlabel('Z')
-    ax.view_init(elev=90, azim=270)  
-    plt.show()
-
-# ::::::::: CYLINDER :::::::::
-elif ((ShpFlag == 1) and (visFlag1 == 1)):
-    mac_file = 'ADAPT.mac'                                                   # Read the ADAPT.mac file
-    
-    with open(mac_file, 'r') as f:
-        lines = f.readlines()
-    
-    # ::: Detector size :::
-    cylinder_size_line = lines[21]                                           # Size of the scoring volume. It says 21 because Python starts counting from 0
-    tokens = re.findall(r'([\d.]+) ([\d.]+)', cylinder_size_line)[0]         # Extract x, y, z sizes
-    Cyl_size = np.array([float(val) for val in tokens])                      # Convert strings to floats
-
-    DetRad = Cyl_size[0]
-    DetLen = 2 * Cyl_size[1]
-
-
-    # ::: Voxels :::
-    n_bin_line = lines[22]                                                   # Number of voxels
-    tokens = re.findall(r'([\d.]+) ([\d.]+) ([\d.]+)', n_bin_line)[0]        # Extract nBin values
-    n_bin = np.array([int(float(val)) for val in tokens])                    # Convert to integers
-
-    NumVoxR  = n_bin[0]
-    NoVoxZ   = n_bin[1]
-    NoVoxPhi = n_bin[2]
-
-    # ::::::::: Extracting Information from .csv file :::::::::
-
-    GammaData = np.loadtxt('CylinderGammaEnergyDep.csv', delimiter=',', skiprows=1)  # Read the CSV file
-
-    # ::: Voxels Information :::
-    iZ     = GammaData[:, 0]     # Z (layer)
-    iPhi   = GammaData[:, 1]     # Phi (angle)
-    iR     = GammaData[:, 2]     # R (radius)
-    Energy = GammaData[:, 3]     # Energy deposition
-
-    # ::: Getting unique values of each vector :::
-    uniqueZ   = np.unique(iZ)    # Unique Z values (layers)
-    uniquePhi = np.unique(iPhi)  # Unique Phi values (angles)
-    uniqueR   = np.unique(iR)    # Unique R values (radii)
-
-    NoVoxZ = len(uniqueZ)
-    NoVoxPhi = len(uniquePhi)
-    NoVoxR = len(uniqueR)
-
-    EnergyMatrices = []          # List to store energy matrices for each Z layer
-
-    # ::: Loop through each Z layer :::
-    for currentZ in uniqueZ:
-        layerData = GammaData[iZ == currentZ]              # Filter data for the current Z layer
-        EnergyMatrix = np.zeros((NoVoxR, NoVoxPhi))        # Initialize energy matrix for this layer (R x Phi)
-    
-        # ::: Fill the matrix with energy values :::
-        for row in layerData:
-            rIdx = np.where(uniqueR == row[2])[0][0]       # Get R index (row)
-            phiIdx = np.where(uniquePhi == row[1])[0][0]   # Get Phi index (column)
-            EnergyMatrix[rIdx, phiIdx] = row[3]            # Store Energy
-    
-        EnergyMatrices.append(EnergyMatrix)                # Store the matrix
-
-    # ::::::::: Plot :::::::::
+    ax.view_init(elev=90, azim=270)
+    return fig
+
+
+def plot_cylinder(ArrayEnergyMatrices, uniqueR, layer=49, output_dir=None, title='Reconstructed Image', label='Energy Deposition'):
+    plt = _pyplot(output_dir)
+    from VDDColorMap import VDD_cmap
+    NoVoxR, NoVoxPhi, NoVoxZ = ArrayEnergyMatrices.shape
+
     DetRad = max(uniqueR)                                  # Define detector radius
     r = np.linspace(0, DetRad, NoVoxR)                     # Radii range (0 - scoring volume max radius)
     theta = np.linspace(0, 2 * np.pi, NoVoxPhi)            # Angular dimension (0°- 360°)
@@ -373,31 +396,449 @@ elif ((ShpFlag == 1) and (visFlag1 == 1)):
     R, Theta = np.meshgrid(r, theta)                       # Polar coordinates mesh
     X, Y = R * np.cos(Theta), R * np.sin(Theta)            # Convert polar to Cartesian
 
-    # Convert list of matrices into 3D NumPy array
-    ArrayEnergyMatrices = np.stack(EnergyMatrices, axis=2)
-
-    # Select a specific layer to visualize (e.g., 50th layer)
-    LayerEnMatrix = ArrayEnergyMatrices[:, :, 49]          # Indexing starts at 0 in Python
+    LayerEnMatrix = ArrayEnergyMatrices[:, :, min(layer, NoVoxZ - 1)].copy()   # Layer to visualize (indexing starts at 0)
     LayerEnMatrix[:2, :] = 0                               # Set inside of cylindrical scoring volume to 0
 
-    # ::: Plot :::
-    plt.figure(figsize=(8, 8))
-    plt.pcolormesh(X, Y, LayerEnMatrix.T, shading='auto', cmap=VDD_cmap) 
-    plt.colorbar(label='Energy Deposition')
-    plt.title('Reconstructed Image')
+    fig = plt.figure(figsize=(8, 8))
+    plt.pcolormesh(X, Y, LayerEnMatrix.T, shading='auto', cmap=VDD_cmap)
+    plt.colorbar(label=label)
+    plt.title(title)
     plt.xlabel('X (mm)')
     plt.ylabel('Y (mm)')
     plt.axis('equal')
-    plt.show()
+    return fig
+
 
+# ::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::
+# :::                                 SUBCOMMANDS                                  :::
+# ::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::
+
+def _path(args, key):
+    # Explicit path, or the default file name inside the input folder (per-run name with --run)
+    path = getattr(args, key, None)
+    if path:
+        return path
+    fileName = DEFAULT_FILES[key]
+    if getattr(args, "run", None) is not None and key in ("h1", "ntuple", "events"):
+        fileName = fileName.replace("ADAPT_Results_", f"ADAPT_Results_run{args.run}_")
+    return os.path.join(args.input_dir, fileName)
+
+
+def _n_simulated(args):
+    # Events of the /run/beamOn of the selected run. Without --run, the output files only hold the last run of the macro
+    counts = read_beam_on(_path(args, "macro"))
+    if args.run is not None and args.run >= len(counts):
+        raise ValueError(f"Run {args.run} has no /run/beamOn in {_path(args, 'macro')} ({len(counts)} found).")
+    return counts[-1 if args.run is None else args.run]
+
+
+def run_spectrum(args, profiler, results):
+    profiler.start("h1 parse")
+    X, EnergySpectrumHisto = read_spectrum(_path(args, "h1"))
+    profiler.stop(rows=X.size + 2)
+    results["spectrum"] = (X, EnergySpectrumHisto)
+
+    if not args.no_plots:
+        profiler.start("spectrum plot")
+        fig = plot_spectrum(X, EnergySpectrumHisto, args.output_dir)
+        profiler.stop(rows=X.size)                                  # The time spent looking at the figure is not counted
+        show_or_save(fig, "EnergySpectrum", args.output_dir)
+
+    if args.fwhm > 0:
+        profiler.start("broadening")
+        BroadEnergySpectrumHisto = broaden_spectrum(X, EnergySpectrumHisto, args.fwhm)
+        profiler.stop(rows=X.size)
+        if args.output_dir:
+            os.makedirs(args.output_dir, exist_ok=True)
+            np.savetxt(os.path.join(args.output_dir, "BroadenedSpectrum.csv"),
+                       np.column_stack([X, EnergySpectrumHisto, BroadEnergySpectrumHisto]),
+                       delimiter=",", header="Energy (MeV),Counts,Broadened counts", comments="")
+        if not args.no_plots:
+            profiler.start("broadening plot")
+            fig = plot_broadened(X, BroadEnergySpectrumHisto, EnergySpectrumHisto, args.output_dir)
+            profiler.stop(rows=X.size)
+            show_or_save(fig, "BroadenedSpectrum", args.output_dir)
+
+    # Scans a grid of FWHM values at once and keeps the one that best reproduces the measured spectrum (chi2 profile)
+    if args.calibrate:
+        profiler.start("calibration")
+        from ResolutionCalibration import calibrate_fwhm
+        Calibration = calibrate_fwhm((X, EnergySpectrumHisto), args.calibrate)
+        profiler.stop(rows=Calibration["fwhms"].size)
+        results["calibration"] = Calibration
+        if not args.no_plots:
+            show_or_save(plot_calibration(Calibration, args.output_dir), "FWHMCalibration", args.output_dir)
+
+
+def run_efficiency(args, profiler, results):
+    if "spectrum" in results:
+        N_detected = results["spectrum"][1].sum()
+    else:
+        profiler.start("h1 totals")                                 # Only the entries column is needed
+        totals = read_h1_totals(_path(args, "h1"))
+        N_detected = totals["N_detected"]
+        profiler.stop(rows=totals["bins"] + 2)
+
+    profiler.start("efficiency")
+    results["efficiency"] = detector_efficiency(N_detected, _n_simulated(args))
+    profiler.stop()
+
+
+def run_hits(args, profiler, results):
+    # Event summary file (hits events) when there is one and no step ntuple was asked for: no per-event sums to do
+    if args.events or (not args.ntuple and os.path.exists(ntuple_files(_path(args, "events"))[0])):
+        run_event_summary(args, profiler, results)
+        return
+
+    profiler.start("hits: ntuple parse")
+    event_numbers, x, y, z, energy = read_hits(_path(args, "ntuple"))
+    profiler.stop(rows=event_numbers.size)
+
+    # ::: History-by-history method, normalised to the events counted in the h1 histogram :::
+    profiler.start("hits: per-event sums")
+    unique_events, total_energy_per_event = energy_per_event(event_numbers, energy)
+    N_detected = _hits_normalisation(args, results, unique_events.size)
+    results["hits"] = {
+        "events":     int(unique_events.size),
+        "E_mean":     float(np.mean(total_energy_per_event)),      # Mean energy deposited per event
+        "sigma_Edep": float(history_uncertainty(total_energy_per_event, N_detected)),
+    }
+    profiler.stop(rows=event_numbers.size)
+
+    if not args.no_plots:
+        profiler.start("hits: rendering")
+        fig = plot_hits(x, y, z, energy, args.output_dir)
+        profiler.stop(rows=event_numbers.size)
+        show_or_save(fig, "HitsMap", args.output_dir)
+
+
+def _hits_normalisation(args, results, events):
+    # Events counted in the h1 histogram (also the events without an ntuple row), or the events of the ntuple
+    if "efficiency" in results:
+        return results["efficiency"]["N_detected"]
+    if os.path.exists(_path(args, "h1")):
+        return read_h1_totals(_path(args, "h1"))["N_detected"]
+    return events
+
+
+def run_event_summary(args, profiler, results):
+    profiler.start("hits: event summary parse")
+    event_numbers, total_energy_per_event, n_hits, centroid, first = read_events(_path(args, "events"))
+    profiler.stop(rows=event_numbers.size)
+
+    profiler.start("hits: statistics")
+    results["hits"] = {
+        "events":     int(event_numbers.size),
+        "E_mean":     float(np.mean(total_energy_per_event)),      # Mean energy deposited per event
+        "sigma_Edep": float(history_uncertainty(total_energy_per_event, _hits_normalisation(args, results, event_numbers.size))),
+        "hits_mean":  float(np.mean(n_hits)),                      # Steps with an energy deposit per event
+    }
+    profiler.stop(rows=event_numbers.size)
+
+    if not args.no_plots:                                           # One point per event: the energy-weighted centroid
+        profiler.start("hits: rendering")
+        fig = plot_hits(centroid[:, 0], centroid[:, 1], centroid[:, 2], total_energy_per_event, args.output_dir,
+                        title='3D Energy Centroids per Event')
+        profiler.stop(rows=event_numbers.size)
+        show_or_save(fig, "HitsMap", args.output_dir)
+
+
+def run_particles(args, profiler, results):
+    profiler.start("particles: ntuple parse")
+    event_numbers, energy, group = read_particle_hits(_path(args, "ntuple"))
+    profiler.stop(rows=event_numbers.size)
+
+    profiler.start("particles: grouped sums")
+    edges = np.linspace(0, args.emax, args.bins + 1)
+    reduced = particle_spectra(event_numbers, energy, group, edges)
+    results["particles"] = {name: {"steps": int(reduced["steps"][g]), "events": int(reduced["events"][g]),
+                                   "E_total": float(reduced["E_total"][g])}
+                            for g, name in enumerate(PARTICLE_GROUPS)}
+    profiler.stop(rows=event_numbers.size)
+
+    if args.output_dir:
+        os.makedirs(args.output_dir, exist_ok=True)
+        np.savetxt(os.path.join(args.output_dir, "ParticleSpectra.csv"), np.column_stack([edges[:-1], reduced["spectra"].T]),
+                   delimiter=",", header="Energy (MeV)," + ",".join(PARTICLE_GROUPS), comments="")
+    if not args.no_plots:
+        show_or_save(plot_particle_spectra(edges, reduced["spectra"], args.output_dir), "ParticleSpectra", args.output_dir)
+
+
+def _mesh_files(args, shape):
+    # --mesh-file, else every dump of the macro that was written (several quantities on one mesh), else the default dump
+    if args.mesh_file:
+        return args.mesh_file.split(",")
+    fileNames = []
+    if os.path.exists(_path(args, "macro")):
+        fileNames = [os.path.join(args.input_dir, fileName) for _, fileName in macro_dumps(_path(args, "macro"))]
+        fileNames = [fileName for fileName in fileNames if os.path.exists(fileName)]
+    return fileNames or [os.path.join(args.input_dir, DEFAULT_FILES[shape])]
+
+
+def run_mesh(args, profiler, results):
+    shape = args.shape
+    profiler.start(f"{shape} mesh: parse")
+    fileNames = _mesh_files(args, shape)
+    mesh = read_scoring_mesh(fileNames)                             # Every channel in one pass over the dumps
+    voxels = int(np.prod(mesh.shape))
+    profiler.stop(rows=voxels * len(mesh.names))
+    if voxels == 0:                                                 # Header only, e.g. a dump too large for SyntheticOutputs.py
+        results["mesh_empty"] = fileNames
+        return
+
+    profiler.start(f"{shape} mesh: reconstruction")
+    images = {name: mesh_image(mesh.values[channel], shape) for channel, name in enumerate(mesh.names)}
+    results["mesh"] = images[mesh.names[0]]
+    results["mesh_channels"] = {name: {"total": total, "unit": unit} for (name, total), unit in zip(mesh.totals().items(), mesh.units)}
+    profiler.stop(rows=voxels * len(mesh.names))
+
+    if not args.no_plots:
+        uniqueR = np.arange(mesh.shape[2])
+        for name, unit in zip(mesh.names, mesh.units):
+            profiler.start(f"{shape} mesh: {name}")
+            label = f"{name} ({unit})" if unit else name
+            fig = (plot_box(images[name], args.output_dir, title=f'Reconstructed Image: {name}', label=label) if shape == "box" else
+                   plot_cylinder(images[name], uniqueR, args.layer, args.output_dir, title=f'Reconstructed Image: {name}', label=label))
+            profiler.stop(rows=voxels)
+            show_or_save(fig, "ReconstructedImage" if len(mesh.names) == 1 else f"ReconstructedImage_{name}", args.output_dir)
+
+    if args.uncertainty:
+        run_mesh_uncertainty(args, profiler, results, mesh)
+
+
+def run_mesh_uncertainty(args, profiler, results, mesh):
+    # ::: Relative uncertainty per voxel, normalised to the simulated events (the entries of each voxel without a macro) :::
+    shape = args.shape
+    profiler.start(f"{shape} mesh: uncertainty")
+    n_events = _n_simulated(args) if os.path.exists(_path(args, "macro")) else None
+    roi = parse_roi(args.roi) if args.roi else None
+    R = mesh.relative_error(n_events)
+    results["mesh_uncertainty"] = {"threshold": args.threshold, "events": n_events, "roi": args.roi,
+                                   "channels": mesh.converged(args.threshold, n_events, roi)}
+    profiler.stop(rows=R.size)
+
+    if not args.no_plots:
+        uniqueR = np.arange(mesh.shape[2])
+        for channel, name in enumerate(mesh.names):
+            image = mesh_image(np.minimum(R[channel], 1.0), shape)   # Voxels without a score (inf) shown as 100 %
+            title, label = f'Relative Uncertainty: {name}', 'Relative uncertainty'
+            fig = (plot_box(image, args.output_dir, title=title, label=label) if shape == "box" else
+                   plot_cylinder(image, uniqueR, args.layer, args.output_dir, title=title, label=label))
+            show_or_save(fig, "RelativeUncertainty" if len(mesh.names) == 1 else f"RelativeUncertainty_{name}", args.output_dir)
+
+
+def run_runs(args, profiler, results):
+    profiler.start("h1 totals (all runs)")                          # One pass over the per-run h1 files of the folder
+    results["runs"] = run_efficiencies(args.input_dir, args.macro)
+    profiler.stop(rows=len(results["runs"]["runs"]))
+    results["efficiency"] = results["runs"]["total"]
+
+
+def run_peaks(args, profiler, results):
+    # h1 file of every run (/adapt/output/perRun true), or the single h1 file, fitted together
+    from PeakAnalysis import analyse_runs
+    runs = {} if args.h1 or args.run is not None else find_runs(args.input_dir)
+    fileNames = list(runs.values()) or [_path(args, "h1")]
+    profiler.start("peaks: h1 parse and fits")
+    results["peaks"] = {"runs": list(runs) or [args.run], "lines": analyse_runs(fileNames, args.lines, args.window)}
+    profiler.stop(rows=len(fileNames))
+    if not args.no_plots and len(fileNames) > 1 and results["peaks"]["lines"]:
+        show_or_save(plot_peaks(results["peaks"], args.output_dir), "PeakCentroids", args.output_dir)
+
+
+def run_report(args, profiler, results):
+    if not args.json:
+        print('\n')
+        print('::::::::::::::::::::::::::::::::::::::::::::::: ADAPTnGUIDE :::::::::::::::::::::::::::::::::::::::::::::::\n')
+        print('                                  Welcome to ADAPTnGUIDE Analysis phase!\n')
+        print('  I am analyzing your output files. Give me a moment...\n')
+
+    run_spectrum(args, profiler, results)
+    run_efficiency(args, profiler, results)
+    if args.hits:
+        run_hits(args, profiler, results)
+    if args.mesh:
+        args.shape = args.mesh
+        run_mesh(args, profiler, results)
 
 
-# ::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::
-# ::::::                           DISPLAYING RESULTS                         ::::::
-# ::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::
-print('  I finished! Your results are listed below.\n')
-print(':::::::::::::::::::::::::::::::::::::::::::::::   RESULTS   :::::::::::::::::::::::::::::::::::::::::::::::\n')
-print(f"  Events simulated:        {N_simulated}")
-print(f"  Events in the detector:  {N_detected}")
-print(f"  Detector efficiency:     {DetEff:.4f} %  ±  {sigma_eff:.4f} % \n")
-print(':::::::::::::::::::::::::::::::::::::::::::::::     END     :::::::::::::::::::::::::::::::::::::::::::::::\n')
+# ::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::
+# :::                              DISPLAYING RESULTS                              :::
+# ::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::
+
+def summary(results):
+    """JSON-ready values of the analysis (efficiency, hits statistics, calibration)."""
+    out = {}
+    out.update(results.get("efficiency", {}))
+    out.update(results.get("hits", {}))
+    if "particles" in results:
+        out["particles"] = results["particles"]
+    if "mesh_channels" in results:
+        out["mesh"] = results["mesh_channels"]
+    if "mesh_uncertainty" in results:
+        out["mesh_uncertainty"] = results["mesh_uncertainty"]
+    if "mesh_empty" in results:
+        out["mesh_empty"] = results["mesh_empty"]
+    if "runs" in results:
+        out["runs"] = results["runs"]["runs"]
+    if "peaks" in results:
+        out["peaks"] = {"runs": results["peaks"]["runs"],
+                        "lines": {label: _peak_values(line) for label, line in results["peaks"]["lines"].items()}}
+    if "calibration" in results:
+        Calibration = results["calibration"]
+        out.update({"fwhm": float(Calibration["fwhm"]), "fwhm_interval": [float(v) for v in Calibration["fwhm_interval"]],
+                    "chi2": float(Calibration["minimum"]), "ndf": int(Calibration["ndf"])})
+    return out
+
+
+def _peak_values(line):
+    # One list per quantity of a fitted peak, None where the fit of the run failed
+    out = {"fit_ok": [bool(ok) for ok in line["fit_ok"]]}
+    for quantity, values in line.items():
+        if quantity != "fit_ok":
+            out[quantity] = [float(v) if ok else None for v, ok in zip(values, line["fit_ok"])]
+    return out
+
+
+def _sigma(eff):
+    return "n/a" if eff["sigma_eff"] is None else f"{eff['sigma_eff']:.4f} %"      # No detected event
+
+
+def print_results(results):
+    print('  I finished! Your results are listed below.\n')
+    print(':::::::::::::::::::::::::::::::::::::::::::::::   RESULTS   :::::::::::::::::::::::::::::::::::::::::::::::\n')
+    if "runs" in results:
+        print("  Run    Events simulated   Events in the detector   Detector efficiency")
+        for eff in results["runs"]["runs"]:
+            print(f"  {eff['run']:<6} {eff['N_simulated']:<18} {eff['N_detected']:<24} {eff['DetEff']:.4f} %  ±  {_sigma(eff)}")
+        print("\n  All runs:")
+    if "efficiency" in results:
+        eff = results["efficiency"]
+        print(f"  Events simulated:        {eff['N_simulated']}")
+        print(f"  Events in the detector:  {eff['N_detected']}")
+        print(f"  Detector efficiency:     {eff['DetEff']:.4f} %  ±  {_sigma(eff)} \n")
+    if "hits" in results:
+        print(f"  Mean energy per event:   {results['hits']['E_mean']:.4f} MeV  ±  {results['hits']['sigma_Edep']:.4f} MeV \n")
+        if "hits_mean" in results["hits"]:
+            print(f"  Mean hits per event:     {results['hits']['hits_mean']:.2f} \n")
+    if "mesh_channels" in results:
+        print("  Mesh quantity            Total")
+        for name, channel in results["mesh_channels"].items():
+            print(f"  {name:<24} {channel['total']:.6g} {channel['unit']}")
+        print()
+    if "mesh_empty" in results:
+        print(f"  Empty mesh dump (no voxel rows, nothing reconstructed): {', '.join(results['mesh_empty'])}\n")
+    if "mesh_uncertainty" in results:
+        uncertainty = results["mesh_uncertainty"]
+        region = f"region {uncertainty['roi']}" if uncertainty["roi"] else "all voxels"
+        print(f"  Voxels with a relative uncertainty below {uncertainty['threshold']:.1%} ({region}):")
+        for name, channel in uncertainty["channels"].items():
+            median = "-" if channel["R_median"] is None else f"{channel['R_median']:.1%}"
+            print(f"  {name:<24} {channel['converged']} / {channel['voxels']} ({channel['fraction']:.1%}, "
+                  f"{channel['fraction_scored']:.1%} of the scored voxels), median {median}")
+        print()
+    if "peaks" in results and not results["peaks"]["lines"]:
+        print("  No peak found in the energy spectrum.\n")
+    elif "peaks" in results:
+        print("  Peak              Run    Centroid (MeV)          FWHM (MeV)              Net area")
+        for label, line in results["peaks"]["lines"].items():
+            for k, run in enumerate(results["peaks"]["runs"]):
+                run = "-" if run is None else run
+                if not line["fit_ok"][k]:
+                    print(f"  {label:<17} {run:<6} fit failed")
+                    continue
+                print(f"  {label:<17} {run:<6} {line['centroid'][k]:.5f} ± {line['centroid_err'][k]:<9.5f} "
+                      f"{line['fwhm'][k]:.5f} ± {line['fwhm_err'][k]:<9.5f} {line['net_area'][k]:.1f} ± {line['net_area_err'][k]:.1f}")
+        print()
+    if "particles" in results:
+        print("  Particle     Steps          Events         Total energy (MeV)")
+        for name, particle in results["particles"].items():
+            print(f"  {name:<12} {particle['steps']:<14} {particle['events']:<14} {particle['E_total']:.4f}")
+        print()
+    if "calibration" in results:
+        Calibration = results["calibration"]
+        FWHM_low, FWHM_high = Calibration["fwhm_interval"]
+        print(f"  Best-fit FWHM:           {Calibration['fwhm']:.4f} MeV  [{FWHM_low:.4f}, {FWHM_high:.4f}] MeV (68 %)")
+        print(f"  chi2 / ndf:              {Calibration['minimum']:.1f} / {Calibration['ndf']} \n")
+
+
+def build_parser():
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--input-dir", default=".", help="Run folder, or folder with the Geant4 output files (default: current folder)")
+    common.add_argument("--output-dir", help="Save the figures (.png) and tables here instead of showing them")
+    common.add_argument("--h1", help=f"h1 histogram file (default: {DEFAULT_FILES['h1']})")
+    common.add_argument("--macro", help=f"Macro file (default: {DEFAULT_FILES['macro']})")
+    common.add_argument("--ntuple", help=f"Ntuple file (default: {DEFAULT_FILES['ntuple']})")
+    common.add_argument("--events", help=f"Event summary ntuple, /adapt/output/hits events (default: {DEFAULT_FILES['events']}, "
+                                         "used by hits when it exists and --ntuple is not given)")
+    common.add_argument("--run", type=int, help="Read the files of this run (ADAPT_Results_run<RUN>_..., /adapt/output/perRun true)")
+    common.add_argument("--mesh-file", help="Scoring mesh dump(s), comma separated (default: every dump of the macro, "
+                                            "or GammaEnergyDep.csv / CylinderGammaEnergyDep.csv)")
+    common.add_argument("--no-plots", action="store_true", help="Compute the results without drawing")
+    common.add_argument("--json", action="store_true", help="Print the results as JSON")
+    common.add_argument("--profile", action="store_true", help="Print the time and memory of every stage")
+    common.add_argument("--profile-json", help="Write the profile of every stage to this JSON file")
+    common.add_argument("--profile-memory", action="store_true",
+                        help="Where the RSS peak cannot be reset (not Linux), trace the Python allocations of every stage (slower)")
+
+    spectrum = argparse.ArgumentParser(add_help=False)
+    spectrum.add_argument("--fwhm", type=float, default=FWHM, help="FWHM of the energy resolution in MeV (0: no broadening)")
+    spectrum.add_argument("--calibrate", metavar="MEASURED", help="Calibrate the FWHM against this measured spectrum")
+
+    mesh = argparse.ArgumentParser(add_help=False)
+    mesh.add_argument("--layer", type=int, default=49, help="Z layer shown for a cylinder mesh (default: 49)")
+    mesh.add_argument("--uncertainty", action="store_true", help="Relative uncertainty of every voxel and fraction of converged voxels")
+    mesh.add_argument("--threshold", type=float, default=0.05, help="Relative uncertainty of a converged voxel (default: 0.05)")
+    mesh.add_argument("--roi", help="Region of interest i0:i1,j0:j1,k0:k1 (index columns of the dump) for the converged fraction")
+
+    parser = argparse.ArgumentParser(prog="ADAPTnGUIDEAnalysis.py", description="ADAPTnGUIDE Analysis phase.")
+    commands = parser.add_subparsers(dest="command")
+    commands.add_parser("spectrum", parents=[common, spectrum], help="Energy spectrum, broadening and FWHM calibration")
+    commands.add_parser("efficiency", parents=[common], help="Detector efficiency and its uncertainty")
+    commands.add_parser("hits", parents=[common], help="Energy per event and 3D hits map from the ntuple")
+    cmd = commands.add_parser("particles", parents=[common], help="Spectra and energy totals of alpha, e-, gamma and recoil ions")
+    cmd.add_argument("--bins", type=int, default=1000, help="Bins of the per-particle spectra (default: 1000)")
+    cmd.add_argument("--emax", type=float, default=10.0, help="Upper edge of the spectra in MeV (default: 10, as the h1 histogram)")
+    cmd = commands.add_parser("mesh", parents=[common, mesh], help="Reconstructed image from the scoring mesh")
+    cmd.add_argument("--shape", choices=["box", "cylinder"], default="box")
+    commands.add_parser("runs", parents=[common], help="Efficiency of every run of a multi-run macro and of all runs together")
+    cmd = commands.add_parser("peaks", parents=[common], help="Centroid, FWHM and net area of the alpha peaks of every run")
+    cmd.add_argument("--lines", choices=["Am-241", "Ra-224"], help="Fit the nominal alpha lines of this source (default: peaks found in the summed spectrum)")
+    cmd.add_argument("--window", type=float, default=0.15, help="Half-width of the fit region around every peak in MeV (default: 0.15)")
+    cmd = commands.add_parser("report", parents=[common, spectrum, mesh], help="Spectrum and efficiency (+ hits and mesh)")
+    cmd.add_argument("--hits", action="store_true", help="Include the hits map")
+    cmd.add_argument("--mesh", choices=["box", "cylinder"], help="Include the reconstructed image of this mesh")
+    return parser
+
+
+COMMANDS = {"spectrum": run_spectrum, "efficiency": run_efficiency, "hits": run_hits, "particles": run_particles, "mesh": run_mesh, "runs": run_runs, "peaks": run_peaks, "report": run_report}
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else list(argv)
+    if not argv or (argv[0].startswith("-") and argv[0] not in ("-h", "--help")):
+        argv = ["report"] + argv                                    # No subcommand: full report, like the former script
+    args = build_parser().parse_args(argv)
+    paths = run_paths(args.input_dir)                               # Run folder: macro in inputs/, output files in outputs/
+    args.input_dir, args.macro = paths["outputs"], args.macro or paths["macro"]
+
+    profiler = StageProfiler(enabled=args.profile or bool(args.profile_json) or args.command == "report",
+                             trace_memory=args.profile_memory)
+    results = {}
+    COMMANDS[args.command](args, profiler, results)
+
+    if args.json:
+        print(json.dumps(summary(results), indent=2))
+    else:
+        print_results(results)
+        if args.profile or args.command == "report":
+            print(':::::::::::::::::::::::::::::::::::::::::::::::   PROFILE   :::::::::::::::::::::::::::::::::::::::::::::::\n')
+            profiler.print_stages()
+        print(':::::::::::::::::::::::::::::::::::::::::::::::     END     :::::::::::::::::::::::::::::::::::::::::::::::\n')
+    if args.profile_json:
+        profiler.write_json(args.profile_json, **summary(results))
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,391 @@
+# ::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::
+# :::                                                                                                                          :::
+# :::                                              ADAPTnGUIDE Analysis Benchmark                                              :::
+# :::                                                                                                                          :::
+# ::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::
+
+
+# ::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::
+# This Python script benchmarks the analysis phase on synthetic Geant4 output files (SyntheticOutputs.py). It does the following:
+#       - Writes h1, ntuple, box/cylinder mesh .csv files and ADAPT.mac at every requested scale (10^3 - 10^8 rows)
+#       - Times every analysis stage (h1 parse, broadening, per-event aggregation, mesh reconstruction, rendering) and records
+#         its peak memory (tracemalloc, measured in a second run so the tracing does not slow down the timed one)
+#       - Runs the original algorithms of the analysis script (REFERENCE) next to the current implementations (CANDIDATES)
+#         and checks that both give the same numbers, so a speedup cannot silently change the physics results
+#       - Optionally runs ADAPTnGUIDEAnalysis.py itself on the synthetic files and compares its RESULTS block
+#
+# The reference loops scale badly (the broadening is quadratic), so they only run on the first REFERENCE_LIMITS rows/bins
+# of each dataset; the candidates are compared on that same subset and timed on the full dataset.
+#
+# Example:
+#       python ADAPTnGUIDEBenchmark.py --rows 1e3 1e4 1e5 --shape Box Cylinder --script --json benchmark.json
+# ::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::
+
+
+# :::::: We import the needed libraries ::::::
+import argparse
+import io
+import json
+import os
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+import numpy as np
+
+import Histograms
+import ADAPTnGUIDEAnalysis as Analysis
+from Efficiency import efficiency
+from GaussianBroadening import broaden
+from ScoringMesh import dump_shape, read_scoring_mesh
+from SyntheticOutputs import generate_dataset
+
+ANALYSIS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+REFERENCE_LIMITS = {                                                # Size of the subset used by the reference loops
+    "broadening":        1000,                                      # Bins
+    "event aggregation": 20000,                                     # Ntuple rows
+    "cylinder mesh":     200000,                                    # Voxels
+    "rendering":         100000,                                    # Hits drawn in the 3D map
+}
+
+
+# ::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::
+# :::              REFERENCE: ORIGINAL ALGORITHMS OF THE ANALYSIS SCRIPT           :::
+# ::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::
+
+def reference_h1(fileName):
+    # Line-by-line parse of the h1 file, first bin set to 0
+    with open(fileName, "r") as file:
+        lines = file.readlines()
+    for line in lines:
+        if line.startswith("#axis fixed"):
+            parts = line.split()
+            no_bins, x_min, x_max = int(parts[2]), float(parts[3]), float(parts[4])
+            break
+    EnergySpectrumHisto = [int(line.strip().split(",")[0]) for line in lines[7:]][1:-1]
+    if len(EnergySpectrumHisto) > 0:
+        EnergySpectrumHisto[0] = 0
+    return np.linspace(x_min, x_max, no_bins), np.array(EnergySpectrumHisto, dtype=float)
+
+
+def reference_spectrum(E, osc, sigma, x):
+    # Gaussian summation as a double loop
+    BroadEnergySpectrumHisto = []
+    for Ei in x:
+        total = 0
+        for Ej, os_ in zip(E, osc):
+            total += os_ * np.exp(-(((Ej - Ei) / sigma) ** 2))
+        BroadEnergySpectrumHisto.append(total)
+    return np.array(BroadEnergySpectrumHisto)
+
+
+def reference_efficiency(EnergySpectrumHisto, macFile):
+    with open(macFile, "r") as f:
+        N_simulated = int(re.search(r'\b\d+\b', next(line for line in f if "/run/beamOn" in line)).group())
+    N_detected = sum(EnergySpectrumHisto)
+    Det_e = N_detected / N_simulated
+    return np.array([N_simulated, N_detected, Det_e * 100, np.sqrt((1 / N_detected) + (1 / N_simulated)) * 100 * Det_e])
+
+
+def reference_efficiency_files(h1File, macFile):
+    return reference_efficiency(reference_h1(h1File)[1], macFile)
+
+
+def reference_event_aggregation(fileName, N_detected, nrows=None):
+    # Total energy per event with one boolean mask per event, then the history-by-history uncertainty
+    import pandas as pd
+    data = pd.read_csv(fileName, header=None, sep=',', skiprows=9, usecols=[0, 1, 2, 3, 4], nrows=nrows)
+    event_numbers, energy = data[0], data[4]
+    unique_events = np.unique(event_numbers)
+    total_energy_per_event = np.array([np.sum(energy[event_numbers == event_id]) for event_id in unique_events])
+    sum_x2 = np.sum(total_energy_per_event**2) / N_detected
+    sum_x = (np.sum(total_energy_per_event) / N_detected)**2
+    sigma_Edep = np.sqrt((sum_x2 - sum_x) / (N_detected - 1))
+    return np.append(total_energy_per_event, [np.mean(total_energy_per_event), sigma_Edep])
+
+
+def _mesh_lines(macFile):
+    with open(macFile, "r") as f:
+        lines = f.readlines()
+    return lines[21], lines[22]                                     # Mesh size and nBin lines of the GUI macro
+
+
+def reference_box_mesh(meshFile, macFile):
+    _, n_bin_line = _mesh_lines(macFile)
+    NumVoxX, NumVoxY, NoVoxZ = [int(float(val)) for val in re.findall(r'([\d.]+) ([\d.]+) ([\d.]+)', n_bin_line)[0]]
+    GammaData = np.loadtxt(meshFile, delimiter=',', skiprows=1)
+    SlicesTot = np.zeros((NumVoxX, NumVoxY, NoVoxZ))
+    for z in range(NoVoxZ):
+        for y in range(NumVoxY):
+            Idx = (y * NoVoxZ) + z
+            SlicesTot[NumVoxY - y - 1, :, z] = GammaData[Idx::(NumVoxY * NoVoxZ), 3]
+    return SlicesTot
+
+
+def reference_cylinder_mesh(meshFile, macFile):
+    GammaData = np.loadtxt(meshFile, delimiter=',', skiprows=1)
+    iZ = GammaData[:, 0]
+    uniqueZ, uniquePhi, uniqueR = np.unique(iZ), np.unique(GammaData[:, 1]), np.unique(GammaData[:, 2])
+    EnergyMatrices = []
+    for currentZ in uniqueZ:
+        layerData = GammaData[iZ == currentZ]
+        EnergyMatrix = np.zeros((len(uniqueR), len(uniquePhi)))
+        for row in layerData:
+            rIdx = np.where(uniqueR == row[2])[0][0]
+            phiIdx = np.where(uniquePhi == row[1])[0][0]
+            EnergyMatrix[rIdx, phiIdx] = row[3]
+        EnergyMatrices.append(EnergyMatrix)
+    return np.stack(EnergyMatrices, axis=2)
+
+
+def reference_render_hits(ntupleFile, nrows):
+    # 3D hits map drawn off-screen (Agg) into memory
+    import pandas as pd
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    from VDDColorMap import VDD_cmap
+    data = pd.read_csv(ntupleFile, header=None, sep=',', skiprows=9, usecols=[0, 1, 2, 3, 4], nrows=nrows)
+    fig = plt.figure()
+    ax = fig.add_subplot(111, projection='3d')
+    scatter = ax.scatter(data[1], data[2], data[3], c=data[4], cmap=VDD_cmap, s=0.5)
+    plt.colorbar(scatter, ax=ax, shrink=0.5, aspect=10)
+    ax.view_init(elev=0, azim=90)
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format="png")
+    plt.close(fig)
+    return buffer.tell()
+
+
+# ::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::
+# :::                         CANDIDATES: CURRENT IMPLEMENTATIONS                  :::
+# ::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::
+
+def candidate_h1(fileName):
+    Histograms._H1_CACHE.clear()                                    # Time the parse, not the cache
+    histogram = Histograms.read_h1(fileName)
+    return np.linspace(histogram.edges[0], histogram.edges[-1], histogram.counts.size), histogram.counts
+
+
+def candidate_spectrum(E, osc, sigma, x):
+    return broaden(E, osc, sigma, x)
+
+
+def candidate_efficiency(h1File, macFile):
+    eff = efficiency(h1File, macFile)                               # Fast path: h1 totals and /run/beamOn only
+    return np.array([eff["N_simulated"], eff["N_detected"], eff["DetEff"], np.nan if eff["sigma_eff"] is None else eff["sigma_eff"]])
+
+
+def candidate_event_aggregation(fileName, N_detected, nrows=None):
+    event_numbers, _, _, _, energy = Analysis.read_hits(fileName, nrows)
+    _, total_energy_per_event = Analysis.energy_per_event(event_numbers, energy)
+    sigma_Edep = Analysis.history_uncertainty(total_energy_per_event, N_detected)
+    return np.append(total_energy_per_event, [np.mean(total_energy_per_event), sigma_Edep])
+
+
+def candidate_box_mesh(meshFile, macFile):
+    return Analysis.mesh_image(read_scoring_mesh([meshFile]).values[0], "box")
+
+
+def candidate_cylinder_mesh(meshFile, macFile):
+    return Analysis.mesh_image(read_scoring_mesh([meshFile]).values[0], "cylinder")
+
+
+def head_dump(meshFile, rows, outFile):
+    """Copy of a mesh dump with its first whole Z layers (about `rows` voxels), so both readers see a complete smaller mesh."""
+    _, n_phi, n_r = dump_shape(meshFile)
+    rows = max(rows // (n_phi * n_r), 1) * n_phi * n_r
+    with open(meshFile, "r") as f, open(outFile, "w") as out:
+        for line in f:
+            if not line.startswith("#"):
+                if rows == 0:
+                    break
+                rows -= 1
+            out.write(line)
+    return outFile
+
+
+# ::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::
+# :::                                 MEASUREMENT                                  :::
+# ::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::
+
+def measure(func, *args, memory=True):
+    """Run func(*args) once timed, then (memory=True) once more under tracemalloc. Returns (result, seconds, peak MB)."""
+    start = time.perf_counter()
+    result = func(*args)
+    seconds = time.perf_counter() - start
+
+    peak = None
+    if memory:
+        tracemalloc.start()
+        func(*args)
+        peak = tracemalloc.get_traced_memory()[1] / 2**20
+        tracemalloc.stop()
+    return result, seconds, peak
+
+
+def compare(reference, candidate, rtol=1e-9):
+    """Largest difference between two results, relative to the largest reference value."""
+    reference, candidate = np.asarray(reference, dtype=float), np.asarray(candidate, dtype=float)
+    if reference.shape != candidate.shape:
+        return {"equivalent": False, "max_rel_diff": None}
+    scale = max(np.abs(reference).max(initial=0), 1e-300)
+    diff = np.abs(reference - candidate).max(initial=0) / scale
+    return {"equivalent": bool(diff <= rtol), "max_rel_diff": float(diff)}
+
+
+def benchmark_stage(records, stage, rows, reference=None, candidate=None, rtol=1e-9, memory=True):
+    """Time the reference and candidate of one stage; reference/candidate are (func, args) or None."""
+    record = {"stage": stage, "rows": rows}
+    results = {}
+    for name, job in (("reference", reference), ("candidate", candidate)):
+        if job is None:
+            continue
+        results[name], seconds, peak = measure(job[0], *job[1], memory=memory)
+        record[name] = {"seconds": seconds, "peak_MB": peak}
+    if len(results) == 2:
+        record.update(compare(results["reference"], results["candidate"], rtol))
+    records.append(record)
+    return results
+
+
+# ::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::
+# :::                                   STAGES                                     :::
+# ::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::
+
+def run_dataset(files, rows, shape, memory=True):
+    """Benchmark every stage on one synthetic dataset. Returns the list of stage records."""
+    records = []
+    sigma = 0.13 / 2.355                                            # FWHM of the analysis script
+
+    # ::: h1 parse and efficiency :::
+    parsed = benchmark_stage(records, "h1 parse", rows, (reference_h1, (files["h1"],)),
+                             (candidate_h1, (files["h1"],)), rtol=0, memory=memory)
+    X, counts = parsed["reference"]
+    benchmark_stage(records, "efficiency", rows, (reference_efficiency_files, (files["h1"], files["macro"])),
+                    (candidate_efficiency, (files["h1"], files["macro"])), memory=memory)
+
+    # ::: Broadening: candidate on the full spectrum, both on the first bins :::
+    n = REFERENCE_LIMITS["broadening"]
+    benchmark_stage(records, "broadening", X.size, candidate=(candidate_spectrum, (X, counts, sigma, X)), memory=memory)
+    benchmark_stage(records, "broadening (subset)", min(n, X.size), (reference_spectrum, (X[:n], counts[:n], sigma, X[:n])),
+                    (candidate_spectrum, (X[:n], counts[:n], sigma, X[:n])), memory=memory)
+
+    # ::: Per-event aggregation (history-by-history uncertainty) :::
+    n = REFERENCE_LIMITS["event aggregation"]
+    benchmark_stage(records, "event aggregation", rows,
+                    candidate=(candidate_event_aggregation, (files["ntuple"], counts.sum())), memory=memory)
+    benchmark_stage(records, "event aggregation (subset)", min(n, rows),
+                    (reference_event_aggregation, (files["ntuple"], counts.sum(), n)),
+                    (candidate_event_aggregation, (files["ntuple"], counts.sum(), n)), memory=memory)
+
+    # ::: Mesh reconstruction :::
+    if shape == "Box":
+        benchmark_stage(records, "box mesh", rows, (reference_box_mesh, (files["mesh"], files["macro"])),
+                        (candidate_box_mesh, (files["mesh"], files["macro"])), memory=memory)
+    else:
+        n = REFERENCE_LIMITS["cylinder mesh"]
+        if rows > n:
+            benchmark_stage(records, "cylinder mesh", rows,
+                            candidate=(candidate_cylinder_mesh, (files["mesh"], files["macro"])), memory=memory)
+        subset = files["mesh"] if rows <= n else head_dump(files["mesh"], n, files["mesh"] + ".subset.csv")
+        benchmark_stage(records, "cylinder mesh" if rows <= n else "cylinder mesh (subset)", min(rows, n),
+                        (reference_cylinder_mesh, (subset, files["macro"])),
+                        (candidate_cylinder_mesh, (subset, files["macro"])), memory=memory)
+
+    # ::: Rendering :::
+    n = min(REFERENCE_LIMITS["rendering"], rows)
+    benchmark_stage(records, "rendering hits map", n, (reference_render_hits, (files["ntuple"], n)), memory=memory)
+    return records
+
+
+def run_script(directory):
+    """Run ADAPTnGUIDEAnalysis.py off-screen in `directory`. Returns (N_simulated, N_detected, DetEff, sigma_eff)."""
+    env = dict(os.environ, MPLBACKEND="Agg", PYTHONPATH=os.pathsep.join([ANALYSIS_DIR, os.environ.get("PYTHONPATH", "")]))
+    output = subprocess.run([sys.executable, os.path.join(ANALYSIS_DIR, "ADAPTnGUIDEAnalysis.py")], cwd=directory, env=env,
+                            capture_output=True, text=True, check=True).stdout
+    N_simulated = int(re.search(r"Events simulated:\s+(\d+)", output).group(1))
+    N_detected = float(re.search(r"Events in the detector:\s+([\d.]+)", output).group(1))
+    DetEff, sigma_eff = [float(v) for v in re.search(r"Detector efficiency:\s+([\d.]+) %\s+±\s+([\d.]+) %", output).groups()]
+    return np.array([N_simulated, N_detected, DetEff, sigma_eff])
+
+
+def check_script(records, files, rows):
+    """Compare the RESULTS block of the analysis script with the reference efficiency (printed with 4 decimals)."""
+    start = time.perf_counter()
+    printed = run_script(os.path.dirname(files["h1"]))
+    seconds = time.perf_counter() - start
+    expected = reference_efficiency(reference_h1(files["h1"])[1], files["macro"])
+    record = {"stage": "analysis script", "rows": rows, "candidate": {"seconds": seconds, "peak_MB": None}}
+    record["equivalent"] = bool(np.allclose(printed, np.round(expected, 4), rtol=0, atol=1e-4))
+    record["max_rel_diff"] = float(np.max(np.abs(printed - expected) / np.maximum(np.abs(expected), 1e-300)))
+    records.append(record)
+
+
+# ::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::
+# :::                                    REPORT                                    :::
+# ::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::
+
+def print_records(records):
+    def cell(entry, key, fmt):
+        return format(entry[key], fmt) if entry and entry.get(key) is not None else "-"
+
+    print(f"  {'Shape':<9}{'Stage':<28}{'Rows':>11}{'Ref. (s)':>11}{'Ref. (MB)':>11}{'Cand. (s)':>11}{'Cand. (MB)':>11}"
+          f"{'Max rel. diff':>15}  Equivalent")
+    for r in records:
+        ref, cand = r.get("reference"), r.get("candidate")
+        equivalent = {True: "yes", False: "NO"}.get(r.get("equivalent"), "-")
+        print(f"  {r['shape']:<9}{r['stage']:<28}{r['rows']:>11}{cell(ref, 'seconds', '.4f'):>11}{cell(ref, 'peak_MB', '.1f'):>11}"
+              f"{cell(cand, 'seconds', '.4f'):>11}{cell(cand, 'peak_MB', '.1f'):>11}{cell(r, 'max_rel_diff', '.2e'):>15}  {equivalent}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the ADAPTnGUIDE analysis on synthetic Geant4 output files.")
+    parser.add_argument("--rows", type=float, nargs="+", default=[1e3, 1e4, 1e5], help="Ntuple rows / mesh voxels per dataset")
+    parser.add_argument("--shape", nargs="+", default=["Box", "Cylinder"], choices=["Box", "Cylinder"])
+    parser.add_argument("--bins", type=int, default=10000, help="Bins of the h1 histogram")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workdir", help="Directory for the synthetic files (default: temporary, removed at the end)")
+    parser.add_argument("--no-memory", action="store_true", help="Skip the tracemalloc runs")
+    parser.add_argument("--script", action="store_true", help="Also run ADAPTnGUIDEAnalysis.py on every dataset")
+    parser.add_argument("--json", help="Write the records to this JSON file")
+    args = parser.parse_args(argv)
+
+    workdir = args.workdir or tempfile.mkdtemp(prefix="adapt_benchmark_")
+    records = []
+    try:
+        for shape in args.shape:
+            for rows in [int(r) for r in args.rows]:
+                directory = os.path.join(workdir, f"{shape}_{rows}")
+                start = time.perf_counter()
+                files = generate_dataset(directory, rows=rows, shape=shape, bins=args.bins, seed=args.seed)
+                print(f"  Generated {shape} dataset with {rows} rows in {time.perf_counter() - start:.1f} s")
+
+                dataset = run_dataset(files, rows, shape, memory=not args.no_memory)
+                if args.script:
+                    check_script(dataset, files, rows)
+                for record in dataset:
+                    record["shape"] = shape
+                records += dataset
+    finally:
+        if args.workdir is None:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    print()
+    print_records(records)
+    if args.json:
+        with open(args.json, "w") as file:
+            json.dump(records, file, indent=2)
+
+    failed = [r for r in records if r.get("equivalent") is False]
+    if failed:
+        print(f"\n  {len(failed)} stage(s) differ from the reference implementation.")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,243 @@
+# ::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::
+# :::                                                                                                                          :::
+# :::                                              ADAPTnGUIDE Run Catalogue                                                   :::
+# :::                                                                                                                          :::
+# ::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::
+
+
+# ::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::
+# This Python module keeps a local SQLite catalogue (one file, e.g. ADAPT_Runs.db) of every generated and finished run folder:
+#       - runs:    run folder, geometry hash, macro hash, seeds, events, state, wall time and events per second
+#       - results: one row per run and result (N_detected, DetEff, sigma_eff, output_bytes, ... or anything added with add_results()),
+#                  indexed by name and value, so any result can be queried quickly over thousands of runs
+#
+# A run whose DetectorConstruction.cc and ADAPT.mac are identical (same hashes, so same geometry, source, events and seeds) to
+# a finished run is not simulated again: register() links the outputs of the finished run into the new run folder and the
+# scheduler skips it. The generator, the sweep and the scheduler use the catalogue when they are given --catalog.
+#
+# Example:
+#       python ADAPTnGUIDEGenerator.py configs.json --output-dir study1 --catalog ADAPT_Runs.db
+#       python ADAPTnGUIDEScheduler.py study1 --catalog ADAPT_Runs.db
+#       python ADAPTnGUIDECatalog.py ADAPT_Runs.db add sweep1/runs/*                     # Runs made without the catalogue
+#       python ADAPTnGUIDECatalog.py ADAPT_Runs.db query --columns DetEff,events_per_s --where "DetEff > 30" --order DetEff
+# ::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::
+
+
+# :::::: We import the needed libraries ::::::
+import json
+import os
+import re
+import shutil
+import sqlite3
+import time
+
+from RunFolders import run_paths
+from Efficiency import H1_FILE, efficiency, find_runs, read_beam_on, run_efficiencies
+
+
+CATALOG_FILE = "ADAPT_Runs.db"
+RUN_COLUMNS  = ("id", "run_dir", "geometry_hash", "macro_hash", "seeds", "events", "state", "wall_time", "events_per_s",
+                "created", "completed", "reused_from")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id            INTEGER PRIMARY KEY,
+    run_dir       TEXT UNIQUE NOT NULL,
+    geometry_hash TEXT,
+    macro_hash    TEXT,
+    seeds         TEXT,
+    events        INTEGER,
+    state         TEXT,                                             -- generated, done, failed or reused
+    wall_time     REAL,
+    events_per_s  REAL,
+    created       REAL,
+    completed     REAL,
+    reused_from   TEXT
+);
+CREATE INDEX IF NOT EXISTS runs_hashes ON runs (geometry_hash, macro_hash);
+CREATE TABLE IF NOT EXISTS results (
+    run_id INTEGER NOT NULL REFERENCES runs (id) ON DELETE CASCADE,
+    name   TEXT NOT NULL,
+    value  REAL,
+    PRIMARY KEY (run_id, name)
+);
+CREATE INDEX IF NOT EXISTS results_values ON results (name, value);
+"""
+
+
+def _link_or_copy(source, destination):
+    # Hard links cost no disk space; copies are used across file systems
+    try:
+        os.link(source, destination)
+    except OSError:
+        shutil.copy2(source, destination)
+
+
+def output_bytes(run_dir):
+    outputs = run_paths(run_dir)["outputs"]
+    return sum(entry.stat().st_size for entry in os.scandir(outputs) if entry.is_file()) if os.path.isdir(outputs) else 0
+
+
+def headline_results(run_dir):
+    """Efficiency and size of the outputs of a run folder (all runs together with per-run files), or {} without outputs."""
+    paths = run_paths(run_dir)
+    if find_runs(paths["outputs"]):
+        return {**run_efficiencies(run_dir)["total"], "output_bytes": output_bytes(run_dir)}
+    if os.path.exists(os.path.join(paths["outputs"], H1_FILE)):
+        return {**efficiency(os.path.join(paths["outputs"], H1_FILE), paths["macro"]), "output_bytes": output_bytes(run_dir)}
+    return {}
+
+
+class Catalog:
+    """SQLite catalogue of run folders and their results."""
+
+    def __init__(self, fileName=CATALOG_FILE):
+        self.fileName   = fileName
+        self.connection = sqlite3.connect(fileName, timeout=60)      # Several processes may write at the same time
+        self.connection.execute("PRAGMA foreign_keys = ON")
+        self.connection.executescript(SCHEMA)
+
+    def close(self):
+        self.connection.close()
+
+    def _run_id(self, run_dir):
+        row = self.connection.execute("SELECT id FROM runs WHERE run_dir = ?", (os.path.abspath(run_dir),)).fetchone()
+        return row[0] if row else None
+
+    # ::: Runs :::
+
+    def find_identical(self, geometry_hash, macro_hash):
+        """Finished run with the same geometry and macro, as a dictionary, or None."""
+        self.connection.row_factory = sqlite3.Row
+        try:
+            row = self.connection.execute("SELECT * FROM runs WHERE geometry_hash = ? AND macro_hash = ? AND state = 'done' "
+                                          "ORDER BY completed DESC LIMIT 1", (geometry_hash, macro_hash)).fetchone()
+        finally:
+            self.connection.row_factory = None
+        return dict(row) if row else None
+
+    def register(self, run_dir, reuse=True):
+        """Adds a generated run folder (from its manifest.json). With reuse, the outputs of an identical finished run are linked
+        into it and the run is marked "reused". A run folder already finished with the same inputs is kept. Returns its state."""
+        run_dir = os.path.abspath(run_dir)
+        paths = run_paths(run_dir)
+        if paths["manifest"] is None:
+            raise ValueError(f"{run_dir} is not a run folder (no manifest.json).")
+        with open(paths["manifest"], "r") as f:
+            manifest = json.load(f)
+        values = {"run_dir": run_dir, "geometry_hash": manifest.get("geometry_hash"), "macro_hash": manifest.get("macro_hash"),
+                  "seeds": json.dumps(manifest.get("seeds")), "events": sum(read_beam_on(paths["macro"])),
+                  "state": "generated", "created": time.time()}
+        known = self.connection.execute("SELECT state FROM runs WHERE run_dir = ? AND geometry_hash IS ? AND macro_hash IS ?",
+                                        (run_dir, values["geometry_hash"], values["macro_hash"])).fetchone()
+        if known and known[0] in ("done", "reused"):                 # Same inputs as when it finished
+            return known[0]
+
+        source = self.find_identical(values["geometry_hash"], values["macro_hash"]) if reuse else None
+        if source and source["run_dir"] != run_dir and os.path.isdir(run_paths(source["run_dir"])["outputs"]):
+            shutil.copytree(run_paths(source["run_dir"])["outputs"], paths["outputs"], copy_function=_link_or_copy, dirs_exist_ok=True)
+            values.update(state="reused", reused_from=source["run_dir"], completed=time.time(),
+                          wall_time=source["wall_time"], events_per_s=source["events_per_s"])
+            manifest["reused_from"] = source["run_dir"]
+            with open(paths["manifest"], "w") as f:
+                json.dump(manifest, f, indent=2)
+
+        with self.connection:
+            self.connection.execute(f"INSERT INTO runs ({', '.join(values)}) VALUES ({', '.join('?' * len(values))}) "
+                                    f"ON CONFLICT (run_dir) DO UPDATE SET {', '.join(f'{k} = excluded.{k}' for k in values)}",
+                                    tuple(values.values()))
+        if values["state"] == "reused":
+            self.add_results(run_dir, self.results(source["run_dir"]))
+        return values["state"]
+
+    def complete(self, run_dir, state="done", wall_time=None, events_per_s=None, results=None):
+        """Records the end of a run and its headline results (read from the outputs when not given)."""
+        if self._run_id(run_dir) is None:
+            self.register(run_dir, reuse=False)
+        with self.connection:
+            self.connection.execute("UPDATE runs SET state = ?, wall_time = ?, events_per_s = ?, completed = ? WHERE run_dir = ?",
+                                    (state, wall_time, events_per_s, time.time(), os.path.abspath(run_dir)))
+        if state == "done":
+            self.add_results(run_dir, headline_results(run_dir) if results is None else results)
+
+    def add_results(self, run_dir, results):
+        """Stores numeric results of a run ({name: value}); a result stored again is replaced."""
+        run_id = self._run_id(run_dir)
+        rows = [(run_id, name, float(value)) for name, value in results.items() if isinstance(value, (int, float))]
+        with self.connection:
+            self.connection.executemany("INSERT OR REPLACE INTO results (run_id, name, value) VALUES (?, ?, ?)", rows)
+
+    def results(self, run_dir):
+        return dict(self.connection.execute("SELECT name, value FROM results WHERE run_id = ?", (self._run_id(run_dir),)))
+
+    # ::: Queries :::
+
+    def query(self, columns=(), where=None, order=None, limit=None):
+        """Rows (dictionaries) with the run folder, the run columns and the results asked for.
+
+        where and order are SQL expressions over the names of the run columns and of the results, e.g. "DetEff > 30"."""
+        names = {row[0] for row in self.connection.execute("SELECT DISTINCT name FROM results")}
+        used = [name for name in names - set(RUN_COLUMNS) if name in columns or re.search(rf"\b{re.escape(name)}\b", f"{where or ''} {order or ''}")]
+        selected = ["run_dir"] + [c for c in columns if c != "run_dir"]
+        for c in selected:
+            if c not in RUN_COLUMNS and c not in names:
+                raise ValueError(f"Unknown column {c!r} (run columns: {', '.join(RUN_COLUMNS)}; results: {', '.join(sorted(names))}).")
+
+        # One join per result used: every result becomes a column, and (name, value) is indexed
+        joins = "".join(f' LEFT JOIN results AS r{i} ON r{i}.run_id = runs.id AND r{i}.name = ?' for i in range(len(used)))
+        inner = ", ".join([f"runs.{c}" for c in RUN_COLUMNS] + [f'r{i}.value AS "{name}"' for i, name in enumerate(used)])
+        outer = ", ".join(f'q."{c}"' for c in selected)
+        sql = f"SELECT {outer} FROM (SELECT {inner} FROM runs{joins}) AS q"
+        if where:
+            sql += f" WHERE {where}"
+        if order:
+            sql += f" ORDER BY {order}"
+        if limit:
+            sql += f" LIMIT {int(limit)}"
+        cursor = self.connection.execute(sql, used)
+        return [dict(zip(selected, row)) for row in cursor]
+
+
+def main(argv=None):
+    import argparse
+    parser = argparse.ArgumentParser(description="ADAPTnGUIDE run catalogue (SQLite).")
+    parser.add_argument("catalog", help=f"Catalogue file (e.g. {CATALOG_FILE})")
+    commands = parser.add_subparsers(dest="command", required=True)
+    cmd = commands.add_parser("add", help="Add run folders and the results of the ones that have outputs")
+    cmd.add_argument("run_dirs", nargs="+")
+    cmd = commands.add_parser("query", help="Runs and results, as a table or JSON")
+    cmd.add_argument("--columns", default="state,events,events_per_s,DetEff,sigma_eff", help="Comma separated columns")
+    cmd.add_argument("--where", help='SQL condition, e.g. "DetEff > 30 AND events >= 1e6"')
+    cmd.add_argument("--order", help="SQL ordering, e.g. \"DetEff DESC\"")
+    cmd.add_argument("--limit", type=int)
+    cmd.add_argument("--json", action="store_true", help="Print the rows as JSON")
+    args = parser.parse_args(argv)
+
+    catalog = Catalog(args.catalog)
+    try:
+        if args.command == "add":
+            for run_dir in args.run_dirs:
+                state = catalog.register(run_dir)
+                if state == "generated" and headline_results(run_dir):
+                    catalog.complete(run_dir)
+            print(f"{len(args.run_dirs)} run folder(s) added to {args.catalog}")
+            return None
+        rows = catalog.query([c.strip() for c in args.columns.split(",") if c.strip()], args.where, args.order, args.limit)
+    except (ValueError, sqlite3.Error) as e:
+        parser.exit(1, f"{e}\n")
+    finally:
+        catalog.close()
+
+    if args.json:
+        print(json.dumps(rows, indent=2))
+    else:
+        columns = list(rows[0]) if rows else []
+        print("  ".join(f"{c:>14}" if c != "run_dir" else f"{c:<40}" for c in columns))
+        for row in rows:
+            print("  ".join(f"{row[c]!s:<40}" if c == "run_dir" else
+                            f"{row[c]:>14.6g}" if isinstance(row[c], float) else f"{row[c]!s:>14}" for c in columns))
+    return rows
+
+
+if __name__ == "__main__":
+    main()
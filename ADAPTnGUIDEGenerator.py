@@ -0,0 +1,1317 @@
+# ::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::
+# :::                                                                                                                          :::
+# :::                                              ADAPTnGUIDE Input Generator                                                 :::
+# :::                                                                                                                          :::
+# ::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::
+
+
+# ::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::
+# This Python module renders the DetectorConstruction.cc and ADAPT.mac files of the GUI without a display:
+#       - A configuration (dictionary, JSON or YAML file) holds the same values as the GUI fields
+#       - validate_config() checks the configuration and returns a normalised copy (raises ValueError with every problem found)
+#       - render_detector_construction() and render_macro() are pure functions that return the text of the files
+#       - write_run_dir() creates a self-contained run folder: manifest.json, inputs/ (DetectorConstruction.cc, <geometryName>.txt,
+#         ADAPT.mac) and outputs/, the working directory of ADAPT. The analysis scripts accept the run folder as --input-dir, so
+#         several studies can be prepared, simulated and analysed at the same time without overwriting each other
+#       - install_inputs() places the files as the GUI does (src/, DetectorConstructionGeometries/ and ADAPT.mac). Files whose
+#         content did not change are not rewritten, and the result says whether ADAPT needs to be rebuilt
+#
+# Both GUIs call this module when the Save button is clicked, so the files generated here and from the GUI are identical.
+# Thousands of configurations can be rendered in a few seconds:
+#       python ADAPTnGUIDEGenerator.py config.json                                 # Installs the files like the GUI
+#       python ADAPTnGUIDEGenerator.py configs.json --output-dir study1            # One run folder per configuration
+#       cd study1/Study/outputs && ADAPT ../inputs/ADAPT.mac 123456
+#
+#       from ADAPTnGUIDEGenerator import render_macro
+#       macro = render_macro({**config, "Runs_input": 10**6})
+#
+# Configuration keys (same names as the GUI variables):
+#       source_choice, detector_choice                              Box or Cylinder
+#       world_material, source_material, detector_material         Geant4 NIST names (e.g. G4_AIR, G4_Am, G4_PLASTIC_SC_VINYLTOLUENE)
+#       source_dim_values, detector_dim_values                      [x, y, z] for a Box or [r1, r2, length] for a Cylinder (mm)
+#       source_pos_values, detector_pos_values                      [x, y, z] (mm)
+#       CADfile_names, CAD_Folder_Path                              Optional CAD geometries (written commented)
+#       Radionuclide, Location_source, Runs_input                   Source of the macro file and number of events
+#       geometryName                                                Name of the .txt copy of the geometry
+#       CAD_commented                                               False to write the CAD section as the macOS GUI does
+#       runtime_geometry                                            True to also write ADAPT_Geometry.txt and load it at startup
+#                                                                   (/adapt/geometry/file), so no recompilation is needed
+#       CAD_materials, CAD_format                                   Material of every CAD file and stl/obj, for the runtime geometry
+#       scan                                                        Optional list of steps run in one process, e.g.
+#                                                                   [{"detector_pos_values": [0, 0, 10], "Runs_input": 10000}, ...]
+#                                                                   (/adapt/source/position, /adapt/detector/position and
+#                                                                   /adapt/detector/dimensions between the /run/beamOn commands)
+#       threads, jobs                                               Worker threads (/run/numberOfThreads): an integer, or "auto" to
+#                                                                   share the cores of this machine between `jobs` simultaneous runs
+#       seed, seed_stream                                           Master seed and stream number: /random/setSeeds gets two seeds
+#                                                                   derived from both, so every stream is independent and reproducible
+#                                                                   (several run folders without a seed use STREAM_SEED)
+#       stack_rules, stack_verbose                                  Track classification of StackingAction (null: the built-in rules),
+#                                                                   e.g. [{"action": "kill", "particle": "neutrinos"},
+#                                                                   {"action": "kill", "particle": "Np-237*", "source": "Am-241"},
+#                                                                   "kill particle=e- emax=10 primary=0"]; names become PDG codes.
+#                                                                   stack_verbose prints every new track (slow)
+#       hits, hit_columns                                           "steps" (one ntuple row per step with an energy deposit), "events"
+#                                                                   (one row per event: Edep, hits, centroid, first hit) or "none"
+#                                                                   (histogram only); optional columns time, momentum, wavelength, particle
+#                                                                   (name) and pdg (PDG encoding, for ADAPTnGUIDEAnalysis.py particles)
+#       mesh_quantities                                             None (gamma energy deposit only) or the quantities of the scoring mesh,
+#                                                                   e.g. ["alpha", "e-", "gamma", "dose"] or {"particle": "alpha",
+#                                                                   "quantity": "doseDeposit"}: one scorer and one dump file each
+# ::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::
+
+
+# :::::: We import the needed libraries ::::::
+import hashlib
+import json
+import os
+import re
+
+from RunFolders import INPUTS_DIR, MACRO_FILE, MANIFEST_FILE, OUTPUTS_DIR, available_cores, run_paths   # Run folder layout
+
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+SHAPES    = ("Box", "Cylinder")
+LOCATIONS = ("Volume", "Surface", "Point", "Beam")
+
+DEFAULT_CONFIG = {
+    "world_material":       "G4_AIR",
+    "CADfile_names":        [],
+    "CAD_Folder_Path":      "",
+    "Location_source":      "Volume",
+    "geometryName":         "DetectorConstruction",
+    "CAD_commented":        True,
+    "runtime_geometry":     False,
+    "CAD_materials":        {},
+    "CAD_format":           "stl",
+    "scan":                 [],
+    "threads":              None,                                   # None: /run/numberOfThreads stays commented (template default)
+    "jobs":                 1,
+    "seed":                 None,                                   # None: no /random/setSeeds (seed of run.sh / Geant4 default)
+    "seed_stream":          0,
+    "inputs_path":          "",                                     # Folder of the inputs seen from the working directory of ADAPT
+    "stack_rules":          None,                                   # None: the rules built into StackingAction.cc
+    "hits":                 "steps",                                # Hits ntuple: one row per depositing step, events (one row per event) or none
+    "hit_columns":          [],                                     # Optional ntuple columns (HIT_COLUMNS)
+    "mesh_quantities":      None,                                   # None: energy deposit of gammas (template default)
+    "stack_verbose":        False,
+}
+
+SCAN_COMMANDS = {                                                   # Configuration key -> macro command of DetectorMessenger
+    "source_pos_values":    "/adapt/source/position",
+    "detector_pos_values":  "/adapt/detector/position",
+    "detector_dim_values":  "/adapt/detector/dimensions",
+}
+
+GEOMETRY_FILE = "ADAPT_Geometry.txt"                                # Runtime geometry read by DetectorConstructionFromFile.cc
+WORLD_SIZE    = 2000                                                # mm, same world as the GUI (2 x 2 x 2 m3)
+STREAM_SEED   = 123456                                              # Master seed of several run folders written without "seed" (run.sh seed)
+
+REQUIRED_KEYS = ("source_choice", "detector_choice", "source_material", "detector_material", "source_dim_values",
+                 "detector_dim_values", "source_pos_values", "detector_pos_values", "Radionuclide", "Runs_input")
+
+
+# :::::: Define radionuclide properties ::::::
+# MOST COMMON RADIOISOTOPES USED ONLY!!!!!
+RADIONUCLIDES = {
+    # ::: α emitters :::
+    "Am-241": {"Z": 95, "A": 241},
+    "Ra-224": {"Z": 88, "A": 224},
+    "DaRT":   {"Z": 88, "A": 224},   # Ra-224 seeds (Diffusing alpha-emitters Radiation Therapy)
+    "Pu-239": {"Z": 94, "A": 239},
+    "Ra-226": {"Z": 88, "A": 226},
+    "Ac-225": {"Z": 89, "A": 225},
+    "Th-232": {"Z": 90, "A": 232},
+    "Th-228": {"Z": 90, "A": 228},
+    "U-238":  {"Z": 92, "A": 238},
+    "U-235":  {"Z": 92, "A": 235},
+    "At-211": {"Z": 85, "A": 211},
+    "Po-210": {"Z": 84, "A": 210},
+    "Cm-244": {"Z": 96, "A": 244},
+    "Cf-252": {"Z": 98, "A": 252},
+    "Rn-222": {"Z": 86, "A": 222},
+
+    # ::: β- emitters :::
+    "Sr-90":  {"Z": 38, "A": 90},
+    "Y-90":   {"Z": 39, "A": 90},
+    "P-32":   {"Z": 15, "A": 32},
+    "S-35":   {"Z": 16, "A": 35},
+    "Lu-177": {"Z": 71, "A": 177},
+    "Re-188": {"Z": 75, "A": 188},
+    "Re-186": {"Z": 75, "A": 186},
+    "Sm-153": {"Z": 62, "A": 153},
+    "Ho-166": {"Z": 67, "A": 166},
+    "I-131":  {"Z": 53, "A": 131},
+    "Ir-192": {"Z": 77, "A": 192},
+    "Fe-59":  {"Z": 26, "A": 59},
+    "Cs-137": {"Z": 55, "A": 137},  # β- → Ba-137m (γ 662 keV)
+    "Co-60":  {"Z": 27, "A": 60},   # β- + γ (1.17, 1.33 MeV)
+    "Na-24":  {"Z": 11, "A": 24},
+
+    # ::: Beta+ emitters :::
+    "F-18":  {"Z": 9,  "A": 18},
+    "C-11":  {"Z": 6,  "A": 11},
+    "N-13":  {"Z": 7,  "A": 13},
+    "O-15":  {"Z": 8,  "A": 15},
+    "Ga-68": {"Z": 31, "A": 68},
+    "Zr-89": {"Z": 40, "A": 89},
+    "Cu-64": {"Z": 29, "A": 64},  # β+ and β-
+    "Sc-44": {"Z": 21, "A": 44},
+    "Rb-82": {"Z": 37, "A": 82},
+    "Na-22": {"Z": 11, "A": 22},
+    "I-124": {"Z": 53, "A": 124},
+    "Y-86":  {"Z": 39, "A": 86},
+    "Br-76": {"Z": 35, "A": 76},
+
+    # ::: Gamma emitters :::
+    "Tc-99m": {"Z": 43, "A": 99},
+    "Co-57":  {"Z": 27, "A": 57},
+    "Ba-133": {"Z": 56, "A": 133},
+    "Mn-54":  {"Z": 25, "A": 54},
+    "Zn-65":  {"Z": 30, "A": 65},
+    "Cd-109": {"Z": 48, "A": 109},
+    "In-111": {"Z": 49, "A": 111},
+    "Tl-201": {"Z": 81, "A": 201},
+    "Xe-133": {"Z": 54, "A": 133},
+    "Kr-85":  {"Z": 36, "A": 85},
+    "I-125":  {"Z": 53, "A": 125},
+}
+
+
+# :::::: Track classification rules (/adapt/stack/rule of StackingAction, keyed by PDG encoding) ::::::
+STACK_ACTIONS   = ("kill", "urgent", "waiting", "postpone")
+STACK_KEYS      = ("particle", "parent", "source", "primary", "emin", "emax", "process")   # emin, emax in keV
+PARTICLE_CODES  = {
+    "gamma": 22, "e-": 11, "e+": -11, "mu-": 13, "mu+": -13, "proton": 2212, "neutron": 2112,
+    "nu_e": 12, "anti_nu_e": -12, "nu_mu": 14, "anti_nu_mu": -14, "nu_tau": 16, "anti_nu_tau": -16,
+    "deuteron": 1000010020, "triton": 1000010030, "He3": 1000020030, "alpha": 1000020040,
+}
+HIT_MODES       = ("steps", "events", "none")
+HIT_COLUMNS     = ("time", "momentum", "wavelength", "particle", "pdg")   # /adapt/output/columns, after iEvent, PosX, PosY, PosZ, fEnergyDeposited
+MESH_QUANTITIES = {"energyDeposit": ("EnergyDep", "MeV"), "doseDeposit": ("Dose", "Gy")}   # Scorer name suffix, unit
+MESH_SHORTCUTS  = {"total": (None, "energyDeposit"), "dose": (None, "doseDeposit")}       # Unfiltered scorers
+MESH_PREFIXES   = {"gamma": ("Gamma", "gammaFilter"), "alpha": ("Alpha", "alphaFilter"),   # Names of the shipped ADAPT.mac
+                   "e-": ("Beta", "eMinusFilter"), None: ("Total", None)}
+PARTICLE_GROUPS = {"neutrinos": ("nu_e", "anti_nu_e", "nu_mu", "anti_nu_mu", "nu_tau", "anti_nu_tau")}
+ELEMENTS = ("H He Li Be B C N O F Ne Na Mg Al Si P S Cl Ar K Ca Sc Ti V Cr Mn Fe Co Ni Cu Zn Ga Ge As Se Br Kr Rb Sr Y Zr Nb Mo "
+            "Tc Ru Rh Pd Ag Cd In Sn Sb Te I Xe Cs Ba La Ce Pr Nd Pm Sm Eu Gd Tb Dy Ho Er Tm Yb Lu Hf Ta W Re Os Ir Pt Au Hg Tl "
+            "Pb Bi Po At Rn Fr Ra Ac Th Pa U Np Pu Am Cm Bk Cf Es Fm").split()
+
+
+# ::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::
+# :::                                                                :::
+# :::          D E T E C T O R    C O N S T R U C T I O N.CC         :::
+# :::                                                                :::
+# ::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::
+
+# The templates are filled with str.format (same fields as the GUI f-strings, literal braces are doubled)
+DC_HEADER = """// :::::::::::::::::::::::::::::::::::::::::::::::::::::
+// :::                                               :::
+// :::     Source file for Detector Construction     :::
+// :::                                               :::
+// :::::::::::::::::::::::::::::::::::::::::::::::::::::
+
+// Include user-made and needed libraries
+#include "DetectorConstruction.hh"
+#include "CADMesh.hh"               // To import CAD files
+
+
+// ::::::::::::::::::::::::::::::::
+// :::  Constructor definition  :::
+// ::::::::::::::::::::::::::::::::
+
+DetectorConstruction::DetectorConstruction()
+{{
+    fMessenger = new DetectorMessenger(this);   // /adapt/... macro commands
+}}
+
+
+// ::::::::::::::::::::::::::::::::
+// :::  Destructor definition   :::
+// ::::::::::::::::::::::::::::::::
+
+DetectorConstruction::~DetectorConstruction()
+{{
+    delete fMessenger;
+}}
+
+
+// ::::::::::::::::::::::::::::::::::
+// ::: Physical volume definition :::
+// :::        (function)          :::
+// ::::::::::::::::::::::::::::::::::
+
+G4VPhysicalVolume *DetectorConstruction::Construct()
+{{ 
+    G4bool checkOverlaps = true;                                 // Command to check for geometries overlaps
+
+    G4NistManager  *nist = G4NistManager::Instance();             // Nist manager includes several materials that we can use
+
+
+    // ::::::::::::::::::::::::::::::::
+    // :::          Elements        :::
+    // ::::::::::::::::::::::::::::::::
+    G4Element*  Lu = nist->FindOrBuildElement("Lu");
+    G4Element*  Y  = nist->FindOrBuildElement("Y");
+    G4Element*  Si = nist->FindOrBuildElement("Si");
+    G4Element*  O  = nist->FindOrBuildElement("O");
+    G4Element*  Ce = nist->FindOrBuildElement("Ce");
+    G4Element*  Fe = nist->FindOrBuildElement("Fe");
+    G4Element*  Cr = nist->FindOrBuildElement("Cr");
+    G4Element*  N  = nist->FindOrBuildElement("N");
+    G4Element*  Ni = nist->FindOrBuildElement("Ni");
+    G4Element*  Mn = nist->FindOrBuildElement("Mn");
+    G4Element*  C  = nist->FindOrBuildElement("C");
+    G4Element*  S  = nist->FindOrBuildElement("S");
+    G4Element*  P  = nist->FindOrBuildElement("P");
+    G4Element*  Cu = nist->FindOrBuildElement("Cu");
+    G4Element*  Mo = nist->FindOrBuildElement("Mo");
+    G4Element*  H = nist->FindOrBuildElement("H");
+    
+
+    // ::::::::::::::::::::::::::::::::
+    // :::        Materials         :::
+    // ::::::::::::::::::::::::::::::::
+    G4Material *WorldMat = nist->FindOrBuildMaterial("{world_material}");   // We name and define a material from the nist manager. For other materials refer to the Geant4 Material Database
+    G4Material    *PbMat = nist->FindOrBuildMaterial("G4_Pb");  
+    G4Material   *SrcMat = nist->FindOrBuildMaterial("{source_material}");    // Source's material
+    G4Material   *DetMat = nist->FindOrBuildMaterial("{detector_material}");  // Detector's Active Volume material
+    G4Material   *Water = nist->FindOrBuildMaterial("G4_WATER");  // Detector's Active Volume material
+
+
+    // ::::::::::::::::::::::::::::::::::::::::::
+    // :::  User-defined materials/compounds  :::
+    // ::::::::::::::::::::::::::::::::::::::::::
+
+    // To define a new material use the following commands:
+    //          G4Material("Name", Density*g/cm3, No. of elements)
+    //          Name->AddElement(Element, No of atoms);  // Define the number of elements and the atom numbers for each element
+
+    // :::::::::::::::::::::::::::
+    // :::  Examples provided  :::
+    // :::::::::::::::::::::::::::
+
+    // :::::::: LYSO ::::::::
+    G4Material* LYSO = new G4Material("LYSO", 7.1*g/cm3, 5);
+    LYSO->AddElement(Lu, 2);
+    LYSO->AddElement( Y, 2);
+    LYSO->AddElement(Si, 1);
+    LYSO->AddElement( O, 5);
+    LYSO->AddElement(Ce, 1);
+
+    // :::::::: Stainless steel 316LVM ::::::::
+    // Values retrieved from: https://www.ulbrich.com/alloys/316lvm-stainless-steel-uns-s31673/
+    // You can also define a material defining the % of each element. The % must add up 1
+    G4Material* StainlessSteel = new G4Material( "SSteel_316LVM", 7.92*g/cm3, 11 );
+    StainlessSteel->AddElement( C , 0.0003 ); // 0.03%
+    StainlessSteel->AddElement( P , 0.0003 ); // 0.03%
+    StainlessSteel->AddElement( Si, 0.0075 ); // 0.75%
+    StainlessSteel->AddElement( Ni, 0.13   ); // 13.0%
+    StainlessSteel->AddElement( Cu, 0.0005 ); // 0.05%
+    StainlessSteel->AddElement( Mn, 0.02   ); // 2.00%
+    StainlessSteel->AddElement( S,  0.0001 ); // 0.01%
+    StainlessSteel->AddElement( Cr, 0.17   ); // 17.0%
+    StainlessSteel->AddElement( Mo, 0.0225 ); // 2.25%
+    StainlessSteel->AddElement( N , 0.0010 ); // 0.10%
+    StainlessSteel->AddElement( Fe, 0.6478 ); // Balance (64.78%)
+
+    // :::::::: Pebax C2H40 ::::::::
+    G4Material* pebax = new G4Material( "Pebax", 1.01*g/cm3, 3 );
+    pebax->AddElement( C , 2 );
+    pebax->AddElement( H , 4 );
+    pebax->AddElement( O , 1 );
+
+    // :::::::: Silicone ::::::::
+    G4Material* silicone = new G4Material( "silicone", 1.1*g/cm3, 4 );
+    silicone->AddElement( C , 2 );
+    silicone->AddElement( H , 6 );
+    silicone->AddElement( Si, 1 );
+    silicone->AddElement( O , 1 );
+
+    // :::::::: Silicone Grease ::::::::
+    G4Material* OpticalGreaseMat = new G4Material( "OpticalGreaseMat", 1.1*g/cm3, 4 );
+    OpticalGreaseMat->AddElement( C , 2 );
+    OpticalGreaseMat->AddElement( H , 6 );
+    OpticalGreaseMat->AddElement( Si, 1 );
+    OpticalGreaseMat->AddElement( O , 1 );
+
+    // :::::::: Polyether Ether Ketona (PEEK,C19H12O3) ::::::::
+    G4Material* PEEK = new G4Material( "PEEK", 1.32*g/cm3, 3 );
+    PEEK->AddElement( C , 19 );
+    PEEK->AddElement( H , 12 );
+    PEEK->AddElement( O , 3  );
+
+
+    // :::::::::::::::::::::::::::::::::::::::::
+    // :::  Runtime geometry file (optional) :::
+    // :::::::::::::::::::::::::::::::::::::::::
+
+    // If a geometry file was given with /adapt/geometry/file (before /run/initialize), the volumes are built from it
+    // (see DetectorConstructionFromFile.cc) and the geometry below is not used. The materials above can be used in the file.
+    if (!fGeometryFile.empty()) return ConstructFromFile(fGeometryFile);
+
+
+    // ::::::::::::::::::::::::::::::::
+    // :::         Geometry         :::
+    // ::::::::::::::::::::::::::::::::
+    
+    // :::  Positions  :::
+    Pos1 = G4ThreeVector(0, 0, 0);       // World position
+    Pos2 = G4ThreeVector({source_pos_values[0]}*mm, {source_pos_values[1]}*mm, {source_pos_values[2]}*mm);  // Source
+    Pos3 = G4ThreeVector({detector_pos_values[0]}*mm, {detector_pos_values[1]}*mm, {detector_pos_values[2]}*mm);  // Detector
+
+
+    // :::::::::::::::::::
+    // :::::: World ::::::
+    // :::::::::::::::::::
+
+    // ::: Dimensions :::
+    G4double WorldX = 2./2*m; // Geant4 always takes half of the length. Therefore define them as X/2 or X*0.5
+    G4double WorldY = 2./2*m;
+    G4double WorldZ = 2./2*m;
+
+    World      = new G4Box("World", WorldX, WorldY, WorldZ); // Solids deals with the definition of the shapes
+    World_log  = new G4LogicalVolume(World, WorldMat, "World_log");
+    World_phys = new G4PVPlacement(0, Pos1, World_log, "World_phys", 0, false, 0, checkOverlaps); // The first 0 means rotation. The world does not need to be rotated so, = 0. 
+                                                                                                  // The second 0 means if this volume is a daughter (aka. if it is inside another volume). In this case, No.
+                                                                                                  // The third 0 means the copy number.
+
+    // ::::::::::::::::::::::
+    // ::::::  Source  ::::::
+    // ::::::::::::::::::::::
+
+    Rotation = new G4RotationMatrix();    // A rotation is defined to align all the source geometry in the Y axis direction
+    Rotation->rotateX(90.*deg);
+    Rotation->rotateY(0.*deg);
+    Rotation->rotateZ(0.*deg);
+"""
+
+# :::::: Dimensions of the source based on the Shape ::::::
+SOURCE_BOX = """
+    G4double SourceX = {source_dim_values[0]}/2.*mm;
+    G4double SourceY = {source_dim_values[1]}/2.*mm;
+    G4double SourceZ = {source_dim_values[2]}/2.*mm;
+
+    G4Box      *Source = new G4Box("Source", SourceX, SourceY, SourceZ);
+            Source_log = new G4LogicalVolume(Source, SrcMat, "Source_log");
+           Source_phys = new G4PVPlacement(0, Pos2, Source_log, "Source_phys", World_log, false, checkOverlaps);
+            """
+
+SOURCE_CYLINDER = """
+    G4double SourceInRad     = {source_dim_values[0]}*mm;
+    G4double SourceOutRad    = {source_dim_values[1]}*mm;
+    G4double SourceThickness = {source_dim_values[2]}/2.*mm;
+
+    G4Tubs   *Source  = new G4Tubs("Source", SourceInRad, SourceOutRad, SourceThickness, 0.*deg, 360*deg);
+          Source_log  = new G4LogicalVolume(Source, SrcMat, "Source_log");
+          Source_phys = new G4PVPlacement(Rotation, Pos2, Source_log, "Source_phys", World_log, 0, checkOverlaps);
+            """
+
+# :::::: Dimensions of the detector based on the Shape ::::::
+DETECTOR_BOX = """
+    
+    // ::::::::::::::::::::::
+    // :::::: Detector ::::::
+    // ::::::::::::::::::::::
+
+    G4double DetectorX = {detector_dim_values[0]}/2.*mm;
+    G4double DetectorY = {detector_dim_values[1]}/2.*mm;
+    G4double DetectorZ = {detector_dim_values[2]}/2.*mm;
+
+    Detector      = new G4Box("Detector", DetectorX, DetectorY, DetectorZ);
+    Detector_log  = new G4LogicalVolume(Detector, DetMat, "Detector_log");
+    Detector_phys = new G4PVPlacement(0, Pos3, Detector_log, "Detector_phys", World_log, false, checkOverlaps);
+            """
+
+DETECTOR_CYLINDER = """
+
+    // ::::::::::::::::::::::
+    // :::::: Detector ::::::
+    // ::::::::::::::::::::::
+
+    G4double DetInnerRadius = {detector_dim_values[0]}*mm;
+    G4double DetOuterRadius = {detector_dim_values[1]}*mm;
+    G4double DetThickness   = {detector_dim_values[2]}/2.*mm;
+
+    G4Tubs   *Detector  = new G4Tubs("Detector", DetInnerRadius, DetOuterRadius, DetThickness, 0.*deg, 360*deg);
+          Detector_log  = new G4LogicalVolume(Detector, DetMat, "Detector_log");
+          Detector_phys = new G4PVPlacement(0, Pos3, Detector_log, "Detector_phys", World_log, 0, checkOverlaps);
+            """
+
+# :::::: CAD Geometries (commented, as in the Ubuntu GUI) ::::::
+CAD_HEADER = """
+        
+    // ::::::::::::::::::::::::::::::::::::::
+    // :::          CAD Geometries        :::
+    // ::::::::::::::::::::::::::::::::::::::
+
+    /* In this section you can add more geometries using CAD files in .obj or .stl format.
+     * !!! Coppy and uncomment the following section if you want to model the CAD files, or if you wich to add more CAD geometries. !!!
+     * !!! The 'X' represents the number of CAD geometries, 'Name' is the name of the CAD file, and 'MATERIAL' should be defined before compiling. !!!
+     *
+     * The CAD files are added throught the GUI, but if you wish to add them manually, here is the detailed processs on how to proceed:
+     *     1) Import .obj, or .stl geometry using:
+     *
+     *        auto meshX = CADMesh::TessellatedMesh::FromOBJ("NAME.obj");  // If you want to add more CAD files, keep using mesh2,3,4, etc. Remember to write the correct file name!
+     *        auto meshx = CADMesh::TessellatedMesh::FromSTL("Name.stl");  // stl geometries MUST BE SAVED IN ASCII STL
+     *
+     *     2) Scale the geoemtry. Recommended to set it to 1 to keep your original dimensions
+     *
+     *        meshX->SetScale(1); // For more geoemtries use mesh2, mesh3, etc.
+     *
+     *     3) Setting an offset in the geoemtry position. Modify it as needed, but adding mesh2, mesh3, etc for more geometries.
+     *
+     *        meshX->SetOffset(x, y, z);
+     *        meshX->SetOffset(G4ThreeVector(x, y, z));
+     *
+     *     4) Assigning names and materials. Replace NAME for the name of your geometry (e.g.  NAME --> Shielding).
+     *                                       Replace MATERIAL with your defined material (e.g. MATERIAL --> LYSO).
+     *
+     *        // ::: Name :::
+     *        auto NAME     = meshX->GetSolid();                                      
+     *        auto NAME_log = new G4LogicalVolume(NAME, MATERIAL, "NAME_log",0,0,0);
+     *                        new G4PVPlacement(rotation, Pos1, "NAME", NAME_log, World_log, false, 0, false);
+     * 
+     * Credits to Christopher Poole for this section (https://github.com/christopherpoole/CADMesh/tree/master)
+     */
+
+    G4double x = 0.0; // Do not comment this line.
+    G4double y = 0.0; // Do not comment this line.
+    G4double z = 0.0; // Do not comment this line.
+    
+    /*  // :::::::::::: UNCOMMENT THE FOLLOWING SECTION STARTING FROM HERE UP TO ....
+     *  //std::string basePath = "{CAD_Folder_Path}/Obj/";  // For .obj files
+     *  //std::string basePath = "{CAD_Folder_Path}/Stl/";  // For .stl files. MUST BE IN ASCII STL
+
+       """
+
+CAD_GEOMETRY = """
+    // ::: {CADfile_name} :::
+    //auto mesh{i} = CADMesh::TessellatedMesh::FromOBJ(basePath + "{CADfile_name}.obj");
+    //auto mesh{i} = CADMesh::TessellatedMesh::FromSTL(basePath + "{CADfile_name}.stl");
+
+    //mesh{i}->SetScale(1);
+    //mesh{i}->SetOffset(x, y, z);
+    //mesh{i}->SetOffset(G4ThreeVector(x, y, z));
+
+    //Rotation = new G4RotationMatrix();
+    //Rotation->rotateX(0.*deg);
+    //Rotation->rotateY(0.*deg);
+    //Rotation->rotateZ(0.*deg);
+
+    //auto {CADfile_name} = mesh{i}->GetSolid();
+    //auto {CADfile_name}_log = new G4LogicalVolume({CADfile_name}, MATERIAL, "{CADfile_name}_log", 0, 0, 0);
+    //                    new G4PVPlacement(Rotation, Pos1, {CADfile_name}_log, "{CADfile_name}", World_log, 0, checkOverlaps); // ...here.
+            """
+
+# :::::: CAD Geometries (inside the block comment only, as in the macOS GUI) ::::::
+CAD_HEADER_UNCOMMENTED = """
+        
+    // ::::::::::::::::::::::::::::::::::::::
+    // :::          CAD Geometries        :::
+    // ::::::::::::::::::::::::::::::::::::::
+
+    /* In this section you can add more geometries using CAD files in .obj or .stl format.
+     * !!! Coppy and uncomment the following section if you want to model the CAD files, or if you wich to add more CAD geometries. !!!
+     * !!! The 'X' represents the number of CAD geometries, 'Name' is the name of the CAD file, and 'MATERIAL' should be defined before compiling. !!!
+     *
+     * The CAD files are added throught the GUI, but if you wish to add them manually, here is the detailed processs on how to proceed:
+     *     1) Import .obj, or .stl geometry using:
+     *
+     *        auto meshX = CADMesh::TessellatedMesh::FromOBJ("NAME.obj");  // If you want to add more CAD files, keep using mesh2,3,4, etc. Remember to write the correct file name!
+     *        auto meshx = CADMesh::TessellatedMesh::FromSTL("Name.stl");  // stl geometries MUST BE SAVED IN ASCII STL
+     *
+     *     2) Scale the geoemtry. Recommended to set it to 1 to keep your original dimensions
+     *
+     *        meshX->SetScale(1); // For more geoemtries use mesh2, mesh3, etc.
+     *
+     *     3) Setting an offset in the geoemtry position. Modify it as needed, but adding mesh2, mesh3, etc for more geometries.
+     *
+     *        meshX->SetOffset(x, y, z);
+     *        meshX->SetOffset(G4ThreeVector(x, y, z));
+     *
+     *     4) Assigning names and materials. Replace NAME for the name of your geometry (e.g.  NAME --> Shielding).
+     *                                       Replace MATERIAL with your defined material (e.g. MATERIAL --> LYSO).
+     *
+     *        // ::: Name :::
+     *        auto NAME     = meshX->GetSolid();                                      
+     *        auto NAME_log = new G4LogicalVolume(NAME, MATERIAL, "NAME_log",0,0,0);
+     *                        new G4PVPlacement(rotation, Pos1, "NAME", NAME_log, World_log, false, 0, false);
+     * 
+     * Credits to Christopher Poole for this section (https://github.com/christopherpoole/CADMesh/tree/master)
+     */
+
+    G4double x = 0.0; // Do not comment this line.
+    G4double y = 0.0; // Do not comment this line.
+    G4double z = 0.0; // Do not comment this line.
+    
+    /*  // :::::::::::: UNCOMMENT THE FOLLOWING SECTION STARTING FROM HERE UP TO ....
+       //std::string basePath = "{CAD_Folder_Path}/Obj/";  // For .obj files
+       //std::string basePath = "{CAD_Folder_Path}/Stl/";  // For .stl files. MUST BE IN ASCII STL
+
+       """
+
+CAD_GEOMETRY_UNCOMMENTED = """
+    // ::: {CADfile_name} :::
+    //auto mesh{i} = CADMesh::TessellatedMesh::FromOBJ(basePath + "{CADfile_name}.obj");
+    //auto mesh{i} = CADMesh::TessellatedMesh::FromSTL(basePath + "{CADfile_name}.stl");
+
+    mesh{i}->SetScale(1);
+    mesh{i}->SetOffset(x, y, z);
+    mesh{i}->SetOffset(G4ThreeVector(x, y, z));
+
+    Rotation = new G4RotationMatrix();
+    Rotation->rotateX(0.*deg);
+    Rotation->rotateY(0.*deg);
+    Rotation->rotateZ(0.*deg);
+
+    auto {CADfile_name} = mesh{i}->GetSolid();
+    auto {CADfile_name}_log = new G4LogicalVolume({CADfile_name}, MATERIAL, "{CADfile_name}_log", 0, 0, 0);
+                        new G4PVPlacement(Rotation, Pos1, {CADfile_name}_log, "{CADfile_name}", World_log, 0, checkOverlaps);
+            """
+
+DC_FOOTER = """
+
+    */  // ... UP TO HERE! 
+
+
+    // ::::::::::::::::::::::::::::::::::::::
+    // :::    Visualisation Attributes    :::
+    // ::::::::::::::::::::::::::::::::::::::
+
+    // Add your CAD_log volumes here for visualization too
+
+    // ::: Detector :::
+    G4VisAttributes *DetVisAtt = new G4VisAttributes(G4Color(0.0, 0.0, 1.0, 0.5)); // Blue
+    DetVisAtt->SetForceSolid(true);
+    Detector_log->SetVisAttributes(DetVisAtt);
+
+    // ::: Source :::
+    G4VisAttributes *SrcVisAtt = new G4VisAttributes(G4Color(1.0, 0.0, 0.0, 0.5)); // Red
+    SrcVisAtt->SetForceSolid(true);
+    Source_log->SetVisAttributes(SrcVisAtt);
+
+
+    return World_phys;  // Always return the physical World
+}}
+
+
+// ::::::::::::::::::::::::::::::::::
+// :::    Sensitive Detector      :::
+// :::         function           :::
+// ::::::::::::::::::::::::::::::::::
+
+void DetectorConstruction::ConstructSDandField()
+{{
+    SensitiveDetector *sensDet = new SensitiveDetector("SensitiveDetector");
+    Detector_log->SetSensitiveDetector(sensDet);
+    G4SDManager::GetSDMpointer()->AddNewDetector(sensDet);
+}}
+
+// :::::::::::::::::::::::::::::::::::::::::::::::::::::::: End ::::::::::::::::::::::::::::::::::::::::::::::::::::::::::
+        """
+
+
+# ::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::
+# :::                                                                :::
+# :::                     M A C R O    F I L E                       :::
+# :::                                                                :::
+# ::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::
+
+# :::::: Command-based Scoring for Square detector ::::::
+SCORING_BOX = """# ::::::::::::::::::::::::::::::::::::::::::::
+# :::         Command-Based Scoring        :::
+# ::::::::::::::::::::::::::::::::::::::::::::
+
+/score/create/boxMesh             DetScoringVolume
+/score/mesh/boxSize               {DetX:.2f} {DetY:.2f} {DetZ:.2f} mm
+/score/mesh/nBin                  {voxX:.0f} {voxY:.0f} {voxZ:.0f}
+/score/mesh/translate/xyz         {detector_pos_values[0]} {detector_pos_values[1]} {detector_pos_values[2]} mm
+
+{MeshQuantities}
+/score/close """
+
+SCORING_VISUALIZATION_BOX = """# ::::::::::::::::::::::::::::::::::::::::::
+# ::: Command-Based Scorer Visualization :::
+# ::::::::::::::::::::::::::::::::::::::::::
+
+# Uncomment the following lines ONLY IF you want to verify the scorer geometry using interactive mode
+# Terminal% ./run.sh --vis
+# Session: /control/execute ADAPT.mac
+
+#/vis/drawVolume worlds
+#/vis/viewer/copyViewFrom viewer-0
+#/score/colorMap/setMinMax ! 0. 800.
+#/control/loop drawSlice.mac iColumn 0 0 1 # Second number is the number of slices depending on the no of bins defined previously
+
+
+# :::::::::::::::::::::::::::::::::::::::::::
+# :::            Scoring Files            :::
+# :::::::::::::::::::::::::::::::::::::::::::
+
+{MeshDumps}
+"""
+
+# :::::: Command-based Scoring for Cylindrical detector ::::::
+SCORING_CYLINDER = """# ::::::::::::::::::::::::::::::::::::::::::::
+# :::         Command-Based Scoring        :::
+# ::::::::::::::::::::::::::::::::::::::::::::
+
+/score/create/cylinderMesh        DetScoringVolume
+/score/mesh/cylinderSize          {detector_dim_values[1]} {DetLen:.2f} mm
+/score/mesh/nBin                  {iR:.0f} {iZ:.0f} {iPhi:.0f}               # R Z Phi
+/score/mesh/translate/xyz         {detector_pos_values[0]} {detector_pos_values[1]} {detector_pos_values[2]} mm
+/score/mesh/rotate/rotateX        90 deg
+
+{MeshQuantities}
+/score/close """
+
+SCORING_VISUALIZATION_CYLINDER = """# ::::::::::::::::::::::::::::::::::::::::::
+# ::: Command-Based Scorer Visualization :::
+# ::::::::::::::::::::::::::::::::::::::::::
+
+# Uncomment the following lines ONLY IF you want to verify the scorer geometry using interactive mode
+# Terminal% ./run.sh --vis
+# Session: /control/execute ADAPT.mac
+
+#/score/colorMap/setMinMax ! 0. 200.
+#/control/alias iAxis 1
+#/control/loop drawCylinderSlice.mac iColumn 0 {cylinderVis:.0f} 1
+
+
+# :::::::::::::::::::::::::::::::::::::::::::
+# :::            Scoring Files            :::
+# :::::::::::::::::::::::::::::::::::::::::::
+
+{MeshDumps}
+"""
+
+# :::::: Shape of the source in the General Particle Source ::::::
+SOURCE_SHAPE_BOX = """/gps/pos/shape            Para
+/gps/pos/halfx            {halfx:.2f} mm
+/gps/pos/halfy            {halfy:.2f} mm"""
+
+SOURCE_SHAPE_CYLINDER = """/gps/pos/shape            {source_choice}
+/gps/pos/radius           {source_dim_values[1]} mm"""
+
+# :::::: Macro File Template ::::::
+THREADS_COMMENTED = "#/run/numberOfThreads 16   # If you enabled multithreaded mode"
+
+MACRO_TEMPLATE = """# ::::::::::::::::::::::::::::::::::
+# ::::::::::::::::::::::::::::::::::
+# :::                            :::
+# :::   ADAPTnGUIDE macrofile    :::
+# :::                            :::
+# ::::::::::::::::::::::::::::::::::
+# ::::::::::::::::::::::::::::::::::
+
+{Threads}
+
+{Seeds}{RuntimeGeometry}{HitOutput}/run/initialize 
+/control/verbose   0
+/run/verbose       0
+/tracking/verbose  0
+{StackRules}
+
+{CommandBasedScoring}
+
+
+# ::::::::::::::::::::::::::::::::::::::::::::
+# :::         Enable Radioactive Decay     :::
+# ::::::::::::::::::::::::::::::::::::::::::::
+
+# This command line is needed so that Geant4 enables the radioactive decay of long-lived ions
+/process/had/rdm/thresholdForVeryLongDecayTime 1.0e+60 y
+
+
+# ::::::::::::::::::::::::::::::::::::::::::::
+# :::         Sources properties           :::
+# :::                 &                    :::
+# :::   Source position and structure      :::
+# ::::::::::::::::::::::::::::::::::::::::::::
+
+# Commands used in this macrofile:
+#/gps/particle       name        || We define the particle type. In this case, it will be gamma
+#/gps/ion            Z A Q E     || We define the gamma based on it Z and A. Q: charge. E: energy
+#/gps/energy         E keV       || We set the particle energy
+#/gps/pos/type       dist        || We set the type of distribution
+#/gps/ang/type       AgDis       || We define the angular distribution. Isotropic emission (iso) is selected by default
+#/gps/pos/shape      Cylinder    || We define the shape of the source
+#/gps/pos/radius     X mm        || We define the radius of the source
+#/gps/pos/halfz      X mm        || We define the half-lenght of the source
+#/gps/pos/centre     X X X mm    || We define the position of the source
+#/gps/pos/confine    source      || We confine the source in the physical volume
+#/gps/pos/rot1                   || We define a rotation. Default [1, 0, 0]
+#/gps/pos/rot2                   || We define a second rotation. Default [0, 1, 0] 
+
+# ::: {Radionuclide} :::
+/gps/particle             ion
+/gps/ion                  {Z} {A} 0 0
+/gps/ang/type             iso
+/gps/pos/type             {Location_source}
+{SourceShape}
+/gps/pos/halfz            {halfz:.2f} mm
+/gps/pos/rot1             1 0 0
+/gps/pos/rot2             0 0 1 
+/gps/energy               0 keV
+/gps/pos/centre           {source_pos_values[0]} {source_pos_values[1]} {source_pos_values[2]} mm
+
+
+# :::::::::::::::::::::::::::::::::::::::::::
+# :::            Run Beam On              :::
+# :::::::::::::::::::::::::::::::::::::::::::
+
+{BeamOn}
+
+
+{CommandBasedScoringVisualization}
+"""
+
+
+# ::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::
+# :::                                                                :::
+# :::                 C O N F I G U R A T I O N                      :::
+# :::                                                                :::
+# ::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::
+
+def _text(value):
+    """GUI entries are text: numbers are written as Python prints them."""
+    if isinstance(value, bool):
+        raise ValueError(f"{value!r} is not a number.")
+    return value.strip() if isinstance(value, str) else str(value)
+
+
+def _triple(config, key, errors):
+    values = config.get(key)
+    if isinstance(values, str):
+        values = values.replace(",", " ").split()
+    if not isinstance(values, (list, tuple)) or len(values) != 3:
+        errors.append(f"{key} must have 3 values (got {values!r}).")
+        return None
+    try:
+        text = [_text(v) for v in values]
+        numbers = [float(v) for v in text]
+    except ValueError:
+        errors.append(f"{key} must be numbers (got {values!r}).")
+        return None
+    return text
+
+
+def _check_dimensions(shape, key, values, errors):
+    x, y, z = (float(v) for v in values)
+    if shape == "Box" and not (x > 0 and y > 0 and z > 0):
+        errors.append(f"{key} of a Box must be positive (got {values!r}).")
+    elif shape == "Cylinder" and not (0 <= x < y and z > 0):
+        errors.append(f"{key} of a Cylinder must be 0 <= r1 < r2 and length > 0 (got {values!r}).")
+
+
+def validate_config(config):
+    """Checks a configuration and returns a normalised copy (defaults filled, dimensions and positions as text)."""
+    config = {**DEFAULT_CONFIG, **config}
+    errors = [f"Missing {key}." for key in REQUIRED_KEYS if config.get(key) in (None, "")]
+    if errors:
+        raise ValueError(" ".join(errors))
+
+    for key in ("source_choice", "detector_choice"):
+        if config[key] not in SHAPES:
+            errors.append(f"{key} must be one of {', '.join(SHAPES)} (got {config[key]!r}).")
+    for key in ("world_material", "source_material", "detector_material"):
+        if not isinstance(config[key], str) or not re.fullmatch(r"[\w\-+.]+", config[key]):
+            errors.append(f"{key} must be a material name (got {config[key]!r}).")
+    for key in ("source_dim_values", "detector_dim_values", "source_pos_values", "detector_pos_values"):
+        config[key] = _triple(config, key, errors)
+    for shape, key in (("source_choice", "source_dim_values"), ("detector_choice", "detector_dim_values")):
+        if config[key] is not None:
+            _check_dimensions(config[shape], key, config[key], errors)
+
+    if config["Radionuclide"] not in RADIONUCLIDES:
+        errors.append(f"Unsupported radionuclide {config['Radionuclide']!r}.")
+    if config["Location_source"] not in LOCATIONS:
+        errors.append(f"Location_source must be one of {', '.join(LOCATIONS)} (got {config['Location_source']!r}).")
+    runs = _text(config["Runs_input"]) if not isinstance(config["Runs_input"], bool) else ""
+    if not re.fullmatch(r"\d+", runs) or int(runs) == 0:
+        errors.append(f"Runs_input must be a positive integer (got {config['Runs_input']!r}).")
+    config["Runs_input"] = runs
+
+    names = config["CADfile_names"]
+    if isinstance(names, str):                                      # Comma separated, as in the GUI field
+        names = [name.strip() for name in names.split(",") if name.strip()]
+    config["CADfile_names"] = list(names)
+    for name in config["CADfile_names"]:
+        if not re.fullmatch(r"[A-Za-z_]\w*", name):                 # Used as a C++ variable name
+            errors.append(f"CAD file name {name!r} must be a valid C++ identifier.")
+    if not isinstance(config["CAD_materials"], dict):
+        errors.append("CAD_materials must map CAD file names to materials.")
+    else:
+        for name, material in config["CAD_materials"].items():
+            if name not in config["CADfile_names"] or not isinstance(material, str) or not re.fullmatch(r"[\w\-+.]+", material):
+                errors.append(f"CAD_materials: {name!r} must be one of the CAD file names with a material name (got {material!r}).")
+    if config["CAD_format"] not in ("stl", "obj"):
+        errors.append(f"CAD_format must be stl or obj (got {config['CAD_format']!r}).")
+    if not isinstance(config["runtime_geometry"], bool):
+        errors.append(f"runtime_geometry must be true or false (got {config['runtime_geometry']!r}).")
+    elif config["runtime_geometry"] and config["CADfile_names"] and re.search(r"\s", str(config["CAD_Folder_Path"])):
+        errors.append(f"CAD_Folder_Path must be a folder without spaces with runtime_geometry: ADAPT_Geometry.txt separates "
+                      f"its fields with spaces (got {config['CAD_Folder_Path']!r}).")
+    if not isinstance(config["inputs_path"], str) or re.search(r"\s", config["inputs_path"]):
+        errors.append(f"inputs_path must be a folder without spaces (got {config['inputs_path']!r}).")
+    if not isinstance(config["geometryName"], str) or not re.fullmatch(r"[\w\-.]+", config["geometryName"]):
+        errors.append(f"geometryName must be a file name without folders (got {config['geometryName']!r}).")
+
+    for key in ("jobs", "seed_stream"):
+        if isinstance(config[key], bool) or not isinstance(config[key], int) or config[key] < (1 if key == "jobs" else 0):
+            errors.append(f"{key} must be an integer >= {1 if key == 'jobs' else 0} (got {config[key]!r}).")
+    threads = config["threads"]
+    if threads not in (None, "auto") and (isinstance(threads, bool) or not isinstance(threads, int) or threads < 1):
+        errors.append(f"threads must be a positive integer or \"auto\" (got {threads!r}).")
+    seed = config["seed"]
+    if seed is not None and (isinstance(seed, bool) or not isinstance(seed, int) or seed < 0):
+        errors.append(f"seed must be a non-negative integer (got {seed!r}).")
+    if config["hits"] not in HIT_MODES:
+        errors.append(f"hits must be one of {', '.join(HIT_MODES)} (got {config['hits']!r}).")
+    if not isinstance(config["hit_columns"], list) or not set(config["hit_columns"]) <= set(HIT_COLUMNS):
+        errors.append(f"hit_columns must be a list of {', '.join(HIT_COLUMNS)} (got {config['hit_columns']!r}).")
+    if config["mesh_quantities"] is not None:
+        if isinstance(config["mesh_quantities"], list) and config["mesh_quantities"]:
+            config["mesh_quantities"] = [_mesh_quantity(q, i, errors) for i, q in enumerate(config["mesh_quantities"])]
+            names = [mesh_scorer(q)[0] for q in config["mesh_quantities"] if isinstance(q, dict) and q.get("quantity") in MESH_QUANTITIES]
+            if len(names) != len(set(names)):
+                errors.append(f"mesh_quantities: every quantity must be given once (got {', '.join(names)}).")
+        else:
+            errors.append(f"mesh_quantities must be a non-empty list (got {config['mesh_quantities']!r}).")
+    if not isinstance(config["stack_verbose"], bool):
+        errors.append(f"stack_verbose must be true or false (got {config['stack_verbose']!r}).")
+    if config["stack_rules"] is not None:
+        if isinstance(config["stack_rules"], list):
+            config["stack_rules"] = [_stack_rule(rule, i, errors) for i, rule in enumerate(config["stack_rules"])]
+        else:
+            errors.append(f"stack_rules must be a list of rules (got {config['stack_rules']!r}).")
+
+    if errors:
+        raise ValueError(" ".join(errors))
+
+    config["threads"] = None if threads is None else thread_count(threads, config["jobs"])
+    config["seeds"]   = None if seed is None else seed_stream(seed, config["seed_stream"])
+    config["scan"] = [_scan_step(config, i, step) for i, step in enumerate(config["scan"] or [])]
+    return config
+
+
+def particle_codes(value):
+    """PDG encodings of particle names (gamma, alpha, neutrinos, ...), nuclides (Am-241, Np237[59.541], Np-237* for every
+    state) or numbers, as the text of /adapt/stack/rule. Raises ValueError for unknown names."""
+    items = value if isinstance(value, (list, tuple)) else str(value).split(",")
+    codes = []
+    for item in items:
+        name = str(item).strip()
+        nuclide = re.fullmatch(r"([A-Z][a-z]?)-?(\d+)(\[[\d.]+\]|\*)?", name)
+        if re.fullmatch(r"-?\d+\*?", name):
+            codes.append(name)
+        elif name in PARTICLE_GROUPS:
+            codes.extend(str(PARTICLE_CODES[p]) for p in PARTICLE_GROUPS[name])
+        elif name in PARTICLE_CODES:
+            codes.append(str(PARTICLE_CODES[name]))
+        elif name.rstrip("*") in RADIONUCLIDES:
+            nucleus = RADIONUCLIDES[name.rstrip("*")]
+            codes.append(f"{1000000000 + nucleus['Z'] * 10000 + nucleus['A'] * 10}" + ("*" if name.endswith("*") else ""))
+        elif nuclide and nuclide.group(1) in ELEMENTS:
+            level = nuclide.group(3) or ""                          # Geant4: excitation level 9 for any excited state
+            code = 1000000000 + (ELEMENTS.index(nuclide.group(1)) + 1) * 10000 + int(nuclide.group(2)) * 10
+            codes.append(f"{code + (9 if level.startswith('[') and float(level[1:-1]) > 0 else 0)}" + ("*" if level == "*" else ""))
+        else:
+            raise ValueError(f"unknown particle {name!r}")
+    return ",".join(codes)
+
+
+def _stack_rule(rule, i, errors):
+    """Text of one /adapt/stack/rule: "<action> key=value ..." from a dictionary or from that text with particle names."""
+    if isinstance(rule, str):
+        action, *tokens = rule.split()
+        rule = {"action": action, **dict(token.partition("=")[::2] for token in tokens)}
+    if not isinstance(rule, dict) or rule.get("action") not in STACK_ACTIONS:
+        errors.append(f"stack_rules {i}: the action must be one of {', '.join(STACK_ACTIONS)} (got {rule!r}).")
+        return rule
+    unknown = set(rule) - set(STACK_KEYS) - {"action"}
+    if unknown:
+        errors.append(f"stack_rules {i}: unknown condition {', '.join(sorted(unknown))} (use {', '.join(STACK_KEYS)}).")
+        return rule
+    text = [rule["action"]]
+    try:
+        for key in STACK_KEYS:
+            if key not in rule:
+                continue
+            value = rule[key]
+            if key in ("particle", "parent", "source"):
+                value = particle_codes(value)
+            elif key == "primary":
+                value = int(value in (True, 1, "1", "true", "True"))
+            elif key in ("emin", "emax"):
+                value = float(value)
+            elif not re.fullmatch(r"[\w\-+]+", str(value)):
+                raise ValueError(f"process must be a Geant4 process name (got {value!r})")
+            text.append(f"{key}={value}")
+    except ValueError as e:
+        errors.append(f"stack_rules {i}: {e}.")
+    return " ".join(text)
+
+
+def _mesh_quantity(quantity, i, errors):
+    """{"particle": name or None, "quantity": primitive scorer} of one mesh quantity given as a dictionary or a shortcut."""
+    if isinstance(quantity, str):
+        particle, primitive = MESH_SHORTCUTS.get(quantity, (quantity, "energyDeposit"))
+        quantity = {"particle": particle, "quantity": primitive}
+    if not isinstance(quantity, dict) or set(quantity) - {"particle", "quantity"}:
+        errors.append(f"mesh_quantities {i}: use a particle name, total, dose or {{\"particle\": ..., \"quantity\": ...}} (got {quantity!r}).")
+        return quantity
+    quantity = {"particle": quantity.get("particle"), "quantity": quantity.get("quantity", "energyDeposit")}
+    if quantity["particle"] is not None and quantity["particle"] not in PARTICLE_CODES:
+        errors.append(f"mesh_quantities {i}: unknown particle {quantity['particle']!r} (use {', '.join(PARTICLE_CODES)}).")
+    if quantity["quantity"] not in MESH_QUANTITIES:
+        errors.append(f"mesh_quantities {i}: quantity must be one of {', '.join(MESH_QUANTITIES)} (got {quantity['quantity']!r}).")
+    return quantity
+
+
+def _scan_step(config, i, step):
+    """Validated step of a scan: the step is applied on top of the configuration and checked as a whole."""
+    unknown = set(step) - set(SCAN_COMMANDS) - {"Runs_input"}
+    if unknown:
+        raise ValueError(f"scan step {i}: only {', '.join(SCAN_COMMANDS)} and Runs_input can change (got {', '.join(sorted(unknown))}).")
+    try:
+        merged = validate_config({**config, **step, "scan": []})
+    except ValueError as e:
+        raise ValueError(f"scan step {i}: {e}") from None
+    return {key: merged[key] for key in step}
+
+
+def thread_count(threads, jobs=1):
+    """Worker threads of one run: "auto" shares the available cores between `jobs` simultaneous runs, an integer is kept."""
+    if threads == "auto":
+        return max(1, available_cores() // jobs)
+    return int(threads)
+
+
+def seed_stream(seed, stream=0):
+    """Two seeds for /random/setSeeds derived (SHA-256) from a master seed and a stream number: same input, same seeds."""
+    digest = hashlib.sha256(f"ADAPTnGUIDE:{seed}:{stream}".encode()).digest()
+    return [int.from_bytes(digest[i:i + 4], "big") & 0x7FFFFFFF or 1 for i in (0, 4)]   # Positive 31-bit integers
+
+
+def load_config(fileName):
+    """Configuration(s) from a JSON or YAML file: one dictionary or a list of dictionaries."""
+    with open(fileName, "r") as f:
+        if fileName.endswith((".yaml", ".yml")):
+            try:
+                import yaml                                         # Optional: only needed for YAML configurations
+            except ImportError:
+                raise ImportError("PyYAML is needed to read YAML configurations (pip install pyyaml).") from None
+            return yaml.safe_load(f)
+        return json.load(f)
+
+
+# ::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::
+# :::                                                                :::
+# :::                      R E N D E R I N G                         :::
+# :::                                                                :::
+# ::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::
+
+def render_detector_construction(config, validated=False):
+    """Text of DetectorConstruction.cc for a configuration."""
+    c = config if validated else validate_config(config)
+    parts = [DC_HEADER.format(**c)]
+    parts.append((SOURCE_BOX if c["source_choice"] == "Box" else SOURCE_CYLINDER).format(**c))
+    parts.append((DETECTOR_BOX if c["detector_choice"] == "Box" else DETECTOR_CYLINDER).format(**c))
+
+    header, geometry = (CAD_HEADER, CAD_GEOMETRY) if c["CAD_commented"] else (CAD_HEADER_UNCOMMENTED, CAD_GEOMETRY_UNCOMMENTED)
+    parts.append(header.format(**c))
+    for i, CADfile_name in enumerate(c["CADfile_names"], start=1):
+        parts.append(geometry.format(i=i, CADfile_name=CADfile_name))
+    parts.append(DC_FOOTER.format(**c))
+    return "".join(parts)
+
+
+def render_macro(config, validated=False):
+    """Text of ADAPT.mac for a configuration."""
+    c = config if validated else validate_config(config)
+    source_dim   = [float(v) for v in c["source_dim_values"]]
+    detector_dim = [float(v) for v in c["detector_dim_values"]]
+    fields = {
+        **c,
+        **RADIONUCLIDES[c["Radionuclide"]],
+        # ::: Source :::
+        "halfx": source_dim[0] / 2, "halfy": source_dim[1] / 2, "halfz": source_dim[2] / 2,
+        # ::: Box detector :::
+        "DetX": detector_dim[0] / 2, "DetY": detector_dim[1] / 2, "DetZ": detector_dim[2] / 2,
+        "voxX": detector_dim[0] / 0.01, "voxY": detector_dim[1] / 0.01, "voxZ": detector_dim[2] / 0.01,
+        # ::: Cylinder detector :::
+        "DetLen": detector_dim[2] / 2,
+        "iR": detector_dim[1] / 0.01, "iPhi": 360, "iZ": detector_dim[2] / 0.01,
+        "cylinderVis": detector_dim[2] / 0.01 - 1,
+    }
+
+    fields["MeshQuantities"], fields["MeshDumps"] = _mesh_commands(c, "" if c["detector_choice"] == "Box" else "Cylinder")
+    if c["detector_choice"] == "Box":
+        fields["CommandBasedScoring"] = SCORING_BOX.format(**fields)
+        fields["CommandBasedScoringVisualization"] = SCORING_VISUALIZATION_BOX.format(**fields)
+    else:
+        fields["CommandBasedScoring"] = SCORING_CYLINDER.format(**fields)
+        fields["CommandBasedScoringVisualization"] = SCORING_VISUALIZATION_CYLINDER.format(**fields)
+    fields["BeamOn"] = _beam_on(c)
+    fields["Threads"] = (THREADS_COMMENTED if c["threads"] is None else
+                         f"# Set by ADAPTnGUIDEGenerator.py (ignored if Geant4 is not multithreaded)\n/run/numberOfThreads {c['threads']}")
+    fields["Seeds"] = ("" if c["seeds"] is None else
+                       f"# Seed stream {c['seed_stream']} of the master seed {c['seed']}\n/random/setSeeds {c['seeds'][0]} {c['seeds'][1]}\n")
+    fields["RuntimeGeometry"] = f"/adapt/geometry/file {_input_path(c, GEOMETRY_FILE)}\n" if c["runtime_geometry"] else ""
+    fields["StackRules"] = _stack_commands(c)
+    fields["HitOutput"] = _hit_commands(c)
+    fields["SourceShape"] = (SOURCE_SHAPE_BOX if c["source_choice"] == "Box" else SOURCE_SHAPE_CYLINDER).format(**fields)
+    return MACRO_TEMPLATE.format(**fields)
+
+
+def mesh_scorer(quantity):
+    """Scorer name, unit and filter name of a validated mesh quantity, e.g. ("AlphaEnergyDep", "MeV", "alphaFilter")."""
+    particle = quantity["particle"]
+    if particle in MESH_PREFIXES:
+        prefix, filter_name = MESH_PREFIXES[particle]
+    else:                                                           # e.g. e+ -> EPlus, ePlusFilter
+        token = particle.replace("-", "Minus").replace("+", "Plus")
+        prefix, filter_name = token[0].upper() + token[1:], token + "Filter"
+    suffix, unit = MESH_QUANTITIES[quantity["quantity"]]
+    return prefix + suffix, unit, filter_name
+
+
+def _mesh_commands(c, dump_prefix):
+    """Scorers of the mesh and their dump lines; without mesh_quantities, the lines of the template (gamma energy deposit)."""
+    if c["mesh_quantities"] is None:
+        return ("/score/quantity/energyDeposit      EnergyDep MeV\n/score/filter/particle gammaFilter gamma",
+                f"/score/dumpQuantityToFile DetScoringVolume EnergyDep {dump_prefix}GammaEnergyDep.csv ")
+    scorers, dumps = [], []
+    for quantity in c["mesh_quantities"]:
+        name, unit, filter_name = mesh_scorer(quantity)
+        scorers.append(f"/score/quantity/{quantity['quantity']:<18} {name} {unit}")
+        if quantity["particle"] is not None:
+            scorers.append(f"/score/filter/particle {filter_name} {quantity['particle']}")
+        dumps.append(f"/score/dumpQuantityToFile DetScoringVolume {name} {dump_prefix}{name}.csv ")
+    return "\n".join(scorers), "\n".join(dumps)
+
+
+def _hit_commands(c):
+    """/adapt/output/ lines of the hits ntuple (before the first /run/beamOn: the columns are fixed for the whole process)."""
+    lines = []
+    if c["hits"] != "steps":
+        lines.append(f"/adapt/output/hits         {c['hits']}")
+    if c["hit_columns"]:
+        lines.append(f"/adapt/output/columns      {','.join(name for name in HIT_COLUMNS if name in c['hit_columns'])}")
+    ntuple = "ADAPT_Results_nt_Events.csv" if c["hits"] == "events" else "ADAPT_Results_nt_Photons.csv"
+    return f"# Hits ntuple ({ntuple})\n" + "\n".join(lines) + "\n" if lines else ""
+
+
+def _stack_commands(c):
+    """/adapt/stack/ lines (after /run/initialize: in multithreaded mode the worker threads own the stacking actions)."""
+    lines = []
+    if c["stack_rules"] is not None:
+        lines += ["# Track classification: the first matching rule classifies a new track, the others are urgent",
+                  "/adapt/stack/clear"] + [f"/adapt/stack/rule         {rule}" for rule in c["stack_rules"]]
+    if c["stack_verbose"]:
+        lines.append("/adapt/stack/verbose      1")
+    return "\n" + "\n".join(lines) + "\n" if lines else ""
+
+
+def _input_path(c, fileName):
+    # Path of an input file for ADAPT (relative to its working directory: outputs/ in a run folder)
+    return f"{c['inputs_path']}/{fileName}" if c["inputs_path"] else fileName
+
+
+def _beam_on(c):
+    """/run/beamOn line, or one block per scan step (placements changed between runs of the same process)."""
+    if not c["scan"]:
+        return f"/run/beamOn               {c['Runs_input']} "
+    blocks = []
+    for i, step in enumerate(c["scan"], start=1):
+        lines = [f"# ::: Scan step {i} of {len(c['scan'])} :::"]
+        for key, command in SCAN_COMMANDS.items():
+            if key in step:
+                lines.append(f"{command:<25} {' '.join(step[key])} mm")
+        lines.append(f"/run/beamOn               {step.get('Runs_input', c['Runs_input'])} ")
+        blocks.append("\n".join(lines))
+    return ("# The scoring mesh stays where it was defined. The h1 histogram and the ntuple follow the detector.\n"
+            "# Every step writes its own ADAPT_Results_run<step - 1>_... files (read them with ADAPTnGUIDEAnalysis.py runs).\n"
+            "/adapt/output/perRun      true\n\n"
+            + "\n\n".join(blocks))
+
+
+def render_geometry_file(config, validated=False):
+    """Text of ADAPT_Geometry.txt: the same geometry as DetectorConstruction.cc, read at startup (see include/GeometryFile.hh)."""
+    c = config if validated else validate_config(config)
+    lines = [
+        "# ADAPTnGUIDE runtime geometry (lengths in mm), written by ADAPTnGUIDEGenerator.py",
+        "# volume    shape     material                        dimensions (x y z or r1 r2 length)    position (x y z)",
+        f"world       {'Box':<9} {c['world_material']:<31} {f'{WORLD_SIZE} {WORLD_SIZE} {WORLD_SIZE}':<37} 0 0 0",
+    ]
+    for volume in ("source", "detector"):
+        dims = " ".join(c[f"{volume}_dim_values"])
+        pos  = " ".join(c[f"{volume}_pos_values"])
+        lines.append(f"{volume:<11} {c[volume + '_choice']:<9} {c[volume + '_material']:<31} {dims:<37} {pos}")
+
+    if c["CADfile_names"]:
+        lines.append("# cad       name      material                        file (.stl ASCII or .obj)             offset (x y z)")
+    folder = "Stl" if c["CAD_format"] == "stl" else "Obj"
+    for name in c["CADfile_names"]:
+        path = f"{c['CAD_Folder_Path']}/{folder}/{name}.{c['CAD_format']}"
+        material = c["CAD_materials"].get(name)
+        prefix = "cad " if material else "#cad"                   # Without a material the CAD file stays commented, as in the .cc
+        lines.append(f"{prefix}        {name:<9} {material or 'MATERIAL':<31} {path:<37} 0 0 0")
+    return "\n".join(lines) + "\n"
+
+
+def content_hash(text):
+    """SHA-256 of a rendered file: identical text, identical hash (used to share geometries between runs)."""
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+def render(config):
+    """Validated configuration and the text of both files: (config, DetectorConstruction.cc, ADAPT.mac)."""
+    c = validate_config(config)
+    return c, render_detector_construction(c, validated=True), render_macro(c, validated=True)
+
+
+# ::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::
+# :::                                                                :::
+# :::                        W R I T I N G                           :::
+# :::                                                                :::
+# ::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::
+
+def file_hash(fileName):
+    """content_hash() of a file on disk, or None if it does not exist."""
+    try:
+        with open(fileName, "r") as file:
+            return content_hash(file.read())
+    except FileNotFoundError:
+        return None
+
+
+def write_if_changed(fileName, text):
+    """Writes text only when the file content is different, so the modification time (and make) sees no change. Returns True if written."""
+    if file_hash(fileName) == content_hash(text):
+        return False
+    with open(fileName, "w") as file:
+        file.write(text)
+    return True
+
+
+def _reads_geometry_file(fileName):
+    """True if the DetectorConstruction.cc on disk already has the /adapt/geometry/file hook."""
+    try:
+        with open(fileName, "r") as file:
+            return "ConstructFromFile" in file.read()
+    except FileNotFoundError:
+        return False
+
+
+# ::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::
+# :::                      R U N    F O L D E R S                    :::
+# ::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::
+
+def create_run_dir(run_dir, inputs, manifest):
+    """Writes the input files ({name: text}) into <run_dir>/inputs, creates <run_dir>/outputs and writes manifest.json."""
+    os.makedirs(os.path.join(run_dir, INPUTS_DIR), exist_ok=True)
+    os.makedirs(os.path.join(run_dir, OUTPUTS_DIR), exist_ok=True)
+    for fileName, text in inputs.items():
+        write_if_changed(os.path.join(run_dir, INPUTS_DIR, fileName), text)
+    manifest = {"inputs": INPUTS_DIR, "outputs": OUTPUTS_DIR, "macro": f"{INPUTS_DIR}/{MACRO_FILE}", **manifest}
+    with open(os.path.join(run_dir, MANIFEST_FILE), "w") as f:
+        json.dump(manifest, f, indent=2)
+
+
+def write_run_dir(config, run_dir, **manifest):
+    """Renders a configuration into a run folder (see create_run_dir) and returns the paths of the files.
+
+    ADAPT is started in <run_dir>/outputs with ../inputs/ADAPT.mac, so the macro refers to the inputs from there."""
+    c, cc, mac = render({**config, "inputs_path": f"../{INPUTS_DIR}"})
+    inputs = {"DetectorConstruction.cc": cc, c["geometryName"] + ".txt": cc, MACRO_FILE: mac}
+    if c["runtime_geometry"]:
+        inputs[GEOMETRY_FILE] = render_geometry_file(c, validated=True)
+    cc_file = os.path.join(run_dir, INPUTS_DIR, "DetectorConstruction.cc")
+    rebuild = file_hash(cc_file) != content_hash(cc)
+    geometry_hash = content_hash(cc + inputs.get(GEOMETRY_FILE, ""))   # As in ADAPTnGUIDESweep.py, so their runs can be matched
+    create_run_dir(run_dir, inputs, {"geometry_hash": geometry_hash, "macro_hash": content_hash(mac),
+                                     "threads": c["threads"], "seeds": c["seeds"], **manifest, "config": c})
+    paths = {"cc": cc_file, "txt": os.path.join(run_dir, INPUTS_DIR, c["geometryName"] + ".txt"), **run_paths(run_dir)}
+    if c["runtime_geometry"]:
+        paths["geometry"] = os.path.join(run_dir, INPUTS_DIR, GEOMETRY_FILE)
+    return {**paths, "geometry_hash": geometry_hash, "rebuild": rebuild}
+
+
+def install_inputs(config, base_dir=BASE_DIR):
+    """Places the files as the GUI does: src/DetectorConstruction.cc, DetectorConstructionGeometries/<geometryName>.txt and ADAPT.mac.
+
+    src/DetectorConstruction.cc is left untouched when the rendered geometry is identical (e.g. only the radionuclide or
+    /run/beamOn changed); "rebuild" in the returned dictionary says whether ADAPT has to be compiled again. With
+    runtime_geometry the geometry goes to ADAPT_Geometry.txt and src/ is only updated if it cannot read that file yet.
+    """
+    c, cc, mac = render(config)
+    geometry_dir = os.path.join(base_dir, "DetectorConstructionGeometries")
+    os.makedirs(geometry_dir, exist_ok=True)
+    paths = {
+        "cc":    os.path.join(base_dir, "src", "DetectorConstruction.cc"),
+        "txt":   os.path.join(geometry_dir, c["geometryName"] + ".txt"),
+        "macro": os.path.join(base_dir, "ADAPT.mac"),
+    }
+    geometry = render_geometry_file(c, validated=True) if c["runtime_geometry"] else ""
+    if c["runtime_geometry"]:
+        paths["geometry"] = os.path.join(base_dir, GEOMETRY_FILE)
+        write_if_changed(paths["geometry"], geometry)
+        rebuild = not _reads_geometry_file(paths["cc"]) and write_if_changed(paths["cc"], cc)
+    else:
+        rebuild = write_if_changed(paths["cc"], cc)
+    write_if_changed(paths["txt"], cc)
+    write_if_changed(paths["macro"], mac)
+    return {**paths, "geometry_hash": content_hash(cc + geometry), "rebuild": rebuild}
+
+
+def main(argv=None):
+    import argparse
+    parser = argparse.ArgumentParser(description="ADAPTnGUIDE headless generation of DetectorConstruction.cc and ADAPT.mac.")
+    parser.add_argument("configs", nargs="+", help="JSON or YAML configuration files (one configuration or a list)")
+    parser.add_argument("--output-dir", help="Write every configuration into the run folder <output-dir>/<geometryName> instead of installing it")
+    parser.add_argument("--catalog", help="Run catalogue (SQLite): reuse the outputs of identical finished runs (needs --output-dir)")
+    args = parser.parse_args(argv)
+
+    configs = []
+    for fileName in args.configs:
+        loaded = load_config(fileName)
+        configs.extend(loaded if isinstance(loaded, list) else [loaded])
+
+    if args.output_dir is None and len(configs) > 1:
+        parser.error("Several configurations need --output-dir (src/ holds a single DetectorConstruction.cc).")
+    if args.catalog and args.output_dir is None:
+        parser.error("--catalog needs --output-dir (outputs are reused in run folders).")
+
+    written = []
+    for i, config in enumerate(configs):
+        try:
+            if args.output_dir is None:
+                written.append(install_inputs(config))
+            else:
+                name = validate_config(config)["geometryName"]
+                folder = name if len(configs) == 1 else f"{i:05d}_{name}"
+                config = {"seed_stream": i, **config}              # A shared master seed gives every configuration its own stream
+                if len(configs) > 1 and config.get("seed") is None:
+                    config["seed"] = STREAM_SEED                    # Otherwise every run folder gets the same seed from the scheduler
+                written.append(write_run_dir(config, os.path.join(args.output_dir, folder)))
+        except ValueError as e:
+            parser.exit(1, f"Configuration {i}: {e}\n")
+    rebuild = sum(w["rebuild"] for w in written)
+    print(f"Generated {len(written)} input set(s), {rebuild} with a new geometry"
+          + (" (rebuild ADAPT)." if rebuild and args.output_dir is None else "."))
+    if args.catalog:
+        from ADAPTnGUIDECatalog import Catalog                      # Imports this module
+        catalog = Catalog(args.catalog)
+        for w in written:
+            w["state"] = catalog.register(os.path.dirname(w["manifest"]))
+        catalog.close()
+        print(f"{sum(w['state'] in ('done', 'reused') for w in written)} already simulated (outputs reused), catalogue {args.catalog}.")
+    return written
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,227 @@
+# ::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::
+# :::                                                                                                                          :::
+# :::                                              ADAPTnGUIDE Runtime Predictor                                               :::
+# :::                                                                                                                          :::
+# ::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::
+
+
+# ::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::
+# This Python module estimates how long a configuration takes to simulate and how much output it writes, from the finished runs
+# of the run catalogue (ADAPTnGUIDECatalog.py):
+#       - Features of a configuration: radionuclide, world/source/detector materials, detector volume, scoring mesh voxels
+#         (/score/mesh/nBin of the macro), CAD facets (files of the active CAD volumes) and threads
+#       - log(events per second) is fitted with a ridge least-squares model over the features (materials and radionuclides
+#         seen in the history get their own term; unknown ones use the average), the spread of the residuals gives a range
+#       - Output size = bytes per event x events + bytes per voxel x dumped voxels (voxels x quantities), fitted on the same runs
+#
+# The GUI (Estimate button) and ADAPTnGUIDESweep.py --catalog show the expected wall time and output size.
+#
+# Example:
+#       python ADAPTnGUIDEPredictor.py ADAPT_Runs.db config.json
+# ::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::
+
+
+# :::::: We import the needed libraries ::::::
+import json
+import math
+import os
+import struct
+import numpy as np
+
+from ADAPTnGUIDEGenerator import load_config, render, run_paths
+
+
+MIN_RUNS      = 3                                                   # Finished runs needed to fit the model
+RIDGE         = 1e-2                                                # Keeps the fit stable with few runs or rare materials
+EVENT_BYTES   = 40                                                  # Output size without history: ntuple rows of one event
+VOXEL_BYTES   = 40                                                  # and one mesh dump row (i,j,k,value,value2,entry)
+CATEGORICAL   = ("Radionuclide", "world_material", "source_material", "detector_material")
+
+
+# ::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::
+# :::                        F E A T U R E S                         :::
+# ::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::
+
+def detector_volume(c):
+    """Volume of the detector in mm3 (Box: x y z, Cylinder: r1 r2 length)."""
+    d1, d2, d3 = (float(v) for v in c["detector_dim_values"])
+    return d1 * d2 * d3 if c["detector_choice"] == "Box" else math.pi * (d2 ** 2 - d1 ** 2) * d3
+
+
+def mesh_voxels(mac):
+    """Voxels of every scoring mesh of a macro (product of each /score/mesh/nBin)."""
+    voxels = 0
+    for line in mac.splitlines():
+        tokens = line.split("#")[0].split()
+        if len(tokens) >= 4 and tokens[0] == "/score/mesh/nBin":
+            voxels += math.prod(int(float(t)) for t in tokens[1:4])
+    return voxels
+
+
+def count_facets(fileName):
+    """Facets of an STL (ASCII or binary) or OBJ file, 0 when the file is missing."""
+    if not os.path.exists(fileName):
+        return 0
+    if fileName.lower().endswith(".obj"):
+        with open(fileName, "rb") as f:
+            return sum(1 for line in f if line.startswith(b"f "))
+    with open(fileName, "rb") as f:
+        header = f.read(84)
+        if header.startswith(b"solid") and b"facet" in header + f.read(512):
+            f.seek(0)
+            return sum(1 for line in f if line.lstrip().startswith(b"facet"))
+    return struct.unpack("<I", header[80:84])[0] if len(header) == 84 else 0
+
+
+def dumped_voxels(mac):
+    """Rows of the mesh dumps of a macro: voxels x /score/dumpQuantityToFile lines (several quantities on one mesh)."""
+    dumps = sum(1 for line in mac.splitlines() if line.split("#")[0].split()[:1] == ["/score/dumpQuantityToFile"])
+    return mesh_voxels(mac) * max(dumps, 1)
+
+
+def cad_facets(c):
+    """Facets of the CAD volumes that are built (uncommented in the .cc, or with a material in the runtime geometry)."""
+    if c["runtime_geometry"]:
+        names = [name for name in c["CADfile_names"] if c["CAD_materials"].get(name)]
+    else:
+        names = [] if c["CAD_commented"] else c["CADfile_names"]
+    folder = "Stl" if c["CAD_format"] == "stl" else "Obj"
+    return sum(count_facets(os.path.join(c["CAD_Folder_Path"], folder, f"{name}.{c['CAD_format']}")) for name in names)
+
+
+def features(c, mac):
+    """Features of a validated configuration and its macro: {name: value}, categorical values as "key=value": 1."""
+    values = {
+        "log_threads": math.log(c.get("threads") or 1),
+        "log_volume":  math.log(max(detector_volume(c), 1e-9)),
+        "log_voxels":  math.log1p(mesh_voxels(mac)),
+        "log_facets":  math.log1p(cad_facets(c)),
+    }
+    values.update({f"{key}={c[key]}": 1.0 for key in CATEGORICAL})
+    return values
+
+
+def macro_events(mac):
+    """Events of every /run/beamOn of a macro."""
+    return sum(int(line.split()[1]) for line in mac.splitlines() if line.split()[:1] == ["/run/beamOn"] and len(line.split()) > 1)
+
+
+# ::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::
+# :::                          M O D E L                             :::
+# ::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::
+
+def history(catalog):
+    """Finished runs of the catalogue that still have their run folder: [(features, events per second, events, voxels, bytes)]."""
+    samples = []
+    for row in catalog.query(["events", "events_per_s"], where="state = 'done' AND events_per_s > 0"):
+        paths = run_paths(row["run_dir"])
+        if paths["manifest"] is None or not os.path.exists(paths["macro"]):
+            continue
+        with open(paths["manifest"], "r") as f:
+            config = json.load(f).get("config")
+        if config is None:                                          # e.g. merged shards
+            continue
+        with open(paths["macro"], "r") as f:
+            mac = f.read()
+        samples.append((features(config, mac), row["events_per_s"], row["events"], dumped_voxels(mac),
+                        catalog.results(row["run_dir"]).get("output_bytes")))
+    return samples
+
+
+class RuntimePredictor:
+    """Events per second and output size of a configuration, fitted on finished runs."""
+
+    def __init__(self, samples, ridge=RIDGE):
+        if len(samples) < MIN_RUNS:
+            raise ValueError(f"The catalogue has {len(samples)} finished run(s) with their folders: at least {MIN_RUNS} are needed.")
+        self.names = sorted({name for sample in samples for name in sample[0]})
+        X = np.array([self._row(sample[0]) for sample in samples])
+        y = np.log([sample[1] for sample in samples])
+        penalty = ridge * np.eye(X.shape[1])
+        penalty[0, 0] = 0                                           # The intercept is not penalised
+        self.coefficients = np.linalg.solve(X.T @ X + penalty, X.T @ y)
+        residuals = y - X @ self.coefficients
+        self.spread = float(np.exp(np.sqrt(np.mean(residuals ** 2)))) # Multiplicative: rate / spread ... rate x spread
+        self.runs = len(samples)
+
+        sized = [(events, voxels, size) for _, _, events, voxels, size in samples if size]
+        self.event_bytes, self.voxel_bytes = EVENT_BYTES, VOXEL_BYTES
+        if len(sized) >= MIN_RUNS:
+            A = np.array([[events, voxels] for events, voxels, _ in sized], dtype=float)
+            b = np.array([size for _, _, size in sized], dtype=float)
+            event_bytes, voxel_bytes = np.linalg.lstsq(A, b, rcond=None)[0]
+            self.event_bytes, self.voxel_bytes = max(float(event_bytes), 0.0), max(float(voxel_bytes), 0.0)
+
+    @classmethod
+    def from_catalog(cls, fileName):
+        from ADAPTnGUIDECatalog import Catalog
+        catalog = Catalog(fileName)
+        try:
+            return cls(history(catalog))
+        finally:
+            catalog.close()
+
+    def _row(self, values):
+        # An unknown material or radionuclide has no term: the unpenalised intercept is the average of the known ones
+        return [1.0] + [values.get(name, 0.0) for name in self.names]
+
+    def rate(self, values):
+        """Expected events per second of a set of features."""
+        return float(np.exp(np.dot(self._row(values), self.coefficients)))
+
+    def predict(self, config):
+        """Expected events per second (and its range), wall time in s and output size in bytes of a configuration."""
+        c, _, mac = render(config)
+        rate = self.rate(features(c, mac))
+        events = macro_events(mac)
+        return {"events": events, "events_per_s": rate, "events_per_s_range": (rate / self.spread, rate * self.spread),
+                "wall_time": events / rate, "wall_time_range": (events / rate / self.spread, events / rate * self.spread),
+                "output_bytes": events * self.event_bytes + dumped_voxels(mac) * self.voxel_bytes,
+                "threads": c.get("threads") or 1, "runs": self.runs}
+
+
+def format_duration(seconds):
+    for unit, size in (("d", 86400), ("h", 3600), ("min", 60)):
+        if seconds >= size:
+            return f"{seconds / size:.1f} {unit}"
+    return f"{seconds:.0f} s"
+
+
+def format_bytes(size):
+    for unit in ("B", "kB", "MB", "GB"):
+        if size < 1000:
+            return f"{size:.0f} {unit}"
+        size /= 1000
+    return f"{size:.1f} TB"
+
+
+def describe(estimate):
+    """One line for the GUI and the command line."""
+    low, high = estimate["wall_time_range"]
+    return (f"{estimate['events']:,} events at ~{estimate['events_per_s']:,.0f} events/s ({estimate['threads']} thread(s)): "
+            f"~{format_duration(estimate['wall_time'])} ({format_duration(low)} - {format_duration(high)}), "
+            f"~{format_bytes(estimate['output_bytes'])} of output (fitted on {estimate['runs']} runs)")
+
+
+def main(argv=None):
+    import argparse
+    parser = argparse.ArgumentParser(description="ADAPTnGUIDE runtime predictor: expected wall time and output size from the run catalogue.")
+    parser.add_argument("catalog", help="Run catalogue (SQLite, see ADAPTnGUIDECatalog.py)")
+    parser.add_argument("configs", nargs="+", help="JSON or YAML configuration files (one configuration or a list)")
+    args = parser.parse_args(argv)
+
+    try:
+        predictor = RuntimePredictor.from_catalog(args.catalog)
+        estimates = []
+        for fileName in args.configs:
+            loaded = load_config(fileName)
+            for config in (loaded if isinstance(loaded, list) else [loaded]):
+                estimates.append(predictor.predict(config))
+                print(describe(estimates[-1]))
+    except ValueError as e:
+        parser.exit(1, f"{e}\n")
+    return estimates
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,261 @@
+# ::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::
+# :::                                                                                                                          :::
+# :::                                              ADAPTnGUIDE Job Scheduler                                                   :::
+# :::                                                                                                                          :::
+# ::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::
+
+
+# ::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::
+# This Python module runs many simulations on one machine, like run.sh does for a single one:
+#       - Queues run folders (inputs/ADAPT.mac, or a plain folder with ADAPT.mac): single runs, or the folders written by
+#         ADAPTnGUIDESweep.py (runs/*) and ADAPTnGUIDEShards.py (shard*)
+#       - Starts ADAPT in the outputs/ folder of every run while CPU slots (the /run/numberOfThreads of the macro, 1 otherwise)
+#         and, optionally, memory are available. The output of ADAPT is saved in ADAPT.log next to the other output files
+#       - Follows the progress of every job (/run/printProgress lines) and prints the events per second
+#       - Retries failed jobs and records every state change in journal.jsonl, so an interrupted campaign started again
+#         skips the runs that already finished
+#       - With --catalog, records the wall time, events per second and efficiency of every run in the run catalogue
+#         (ADAPTnGUIDECatalog.py) and skips the runs whose outputs were reused from an identical finished run
+#
+# Example:
+#       python ADAPTnGUIDEScheduler.py sweep1                                  # Every run of a sweep, all the cores of the machine
+#       python ADAPTnGUIDEScheduler.py dart --slots 32 --memory 64000 --job-memory 2000 --retries 2
+#       python ADAPTnGUIDEScheduler.py sweep1 --executable "python SyntheticOutputs.py --fail 0.2"   # Without Geant4
+# ::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::
+
+
+# :::::: We import the needed libraries ::::::
+import asyncio
+import json
+import os
+import re
+import shlex
+import time
+
+from ADAPTnGUIDECatalog import Catalog
+from RunFolders import available_cores, run_paths
+from Efficiency import read_beam_on
+
+
+WRAPPER_MACRO = "scheduler.mac"                                     # printProgress, then ADAPT.mac
+LOG_FILE      = "ADAPT.log"
+JOURNAL_FILE  = "journal.jsonl"
+DEFAULT_SEED  = 123456                                              # Same seed as run.sh (the seeds of the macro override it)
+
+PROGRESS = re.compile(r"--> Event (\d+) starts")
+RUN_END  = re.compile(r"^:::\s+Simulation Finished")               # Master thread only (worker lines start with G4WT)
+
+
+def default_executable():
+    """ADAPT as installed by the GNUmakefile ($G4WORKDIR/bin/$G4SYSTEM/ADAPT), as in run.sh."""
+    return os.path.join(os.environ.get("G4WORKDIR", "."), "bin", os.environ.get("G4SYSTEM", ""), "ADAPT")
+
+
+def find_run_dirs(paths):
+    """Run folders (with a macro) of the paths: a run folder itself, or a sweep or shards folder whose subfolders are runs."""
+    dirs = []
+    for path in paths:
+        if os.path.exists(run_paths(path)["macro"]):
+            dirs.append(os.path.abspath(path))
+            continue
+        for root in (os.path.join(path, "runs"), path):
+            if not os.path.isdir(root):
+                continue
+            found = sorted(os.path.join(root, name) for name in os.listdir(root)
+                           if name != "merged" and os.path.exists(run_paths(os.path.join(root, name))["macro"]))   # Not the merged shards
+            if found:
+                dirs.extend(os.path.abspath(d) for d in found)
+                break
+        else:
+            raise ValueError(f"{path} is not a run folder and has no run folders.")
+    return dirs
+
+
+def job_threads(run_dir):
+    """CPU slots of a run: the /run/numberOfThreads of its macro, 1 when the line is commented."""
+    threads = 1
+    with open(run_paths(run_dir)["macro"], "r") as f:
+        for line in f:
+            tokens = line.split("#")[0].split()
+            if len(tokens) > 1 and tokens[0] == "/run/numberOfThreads" and tokens[1].isdigit():
+                threads = int(tokens[1])
+    return threads
+
+
+# ::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::
+# :::                   J O U R N A L    &    S L O T S              :::
+# ::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::
+
+class Journal:
+    """Append-only JSON-lines record of a campaign. The last record of a run folder is its state."""
+
+    def __init__(self, fileName):
+        self.fileName = fileName
+        self.states   = {}
+        if os.path.exists(fileName):
+            with open(fileName, "r") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:                              # Last line cut by an interruption
+                        continue
+                    self.states[record["run"]] = record
+
+    def record(self, run, state, **values):
+        record = {"run": run, "state": state, "time": round(time.time(), 3), **values}
+        with open(self.fileName, "a") as f:
+            f.write(json.dumps(record) + "\n")
+            f.flush()
+            os.fsync(f.fileno())                                    # The journal survives a crash of the machine
+        self.states[run] = record
+
+    def done(self, run):
+        return self.states.get(run, {}).get("state") == "done"
+
+
+class Slots:
+    """CPU slots and memory (MB) shared by the running jobs."""
+
+    def __init__(self, cpus, memory=None):
+        self.cpus      = cpus
+        self.memory    = memory                                     # None: memory is not accounted
+        self.condition = asyncio.Condition()
+
+    def _fits(self, cpus, memory):
+        return self.cpus >= cpus and (self.memory is None or self.memory >= memory)
+
+    async def acquire(self, cpus, memory=0):
+        async with self.condition:
+            await self.condition.wait_for(lambda: self._fits(cpus, memory))
+            self.cpus -= cpus
+            if self.memory is not None:
+                self.memory -= memory
+
+    async def release(self, cpus, memory=0):
+        async with self.condition:
+            self.cpus += cpus
+            if self.memory is not None:
+                self.memory += memory
+            self.condition.notify_all()
+
+
+# ::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::
+# :::                           J O B S                              :::
+# ::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::
+
+async def run_job(run_dir, command, seed=DEFAULT_SEED, report=None):
+    """Runs ADAPT once in run_dir. Returns the exit code, the events processed, the wall time and the events per second."""
+    paths  = run_paths(run_dir)
+    counts = read_beam_on(paths["macro"])
+    events = sum(counts)
+    os.makedirs(paths["outputs"], exist_ok=True)
+    with open(os.path.join(paths["outputs"], WRAPPER_MACRO), "w") as f:
+        f.write(f"/run/printProgress {max(events // 100, 1)}\n/control/execute {os.path.relpath(paths['macro'], paths['outputs'])}\n")
+
+    start = time.monotonic()
+    finished, current, shown = 0, 0, -1                            # Events of the finished runs and of the current one
+    remaining = list(counts)                                        # /run/beamOn still to finish
+    with open(os.path.join(paths["outputs"], LOG_FILE), "wb") as log:
+        process = await asyncio.create_subprocess_exec(*command, WRAPPER_MACRO, str(seed), cwd=paths["outputs"],
+                                                       stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.STDOUT)
+        try:
+            async for line in process.stdout:
+                log.write(line)
+                text = line.decode(errors="replace")
+                match = PROGRESS.search(text)
+                if match:
+                    current = int(match.group(1))
+                elif RUN_END.match(text) and remaining:
+                    finished, current = finished + remaining.pop(0), 0
+                processed = finished + current
+                if report and events and processed * 10 // events != shown:      # Every 10 %
+                    shown = processed * 10 // events
+                    report(run_dir, processed, events, processed / max(time.monotonic() - start, 1e-9))
+            returncode = await process.wait()
+        except asyncio.CancelledError:                              # Interrupted campaign: the job is run again next time
+            process.kill()
+            await process.wait()
+            raise
+
+    wall = time.monotonic() - start
+    processed = finished if returncode == 0 else finished + current
+    return {"returncode": returncode, "events": processed, "wall_time": round(wall, 3),
+            "events_per_s": round(processed / wall, 1) if wall > 0 else None}
+
+
+async def run_campaign(run_dirs, command, cpus=None, memory=None, job_memory=0, retries=1, journal=None,
+                       seed=DEFAULT_SEED, report=None, catalog=None):
+    """Runs every run folder not yet done in the journal (or in the catalogue). Returns {"done", "failed", "skipped"} lists of run folders."""
+    cpus    = cpus or available_cores()
+    slots   = Slots(cpus, memory)
+    summary = {"done": [], "failed": [], "skipped": [d for d in run_dirs if journal and journal.done(d)]}
+    if catalog:
+        summary["skipped"] += [d for d in run_dirs if d not in summary["skipped"] and run_paths(d)["manifest"]
+                               and catalog.register(d) in ("done", "reused")]
+
+    async def job(run_dir):
+        threads = min(job_threads(run_dir), cpus)                   # A job larger than the machine still runs, alone
+        needed  = min(job_memory, memory) if memory is not None else 0
+        for attempt in range(1, retries + 2):
+            await slots.acquire(threads, needed)
+            try:
+                if journal:
+                    journal.record(run_dir, "running", attempt=attempt, threads=threads)
+                result = await run_job(run_dir, command, seed, report)
+            finally:
+                await slots.release(threads, needed)
+            state = "done" if result["returncode"] == 0 else "failed"
+            if journal:
+                journal.record(run_dir, state, attempt=attempt, threads=threads, **result)
+            if catalog and run_paths(run_dir)["manifest"] and (state == "done" or attempt == retries + 1):
+                catalog.complete(run_dir, state, result["wall_time"], result["events_per_s"])
+            if state == "done":
+                summary["done"].append(run_dir)
+                return
+        summary["failed"].append(run_dir)
+
+    await asyncio.gather(*(job(d) for d in run_dirs if d not in summary["skipped"]))
+    return summary
+
+
+def main(argv=None):
+    import argparse
+    parser = argparse.ArgumentParser(description="ADAPTnGUIDE local job scheduler: runs many ADAPT folders within the CPU and memory slots.")
+    parser.add_argument("paths", nargs="+", help="Run folders, or sweep / shards folders")
+    parser.add_argument("--executable", default=default_executable(), help="ADAPT command (default: $G4WORKDIR/bin/$G4SYSTEM/ADAPT)")
+    parser.add_argument("--slots", type=int, help=f"CPU slots (default: the {available_cores()} cores available)")
+    parser.add_argument("--memory", type=float, help="Memory available to the jobs in MB (default: not accounted)")
+    parser.add_argument("--job-memory", type=float, default=0, help="Memory of one job in MB")
+    parser.add_argument("--retries", type=int, default=1, help="Attempts after a failure (default: 1)")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED, help=f"Seed given to ADAPT (default: {DEFAULT_SEED}, as run.sh)")
+    parser.add_argument("--journal", help=f"Journal file (default: {JOURNAL_FILE} in the first path)")
+    parser.add_argument("--catalog", help="Run catalogue (SQLite) recording the finished runs (see ADAPTnGUIDECatalog.py)")
+    args = parser.parse_args(argv)
+
+    try:
+        run_dirs = find_run_dirs(args.paths)
+    except ValueError as e:
+        parser.exit(1, f"{e}\n")
+    journal = Journal(args.journal or os.path.join(args.paths[0], JOURNAL_FILE))
+    base = os.path.commonpath(run_dirs) if len(run_dirs) > 1 else os.path.dirname(run_dirs[0])
+
+    def report(run_dir, processed, events, rate):
+        print(f"  {os.path.relpath(run_dir, base):<30} {100 * processed / events:5.1f} %  {rate:12,.0f} events/s", flush=True)
+
+    # Jobs start inside the run folders: relative paths of the command (ADAPT, a stand-in script) are made absolute
+    command = [os.path.abspath(arg) if os.path.exists(arg) else arg for arg in shlex.split(args.executable)]
+    catalog = Catalog(args.catalog) if args.catalog else None
+    start = time.monotonic()
+    try:
+        summary = asyncio.run(run_campaign(run_dirs, command, args.slots, args.memory, args.job_memory,
+                                           args.retries, journal, args.seed, report, catalog))
+    finally:
+        if catalog:
+            catalog.close()
+    print(f"{len(summary['done'])} run(s) done, {len(summary['failed'])} failed, {len(summary['skipped'])} already done "
+          f"({time.monotonic() - start:.1f} s). Journal: {journal.fileName}")
+    return summary
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,264 @@
+# ::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::
+# :::                                                                                                                          :::
+# :::                                              ADAPTnGUIDE Shards                                                          :::
+# :::                                                                                                                          :::
+# ::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::
+
+
+# ::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::
+# This Python module splits one large simulation into independent processes (shards) and merges what they produced:
+#       - split: N shard run folders (shard000/, shard001/, ...), each with a copy of ADAPT.mac in inputs/ whose /run/beamOn counts
+#         add up to the original ones (proportional to the shard weights) and with its own /random/setSeeds stream, plus shards.json
+#       - merge: sums the h1 histograms and the scoring mesh dumps, and appends the ntuples (event numbers shifted so they stay
+#         unique) of every shard that finished into the run folder merged/. Its ADAPT.mac holds the events actually simulated,
+#         so the analysis scripts read it as a normal run, even when some shards crashed or are still running
+#
+# Every shard is run from its own folder (cd shard003/outputs && ADAPT ../inputs/ADAPT.mac), on this machine or on any node.
+# Only the Python standard library is used, the files are streamed line by line.
+#
+# Example:
+#       python ADAPTnGUIDEShards.py split ADAPT.mac --shards 64 --output-dir dart --seed 2024
+#       python ADAPTnGUIDEShards.py split ADAPT.mac --weights 16,16,32 --output-dir dart       # Shards sized to the nodes
+#       python ADAPTnGUIDEShards.py merge dart                                                 # -> dart/merged/
+# ::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::
+
+
+# :::::: We import the needed libraries ::::::
+import json
+import os
+import re
+
+from ADAPTnGUIDEGenerator import INPUTS_DIR, MACRO_FILE, OUTPUTS_DIR, content_hash, create_run_dir, run_paths, seed_stream
+
+
+SHARDS_FILE = "shards.json"
+H1_FILE     = "ADAPT_Results{run}_h1_Energy_Deposit.csv"          # {run}: "" or "_run<N>" (/adapt/output/perRun true)
+RUN_INDEX   = re.compile(r"ADAPT_Results_run(\d+)_")
+
+
+# ::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::
+# :::                           S P L I T                            :::
+# ::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::
+
+def _command(line):
+    # Command and arguments of a macro line (comments removed)
+    tokens = line.split("#")[0].split()
+    return (tokens[0], tokens[1:]) if tokens else (None, [])
+
+
+def split_counts(total, weights):
+    """Split `total` events proportionally to the weights (largest remainder): the parts add up to `total` exactly."""
+    exact = [total * w / sum(weights) for w in weights]
+    parts = [int(x) for x in exact]
+    for i in sorted(range(len(weights)), key=lambda i: parts[i] - exact[i])[:total - sum(parts)]:
+        parts[i] += 1
+    return parts
+
+
+def macro_info(text):
+    """Events of every /run/beamOn, seeds, per-run outputs, mesh dump files and geometry file of a macro."""
+    info = {"beam_on": [], "seeds": None, "per_run": False, "dumps": [], "geometry_file": None}
+    for line in text.splitlines():
+        command, args = _command(line)
+        if command == "/run/beamOn" and args and re.fullmatch(r"\d+", args[0]):
+            info["beam_on"].append(int(args[0]))
+        elif command == "/random/setSeeds":
+            info["seeds"] = args
+        elif command == "/adapt/output/perRun":
+            info["per_run"] = args[:1] in (["true"], ["1"])
+        elif command == "/score/dumpQuantityToFile" and len(args) > 2:
+            info["dumps"].append(args[2])
+        elif command == "/adapt/geometry/file" and args:
+            info["geometry_file"] = args[0]
+    if not info["beam_on"]:
+        raise ValueError("The macro file has no /run/beamOn line.")
+    return info
+
+
+def shard_macro(text, counts, seeds=None):
+    """Copy of the macro with the /run/beamOn counts replaced (in order) and, if given, /random/setSeeds before /run/initialize."""
+    lines, counts, seeded = [], iter(counts), seeds is None
+    for line in text.splitlines(keepends=True):
+        command, args = _command(line)
+        if command == "/random/setSeeds":
+            continue                                                # Replaced by the seeds of the shard
+        if command == "/run/initialize" and not seeded:
+            lines.append(f"/random/setSeeds {seeds[0]} {seeds[1]}\n")
+            seeded = True
+        if command == "/run/beamOn" and args and re.fullmatch(r"\d+", args[0]):
+            line = line.replace(args[0], str(next(counts)), 1)
+        lines.append(line)
+    if not seeded:
+        lines.insert(0, f"/random/setSeeds {seeds[0]} {seeds[1]}\n")
+    return "".join(lines)
+
+
+def split_macro(macFile, output_dir, shards=None, weights=None, seed=None):
+    """Writes one run folder per shard (ADAPT.mac and the runtime geometry file) and shards.json. Returns the shards description."""
+    weights = list(weights) if weights else [1] * int(shards or 0)
+    if not weights or any(w <= 0 for w in weights):
+        raise ValueError("At least one shard is needed and the weights must be positive.")
+    with open(macFile, "r") as f:
+        text = f.read()
+    info = macro_info(text)
+    if seed is None:                                                # Streams derived from the seeds of the macro (or 0)
+        seed = " ".join(info["seeds"]) if info["seeds"] else 0
+
+    counts = list(zip(*(split_counts(total, weights) for total in info["beam_on"])))   # counts[shard][run]
+    description = {"macro": os.path.basename(macFile), "macro_hash": content_hash(text), "seed": seed,
+                   "beam_on": info["beam_on"], "per_run": info["per_run"], "dumps": info["dumps"], "shards": []}
+    geometry = info["geometry_file"]
+    if geometry and not os.path.isabs(geometry):                    # Runtime geometry, copied into the inputs of every shard
+        # Relative to the working directory of ADAPT: the folder of the macro, or outputs/ (a sibling of inputs/) in a run folder
+        with open(os.path.join(os.path.dirname(os.path.abspath(macFile)), geometry), "r") as f:
+            geometry_text = f.read()
+        name = os.path.basename(geometry)
+        text = text.replace(f"/adapt/geometry/file {geometry}", f"/adapt/geometry/file ../{INPUTS_DIR}/{name}")
+    for i, weight in enumerate(weights):
+        name = f"shard{i:03d}"
+        seeds = seed_stream(seed, i)
+        inputs = {MACRO_FILE: shard_macro(text, counts[i], seeds)}
+        if geometry and not os.path.isabs(geometry):
+            inputs[os.path.basename(geometry)] = geometry_text
+        shard = {"name": name, "weight": weight, "beam_on": list(counts[i]), "seeds": seeds}
+        create_run_dir(os.path.join(output_dir, name), inputs, {"shard": i, **shard, "source": os.path.abspath(macFile)})
+        description["shards"].append(shard)
+
+    with open(os.path.join(output_dir, SHARDS_FILE), "w") as f:
+        json.dump(description, f, indent=2)
+    return description
+
+
+# ::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::
+# :::                           M E R G E                            :::
+# ::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::
+
+def expected_outputs(description):
+    """Files every finished shard has: the h1 histogram of every run (or of the last one) and the mesh dumps."""
+    runs = range(len(description["beam_on"])) if description["per_run"] else [None]
+    return [H1_FILE.format(run="" if run is None else f"_run{run}") for run in runs] + list(description["dumps"])
+
+
+def finished_shards(shard_dir, description):
+    """Shards whose folder holds every expected output file."""
+    expected = expected_outputs(description)
+    return [shard for shard in description["shards"]
+            if all(os.path.exists(os.path.join(run_paths(os.path.join(shard_dir, shard["name"]))["outputs"], fileName))
+                   for fileName in expected)]
+
+
+def _number(text):
+    return float(text) if any(c in text for c in ".eEnN") else int(text)
+
+
+def _format(value):
+    return str(value) if isinstance(value, int) else f"{value:.10g}"
+
+
+def sum_tables(fileNames, outFile, first_summed):
+    """Adds the columns from `first_summed` on of csv files with the same rows (h1 histograms, mesh dumps). Header of the first file."""
+    files = [open(fileName, "r") for fileName in fileNames]
+    try:
+        with open(outFile, "w") as out:
+            for lines in zip(*files):
+                line = lines[0]
+                if line.startswith("#") or line[:1].isalpha():
+                    out.write(line)                                 # Metadata and column names
+                    continue
+                rows = [l.rstrip("\n").split(",") for l in lines]
+                keys = rows[0][:first_summed]
+                if any(row[:first_summed] != keys for row in rows):
+                    raise ValueError(f"{outFile}: the shards do not have the same bins.")
+                sums = [sum(_number(row[j]) for row in rows) for j in range(first_summed, len(rows[0]))]
+                out.write(",".join(keys + [_format(v) for v in sums]) + "\n")
+    finally:
+        for f in files:
+            f.close()
+
+
+def append_ntuples(fileNames, offsets, outFile):
+    """Appends ntuple files; the event number (first column) of every file is shifted by its offset so events stay unique."""
+    with open(outFile, "w") as out:
+        for n, (fileName, offset) in enumerate(zip(fileNames, offsets)):
+            with open(fileName, "r") as f:
+                for line in f:
+                    if line.startswith("#"):
+                        if n == 0:
+                            out.write(line)                         # Metadata of the first file only
+                        continue
+                    event, sep, rest = line.partition(",")
+                    out.write(f"{int(event) + offset}{sep}{rest}" if offset else line)
+
+
+def merge_shards(shard_dir, output_dir=None):
+    """Merges the outputs of the finished shards into the run folder output_dir (default <shard_dir>/merged). Returns a summary."""
+    with open(os.path.join(shard_dir, SHARDS_FILE), "r") as f:
+        description = json.load(f)
+    output_dir = output_dir or os.path.join(shard_dir, "merged")
+    done = finished_shards(shard_dir, description)
+    if not done:
+        raise ValueError(f"No shard of {shard_dir} has finished yet.")
+    folders = [run_paths(os.path.join(shard_dir, shard["name"]))["outputs"] for shard in done]
+    merged = os.path.join(output_dir, OUTPUTS_DIR)
+    os.makedirs(merged, exist_ok=True)
+
+    # ::: Histograms (entries,Sw,Sw2,Sxw0,Sx2w0: every column adds up) and meshes (3 indices, value, value^2, entries) :::
+    h1_files = sorted({f for folder in folders for f in os.listdir(folder) if re.fullmatch(r"ADAPT_Results.*_h1_.*\.csv", f)})
+    for fileName in h1_files:
+        sum_tables([os.path.join(folder, fileName) for folder in folders], os.path.join(merged, fileName), 0)
+    for fileName in description["dumps"]:
+        sum_tables([os.path.join(folder, fileName) for folder in folders], os.path.join(merged, fileName), 3)
+
+    # ::: Ntuples: event numbers start at 0 in every shard :::
+    nt_files = sorted({f for folder in folders for f in os.listdir(folder) if re.fullmatch(r"ADAPT_Results.*_nt_.*\.csv", f)})
+    for fileName in nt_files:
+        match = RUN_INDEX.match(fileName)
+        run = int(match.group(1)) if match else -1                  # Without per-run files only the last run is kept
+        present = [(folder, shard) for folder, shard in zip(folders, done) if os.path.exists(os.path.join(folder, fileName))]
+        offsets = [sum(shard["beam_on"][run] for _, shard in present[:k]) for k in range(len(present))]
+        append_ntuples([os.path.join(folder, fileName) for folder, _ in present], offsets, os.path.join(merged, fileName))
+
+    # ::: Statistics :::
+    beam_on = [sum(shard["beam_on"][run] for shard in done) for run in range(len(description["beam_on"]))]
+    with open(run_paths(os.path.join(shard_dir, done[0]["name"]))["macro"], "r") as f:
+        text = f.read()
+
+    summary = {"finished": [shard["name"] for shard in done],
+               "missing":  [shard["name"] for shard in description["shards"] if shard not in done],
+               "beam_on":  beam_on, "requested": description["beam_on"],
+               "files":    h1_files + list(description["dumps"]) + nt_files}
+    create_run_dir(output_dir, {MACRO_FILE: shard_macro(text, beam_on)}, summary)   # Events of the finished shards, for the analysis
+    return summary
+
+
+def main(argv=None):
+    import argparse
+    parser = argparse.ArgumentParser(description="ADAPTnGUIDE shards: split one macro into independent processes and merge them.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    cmd = commands.add_parser("split", help="One folder per shard with its share of the events and its own seeds")
+    cmd.add_argument("macro", help="Macro file to split (e.g. ADAPT.mac)")
+    cmd.add_argument("--shards", type=int, help="Number of shards of equal size")
+    cmd.add_argument("--weights", help="Comma separated relative sizes of the shards (e.g. the cores of every node)")
+    cmd.add_argument("--seed", type=int, help="Master seed of the shard streams (default: the seeds of the macro, or 0)")
+    cmd.add_argument("--output-dir", default="shards", help="Folder of the shards (default: shards)")
+    cmd = commands.add_parser("merge", help="Merge the outputs of the finished shards")
+    cmd.add_argument("shard_dir", help="Folder written by split")
+    cmd.add_argument("--output-dir", help="Folder of the merged outputs (default: <shard_dir>/merged)")
+    args = parser.parse_args(argv)
+
+    try:
+        if args.command == "split":
+            weights = [float(w) for w in args.weights.split(",")] if args.weights else None
+            description = split_macro(args.macro, args.output_dir, args.shards, weights, args.seed)
+            print(f"{len(description['shards'])} shard(s) of {args.macro} written to {args.output_dir}")
+            return description
+        summary = merge_shards(args.shard_dir, args.output_dir)
+    except ValueError as e:
+        parser.exit(1, f"{e}\n")
+    print(f"Merged {len(summary['finished'])} shard(s) ({len(summary['missing'])} missing): "
+          f"{', '.join(str(n) for n in summary['beam_on'])} of {', '.join(str(n) for n in summary['requested'])} events")
+    return summary
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,258 @@
+# ::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::
+# :::                                                                                                                          :::
+# :::                                              ADAPTnGUIDE Parameter Sweeps                                                :::
+# :::                                                                                                                          :::
+# ::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::
+
+
+# ::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::
+# This Python module expands a sweep specification (design of experiments) over the inputs of ADAPTnGUIDEGenerator.py and
+# writes one self-contained run folder per point:
+#       <output-dir>/sweep.json                              Every point, its parameters and its geometry
+#       <output-dir>/geometries/<hash>/                      DetectorConstruction.cc and geometry.json, once per distinct geometry
+#       <output-dir>/runs/<index>/inputs/ADAPT.mac           Macro file of the point
+#       <output-dir>/runs/<index>/outputs/                   Working directory of ADAPT (cd outputs && ADAPT ../inputs/ADAPT.mac)
+#       <output-dir>/runs/<index>/manifest.json              Parameters, full configuration, hashes and geometry reference
+#
+# Points that only differ in macro parameters (Radionuclide, Location_source, Runs_input, ...) render the same
+# DetectorConstruction.cc and share one geometry folder, so one compiled geometry serves all of them. With
+# "runtime_geometry": true in the base configuration every run folder also gets its ADAPT_Geometry.txt, and a single
+# compiled ADAPT runs every point of the sweep.
+#
+# Sweep specification (JSON or YAML). Every block is optional, the points are the product of the blocks present:
+#       {
+#         "base":   { ...generator configuration... },
+#         "grid":   {"detector_pos_values[2]": [5, 10, 15], "Radionuclide": ["Am-241", "Ra-224"]},
+#         "latin_hypercube": {"samples": 20, "seed": 1, "decimals": 3,
+#                             "parameters": {"source_dim_values[1]": [0.5, 2.0], "Runs_input": {"min": 1e4, "max": 1e6, "integer": true}}},
+#         "points": [{"Runs_input": 1000}, {"Runs_input": 100000, "Location_source": "Surface"}]
+#       }
+# A parameter is a configuration key, or "key[i]" for one component of the dimension and position values.
+# Every point uses its index as seed stream (unless it sets "seed_stream") of the "seed" of the base configuration (default:
+# STREAM_SEED of the generator), so the runs get independent, reproducible random numbers; "threads": "auto" with "jobs" shares
+# the cores between simultaneous runs.
+#
+# Example:
+#       python ADAPTnGUIDESweep.py sweep.json --output-dir sweep1
+#       python ADAPTnGUIDESweep.py sweep.json --dry-run                  # Only prints the number of points and geometries
+#       python ADAPTnGUIDESweep.py sweep.json --dry-run --catalog ADAPT_Runs.db   # Also the expected wall time and output size
+# ::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::
+
+
+# :::::: We import the needed libraries ::::::
+import itertools
+import json
+import os
+import random
+import re
+
+from ADAPTnGUIDEGenerator import (GEOMETRY_FILE, INPUTS_DIR, MACRO_FILE, STREAM_SEED, content_hash, create_run_dir, load_config,
+                                  render, render_geometry_file, write_if_changed)
+
+
+GEOMETRY_KEYS = ("world_material", "source_choice", "detector_choice", "source_material", "detector_material",
+                 "source_dim_values", "detector_dim_values", "source_pos_values", "detector_pos_values",
+                 "CADfile_names", "CAD_Folder_Path", "CAD_commented", "CAD_materials", "CAD_format", "runtime_geometry")
+
+HASH_LENGTH = 12                                                    # Characters of the geometry hash used as folder name
+
+
+# ::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::
+# :::                  D E S I G N    O F    E X P E R I M E N T S   :::
+# ::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::
+
+def set_parameter(config, key, value):
+    """Copy of config with one parameter set; "key[i]" sets one component of a 3-value entry."""
+    config = dict(config)
+    match = re.fullmatch(r"(\w+)\[([0-2])\]", key)
+    if match is None:
+        config[key] = value
+        return config
+
+    name, i = match.group(1), int(match.group(2))
+    values = config.get(name)
+    if isinstance(values, str):
+        values = values.replace(",", " ").split()
+    if not isinstance(values, (list, tuple)) or len(values) != 3:
+        raise ValueError(f"{key}: the base configuration needs 3 values for {name}.")
+    values = list(values)
+    values[i] = value
+    config[name] = values
+    return config
+
+
+def grid_points(grid):
+    """Every combination of the listed values (cartesian product)."""
+    keys = list(grid)
+    for key in keys:
+        if not isinstance(grid[key], (list, tuple)) or not grid[key]:
+            raise ValueError(f"grid: {key} needs a non-empty list of values.")
+    return [dict(zip(keys, values)) for values in itertools.product(*(grid[key] for key in keys))]
+
+
+def latin_hypercube_points(spec):
+    """Latin hypercube samples: every parameter range is split into `samples` strata, each stratum is used once."""
+    samples  = int(spec.get("samples", 0))
+    decimals = spec.get("decimals", 4)
+    rng      = random.Random(spec.get("seed", 0))
+    if samples < 1 or not spec.get("parameters"):
+        raise ValueError("latin_hypercube needs samples >= 1 and at least one parameter.")
+
+    columns = {}
+    for key, bounds in spec["parameters"].items():
+        if isinstance(bounds, dict):
+            low, high, integer = bounds["min"], bounds["max"], bounds.get("integer", False)
+        else:
+            (low, high), integer = bounds, False
+        if not float(low) < float(high):
+            raise ValueError(f"latin_hypercube: {key} needs min < max (got {low}, {high}).")
+        strata = list(range(samples))
+        rng.shuffle(strata)
+        values = [float(low) + (s + rng.random()) / samples * (float(high) - float(low)) for s in strata]
+        columns[key] = [int(round(v)) for v in values] if integer else [round(v, decimals) for v in values]
+    return [{key: columns[key][i] for key in columns} for i in range(samples)]
+
+
+def expand_points(spec):
+    """Configurations of every point of a sweep specification: list of (parameters, configuration)."""
+    blocks = []
+    if spec.get("grid"):
+        blocks.append(grid_points(spec["grid"]))
+    if spec.get("latin_hypercube"):
+        blocks.append(latin_hypercube_points(spec["latin_hypercube"]))
+    if spec.get("points"):
+        blocks.append([dict(point) for point in spec["points"]])
+
+    base = spec.get("base", {})
+    points = []
+    for combination in itertools.product(*blocks):                 # No blocks: a single point with the base configuration
+        parameters = {key: value for block in combination for key, value in block.items()}
+        config = base
+        for key, value in parameters.items():
+            config = set_parameter(config, key, value)
+        points.append((parameters, config))
+    return points
+
+
+# ::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::
+# :::                      R U N    F O L D E R S                    :::
+# ::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::
+
+def plan_sweep(spec):
+    """Renders every point (nothing is written) and groups the points by geometry. Raises ValueError listing the invalid points."""
+    runs, geometries, errors = [], {}, []
+    for index, (parameters, config) in enumerate(expand_points(spec)):
+        point = {"seed_stream": index, **config, "inputs_path": f"../{INPUTS_DIR}"}                   # One random stream per point
+        if point.get("seed") is None:
+            point["seed"] = STREAM_SEED                             # Never the seed the scheduler gives to every job
+        try:
+            c, cc, mac = render(point)
+        except ValueError as e:
+            errors.append(f"Point {index} {parameters}: {e}")
+            continue
+        geometry_file = render_geometry_file(c, validated=True) if c["runtime_geometry"] else None
+        geometry_hash = content_hash(cc + (geometry_file or ""))
+        if geometry_hash not in geometries:
+            geometries[geometry_hash] = {"cc": cc, "geometry_file": geometry_file, "config": {key: c[key] for key in GEOMETRY_KEYS}, "runs": []}
+        geometries[geometry_hash]["runs"].append(index)
+        runs.append({"index": index, "parameters": parameters, "config": c, "macro": mac, "geometry_file": geometry_file,
+                     "geometry_hash": geometry_hash, "macro_hash": content_hash(mac)})
+    if errors:
+        raise ValueError("\n".join(errors))
+    return runs, geometries
+
+
+def _write_json(fileName, data):
+    with open(fileName, "w") as file:
+        json.dump(data, file, indent=2)
+
+
+def write_sweep(spec, output_dir):
+    """Writes the geometry folders, one run folder per point and sweep.json. Returns the sweep summary."""
+    runs, geometries = plan_sweep(spec)
+
+    for geometry_hash, geometry in geometries.items():
+        folder = os.path.join(output_dir, "geometries", geometry_hash[:HASH_LENGTH])
+        os.makedirs(folder, exist_ok=True)
+        write_if_changed(os.path.join(folder, "DetectorConstruction.cc"), geometry["cc"])
+        if geometry["geometry_file"] is not None:
+            write_if_changed(os.path.join(folder, GEOMETRY_FILE), geometry["geometry_file"])
+        _write_json(os.path.join(folder, "geometry.json"), {"geometry_hash": geometry_hash, **geometry["config"]})
+
+    width = max(5, len(str(len(runs) - 1)))
+    summary = {"runs": [], "geometries": {h[:HASH_LENGTH]: g["runs"] for h, g in geometries.items()}}
+    for run in runs:
+        name = f"{run['index']:0{width}d}"
+        folder = os.path.join(output_dir, "runs", name)
+        inputs = {MACRO_FILE: run["macro"]}
+        if run["geometry_file"] is not None:                        # Runtime geometry: the run folder is self-contained
+            inputs[GEOMETRY_FILE] = run["geometry_file"]
+        geometry = os.path.join("..", "..", "geometries", run["geometry_hash"][:HASH_LENGTH])
+        create_run_dir(folder, inputs, {
+            "index":          run["index"],
+            "parameters":     run["parameters"],
+            "geometry":       geometry,                             # Relative to the run folder
+            "geometry_hash":  run["geometry_hash"],
+            "macro_hash":     run["macro_hash"],
+            "threads":        run["config"]["threads"],
+            "seeds":          run["config"]["seeds"],                # /random/setSeeds of the macro (null: not set)
+            "config":         run["config"],
+        })
+        summary["runs"].append({"index": run["index"], "folder": os.path.join("runs", name), "parameters": run["parameters"],
+                                "geometry": run["geometry_hash"][:HASH_LENGTH]})
+    _write_json(os.path.join(output_dir, "sweep.json"), summary)
+    return summary
+
+
+def main(argv=None):
+    import argparse
+    parser = argparse.ArgumentParser(description="ADAPTnGUIDE sweep expander: one run folder per point, geometries shared.")
+    parser.add_argument("spec", help="JSON or YAML sweep specification")
+    parser.add_argument("--output-dir", default="sweep", help="Folder of the sweep (default: sweep)")
+    parser.add_argument("--dry-run", action="store_true", help="Only validate the points and count the distinct geometries")
+    parser.add_argument("--catalog", help="Run catalogue (SQLite): reuse the outputs of points already simulated")
+    args = parser.parse_args(argv)
+
+    spec = load_config(args.spec)
+    try:
+        if args.dry_run:
+            runs, geometries = plan_sweep(spec)
+        else:
+            summary = write_sweep(spec, args.output_dir)
+            runs, geometries = summary["runs"], summary["geometries"]
+    except ValueError as e:
+        parser.exit(1, f"{e}\n")
+    print(f"{len(runs)} point(s), {len(geometries)} distinct geometr{'y' if len(geometries) == 1 else 'ies'}"
+          + ("" if args.dry_run else f" written to {args.output_dir}"))
+
+    if args.catalog:
+        from ADAPTnGUIDECatalog import Catalog
+        catalog = Catalog(args.catalog)
+        if args.dry_run:
+            cached = sum(catalog.find_identical(run["geometry_hash"], run["macro_hash"]) is not None for run in runs)
+        else:
+            cached = sum(catalog.register(os.path.join(args.output_dir, run["folder"])) in ("done", "reused") for run in runs)
+        catalog.close()
+        print(f"{cached} point(s) already simulated" + (" (outputs reused)." if not args.dry_run else "."))
+        print_estimate(spec, args.catalog)
+
+
+def print_estimate(spec, catalog):
+    """Expected wall time, CPU time and output size of the sweep, from the finished runs of the catalogue."""
+    from ADAPTnGUIDEPredictor import RuntimePredictor, format_bytes, format_duration
+    try:
+        predictor = RuntimePredictor.from_catalog(catalog)
+    except ValueError as e:
+        print(f"No estimate: {e}")
+        return
+    estimates = [predictor.predict(config) for _, config in expand_points(spec)]
+    wall = sum(e["wall_time"] for e in estimates)
+    cpu  = sum(e["wall_time"] * e["threads"] for e in estimates)
+    slowest = max(range(len(estimates)), key=lambda i: estimates[i]["wall_time"])
+    print(f"Estimate ({predictor.runs} finished runs): {format_duration(wall)} one run after the other, "
+          f"{format_duration(cpu)} of CPU time, {format_bytes(sum(e['output_bytes'] for e in estimates))} of output; "
+          f"slowest point {slowest} ({format_duration(estimates[slowest]['wall_time'])}).")
+
+
+if __name__ == "__main__":
+    main()
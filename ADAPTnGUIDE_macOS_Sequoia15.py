@@ -9,9 +9,10 @@
 # ::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::
 # This Python script generates the GUI for the ADAPTnGUIDE app. This script is divided into 2 main sections:
 #   
-#   1) Collecting Input Information: This section defines the variables used to store the user's input along with the text 
-#                                    templates required to generate both the DetectorConstruction.cc file and the macro file, 
-#                                    which contain the user-defined geometry.
+#   1) Collecting Input Information: This section defines the variables used to store the user's input and passes them to 
+#                                    ADAPTnGUIDEGenerator.py, which holds the text templates required to generate both the 
+#                                    DetectorConstruction.cc file and the macro file, which contain the user-defined geometry.
+#                                    The same files can be generated without the GUI (python ADAPTnGUIDEGenerator.py config.json).
 #   
 #   2) GUI: This section generates the GUI itself, including all the corresponding text fields and input options for the user to 
 #           define the geometry.
@@ -43,17 +44,16 @@
 
 # :::::: We import the needed libraries ::::::
 import tkinter as tk
-import shutil
 import os
 from tkinter import ttk, filedialog, messagebox
+from ADAPTnGUIDEGenerator import install_inputs
+from ADAPTnGUIDECatalog import CATALOG_FILE
+from ADAPTnGUIDEPredictor import RuntimePredictor, describe
 
 # ::: Important paths for sending the .cc, .txt, and macro files to their respective folders :::
 # ::: macOS Sequoia 15.6 :::
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))                                  # Obtaining the main path (same level where this script should be)
-SourceCCFile       = os.path.join(BASE_DIR, "DetectorConstruction.cc")                 # Path where the GUI-generated DetectorConstruction.cc file is located
-DestinationCCFile  = os.path.join(BASE_DIR, "src", "DetectorConstruction.cc")          # Path where the old DetectorConstruction.cc file will be replaced with the GUI-generated one
-DestinationTxtFile = os.path.join(BASE_DIR, "DetectorConstructionGeometries")          # Path to the folder where .txt version of the GUI-generated DetectorConstruction files will be stored
-os.makedirs(DestinationTxtFile, exist_ok=True)                                         # Command to create the DetectorConstructionGeometries folder if it does not exist
+os.makedirs(os.path.join(BASE_DIR, "DetectorConstructionGeometries"), exist_ok=True)                                      # Command to create the DetectorConstructionGeometries folder if it does not exist
 
 
 # ::: For loading previous geometries (to be added):::
@@ -68,7 +68,7 @@ os.makedirs(DestinationTxtFile, exist_ok=True)
 # :::                                                                :::
 # ::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::
 
-def save_input():
+def collect_config():
 
     # :::::: Collecting user inputs from dropdown menus ::::::
 
@@ -105,361 +105,62 @@ def save_input():
     geometryName = GeometryName.get()                                                         # Name of the geometry (e.g. PlasticScintillatorGeometry, LYSOGeometry)
 
 
-    # ::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::
-    # ::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::
-    # ::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::
-    
-
     # ::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::
     # :::                                                                :::
-    # :::          D E T E C T O R    C O N S T R U C T I O N.CC         :::
+    # :::    D E T E C T O R    C O N S T R U C T I O N  &  M A C R O    :::
     # :::                                                                :::
     # ::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::
-    
-    with open("DetectorConstruction.cc", "w") as file:                                        # Save the user's input to a text file
-
-
-        # :::::: Detector Construction Template ::::::
-        file.write(f"""// :::::::::::::::::::::::::::::::::::::::::::::::::::::
-// :::                                               :::
-// :::     Source file for Detector Construction     :::
-// :::                                               :::
-// :::::::::::::::::::::::::::::::::::::::::::::::::::::
-
-// Include user-made and needed libraries
-#include "DetectorConstruction.hh"
-#include "CADMesh.hh"               // To import CAD files
-
-
-// ::::::::::::::::::::::::::::::::
-// :::  Constructor definition  :::
-// ::::::::::::::::::::::::::::::::
-
-DetectorConstruction::DetectorConstruction()
-{{}}
-
-
-// ::::::::::::::::::::::::::::::::
-// :::  Destructor definition   :::
-// ::::::::::::::::::::::::::::::::
-
-DetectorConstruction::~DetectorConstruction()
-{{}}
-
-
-// ::::::::::::::::::::::::::::::::::
-// ::: Physical volume definition :::
-// :::        (function)          :::
-// ::::::::::::::::::::::::::::::::::
-
-G4VPhysicalVolume *DetectorConstruction::Construct()
-{{ 
-    G4bool checkOverlaps = true;                                 // Command to check for geometries overlaps
-
-    G4NistManager  *nist = G4NistManager::Instance();             // Nist manager includes several materials that we can use
-
-
-    // ::::::::::::::::::::::::::::::::
-    // :::          Elements        :::
-    // ::::::::::::::::::::::::::::::::
-    G4Element*  Lu = nist->FindOrBuildElement("Lu");
-    G4Element*  Y  = nist->FindOrBuildElement("Y");
-    G4Element*  Si = nist->FindOrBuildElement("Si");
-    G4Element*  O  = nist->FindOrBuildElement("O");
-    G4Element*  Ce = nist->FindOrBuildElement("Ce");
-    G4Element*  Fe = nist->FindOrBuildElement("Fe");
-    G4Element*  Cr = nist->FindOrBuildElement("Cr");
-    G4Element*  N  = nist->FindOrBuildElement("N");
-    G4Element*  Ni = nist->FindOrBuildElement("Ni");
-    G4Element*  Mn = nist->FindOrBuildElement("Mn");
-    G4Element*  C  = nist->FindOrBuildElement("C");
-    G4Element*  S  = nist->FindOrBuildElement("S");
-    G4Element*  P  = nist->FindOrBuildElement("P");
-    G4Element*  Cu = nist->FindOrBuildElement("Cu");
-    G4Element*  Mo = nist->FindOrBuildElement("Mo");
-    G4Element*  H = nist->FindOrBuildElement("H");
-    
-
-    // ::::::::::::::::::::::::::::::::
-    // :::        Materials         :::
-    // ::::::::::::::::::::::::::::::::
-    G4Material *WorldMat = nist->FindOrBuildMaterial("{world_material}");   // We name and define a material from the nist manager. For other materials refer to the Geant4 Material Database
-    G4Material    *PbMat = nist->FindOrBuildMaterial("G4_Pb");  
-    G4Material   *SrcMat = nist->FindOrBuildMaterial("{source_material}");    // Source's material
-    G4Material   *DetMat = nist->FindOrBuildMaterial("{detector_material}");  // Detector's Active Volume material
-    G4Material   *Water = nist->FindOrBuildMaterial("G4_WATER");  // Detector's Active Volume material
-
-
-    // ::::::::::::::::::::::::::::::::::::::::::
-    // :::  User-defined materials/compounds  :::
-    // ::::::::::::::::::::::::::::::::::::::::::
-
-    // To define a new material use the following commands:
-    //          G4Material("Name", Density*g/cm3, No. of elements)
-    //          Name->AddElement(Element, No of atoms);  // Define the number of elements and the atom numbers for each element
-
-    // :::::::::::::::::::::::::::
-    // :::  Examples provided  :::
-    // :::::::::::::::::::::::::::
-
-    // :::::::: LYSO ::::::::
-    G4Material* LYSO = new G4Material("LYSO", 7.1*g/cm3, 5);
-    LYSO->AddElement(Lu, 2);
-    LYSO->AddElement( Y, 2);
-    LYSO->AddElement(Si, 1);
-    LYSO->AddElement( O, 5);
-    LYSO->AddElement(Ce, 1);
-
-    // :::::::: Stainless steel 316LVM ::::::::
-    // Values retrieved from: https://www.ulbrich.com/alloys/316lvm-stainless-steel-uns-s31673/
-    // You can also define a material defining the % of each element. The % must add up 1
-    G4Material* StainlessSteel = new G4Material( "SSteel_316LVM", 7.92*g/cm3, 11 );
-    StainlessSteel->AddElement( C , 0.0003 ); // 0.03%
-    StainlessSteel->AddElement( P , 0.0003 ); // 0.03%
-    StainlessSteel->AddElement( Si, 0.0075 ); // 0.75%
-    StainlessSteel->AddElement( Ni, 0.13   ); // 13.0%
-    StainlessSteel->AddElement( Cu, 0.0005 ); // 0.05%
-    StainlessSteel->AddElement( Mn, 0.02   ); // 2.00%
-    StainlessSteel->AddElement( S,  0.0001 ); // 0.01%
-    StainlessSteel->AddElement( Cr, 0.17   ); // 17.0%
-    StainlessSteel->AddElement( Mo, 0.0225 ); // 2.25%
-    StainlessSteel->AddElement( N , 0.0010 ); // 0.10%
-    StainlessSteel->AddElement( Fe, 0.6478 ); // Balance (64.78%)
-
-    // :::::::: Pebax C2H40 ::::::::
-    G4Material* pebax = new G4Material( "Pebax", 1.01*g/cm3, 3 );
-    pebax->AddElement( C , 2 );
-    pebax->AddElement( H , 4 );
-    pebax->AddElement( O , 1 );
-
-    // :::::::: Silicone ::::::::
-    G4Material* silicone = new G4Material( "silicone", 1.1*g/cm3, 4 );
-    silicone->AddElement( C , 2 );
-    silicone->AddElement( H , 6 );
-    silicone->AddElement( Si, 1 );
-    silicone->AddElement( O , 1 );
-
-    // :::::::: Silicone Grease ::::::::
-    G4Material* OpticalGreaseMat = new G4Material( "OpticalGreaseMat", 1.1*g/cm3, 4 );
-    OpticalGreaseMat->AddElement( C , 2 );
-    OpticalGreaseMat->AddElement( H , 6 );
-    OpticalGreaseMat->AddElement( Si, 1 );
-    OpticalGreaseMat->AddElement( O , 1 );
-
-    // :::::::: Polyether Ether Ketona (PEEK,C19H12O3) ::::::::
-    G4Material* PEEK = new G4Material( "PEEK", 1.32*g/cm3, 3 );
-    PEEK->AddElement( C , 19 );
-    PEEK->AddElement( H , 12 );
-    PEEK->AddElement( O , 3  );
-
-
-    // ::::::::::::::::::::::::::::::::
-    // :::         Geometry         :::
-    // ::::::::::::::::::::::::::::::::
-    
-    // :::  Positions  :::
-    Pos1 = G4ThreeVector(0, 0, 0);       // World position
-    Pos2 = G4ThreeVector({source_pos_values[0]}*mm, {source_pos_values[1]}*mm, {source_pos_values[2]}*mm);  // Source
-    Pos3 = G4ThreeVector({detector_pos_values[0]}*mm, {detector_pos_values[1]}*mm, {detector_pos_values[2]}*mm);  // Detector
-
-
-    // :::::::::::::::::::
-    // :::::: World ::::::
-    // :::::::::::::::::::
-
-    // ::: Dimensions :::
-    G4double WorldX = 2./2*m; // Geant4 always takes half of the length. Therefore define them as X/2 or X*0.5
-    G4double WorldY = 2./2*m;
-    G4double WorldZ = 2./2*m;
-
-    World      = new G4Box("World", WorldX, WorldY, WorldZ); // Solids deals with the definition of the shapes
-    World_log  = new G4LogicalVolume(World, WorldMat, "World_log");
-    World_phys = new G4PVPlacement(0, Pos1, World_log, "World_phys", 0, false, 0, checkOverlaps); // The first 0 means rotation. The world does not need to be rotated so, = 0. 
-                                                                                                  // The second 0 means if this volume is a daughter (aka. if it is inside another volume). In this case, No.
-                                                                                                  // The third 0 means the copy number.
-
-    // ::::::::::::::::::::::
-    // ::::::  Source  ::::::
-    // ::::::::::::::::::::::
-
-    Rotation = new G4RotationMatrix();    // A rotation is defined to align all the source geometry in the Y axis direction
-    Rotation->rotateX(90.*deg);
-    Rotation->rotateY(0.*deg);
-    Rotation->rotateZ(0.*deg);
-""")
-
-        # :::::: Dimensions of the source based on the Shape ::::::
-        if source_choice == "Box":                          # For Box
-            file.write(f"""
-    G4double SourceX = {source_dim_values[0]}/2.*mm;
-    G4double SourceY = {source_dim_values[1]}/2.*mm;
-    G4double SourceZ = {source_dim_values[2]}/2.*mm;
-
-    G4Box      *Source = new G4Box("Source", SourceX, SourceY, SourceZ);
-            Source_log = new G4LogicalVolume(Source, SrcMat, "Source_log");
-           Source_phys = new G4PVPlacement(0, Pos2, Source_log, "Source_phys", World_log, false, checkOverlaps);
-            """)
-
-        elif source_choice == "Cylinder":                   # For Cylinder
-            file.write(f"""
-    G4double SourceInRad     = {source_dim_values[0]}*mm;
-    G4double SourceOutRad    = {source_dim_values[1]}*mm;
-    G4double SourceThickness = {source_dim_values[2]}/2.*mm;
-
-    G4Tubs   *Source  = new G4Tubs("Source", SourceInRad, SourceOutRad, SourceThickness, 0.*deg, 360*deg);
-          Source_log  = new G4LogicalVolume(Source, SrcMat, "Source_log");
-          Source_phys = new G4PVPlacement(Rotation, Pos2, Source_log, "Source_phys", World_log, 0, checkOverlaps);
-            """)
-
-        # :::::: Dimensions of the detector based on the Shape ::::::
-        if detector_choice == "Box":                          # For Box
-            file.write(f"""
-    
-    // ::::::::::::::::::::::
-    // :::::: Detector ::::::
-    // ::::::::::::::::::::::
-
-    G4double DetectorX = {detector_dim_values[0]}/2.*mm;
-    G4double DetectorY = {detector_dim_values[1]}/2.*mm;
-    G4double DetectorZ = {detector_dim_values[2]}/2.*mm;
-
-    Detector      = new G4Box("Detector", DetectorX, DetectorY, DetectorZ);
-    Detector_log  = new G4LogicalVolume(Detector, DetMat, "Detector_log");
-    Detector_phys = new G4PVPlacement(0, Pos3, Detector_log, "Detector_phys", World_log, false, checkOverlaps);
-            """)
-
-        elif detector_choice == "Cylinder":                   # For Cylinder
-            file.write(f"""
-
-    // ::::::::::::::::::::::
-    // :::::: Detector ::::::
-    // ::::::::::::::::::::::
-
-    G4double DetInnerRadius = {detector_dim_values[0]}*mm;
-    G4double DetOuterRadius = {detector_dim_values[1]}*mm;
-    G4double DetThickness   = {detector_dim_values[2]}/2.*mm;
-
-    G4Tubs   *Detector  = new G4Tubs("Detector", DetInnerRadius, DetOuterRadius, DetThickness, 0.*deg, 360*deg);
-          Detector_log  = new G4LogicalVolume(Detector, DetMat, "Detector_log");
-          Detector_phys = new G4PVPlacement(0, Pos3, Detector_log, "Detector_phys", World_log, 0, checkOverlaps);
-            """)
-
-        file.write(f"""
-        
-    // ::::::::::::::::::::::::::::::::::::::
-    // :::          CAD Geometries        :::
-    // ::::::::::::::::::::::::::::::::::::::
-
-    /* In this section you can add more geometries using CAD files in .obj or .stl format.
-     * !!! Coppy and uncomment the following section if you want to model the CAD files, or if you wich to add more CAD geometries. !!!
-     * !!! The 'X' represents the number of CAD geometries, 'Name' is the name of the CAD file, and 'MATERIAL' should be defined before compiling. !!!
-     *
-     * The CAD files are added throught the GUI, but if you wish to add them manually, here is the detailed processs on how to proceed:
-     *     1) Import .obj, or .stl geometry using:
-     *
-     *        auto meshX = CADMesh::TessellatedMesh::FromOBJ("NAME.obj");  // If you want to add more CAD files, keep using mesh2,3,4, etc. Remember to write the correct file name!
-     *        auto meshx = CADMesh::TessellatedMesh::FromSTL("Name.stl");  // stl geometries MUST BE SAVED IN ASCII STL
-     *
-     *     2) Scale the geoemtry. Recommended to set it to 1 to keep your original dimensions
-     *
-     *        meshX->SetScale(1); // For more geoemtries use mesh2, mesh3, etc.
-     *
-     *     3) Setting an offset in the geoemtry position. Modify it as needed, but adding mesh2, mesh3, etc for more geometries.
-     *
-     *        meshX->SetOffset(x, y, z);
-     *        meshX->SetOffset(G4ThreeVector(x, y, z));
-     *
-     *     4) Assigning names and materials. Replace NAME for the name of your geometry (e.g.  NAME --> Shielding).
-     *                                       Replace MATERIAL with your defined material (e.g. MATERIAL --> LYSO).
-     *
-     *        // ::: Name :::
-     *        auto NAME     = meshX->GetSolid();                                      
-     *        auto NAME_log = new G4LogicalVolume(NAME, MATERIAL, "NAME_log",0,0,0);
-     *                        new G4PVPlacement(rotation, Pos1, "NAME", NAME_log, World_log, false, 0, false);
-     * 
-     * Credits to Christopher Poole for this section (https://github.com/christopherpoole/CADMesh/tree/master)
-     */
-
-    G4double x = 0.0; // Do not comment this line.
-    G4double y = 0.0; // Do not comment this line.
-    G4double z = 0.0; // Do not comment this line.
-    
-    /*  // :::::::::::: UNCOMMENT THE FOLLOWING SECTION STARTING FROM HERE UP TO ....
-       //std::string basePath = "{CAD_Folder_Path}/Obj/";  // For .obj files
-       //std::string basePath = "{CAD_Folder_Path}/Stl/";  // For .stl files. MUST BE IN ASCII STL
-
-       """)
-
-        for i, CADfile_name in enumerate(CADfile_names, start=1):
-                    file.write(f"""
-    // ::: {CADfile_name} :::
-    //auto mesh{i} = CADMesh::TessellatedMesh::FromOBJ(basePath + "{CADfile_name}.obj");
-    //auto mesh{i} = CADMesh::TessellatedMesh::FromSTL(basePath + "{CADfile_name}.stl");
-
-    mesh{i}->SetScale(1);
-    mesh{i}->SetOffset(x, y, z);
-    mesh{i}->SetOffset(G4ThreeVector(x, y, z));
-
-    Rotation = new G4RotationMatrix();
-    Rotation->rotateX(0.*deg);
-    Rotation->rotateY(0.*deg);
-    Rotation->rotateZ(0.*deg);
-
-    auto {CADfile_name} = mesh{i}->GetSolid();
-    auto {CADfile_name}_log = new G4LogicalVolume({CADfile_name}, MATERIAL, "{CADfile_name}_log", 0, 0, 0);
-                        new G4PVPlacement(Rotation, Pos1, {CADfile_name}_log, "{CADfile_name}", World_log, 0, checkOverlaps);
-            """)          
-
-
-        file.write(f"""
-
-    */  // ... UP TO HERE! 
-
-
-    // ::::::::::::::::::::::::::::::::::::::
-    // :::    Visualisation Attributes    :::
-    // ::::::::::::::::::::::::::::::::::::::
-
-    // Add your CAD_log volumes here for visualization too
-
-    // ::: Detector :::
-    G4VisAttributes *DetVisAtt = new G4VisAttributes(G4Color(0.0, 0.0, 1.0, 0.5)); // Blue
-    DetVisAtt->SetForceSolid(true);
-    Detector_log->SetVisAttributes(DetVisAtt);
-
-    // ::: Source :::
-    G4VisAttributes *SrcVisAtt = new G4VisAttributes(G4Color(1.0, 0.0, 0.0, 0.5)); // Red
-    SrcVisAtt->SetForceSolid(true);
-    Source_log->SetVisAttributes(SrcVisAtt);
-
-
-    return World_phys;  // Always return the physical World
-}}
-
-
-// ::::::::::::::::::::::::::::::::::
-// :::    Sensitive Detector      :::
-// :::         function           :::
-// ::::::::::::::::::::::::::::::::::
-
-void DetectorConstruction::ConstructSDandField()
-{{
-    SensitiveDetector *sensDet = new SensitiveDetector("SensitiveDetector");
-    Detector_log->SetSensitiveDetector(sensDet);
-    G4SDManager::GetSDMpointer()->AddNewDetector(sensDet);
-}}
-
-// :::::::::::::::::::::::::::::::::::::::::::::::::::::::: End ::::::::::::::::::::::::::::::::::::::::::::::::::::::::::
-        """)
-    # ::::::::::::::::::::::::::::::::::::::::::::::::::::::::::
-    # :::    Saving the DetectorCosntruction.cc into .txt    :::
-    # ::::::::::::::::::::::::::::::::::::::::::::::::::::::::::
-
-    with open("DetectorConstruction.cc", "r") as cc_file:     # Opening and reading the .cc file
-        ccContent = cc_file.read()
-
-    with open(geometryName +".txt", "w") as txt_file:         # Saving it as a txt file
-        txt_file.write(ccContent)
+
+    # The templates live in ADAPTnGUIDEGenerator.py. install_inputs() writes src/DetectorConstruction.cc, 
+    # DetectorConstructionGeometries/<geometryName>.txt and ADAPT.mac
+    config = {
+        "source_choice":        source_choice,
+        "detector_choice":      detector_choice,
+        "world_material":       world_material,
+        "source_material":      source_material,
+        "detector_material":    detector_material,
+        "source_dim_values":    source_dim_values,
+        "detector_dim_values":  detector_dim_values,
+        "source_pos_values":    source_pos_values,
+        "detector_pos_values":  detector_pos_values,
+        "CADfile_names":        CADfile_names,
+        "CAD_Folder_Path":      CAD_Folder_Path,
+        "Radionuclide":         Radionuclide,
+        "Location_source":      Location_source,
+        "Runs_input":           Runs_input,
+        "geometryName":         geometryName,
+        "CAD_commented":        False,
+    }
+    return config
+
+
+def save_input():
+    config = collect_config()
+
+    try:
+        written = install_inputs(config, BASE_DIR)
+    except ValueError as e:                                                                   # Missing or invalid fields
+        messagebox.showerror("Error", str(e))
+        return
+
+    if written["rebuild"]:                                                                    # src/DetectorConstruction.cc changed
+        messagebox.showinfo("Success!", "Your DetectorConstruction.cc and macro file have been generated!\nThe geometry changed: rebuild ADAPT before running.")
+    else:                                                                                     # Only the macro file changed
+        messagebox.showinfo("Success!", "Your macro file has been generated!\nThe geometry is unchanged: no rebuild is needed.")
+
+
+def estimate_input():
+    # Expected wall time and output size of the current inputs, fitted on the finished runs of the run catalogue
+    catalog = os.path.join(BASE_DIR, CATALOG_FILE)
+    if not os.path.exists(catalog):
+        messagebox.showinfo("Estimate", f"No run catalogue yet ({CATALOG_FILE}).\nRun simulations with ADAPTnGUIDEScheduler.py --catalog {CATALOG_FILE} first.")
+        return
+    try:
+        estimate = RuntimePredictor.from_catalog(catalog).predict(collect_config())
+    except ValueError as e:                                                                   # Invalid fields or not enough finished runs
+        messagebox.showerror("Error", str(e))
+        return
+    messagebox.showinfo("Estimate", describe(estimate))
 
 
 # ::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::
@@ -497,292 +198,6 @@ void DetectorConstruction::ConstructSDandField()
 
 
 
-# ::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::
-# ::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::
-# ::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::
-
-
-
-# ::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::
-# :::                                                                :::
-# :::                     M A C R O    F I L E                       :::
-# :::                                                                :::
-# ::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::
-
-# :::::: Converting the source and detector values into float ::::::
-    # :::::: Source ::::::
-    halfx = float(source_dim_values[0]) / 2
-    halfy = float(source_dim_values[1]) / 2
-    halfz = float(source_dim_values[2]) / 2
-
-    # :::::: Detector ::::::
-    # ::: Box :::
-    DetX = float(detector_dim_values[0]) / 2
-    DetY = float(detector_dim_values[1]) / 2
-    DetZ = float(detector_dim_values[2]) / 2
-
-    voxX = float(detector_dim_values[0]) / 0.01 
-    voxY = float(detector_dim_values[1]) / 0.01 
-    voxZ = float(detector_dim_values[2]) / 0.01
-
-    # ::: Cylinder :::
-    DetLen = float(detector_dim_values[2]) / 2
-
-    # Voxels
-    iR = float(detector_dim_values[1]) / 0.01
-    iPhi = 360
-    iZ = float(detector_dim_values[2]) / 0.01
-    cylinderVis = iZ - 1
-
-
-# :::::: Define radionuclide properties ::::::
-    radionuclides = {
-        "DaRT":   {"Z": 88, "A": 224},
-        "Am-241": {"Z": 95, "A": 241},
-        }
-
-
-# :::::: Command-based Scoring for Square detector ::::::
-    if detector_choice == "Box":
-        CommandBasedScoring = f"""# ::::::::::::::::::::::::::::::::::::::::::::
-# :::         Command-Based Scoring        :::
-# ::::::::::::::::::::::::::::::::::::::::::::
-
-/score/create/boxMesh             DetScoringVolume
-/score/mesh/boxSize               {DetX:.2f} {DetY:.2f} {DetZ:.2f} mm
-/score/mesh/nBin                  {voxX:.0f} {voxY:.0f} {voxZ:.0f}
-/score/mesh/translate/xyz         {detector_pos_values[0]} {detector_pos_values[1]} {detector_pos_values[2]} mm
-
-/score/quantity/energyDeposit      EnergyDep MeV
-/score/filter/particle gammaFilter gamma
-/score/close """
-
-        CommandBasedScoringVisualization = f"""# ::::::::::::::::::::::::::::::::::::::::::
-# ::: Command-Based Scorer Visualization :::
-# ::::::::::::::::::::::::::::::::::::::::::
-
-# Uncomment the following lines ONLY IF you want to verify the scorer geometry using interactive mode
-# Terminal% ./run.sh --vis
-# Session: /control/execute ADAPT.mac
-
-#/vis/drawVolume worlds
-#/vis/viewer/copyViewFrom viewer-0
-#/score/colorMap/setMinMax ! 0. 800.
-#/control/loop drawSlice.mac iColumn 0 0 1 # Second number is the number of slices depending on the no of bins defined previously
-
-
-# :::::::::::::::::::::::::::::::::::::::::::
-# :::            Scoring Files            :::
-# :::::::::::::::::::::::::::::::::::::::::::
-
-/score/dumpQuantityToFile DetScoringVolume EnergyDep GammaEnergyDep.csv 
-"""
-    elif detector_choice == "Cylinder":
-        CommandBasedScoring = f"""# ::::::::::::::::::::::::::::::::::::::::::::
-# :::         Command-Based Scoring        :::
-# ::::::::::::::::::::::::::::::::::::::::::::
-
-/score/create/cylinderMesh        DetScoringVolume
-/score/mesh/cylinderSize          {detector_dim_values[1]} {DetLen:.2f} mm
-/score/mesh/nBin                  {iR:.0f} {iZ:.0f} {iPhi:.0f}               # R Z Phi
-/score/mesh/translate/xyz         {detector_pos_values[0]} {detector_pos_values[1]} {detector_pos_values[2]} mm
-/score/mesh/rotate/rotateX        90 deg
-
-/score/quantity/energyDeposit      EnergyDep MeV
-/score/filter/particle gammaFilter gamma
-/score/close """
-
-        CommandBasedScoringVisualization =f"""# ::::::::::::::::::::::::::::::::::::::::::
-# ::: Command-Based Scorer Visualization :::
-# ::::::::::::::::::::::::::::::::::::::::::
-
-# Uncomment the following lines ONLY IF you want to verify the scorer geometry using interactive mode
-# Terminal% ./run.sh --vis
-# Session: /control/execute ADAPT.mac
-
-#/score/colorMap/setMinMax ! 0. 200.
-#/control/alias iAxis 1
-#/control/loop drawCylinderSlice.mac iColumn 0 {cylinderVis:.0f} 1
-
-
-# :::::::::::::::::::::::::::::::::::::::::::
-# :::            Scoring Files            :::
-# :::::::::::::::::::::::::::::::::::::::::::
-
-/score/dumpQuantityToFile DetScoringVolume EnergyDep CylinderGammaEnergyDep.csv 
-"""
-    
-
-# :::::: Macro File Template ::::::
-    if Radionuclide in radionuclides:               # Check if radionuclide is supported
-            Z = radionuclides[Radionuclide]["Z"]
-            A = radionuclides[Radionuclide]["A"]
-            
-            if source_choice == "Cylinder": 
-                # ::: Cylindrical source :::
-                MacroFileTemplate = f"""# ::::::::::::::::::::::::::::::::::
-# ::::::::::::::::::::::::::::::::::
-# :::                            :::
-# :::   ADAPTnGUIDE macrofile    :::
-# :::                            :::
-# ::::::::::::::::::::::::::::::::::
-# ::::::::::::::::::::::::::::::::::
-
-#/run/numberOfThreads 16   # If you enabled multithreaded mode
-
-/run/initialize 
-/control/verbose   0
-/run/verbose       0
-/tracking/verbose  0
-
-
-{CommandBasedScoring}
-
-
-# ::::::::::::::::::::::::::::::::::::::::::::
-# :::         Enable Radioactive Decay     :::
-# ::::::::::::::::::::::::::::::::::::::::::::
-
-# This command line is needed so that Geant4 enables the radioactive decay of long-lived ions
-/process/had/rdm/thresholdForVeryLongDecayTime 1.0e+60 y
-
-
-# ::::::::::::::::::::::::::::::::::::::::::::
-# :::         Sources properties           :::
-# :::                 &                    :::
-# :::   Source position and structure      :::
-# ::::::::::::::::::::::::::::::::::::::::::::
-
-# Commands used in this macrofile:
-#/gps/particle       name        || We define the particle type. In this case, it will be gamma
-#/gps/ion            Z A Q E     || We define the gamma based on it Z and A. Q: charge. E: energy
-#/gps/energy         E keV       || We set the particle energy
-#/gps/pos/type       dist        || We set the type of distribution
-#/gps/ang/type       AgDis       || We define the angular distribution. Isotropic emission (iso) is selected by default
-#/gps/pos/shape      Cylinder    || We define the shape of the source
-#/gps/pos/radius     X mm        || We define the radius of the source
-#/gps/pos/halfz      X mm        || We define the half-lenght of the source
-#/gps/pos/centre     X X X mm    || We define the position of the source
-#/gps/pos/confine    source      || We confine the source in the physical volume
-#/gps/pos/rot1                   || We define a rotation. Default [1, 0, 0]
-#/gps/pos/rot2                   || We define a second rotation. Default [0, 1, 0] 
-
-# ::: {Radionuclide} :::
-/gps/particle             ion
-/gps/ion                  {Z} {A} 0 0
-/gps/ang/type             iso
-/gps/pos/type             {Location_source}
-/gps/pos/shape            {source_choice}
-/gps/pos/radius           {source_dim_values[1]} mm
-/gps/pos/halfz            {halfz:.2f} mm
-/gps/pos/rot1             1 0 0
-/gps/pos/rot2             0 0 1 
-/gps/energy               0 keV
-/gps/pos/centre           {source_pos_values[0]} {source_pos_values[1]} {source_pos_values[2]} mm
-
-
-# :::::::::::::::::::::::::::::::::::::::::::
-# :::            Run Beam On              :::
-# :::::::::::::::::::::::::::::::::::::::::::
-
-/run/beamOn               {Runs_input} 
-
-
-{CommandBasedScoringVisualization}
-"""
-
-            elif source_choice == "Box":
-                # ::: Square source :::
-                MacroFileTemplate = f"""# ::::::::::::::::::::::::::::::::::
-# ::::::::::::::::::::::::::::::::::
-# :::                            :::
-# :::   ADAPTnGUIDE macrofile    :::
-# :::                            :::
-# ::::::::::::::::::::::::::::::::::
-# ::::::::::::::::::::::::::::::::::
-
-#/run/numberOfThreads 16   # If you enabled multithreaded mode
-
-/run/initialize 
-/control/verbose   0
-/run/verbose       0
-/tracking/verbose  0
-
-
-{CommandBasedScoring}
-
-
-# ::::::::::::::::::::::::::::::::::::::::::::
-# :::         Enable Radioactive Decay     :::
-# ::::::::::::::::::::::::::::::::::::::::::::
-
-# This command line is needed so that Geant4 enables the radioactive decay of long-lived ions
-/process/had/rdm/thresholdForVeryLongDecayTime 1.0e+60 y
-
-
-# ::::::::::::::::::::::::::::::::::::::::::::
-# :::         Sources properties           :::
-# :::                 &                    :::
-# :::   Source position and structure      :::
-# ::::::::::::::::::::::::::::::::::::::::::::
-
-# Commands used in this macrofile:
-#/gps/particle       name        || We define the particle type. In this case, it will be gamma
-#/gps/ion            Z A Q E     || We define the gamma based on it Z and A. Q: charge. E: energy
-#/gps/energy         E keV       || We set the particle energy
-#/gps/pos/type       dist        || We set the type of distribution
-#/gps/ang/type       AgDis       || We define the angular distribution. Isotropic emission (iso) is selected by default
-#/gps/pos/shape      Cylinder    || We define the shape of the source
-#/gps/pos/radius     X mm        || We define the radius of the source
-#/gps/pos/halfz      X mm        || We define the half-lenght of the source
-#/gps/pos/centre     X X X mm    || We define the position of the source
-#/gps/pos/confine    source      || We confine the source in the physical volume
-#/gps/pos/rot1                   || We define a rotation. Default [1, 0, 0]
-#/gps/pos/rot2                   || We define a second rotation. Default [0, 1, 0] 
-
-# ::: {Radionuclide} :::
-/gps/particle             ion
-/gps/ion                  {Z} {A} 0 0
-/gps/ang/type             iso
-/gps/pos/type             {Location_source}
-/gps/pos/shape            Para
-/gps/pos/halfx            {halfx:.2f} mm
-/gps/pos/halfy            {halfy:.2f} mm
-/gps/pos/halfz            {halfz:.2f} mm
-/gps/pos/rot1             1 0 0
-/gps/pos/rot2             0 0 1 
-/gps/energy               0 keV
-/gps/pos/centre           {source_pos_values[0]} {source_pos_values[1]} {source_pos_values[2]} mm
-
-
-# :::::::::::::::::::::::::::::::::::::::::::
-# :::            Run Beam On              :::
-# :::::::::::::::::::::::::::::::::::::::::::
-
-/run/beamOn               {Runs_input} 
-
-
-{CommandBasedScoringVisualization}
-"""
-            else:
-                print("Error: Unsupported source shape choice.")
-                exit(1)  # Ensure the script stops if an unsupported source is selected
-                
-
-# :::::: Generating the Macro File ::::::
-            with open("ADAPT.mac", "w") as macrofile:
-                macrofile.write(MacroFileTemplate)
-        
-    else:
-        print("Error: Unsupported radionuclide.")
-
-    messagebox.showinfo("Success!", "Your DetectorConstruction.cc and macro file have been generated!")
-
-
-    shutil.copy(SourceCCFile, DestinationCCFile)                                  # Copy the file to the destination 
-    os.replace(SourceCCFile, DestinationCCFile)
-    shutil.move(geometryName +".txt", DestinationTxtFile)                         # Moving DetectorConstruction.txt into DetectorConstructionGeometries folder
-
 
 # Function to close the GUI window
 def close_window():
@@ -1189,6 +604,17 @@ RunsInput.place(x=750, y=450)
 #load_geometry_button = tk.Button(root, text="Load Geometry", command=load_geometry)
 #load_geometry_button.place(x=890, y = 540)
 
+# :::::: ESTIMATE BUTTON ::::::
+estimate_canvas = tk.Canvas(root, width=80, height=30, bg=blue_color, highlightthickness=0)
+estimate_button = estimate_canvas.create_text(40, 15, text="Estimate", fill="white", font=("Times New Roman", 10, "bold"))
+estimate_canvas.place(x=390, y=540, anchor=tk.SE)
+
+def estimate_click(event):
+    estimate_input()      # Shows the expected wall time and output size to the click
+
+estimate_canvas.bind("<Button-1>", estimate_click)
+
+
 # :::::: SAVE BUTTON ::::::
 save_canvas = tk.Canvas(root, width=80, height=30, bg=blue_color, highlightthickness=0)
 save_button = save_canvas.create_text(40, 15, text="Save", fill="white", font=("Times New Roman", 10, "bold"))
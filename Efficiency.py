@@ -0,0 +1,140 @@
+# ::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::
+# :::                                                                                                                          :::
+# :::                                              ADAPTnGUIDE Detector Efficiency                                             :::
+# :::                                                                                                                          :::
+# ::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::
+
+
+# ::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::
+# This Python module is the fast path of the analysis when only the detection efficiency is needed. It does the following:
+#       - Sums the entries column of ADAPT_Results_h1_Energy_Deposit.csv (in-range bins, without the first bin) -> N_detected
+#       - Reads the number of simulated events from the /run/beamOn line of ADAPT.mac -> N_simulated
+#       - Returns N_simulated, N_detected, DetEff and sigma_eff (same values as the analysis script)
+#       - With per-run output files (/adapt/output/perRun true: ADAPT_Results_run<N>_h1_Energy_Deposit.csv), returns the same
+#         values for every run (N_simulated from the /run/beamOn of that run) and for all the runs together
+#
+# It only uses the Python standard library (no numpy, pandas or matplotlib), so it can be called thousands of times from
+# orchestration code, or from the command line:
+#       python Efficiency.py --input-dir run0                            # Prints the results as JSON
+#       python Efficiency.py --input-dir scan0 --runs                    # Every run of a multi-run macro, and their total
+#       python Efficiency.py --input-dir sweep1/runs/00003               # Run folder: inputs/ADAPT.mac and outputs/
+#
+#       from Efficiency import efficiency
+#       efficiency("run0/ADAPT_Results_h1_Energy_Deposit.csv", "run0/ADAPT.mac")["DetEff"]
+# ::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::
+
+
+# :::::: We import the needed libraries ::::::
+import json
+import math
+import os
+import re
+
+from RunFolders import run_paths                                   # Standard library only as well
+
+
+H1_FILE    = "ADAPT_Results_h1_Energy_Deposit.csv"
+MACRO_FILE = "ADAPT.mac"
+RUN_FILE   = re.compile(r"ADAPT_Results_run(\d+)_h1_Energy_Deposit\.csv")   # Per-run h1 files (runID = index of the /run/beamOn)
+
+
+def read_h1_totals(fileName=H1_FILE):
+    """Total entries of the h1 file: {"N_detected": in-range entries without the first bin, "underflow", "overflow", "bins"}."""
+    with open(fileName, "rb") as file:
+        lines = file.read().splitlines()
+
+    start = 0
+    while start < len(lines) and lines[start].startswith(b"#"):    # Metadata lines
+        start += 1
+    rows = [line for line in lines[start + 1:] if line.strip()]     # Skip the column names line (entries,Sw,Sw2,Sxw0,Sx2w0)
+    if len(rows) < 3:
+        raise ValueError(f"{fileName} has no in-range bins.")
+
+    try:
+        entries = [int(line.split(b",", 1)[0]) for line in rows]
+    except ValueError:                                              # Entries written as floating point numbers
+        entries = [int(float(line.split(b",", 1)[0])) for line in rows]
+
+    # The first in-range bin is radiation that did not interact inside the detector (set to 0 by the analysis script)
+    return {"N_detected": sum(entries[2:-1]), "underflow": entries[0], "overflow": entries[-1], "bins": len(entries) - 2}
+
+
+def read_beam_on(macFile=MACRO_FILE):
+    """Number of events of every /run/beamOn command of the macro file (commented lines are ignored)."""
+    counts = []
+    with open(macFile, "r") as f:
+        for line in f:
+            tokens = line.split("#")[0].split()
+            if len(tokens) > 1 and tokens[0] == "/run/beamOn" and re.fullmatch(r"\d+", tokens[1]):
+                counts.append(int(tokens[1]))
+    if not counts:
+        raise ValueError(f"No line was found with /run/beamOn in {macFile}.")
+    return counts
+
+
+def detector_efficiency(N_detected, N_simulated):
+    """Detector efficiency (%) and its uncertainty (%, None without detected events: null in the JSON output)."""
+    Det_e = N_detected / N_simulated
+    DetEff = Det_e * 100
+    sigma_eff = float(math.sqrt((1 / N_detected) + (1 / N_simulated)) * 100 * Det_e) if N_detected > 0 else None
+    return {"N_simulated": int(N_simulated), "N_detected": int(N_detected), "DetEff": float(DetEff), "sigma_eff": sigma_eff}
+
+
+def efficiency(h1File=H1_FILE, macFile=MACRO_FILE, run=None):
+    """N_simulated, N_detected, DetEff and sigma_eff of one run.
+
+    The h1 file of a multi-run macro written without per-run files only holds the last run (every run overwrites it), so
+    N_simulated is the last /run/beamOn unless the run index is given."""
+    counts = read_beam_on(macFile)
+    return detector_efficiency(read_h1_totals(h1File)["N_detected"], counts[-1 if run is None else run])
+
+
+def find_runs(input_dir="."):
+    """{runID: h1 file} of the per-run output files of the folder, sorted by runID."""
+    runs = {}
+    for fileName in os.listdir(input_dir):
+        match = RUN_FILE.fullmatch(fileName)
+        if match:
+            runs[int(match.group(1))] = os.path.join(input_dir, fileName)
+    return dict(sorted(runs.items()))
+
+
+def run_efficiencies(input_dir=".", macFile=None):
+    """Efficiency of every per-run h1 file of the folder (or run folder) and of all of them together: {"runs": [...], "total": {...}}."""
+    paths = run_paths(input_dir)
+    input_dir, macFile = paths["outputs"], macFile or paths["macro"]
+    runs = find_runs(input_dir)
+    if not runs:
+        raise ValueError(f"No ADAPT_Results_run<N>_h1_Energy_Deposit.csv file was found in {input_dir}.")
+    counts = read_beam_on(macFile)
+    if max(runs) >= len(counts):
+        raise ValueError(f"Run {max(runs)} has no /run/beamOn in {macFile} ({len(counts)} found).")
+
+    results = []
+    for runID, h1File in runs.items():
+        result = detector_efficiency(read_h1_totals(h1File)["N_detected"], counts[runID])
+        results.append({"run": runID, **result})
+    total = detector_efficiency(sum(r["N_detected"] for r in results), sum(r["N_simulated"] for r in results))
+    return {"runs": results, "total": total}
+
+
+def main(argv=None):
+    import argparse
+    parser = argparse.ArgumentParser(description="ADAPTnGUIDE detection efficiency (JSON).")
+    parser.add_argument("--input-dir", default=".", help="Run folder, or folder with the output files (default: current folder)")
+    parser.add_argument("--h1", help=f"h1 histogram file (default: {H1_FILE})")
+    parser.add_argument("--macro", help=f"Macro file (default: {MACRO_FILE})")
+    parser.add_argument("--runs", action="store_true", help="Every ADAPT_Results_run<N>_... file of the folder and their total")
+    args = parser.parse_args(argv)
+
+    paths = run_paths(args.input_dir)
+    if args.runs:
+        result = run_efficiencies(args.input_dir, args.macro)
+    else:
+        result = efficiency(args.h1 or os.path.join(paths["outputs"], H1_FILE), args.macro or paths["macro"])
+    print(json.dumps(result))
+    return result
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+# ::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::
+# :::                                                                                                                          :::
+# :::                                             ADAPTnGUIDE Gaussian Broadening                                              :::
+# :::                                                                                                                          :::
+# ::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::
+
+
+# ::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::
+# This Python module is the counterpart of GaussianBroadening.m. It smears the energy spectrum with the same Gaussian
+# summation used in the analysis script:
+#
+#       Broad(Ei) = sum_j counts(Ej) * exp(-((Ej - Ei) / sigma)^2)
+#
+# On a uniform energy grid this sum is a convolution, so it is evaluated with FFTs instead of a double loop. Several sigma
+# values can be broadened at once (one row per sigma), which is what the FWHM calibration scan uses.
+# ::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::
+
+
+# :::::: We import the needed libraries ::::::
+import numpy as np
+
+
+def _is_uniform(x):
+    step = np.diff(x)
+    return x.size > 1 and np.allclose(step, step[0], rtol=1e-9, atol=0)
+
+
+def broaden_grid(E, counts, sigmas, x=None):
+    """Broadened spectra (len(sigmas), len(x)) of counts(E) for every sigma, evaluated at x (defaults to E)."""
+    E = np.asarray(E, dtype=float)
+    counts = np.asarray(counts, dtype=float)
+    sigmas = np.atleast_1d(np.asarray(sigmas, dtype=float))
+    same_grid = x is None or (np.shape(x) == E.shape and np.array_equal(x, E))
+    x = E if x is None else np.asarray(x, dtype=float)
+
+    if same_grid and _is_uniform(E):
+        # ::: Linear convolution through zero-padded FFTs: every sigma in one batched operation :::
+        n = E.size
+        step = E[1] - E[0]
+        lags = np.arange(-(n - 1), n) * step                                  # Every possible Ej - Ei
+        kernels = np.exp(-(lags[None, :] / sigmas[:, None]) ** 2)             # (n_sigma, 2n - 1)
+        size = 1 << int(np.ceil(np.log2(3 * n - 2)))
+        spectrum = np.fft.rfft(counts, size)
+        result = np.fft.irfft(np.fft.rfft(kernels, size, axis=1) * spectrum, size, axis=1)
+        return result[:, n - 1:2 * n - 1]
+
+    # ::: Any other grid: dense kernel, evaluated in chunks of x to bound the memory :::
+    result = np.empty((sigmas.size, x.size))
+    chunk = max(1, 2 ** 22 // max(E.size, 1))
+    for start in range(0, x.size, chunk):
+        d = E[None, :] - x[start:start + chunk, None]
+        for k, sigma in enumerate(sigmas):
+            result[k, start:start + chunk] = np.exp(-(d / sigma) ** 2) @ counts
+    return result
+
+
+def broaden(E, counts, sigma, x=None):
+    """Broadened spectrum of counts(E) evaluated at x, same result as the spectrum() loop of the analysis script."""
+    return broaden_grid(E, counts, [sigma], x)[0]
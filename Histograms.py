@@ -0,0 +1,177 @@
+# ::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::
+# :::                                                                                                                          :::
+# :::                                                ADAPTnGUIDE Histograms                                                    :::
+# :::                                                                                                                          :::
+# ::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::
+
+
+# ::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::
+# This Python module is the counterpart of Histograms.m. It does the following:
+#       - Reads the Geant4-generated histogram file (ADAPT_Results_h1_Energy_Deposit.csv) into a Histogram1D object
+#       - Rebins the histogram into any coarser uniform, variable or logarithmic binning using cumulative sums (np.add.reduceat)
+#         and propagates the uncertainties through the sum of squared weights (Sw2 column)
+#       - Keeps every rebinned view in memory, so re-plotting the same binning does not repeat the work
+#       - Keeps the last parsed files in memory (H1_CACHE_SIZE, least recently used dropped first); their arrays are read-only
+#         because every caller shares them (copy them before changing them)
+#
+# Example:
+#       from Histograms import read_h1, uniform_edges, log_edges
+#       h1   = read_h1("ADAPT_Results_h1_Energy_Deposit.csv")
+#       h10  = h1.rebin(uniform_edges(h1, 0.010))                  # 10 keV bins
+#       hlog = h1.rebin(log_edges(h1, 1e-3, 10, 200))              # 200 logarithmic bins between 1 keV and 10 MeV
+# ::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::
+
+
+# :::::: We import the needed libraries ::::::
+import os
+from collections import OrderedDict
+import numpy as np
+
+
+# ::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::
+# :::                                  HISTOGRAM                                   :::
+# ::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::
+
+class Histogram1D:
+    """In-range bins of a 1D histogram: counts, sum of squared weights and bin edges."""
+
+    def __init__(self, counts, sumw2, edges, underflow=0, overflow=0, title=""):
+        self.counts    = np.asarray(counts, dtype=float)            # Counts per bin (entries)
+        self.sumw2     = np.asarray(sumw2, dtype=float)             # Sum of the squared weights per bin (variance of the counts)
+        self.edges     = np.asarray(edges, dtype=float)             # Bin edges (len(counts) + 1)
+        self.underflow = underflow
+        self.overflow  = overflow
+        self.title     = title
+        self._views    = {}                                         # Memoized rebinned views: {edge indices: Histogram1D}
+
+        if self.edges.size != self.counts.size + 1:
+            raise ValueError("The number of edges must be the number of bins + 1.")
+
+    @property
+    def centers(self):
+        return (self.edges[:-1] + self.edges[1:]) / 2
+
+    @property
+    def widths(self):
+        return np.diff(self.edges)
+
+    @property
+    def errors(self):
+        return np.sqrt(self.sumw2)
+
+    def rebin(self, edges):
+        """Return the histogram rebinned onto `edges` (snapped to the nearest original edges). Views are memoized."""
+        indices = snap_edges(self.edges, edges)
+        key = indices.tobytes()
+
+        if key not in self._views:
+            view = Histogram1D(np.add.reduceat(self.counts[:indices[-1]], indices[:-1]),   # The last bin stops at the last edge
+                               np.add.reduceat(self.sumw2[:indices[-1]], indices[:-1]),
+                               self.edges[indices],
+                               underflow=self.underflow + self.counts[:indices[0]].sum(),
+                               overflow=self.overflow + self.counts[indices[-1]:].sum(),
+                               title=self.title)
+            if not self.counts.flags.writeable:                     # Views of a shared histogram are shared too
+                view.set_read_only()
+            self._views[key] = view
+        return self._views[key]
+
+    def set_read_only(self):
+        for array in (self.counts, self.sumw2, self.edges):
+            array.setflags(write=False)
+
+    def clear_views(self):
+        self._views.clear()
+
+
+# ::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::
+# :::                                   BINNINGS                                   :::
+# ::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::
+
+def snap_edges(original_edges, edges):
+    """Indices of the original edges closest to the requested ones (sorted, without duplicates)."""
+    edges = np.asarray(edges, dtype=float)
+    if edges.ndim != 1 or edges.size < 2:
+        raise ValueError("At least two bin edges are needed to rebin.")
+
+    edges = np.clip(edges, original_edges[0], original_edges[-1])   # Requested edges outside the axis go to under/overflow
+    indices = np.searchsorted(original_edges, edges)                # First original edge >= requested edge
+    indices = np.clip(indices, 1, original_edges.size - 1)
+    left_closer = (edges - original_edges[indices - 1]) < (original_edges[indices] - edges)
+    indices = np.unique(indices - left_closer)                      # Nearest original edge, duplicates merged
+
+    if indices.size < 2:
+        raise ValueError("The requested binning is narrower than one bin of the histogram.")
+    return indices
+
+
+def uniform_edges(histogram, width, x_min=None, x_max=None):
+    """Uniform bin edges of the given width (MeV) inside [x_min, x_max] (defaults to the histogram range)."""
+    x_min = histogram.edges[0] if x_min is None else x_min
+    x_max = histogram.edges[-1] if x_max is None else x_max
+    n_bins = max(int(round((x_max - x_min) / width)), 1)
+    return np.linspace(x_min, x_max, n_bins + 1)
+
+
+def log_edges(histogram, x_min, x_max, n_bins):
+    """Logarithmic bin edges between x_min > 0 and x_max (MeV). Edges narrower than the original bins are merged."""
+    if x_min <= 0:
+        raise ValueError("Logarithmic binning needs x_min > 0.")
+    return np.geomspace(x_min, min(x_max, histogram.edges[-1]), n_bins + 1)
+
+
+# ::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::
+# :::                            READING THE .CSV FILE                             :::
+# ::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::
+
+H1_CACHE_SIZE = 32                                                  # Parsed histograms kept in memory
+_H1_CACHE = OrderedDict()                                           # {(path, mtime, size, zero_first_bin): Histogram1D}, oldest use first
+
+
+def read_h1(fileName="ADAPT_Results_h1_Energy_Deposit.csv", zero_first_bin=True):
+    """Read a Geant4 h1 .csv file. The first in-range bin is set to 0 like in the analysis script (no interaction).
+    The histogram is cached and shared: its arrays are read-only."""
+    stat = os.stat(fileName)
+    key = (os.path.abspath(fileName), stat.st_mtime_ns, stat.st_size, zero_first_bin)
+    if key in _H1_CACHE:
+        _H1_CACHE.move_to_end(key)
+        return _H1_CACHE[key]
+
+    no_bins = None
+    title = ""
+    header_lines = 0
+    with open(fileName, "r") as file:                               # Metadata lines start with '#', followed by the column names line
+        for line in file:
+            header_lines += 1
+            if line.startswith("#axis fixed"):
+                parts   = line.split()
+                no_bins = int(parts[2])                             # Getting the Number of bins
+                x_min   = float(parts[3])                           # Getting the Minimum energy value
+                x_max   = float(parts[4])                           # Getting the Maximum energy value
+            elif line.startswith("#title"):
+                title = line[len("#title"):].strip()
+            elif not line.startswith("#"):
+                break                                               # Column names: entries,Sw,Sw2,Sxw0,Sx2w0
+
+    if no_bins is None:
+        raise ValueError("Could not extract axis information.")
+
+    data = np.loadtxt(fileName, delimiter=",", skiprows=header_lines, ndmin=2)
+    entries = data[:, 0]
+    sumw2 = data[:, 2] if data.shape[1] > 2 else entries            # Sw2 column (equal to the entries for unit weights)
+
+    counts = entries[1:-1].copy()                                   # Remove underflow and overflow bins
+    sumw2  = sumw2[1:-1].copy()
+    if zero_first_bin and counts.size > 0:
+        counts[0] = 0
+        sumw2[0]  = 0
+
+    histogram = Histogram1D(counts, sumw2, np.linspace(x_min, x_max, no_bins + 1),
+                            underflow=entries[0], overflow=entries[-1], title=title)
+    histogram.set_read_only()
+    for old in [old for old in _H1_CACHE if old[0] == key[0] and old[3] == zero_first_bin]:
+        del _H1_CACHE[old]                                          # Older version of the same file
+    _H1_CACHE[key] = histogram
+    while len(_H1_CACHE) > H1_CACHE_SIZE:
+        _H1_CACHE.popitem(last=False)                               # Least recently used
+    return histogram
@@ -0,0 +1,216 @@
+# ::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::
+# :::                                                                                                                          :::
+# :::                                               ADAPTnGUIDE Peak Analysis                                                  :::
+# :::                                                                                                                          :::
+# ::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::
+
+
+# ::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::
+# This Python module tracks the position and width of the alpha lines run by run. It does the following:
+#       - Stacks the energy histograms of many runs (ADAPT_Results_h1_Energy_Deposit.csv files) sharing the same bin grid
+#       - Finds the peaks in the summed spectrum, or takes the nominal alpha lines of the radionuclide (Am-241, Ra-224 chain)
+#       - Fits a Gaussian plus linear background to every peak of every spectrum at once (batched Levenberg-Marquardt)
+#       - Reports centroid, FWHM and net area with their uncertainties as arrays with one value per spectrum (NaN where the fit
+#         failed: no significant peak, centroid outside the window or diverged parameters)
+#
+# Example:
+#       from PeakAnalysis import analyse_runs
+#       results = analyse_runs(["run0/ADAPT_Results_h1_Energy_Deposit.csv", ...], lines="Ra-224")
+#       results["Po-212"]["centroid"]                                  # One centroid per run
+# ::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::
+
+
+# :::::: We import the needed libraries ::::::
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from Histograms import read_h1
+
+
+# :::::: Main alpha lines (MeV) of the sources predefined in the GUI ::::::
+ALPHA_LINES = {
+    "Am-241": {"Am-241": 5.486},
+    "Ra-224": {"Ra-224": 5.685,
+               "Bi-212": 6.051,
+               "Rn-220": 6.288,
+               "Po-216": 6.778,
+               "Po-212": 8.785},
+}
+
+FWHM_FACTOR = 2 * np.sqrt(2 * np.log(2))                            # FWHM = 2.3548 sigma
+MIN_AREA_SIGNIFICANCE = 3.0                                         # A fitted peak needs net area > 3 standard deviations
+
+
+# ::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::
+# :::                                 PEAK FINDING                                 :::
+# ::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::
+
+def find_peaks(counts, half_window=25, min_counts=10, min_significance=5.0):
+    """Boolean mask (same shape as counts) of the local maxima that stand out of the local background.
+
+    counts can be a single spectrum or a stack (n_spectra, n_bins). A bin is a peak if it is the maximum of the
+    +-half_window neighbourhood and exceeds the neighbourhood median by min_significance Poisson standard deviations.
+    """
+    counts = np.atleast_2d(np.asarray(counts, dtype=float))
+    padded = np.pad(counts, ((0, 0), (half_window, half_window)), mode="edge")
+    windows = sliding_window_view(padded, 2 * half_window + 1, axis=1)     # (n_spectra, n_bins, 2 * half_window + 1)
+
+    local_max = windows.max(axis=2)
+    background = np.median(windows, axis=2)
+    significance = (counts - background) / np.sqrt(np.maximum(background, 1))
+
+    mask = (counts == local_max) & (counts >= min_counts) & (significance >= min_significance)
+    mask[:, 1:] &= counts[:, 1:] != counts[:, :-1]                  # Flat tops only count once
+    return mask
+
+
+# ::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::
+# :::                        GAUSSIAN  +  BACKGROUND  FIT                          :::
+# ::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::
+
+def _model(x, p):
+    # p = [amplitude, centroid, sigma, background offset, background slope], x centred on the window
+    gauss = np.exp(-0.5 * ((x - p[:, 1:2]) / p[:, 2:3]) ** 2)
+    return p[:, 0:1] * gauss + p[:, 3:4] + p[:, 4:5] * x, gauss
+
+
+def _jacobian(x, p, gauss):
+    # Rows of the Jacobian (n_spectra, 5, n_bins): one row per parameter keeps the memory access contiguous
+    dx = x - p[:, 1:2]
+    sigma = p[:, 2:3]
+    J = np.empty((gauss.shape[0], 5, gauss.shape[1]))
+    J[:, 0] = gauss
+    J[:, 1] = p[:, 0:1] * gauss * dx / sigma ** 2
+    J[:, 2] = J[:, 1] * dx / sigma
+    J[:, 3] = 1.0
+    J[:, 4] = x
+    return J
+
+
+def fit_gaussian_background(x, y, iterations=50):
+    """Fit y = A exp(-(x - mu)^2 / 2 sigma^2) + b0 + b1 x to every row of y at once (Poisson weights).
+
+    x is the shared bin grid of the window (n_bins,) and y the stacked counts (n_spectra, n_bins).
+    Returns the parameters (n_spectra, 5), their covariance matrices (n_spectra, 5, 5) and the chi2 per row.
+    """
+    y = np.atleast_2d(np.asarray(y, dtype=float))
+    x = np.asarray(x, dtype=float)
+    weights = 1 / np.maximum(y, 1)                                  # Poisson variance, at least 1 count
+
+    # ::: Initial guess from the moments of the background-subtracted window :::
+    b0 = (y[:, :3].mean(axis=1) + y[:, -3:].mean(axis=1)) / 2
+    net = np.clip(y - b0[:, None], 0, None)
+    area = np.maximum(net.sum(axis=1), 1e-12)
+    mu = (net * x).sum(axis=1) / area
+    sigma = np.sqrt(np.maximum((net * (x - mu[:, None]) ** 2).sum(axis=1) / area, (x[1] - x[0]) ** 2))
+    p = np.column_stack([np.maximum(y.max(axis=1) - b0, 1), mu, sigma, b0, np.zeros_like(b0)])
+
+    lam = np.full(len(y), 1e-3)                                     # Levenberg-Marquardt damping per spectrum
+    done = np.zeros(len(y), dtype=bool)
+    model, gauss = _model(x, p)
+    chi2 = (weights * (y - model) ** 2).sum(axis=1)
+
+    for _ in range(iterations):
+        J = _jacobian(x, p, gauss)
+        JW = J * weights[:, None, :]
+        A = JW @ J.transpose(0, 2, 1)
+        g = (JW @ (y - model)[..., None])[..., 0]
+        damped = A + lam[:, None, None] * np.eye(5) * np.diagonal(A, axis1=1, axis2=2)[:, :, None]
+        step = np.linalg.solve(damped + 1e-12 * np.eye(5), g[..., None])[..., 0]
+
+        trial = p + step
+        trial[:, 2] = np.abs(trial[:, 2])
+        trial_model, trial_gauss = _model(x, trial)
+        trial_chi2 = (weights * (y - trial_model) ** 2).sum(axis=1)
+
+        better = np.isfinite(trial_chi2) & (trial_chi2 < chi2)
+        done |= (better & (chi2 - trial_chi2 < 1e-8 * chi2)) | (~better & (lam > 1e8))
+        p[better] = trial[better]
+        model[better], gauss[better], chi2[better] = trial_model[better], trial_gauss[better], trial_chi2[better]
+        lam = np.where(better, lam / 10, lam * 10)
+        if done.all():
+            break
+
+    J = _jacobian(x, p, gauss)
+    covariance = np.linalg.pinv((J * weights[:, None, :]) @ J.transpose(0, 2, 1))
+    return p, covariance, chi2
+
+
+# ::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::
+# :::                                PEAK ANALYSIS                                 :::
+# ::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::
+
+def analyse_peaks(counts, edges, lines=None, window=0.15, **find_options):
+    """Centroid, FWHM and net area (with uncertainties) of every peak of a stack of spectra sharing the same bins.
+
+    lines can be a radionuclide from ALPHA_LINES, a {label: energy (MeV)} dictionary, or None to find the peaks in the
+    summed spectrum. window is the half-width (MeV) of the fit region around each peak.
+    Returns {label: {quantity: array with one value per spectrum}}, NaN where the fit of a spectrum failed ("fit_ok" False).
+    """
+    counts = np.atleast_2d(np.asarray(counts, dtype=float))
+    edges = np.asarray(edges, dtype=float)
+    centers = (edges[:-1] + edges[1:]) / 2
+    bin_width = np.diff(edges).mean()
+    total = counts.sum(axis=0)
+
+    if lines is None:
+        peaks = np.flatnonzero(find_peaks(total, **find_options)[0])
+        lines = {f"{centers[i]:.3f} MeV": centers[i] for i in peaks}
+    elif isinstance(lines, str):
+        lines = ALPHA_LINES[lines]
+
+    half = max(int(round(window / bin_width)), 3)
+    results = {}
+    for label, energy in lines.items():
+        # ::: Window centred on the maximum of the summed spectrum near the nominal energy :::
+        i0 = np.searchsorted(centers, energy)
+        lo, hi = max(i0 - half, 0), min(i0 + half + 1, centers.size)
+        peak = lo + np.argmax(total[lo:hi])
+        lo, hi = max(peak - half, 0), min(peak + half + 1, centers.size)
+        if hi - lo < 6:
+            continue
+
+        x = centers[lo:hi] - centers[peak]                          # Centred grid keeps the fit well conditioned
+        p, cov, chi2 = fit_gaussian_background(x, counts[:, lo:hi])
+        var = np.diagonal(cov, axis1=1, axis2=2)
+
+        amplitude, sigma = p[:, 0], p[:, 2]
+        net_area = amplitude * sigma * np.sqrt(2 * np.pi) / bin_width
+        with np.errstate(divide="ignore", invalid="ignore"):
+            rel_area_var = var[:, 0] / amplitude ** 2 + var[:, 2] / sigma ** 2 + 2 * cov[:, 0, 2] / (amplitude * sigma)
+        net_area_err = np.abs(net_area) * np.sqrt(np.clip(rel_area_var, 0, None))
+        fit_ok = (np.isfinite(p).all(axis=1) & np.isfinite(net_area_err) & (amplitude > 0) & (np.abs(p[:, 1]) <= x[-1])
+                  & (net_area > MIN_AREA_SIGNIFICANCE * net_area_err))
+
+        quantities = {
+            "centroid":     p[:, 1] + centers[peak],
+            "centroid_err": np.sqrt(np.clip(var[:, 1], 0, None)),
+            "fwhm":         FWHM_FACTOR * sigma,
+            "fwhm_err":     FWHM_FACTOR * np.sqrt(np.clip(var[:, 2], 0, None)),
+            "net_area":     net_area,
+            "net_area_err": net_area_err,
+            "chi2_ndf":     chi2 / max(hi - lo - 5, 1),
+        }
+        results[label] = {quantity: np.where(fit_ok, values, np.nan) for quantity, values in quantities.items()}
+        results[label]["fit_ok"] = fit_ok
+    return results
+
+
+def analyse_runs(fileNames, lines=None, window=0.15, **find_options):
+    """Read many h1 .csv files and run analyse_peaks once per shared bin grid. Returns {label: {quantity: array}}
+    ordered like fileNames (NaN where a run's grid has no such peak)."""
+    histograms = [read_h1(fileName) for fileName in fileNames]
+
+    groups = {}                                                     # Runs sharing a bin grid are fitted together
+    for i, histogram in enumerate(histograms):
+        groups.setdefault(histogram.edges.tobytes(), []).append(i)
+
+    results = {}
+    for indices in groups.values():
+        edges = histograms[indices[0]].edges
+        counts = np.stack([histograms[i].counts for i in indices])
+        for label, quantities in analyse_peaks(counts, edges, lines, window, **find_options).items():
+            out = results.setdefault(label, {q: np.full(len(histograms), np.nan) if q != "fit_ok" else np.zeros(len(histograms), bool)
+                                             for q in quantities})
+            for quantity, values in quantities.items():
+                out[quantity][indices] = values
+    return results
@@ -0,0 +1,155 @@
+# ::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::
+# :::                                                                                                                          :::
+# :::                                                ADAPTnGUIDE Profiling                                                     :::
+# :::                                                                                                                          :::
+# ::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::
+
+
+# ::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::
+# This Python module measures every stage of the analysis phase:
+#       - Wall time and CPU time of the stage
+#       - Peak memory of the stage: the resident set (RSS) high-water mark is reset when the stage starts (Linux), so every stage
+#         reports its own peak; elsewhere "-", or with trace_memory the peak of the Python allocations traced by tracemalloc
+#         during the stage (slows the stages down)
+#       - Rows processed per second, when the stage says how many rows it processed
+#
+# The stages are printed as a table next to the RESULTS block and can be written to a JSON report, so the throughput of
+# the analysis can be compared between releases and datasets.
+#
+# Example:
+#       from Profiling import StageProfiler
+#       profiler = StageProfiler()
+#       profiler.start("h1 parse")
+#       ...
+#       profiler.stop(rows=10002)
+#       with profiler.stage("broadening", rows=10000):
+#           ...
+#       profiler.print_stages()
+#       profiler.write_json("profile.json")
+# ::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::
+
+
+# :::::: We import the needed libraries ::::::
+import json
+import os
+import platform
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+STATUS_FILE     = "/proc/self/status"                               # VmHWM: peak resident memory of the process (Linux)
+CLEAR_REFS_FILE = "/proc/self/clear_refs"                           # Writing "5" resets VmHWM to the current RSS (Linux >= 4.0)
+
+
+def reset_peak_rss():
+    """Reset the resident memory high-water mark of the process. False when the platform cannot."""
+    try:
+        with open(CLEAR_REFS_FILE, "w") as f:
+            f.write("5")
+        return peak_rss_mb() is not None
+    except OSError:
+        return False
+
+
+def peak_rss_mb():
+    """Resident memory high-water mark of the process since the last reset_peak_rss (MB), or None when not reported."""
+    try:
+        with open(STATUS_FILE, "r") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 2**10             # kB
+    except OSError:
+        pass
+    return None
+
+
+class StageProfiler:
+    """Wall time, CPU time, peak memory and throughput of named analysis stages."""
+
+    def __init__(self, enabled=True, trace_memory=False):
+        self.enabled = enabled
+        self.trace_memory = trace_memory                            # tracemalloc when the RSS peak cannot be reset
+        self.stages  = []                                           # One dictionary per finished stage
+        self.memory  = None                                         # "rss", "tracemalloc" or "n/a": how the peak of a stage is measured
+        self._open   = None                                         # (name, wall start, CPU start) of the running stage
+        self._start  = time.perf_counter()
+
+    def start(self, name):
+        if not self.enabled:
+            return
+        if self._open is not None:                                  # Starting a stage closes the previous one
+            self.stop()
+        self._reset_peak()
+        self._open = (name, time.perf_counter(), time.process_time())
+
+    def _reset_peak(self):
+        if self.memory in (None, "rss") and reset_peak_rss():
+            self.memory = "rss"
+        elif self.trace_memory:
+            self.memory = "tracemalloc"                             # No resettable RSS peak: trace the Python allocations instead
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+            tracemalloc.reset_peak()
+        else:
+            self.memory = "n/a"                                     # Tracing every allocation would slow the stages down
+
+    def _peak_mb(self):
+        if self.memory == "rss":
+            return peak_rss_mb()
+        if self.memory == "tracemalloc":
+            return tracemalloc.get_traced_memory()[1] / 2**20
+        return None
+
+    def stop(self, rows=None):
+        if not self.enabled or self._open is None:
+            return
+        name, wall_start, cpu_start = self._open
+        wall = time.perf_counter() - wall_start
+        self.stages.append({
+            "stage":        name,
+            "wall_s":       wall,
+            "cpu_s":        time.process_time() - cpu_start,
+            "peak_MB":      self._peak_mb(),
+            "rows":         rows,
+            "rows_per_s":   rows / wall if rows is not None and wall > 0 else None,
+        })
+        self._open = None
+
+    @contextmanager
+    def stage(self, name, rows=None):
+        self.start(name)
+        try:
+            yield self
+        finally:
+            self.stop(rows)
+
+    def print_stages(self):
+        if not self.enabled or not self.stages:
+            return
+        def cell(value, fmt):
+            return "-" if value is None else format(value, fmt)
+
+        peak = {"rss": "Peak RSS (MB)", "tracemalloc": "Peak heap (MB)"}.get(self.memory, "Peak mem (MB)")
+        print(f"  {'Stage':<32}{'Wall (s)':>10}{'CPU (s)':>10}{peak:>15}{'Rows':>12}{'Rows/s':>12}")
+        for s in self.stages:
+            print(f"  {s['stage']:<32}{s['wall_s']:>10.3f}{s['cpu_s']:>10.3f}{cell(s['peak_MB'], '.1f'):>15}"
+                  f"{cell(s['rows'], 'd'):>12}{cell(s['rows_per_s'], '.3g'):>12}")
+        print(f"  {'Total':<32}{time.perf_counter() - self._start:>10.3f}\n")
+
+    def report(self, **extra):
+        """Dictionary with the stages, the platform and any extra values (e.g. the RESULTS numbers)."""
+        return {
+            "stages":   self.stages,
+            "total_s":  time.perf_counter() - self._start,
+            "memory":   self.memory,
+            "python":   platform.python_version(),
+            "platform": platform.platform(),
+            "cwd":      os.getcwd(),
+            **extra,
+        }
+
+    def write_json(self, fileName, **extra):
+        if not self.enabled:
+            return
+        with open(fileName, "w") as file:
+            json.dump(self.report(**extra), file, indent=2)
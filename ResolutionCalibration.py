@@ -0,0 +1,174 @@
+# ::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::
+# :::                                                                                                                          :::
+# :::                                          ADAPTnGUIDE Resolution Calibration                                              :::
+# :::                                                                                                                          :::
+# ::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::
+
+
+# ::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::
+# This Python module calibrates the energy resolution (FWHM) used to broaden the simulated spectrum. It does the following:
+#       - Loads a measured spectrum: a Geant4-like h1 .csv file, or a 2-column text/csv file (energy in MeV, counts)
+#       - Broadens the simulated h1 histogram for a whole grid of FWHM values in one batched operation (GaussianBroadening)
+#       - Scales every broadened spectrum to the measurement and computes chi2 or the Poisson likelihood for each FWHM
+#       - Returns the best-fit FWHM and its confidence interval from the chi2 / likelihood profile, scanned again on finer grids
+#         between the points where the profile rises above min + delta until the interval is resolved
+#
+# The FWHM follows the convention of the analysis script (sigma = FWHM / 2.355 used in exp(-((Ej - Ei) / sigma)^2)), so the
+# best-fit value can be used directly as the FWHM of the energy resolution section.
+#
+# Example:
+#       from ResolutionCalibration import calibrate_fwhm
+#       result = calibrate_fwhm("ADAPT_Results_h1_Energy_Deposit.csv", "MeasuredSpectrum.csv", energy_range=(4, 9))
+#       result["fwhm"], result["fwhm_interval"]
+# ::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::
+
+
+# :::::: We import the needed libraries ::::::
+import numpy as np
+from Histograms import read_h1
+from GaussianBroadening import broaden_grid
+
+
+FINE_POINTS = 101                                                   # FWHM values of every fine scan around the minimum
+FINE_PASSES = 4                                                     # Fine scans at most, until the interval spans MIN_POINTS
+MIN_POINTS  = 20
+
+# ::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::
+# :::                              MEASURED SPECTRUM                               :::
+# ::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::
+
+def read_measured_spectrum(fileName):
+    """Energies (MeV) and counts of a measured spectrum (h1 .csv file or 2-column energy/counts file)."""
+    with open(fileName, "r") as file:
+        first_line = file.readline()
+
+    if first_line.startswith("#class"):                             # Same format as the Geant4 output
+        histogram = read_h1(fileName, zero_first_bin=False)
+        return histogram.centers, histogram.counts
+
+    delimiter = "," if "," in first_line else None
+    try:
+        data = np.loadtxt(fileName, delimiter=delimiter, ndmin=2)
+    except ValueError:                                              # A column names line
+        data = np.loadtxt(fileName, delimiter=delimiter, ndmin=2, skiprows=1)
+    return data[:, 0], data[:, 1]
+
+
+# ::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::
+# :::                                 FWHM  SCAN                                   :::
+# ::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::
+
+def _interpolation_matrix(x, xp):
+    # Sparse-free linear interpolation from the grid x onto the points xp: returns indices and weights
+    i = np.clip(np.searchsorted(x, xp) - 1, 0, x.size - 2)
+    t = np.clip((xp - x[i]) / (x[i + 1] - x[i]), 0, 1)
+    return i, t
+
+
+def _bracket(profile, best, delta):
+    # Grid points on each side of the best one where the profile rises above min + delta (the ends of the grid otherwise)
+    level = profile[best] + delta
+    left = np.flatnonzero(profile[:best] > level)
+    right = np.flatnonzero(profile[best + 1:] > level)
+    return (left[-1] if left.size else 0), (best + 1 + right[0] if right.size else profile.size - 1)
+
+
+def _interval(fwhms, profile, best, delta):
+    # FWHM values where the profile crosses min + delta on each side of the best grid point (linear interpolation)
+    level = profile[best] + delta
+    bounds = []
+    for side in (np.arange(best, -1, -1), np.arange(best, fwhms.size)):
+        above = np.flatnonzero(profile[side] > level)
+        if above.size == 0:
+            bounds.append(np.nan)                                   # The interval is not closed inside the grid
+            continue
+        k1, k0 = side[above[0]], side[above[0] - 1]
+        bounds.append(np.interp(level, [profile[k0], profile[k1]], [fwhms[k0], fwhms[k1]]))
+    return tuple(bounds)
+
+
+def scan_fwhm(sim_energies, sim_counts, meas_energies, meas_counts, fwhms, statistic="chi2", energy_range=None):
+    """chi2 (or -2 ln L Poisson deviance) of the measurement against the broadened simulation for every FWHM.
+
+    The simulated spectrum is broadened for all FWHM values at once, interpolated onto the measured energies and scaled
+    to the measurement with the best (analytic) normalisation. Returns (profile, scale factors).
+    """
+    fwhms = np.asarray(fwhms, dtype=float)
+    meas_energies = np.asarray(meas_energies, dtype=float)
+    meas_counts = np.asarray(meas_counts, dtype=float)
+    sim_energies = np.asarray(sim_energies, dtype=float)
+    sim_counts = np.asarray(sim_counts, dtype=float)
+
+    if energy_range is not None:
+        keep = (meas_energies >= energy_range[0]) & (meas_energies <= energy_range[1])
+        meas_energies, meas_counts = meas_energies[keep], meas_counts[keep]
+
+        margin = 3 * fwhms.max()                                                    # Kernel tails reaching the fit range
+        keep = (sim_energies >= energy_range[0] - margin) & (sim_energies <= energy_range[1] + margin)
+        sim_energies, sim_counts = sim_energies[keep], sim_counts[keep]
+
+    broad = broaden_grid(sim_energies, sim_counts, fwhms / 2.355)                  # (n_fwhm, n_sim): one batched operation
+    i, t = _interpolation_matrix(sim_energies, meas_energies)
+    model = broad[:, i] * (1 - t) + broad[:, i + 1] * t                             # (n_fwhm, n_meas)
+
+    if statistic == "chi2":
+        weights = 1 / np.maximum(meas_counts, 1)                                    # Neyman chi2 (measured variance)
+        scale = (weights * meas_counts * model).sum(axis=1) / np.maximum((weights * model ** 2).sum(axis=1), 1e-300)
+        profile = (weights * (meas_counts - scale[:, None] * model) ** 2).sum(axis=1)
+    elif statistic == "poisson":
+        scale = meas_counts.sum() / np.maximum(model.sum(axis=1), 1e-300)           # Maximum likelihood normalisation
+        mu = np.maximum(scale[:, None] * model, 1e-300)
+        log_term = np.where(meas_counts > 0, meas_counts * np.log(np.maximum(meas_counts, 1e-300) / mu), 0)
+        profile = 2 * (mu - meas_counts + log_term).sum(axis=1)                     # Poisson deviance (-2 ln L ratio)
+    else:
+        raise ValueError("statistic must be 'chi2' or 'poisson'.")
+    return profile, scale
+
+
+def calibrate_fwhm(simulated, measured, fwhms=None, statistic="chi2", energy_range=None, delta=1.0):
+    """Best-fit FWHM (MeV) of the simulated h1 histogram against a measured spectrum.
+
+    simulated and measured are file names (or (energies, counts) tuples). fwhms is the scanned grid (default 2 keV to
+    500 keV, 250 points). delta is the profile increase defining the interval (1.0 -> 68.3 %, 3.84 -> 95 %).
+    Returns a dictionary with fwhm, fwhm_interval, scale, minimum, ndf and the full profile.
+    """
+    if isinstance(simulated, str):
+        histogram = read_h1(simulated)
+        simulated = (np.linspace(histogram.edges[0], histogram.edges[-1], histogram.counts.size), histogram.counts)  # Same X as the script
+    if isinstance(measured, str):
+        measured = read_measured_spectrum(measured)
+    fwhms = np.linspace(0.002, 0.5, 250) if fwhms is None else np.asarray(fwhms, dtype=float)
+
+    profile, _ = scan_fwhm(simulated[0], simulated[1], measured[0], measured[1], fwhms, statistic, energy_range)
+
+    # ::: Fine scans over the interval until enough points resolve it: the best value and the interval come from one profile :::
+    fine, fine_profile = fwhms, profile
+    for _ in range(FINE_PASSES):
+        low, high = _bracket(fine_profile, int(np.argmin(fine_profile)), delta)
+        if high - low >= MIN_POINTS:
+            break
+        fine = np.linspace(fine[low], fine[high], FINE_POINTS)
+        fine_profile, _ = scan_fwhm(simulated[0], simulated[1], measured[0], measured[1], fine, statistic, energy_range)
+    best = int(np.argmin(fine_profile))
+
+    # ::: Parabola through the minimum and its neighbours refines the best value between fine grid points :::
+    fwhm = float(fine[best])
+    if 0 < best < fine.size - 1:
+        a, b, _ = np.polyfit(fine[best - 1:best + 2], fine_profile[best - 1:best + 2], 2)
+        if a > 0:
+            fwhm = float(np.clip(-b / (2 * a), fine[best - 1], fine[best + 1]))
+    minimum, scale = scan_fwhm(simulated[0], simulated[1], measured[0], measured[1], [fwhm], statistic, energy_range)
+
+    n_points = measured[0].size if energy_range is None else int(np.count_nonzero(
+        (np.asarray(measured[0]) >= energy_range[0]) & (np.asarray(measured[0]) <= energy_range[1])))
+
+    return {
+        "fwhm":          fwhm,
+        "fwhm_interval": _interval(fine, fine_profile, best, delta),
+        "scale":         float(scale[0]),
+        "minimum":       float(minimum[0]),
+        "ndf":           n_points - 2,                              # FWHM and normalisation are fitted
+        "statistic":     statistic,
+        "fwhms":         fwhms,
+        "profile":       profile,
+    }
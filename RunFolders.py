@@ -0,0 +1,45 @@
+# ::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::
+# :::                                                                                                                          :::
+# :::                                               ADAPTnGUIDE Run Folders                                                    :::
+# :::                                                                                                                          :::
+# ::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::
+
+
+# ::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::
+# This Python module holds the layout of a run folder (standard library only, so the fast paths such as Efficiency.py and the
+# job scheduler do not import the generator):
+#       <run_dir>/manifest.json      configuration, seeds and hashes of the run
+#       <run_dir>/inputs/            ADAPT.mac, DetectorConstruction.cc, <geometryName>.txt, ADAPT_Geometry.txt
+#       <run_dir>/outputs/           working directory of ADAPT: every output file lands here
+#
+# Example:
+#       from RunFolders import run_paths
+#       paths = run_paths("sweep1/runs/00003")                      # {"macro", "inputs", "outputs", "manifest"}
+# ::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::
+
+
+# :::::: We import the needed libraries ::::::
+import os
+
+
+MACRO_FILE    = "ADAPT.mac"
+INPUTS_DIR    = "inputs"                                            # ADAPT.mac, DetectorConstruction.cc, <geometryName>.txt, ADAPT_Geometry.txt
+OUTPUTS_DIR   = "outputs"                                           # Working directory of ADAPT: every output file lands here
+MANIFEST_FILE = "manifest.json"
+
+
+def run_paths(run_dir):
+    """Macro, inputs, outputs and manifest of a run folder. A folder without the layout (e.g. the repository) holds everything."""
+    if os.path.exists(os.path.join(run_dir, MANIFEST_FILE)) and os.path.isdir(os.path.join(run_dir, INPUTS_DIR)):
+        inputs, outputs = os.path.join(run_dir, INPUTS_DIR), os.path.join(run_dir, OUTPUTS_DIR)
+        return {"macro": os.path.join(inputs, MACRO_FILE), "inputs": inputs, "outputs": outputs,
+                "manifest": os.path.join(run_dir, MANIFEST_FILE)}
+    return {"macro": os.path.join(run_dir, MACRO_FILE), "inputs": run_dir, "outputs": run_dir, "manifest": None}
+
+
+def available_cores():
+    """Cores this process may run on (CPU affinity of batch systems on Linux, every core otherwise)."""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
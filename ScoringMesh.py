@@ -0,0 +1,190 @@
+# ::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::
+# :::                                                                                                                          :::
+# :::                                               ADAPTnGUIDE Scoring Mesh                                                   :::
+# :::                                                                                                                          :::
+# ::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::
+
+
+# ::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::
+# This Python module reads the /score/dumpQuantityToFile files of one scoring mesh into a ScoringMesh object:
+#       - One channel per dump (primitive scorer): e.g. AlphaEnergyDep, BetaEnergyDep, GammaEnergyDep and TotalDose written by a
+#         macro with "mesh_quantities" (ADAPTnGUIDEGenerator.py), so one simulation gives every component
+#       - Every channel keeps the three value columns of the dump: total(value), total(val^2) and entry, per voxel
+#       - The dumps are read together, chunk by chunk, in a single pass: the voxel indices are converted once per chunk and only
+#         the (channels, i, j, k) arrays stay in memory
+#       - Relative statistical uncertainty of every voxel from the value and value^2 columns (Geant4 fills them once per event,
+#         so this is the history-by-history estimate R = sqrt(sum(x^2) / sum(x)^2 - 1/N)) and the fraction of voxels below a
+#         threshold, for the whole mesh or a region of interest
+#
+# Example:
+#       from ScoringMesh import read_scoring_mesh, macro_dumps
+#       mesh = read_scoring_mesh([fileName for _, fileName in macro_dumps("ADAPT.mac")])
+#       alpha = mesh["AlphaEnergyDep"]                              # (iX, iY, iZ) array of the box mesh
+#       R = mesh.relative_error(n_events=10**6)                     # (channels, iX, iY, iZ), inf where nothing was scored
+#       mesh.converged(0.05, n_events=10**6, roi=parse_roi("0:10,0:10,20:30"))
+# ::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::
+
+
+# :::::: We import the needed libraries ::::::
+import os
+import re
+import numpy as np
+
+
+CHUNK_ROWS = 10**6                                                  # Voxels parsed at once from every dump
+
+
+# ::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::
+# :::                                 SCORING MESH                                 :::
+# ::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::
+
+class ScoringMesh:
+    """Channels of one scoring mesh: value, sum of squares and entries of every voxel, indexed as in the dump."""
+
+    def __init__(self, names, values, sumw2, entries, units=None, axes=("iX", "iY", "iZ")):
+        self.names   = list(names)                                  # Primitive scorer of every channel
+        self.values  = np.asarray(values, dtype=float)              # (channels, n1, n2, n3): total(value)
+        self.sumw2   = np.asarray(sumw2, dtype=float)               # total(val^2)
+        self.entries = np.asarray(entries, dtype=np.int64)          # Events that scored in the voxel (filled once per event)
+        self.units   = list(units) if units else [""] * len(self.names)
+        self.axes    = tuple(axes)                                  # Index columns: iX, iY, iZ (box) or iZ, iPHI, iR (cylinder)
+
+        if self.values.shape[0] != len(self.names) or self.values.shape != self.sumw2.shape or self.values.shape != self.entries.shape:
+            raise ValueError("Every channel needs its values, sums of squares and entries on the same voxels.")
+
+    @property
+    def shape(self):
+        return self.values.shape[1:]
+
+    def __getitem__(self, name):
+        return self.values[self.index(name)]
+
+    def __contains__(self, name):
+        return name in self.names
+
+    def index(self, name):
+        if name not in self.names:
+            raise ValueError(f"The scoring mesh has no channel {name!r} (channels: {', '.join(self.names)}).")
+        return self.names.index(name)
+
+    def totals(self):
+        """Sum of every channel over the whole mesh: {name: total}."""
+        return dict(zip(self.names, self.values.reshape(len(self.names), -1).sum(axis=1).tolist()))
+
+    def relative_error(self, n_events=None):
+        """Relative uncertainty of every voxel, (channels, n1, n2, n3): sqrt(sum(x^2) / sum(x)^2 - 1/N), inf without a score.
+        N is the number of simulated events; without it, the entries of every voxel (uncertainty of the events that scored)."""
+        N = np.maximum(self.entries, 1) if n_events is None else n_events
+        with np.errstate(divide="ignore", invalid="ignore"):
+            R2 = self.sumw2 / self.values ** 2 - 1.0 / N
+        return np.where(self.values != 0, np.sqrt(np.clip(R2, 0, None)), np.inf)
+
+    def converged(self, threshold, n_events=None, roi=None):
+        """Voxels with a relative uncertainty below threshold, per channel: counts and fractions of the scored and of all voxels
+        (inside roi, a tuple of slices of the index columns, if given)."""
+        R = self.relative_error(n_events)
+        if roi is not None:
+            R = R[(slice(None),) + tuple(roi)]
+        R = R.reshape(len(self.names), -1)
+        scored = np.isfinite(R).sum(axis=1)
+        below = (R < threshold).sum(axis=1)
+        finite = np.where(np.isfinite(R), R, np.nan)
+        out = {}
+        for channel, name in enumerate(self.names):
+            out[name] = {"voxels": int(R.shape[1]), "scored": int(scored[channel]), "converged": int(below[channel]),
+                         "fraction": float(below[channel] / R.shape[1]) if R.shape[1] else 0.0,
+                         "fraction_scored": float(below[channel] / scored[channel]) if scored[channel] else 0.0,
+                         "R_median": float(np.nanmedian(finite[channel])) if scored[channel] else None}
+        return out
+
+
+# ::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::
+# :::                            READING THE DUMP FILES                            :::
+# ::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::
+
+def macro_dumps(macFile, mesh="DetScoringVolume"):
+    """(scorer, file) of every /score/dumpQuantityToFile of the mesh in a macro file, in order."""
+    dumps = []
+    with open(macFile, "r") as f:
+        for line in f:
+            tokens = line.split("#")[0].split()                     # Commented commands are ignored
+            if len(tokens) > 3 and tokens[0] == "/score/dumpQuantityToFile" and tokens[1] == mesh:
+                dumps.append((tokens[2], tokens[3]))
+    return dumps
+
+
+def parse_roi(text):
+    """Region of interest "i0:i1,j0:j1,k0:k1" (index columns of the dump, end excluded, empty bounds allowed) as slices."""
+    parts = text.split(",")
+    if len(parts) != 3:
+        raise ValueError(f"A region of interest needs three index ranges i0:i1,j0:j1,k0:k1 (got {text!r}).")
+    try:
+        return tuple(slice(*(int(v) if v.strip() else None for v in part.split(":", 1))) if ":" in part else
+                     slice(int(part), int(part) + 1) for part in parts)
+    except ValueError:
+        raise ValueError(f"The index ranges of the region of interest must be integers (got {text!r}).") from None
+
+
+def read_dump_header(fileName):
+    """Scorer name, unit, index column names and number of header lines of a dump file."""
+    name, unit, axes, lines = os.path.splitext(os.path.basename(fileName))[0], "", ("iX", "iY", "iZ"), 0
+    with open(fileName, "r") as f:
+        for line in f:
+            if not line.startswith("#"):
+                break
+            lines += 1
+            if line.startswith("# primitive scorer name:"):
+                name = line.split(":", 1)[1].strip()
+            elif "total(value)" in line:                            # "# iX, iY, iZ, total(value) [MeV], total(val^2), entry"
+                columns = [c.strip() for c in line[1:].split(",")]
+                axes = tuple(columns[:3])
+                match = re.search(r"\[(.*?)\]", line)
+                unit = match.group(1) if match else ""
+    return name, unit, axes, lines
+
+
+def dump_shape(fileName):
+    """Voxels per index column of a dump, from its last row (every voxel is listed, the last index running fastest)."""
+    with open(fileName, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        f.seek(max(f.tell() - 4096, 0))
+        rows = [line for line in f.read().splitlines() if line.strip() and not line.startswith(b"#")]
+    if not rows:
+        return (0, 0, 0)                                            # Header only
+    return tuple(int(float(v)) + 1 for v in rows[-1].split(b",")[:3])
+
+
+def read_scoring_mesh(fileNames, shape=None, chunk_rows=CHUNK_ROWS):
+    """ScoringMesh with one channel per dump file, read in a single pass. shape: voxels per index column (default: from the dumps)."""
+    import pandas as pd
+    if not fileNames:
+        raise ValueError("No scoring mesh dump to read.")
+    headers = [read_dump_header(fileName) for fileName in fileNames]
+    shape = tuple(int(n) for n in (dump_shape(fileNames[0]) if shape is None else shape))
+
+    n_channels = len(fileNames)
+    values  = np.zeros((n_channels,) + shape)
+    sumw2   = np.zeros((n_channels,) + shape)
+    entries = np.zeros((n_channels,) + shape, dtype=np.int64)
+    names, units, axes = [h[0] for h in headers], [h[1] for h in headers], headers[0][2]
+    if values.size == 0:                                            # Dumps without voxel rows
+        return ScoringMesh(names, values, sumw2, entries, units=units, axes=axes)
+
+    readers = [pd.read_csv(fileName, header=None, sep=',', skiprows=lines, chunksize=chunk_rows)
+               for fileName, (_, _, _, lines) in zip(fileNames, headers)]
+    try:
+        for chunks in zip(*readers):                                # The dumps of one mesh list the voxels in the same order
+            index = None
+            for channel, chunk in enumerate(chunks):
+                data = chunk.to_numpy()
+                if index is None or len(data) != index.size or not np.array_equal(data[:, :3], first):
+                    first = data[:, :3]
+                    index = np.ravel_multi_index(tuple(first.astype(np.int64).T), shape)
+                values[channel].flat[index]  = data[:, 3]
+                sumw2[channel].flat[index]   = data[:, 4]
+                entries[channel].flat[index] = data[:, 5]
+    finally:
+        for reader in readers:
+            reader.close()
+
+    return ScoringMesh(names, values, sumw2, entries, units=units, axes=axes)
@@ -0,0 +1,353 @@
+# ::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::
+# :::                                                                                                                          :::
+# :::                                           ADAPTnGUIDE Synthetic Output Files                                             :::
+# :::                                                                                                                          :::
+# ::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::
+
+
+# ::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::
+# This Python module writes fake Geant4 output files with exactly the same format as the simulation phase, so the analysis
+# can be benchmarked and checked without running Geant4:
+#       - ADAPT_Results_h1_Energy_Deposit.csv     (h1 histogram: entries,Sw,Sw2,Sxw0,Sx2w0)
+#       - ADAPT_Results_nt_Photons.csv            (ntuple: iEvent, PosX, PosY, PosZ, fEnergyDeposited)
+#       - ADAPT_Results_nt_Events.csv             (event summary, /adapt/output/hits events: iEvent, Edep, nHits, centroid, first hit)
+#       - GammaEnergyDep.csv                      (box scoring mesh dump: iX, iY, iZ, value, value^2, entries)
+#       - CylinderGammaEnergyDep.csv              (cylinder scoring mesh dump: iZ, iPhi, iR, value, value^2, entries)
+#       - ADAPT.mac                               (macro file with the scoring mesh lines where the analysis expects them)
+#
+# It can also stand in for the ADAPT executable (same arguments: macro file and seed). It follows /control/execute, writes the
+# h1 histogram and the ntuple of every /run/beamOn (per-run names with /adapt/output/perRun true), the mesh dumps of
+# /score/dumpQuantityToFile and prints the progress lines of Geant4 (/run/printProgress), so the job scheduler can be tried
+# without Geant4. With /run/numberOfThreads N, the ntuples are split into one file per worker thread (<name>_t<N>.csv):
+#       python SyntheticOutputs.py ADAPT.mac 123456
+#       python SyntheticOutputs.py --events-per-second 5e4 --fail 0.2 ADAPT.mac 123456
+#
+# Example:
+#       from SyntheticOutputs import generate_dataset
+#       files = generate_dataset("bench", rows=10**5, shape="Box")
+# ::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::
+
+
+# :::::: We import the needed libraries ::::::
+import os
+import sys
+import time
+import numpy as np
+
+
+CHUNK_ROWS = 10**6                                                  # Rows formatted at once when writing the large files
+PDG_CODES   = [11, 22, 1000020040, 1000822120, -11]                 # PDG column (/adapt/output/columns pdg): e-, gamma, alpha,
+PDG_WEIGHTS = [0.7, 0.15, 0.08, 0.05, 0.02]                         # Pb-212 recoil, e+
+
+
+# ::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::
+# :::                                 H1 HISTOGRAM                                 :::
+# ::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::
+
+def sample_energies(events, rng, efficiency=0.3):
+    """Deposited energy per event (MeV): 0 for the events that miss the detector, Am-241-like alpha lines plus a tail otherwise."""
+    energies = np.zeros(events)
+    hit = rng.random(events) < efficiency
+    n_hit = int(hit.sum())
+    line = rng.choice([5.486, 5.443, 0.0595], size=n_hit, p=[0.75, 0.15, 0.10])     # Main alpha lines and the 59.5 keV gamma
+    full = rng.random(n_hit) < 0.7                                                   # Full deposition or partial escape
+    energies[hit] = np.where(full, line + rng.normal(0, 0.005, n_hit), line * rng.random(n_hit))
+    return np.clip(energies, 0, None)
+
+
+def write_h1(fileName, events=10**5, bins=10000, x_min=0.0, x_max=10.0, seed=0):
+    """Write an h1 .csv file filled with `events` entries (one per simulated event). Returns the counts per bin with under/overflow."""
+    rng = np.random.default_rng(seed)
+    edges = np.linspace(x_min, x_max, bins + 1)
+    counts = np.zeros(bins + 2)
+    sum_x = np.zeros(bins + 2)
+    sum_x2 = np.zeros(bins + 2)
+
+    for start in range(0, events, CHUNK_ROWS):
+        energies = sample_energies(min(CHUNK_ROWS, events - start), rng)
+        index = np.searchsorted(edges, energies, side="right")              # 0 = underflow, bins + 1 = overflow
+        counts += np.bincount(index, minlength=bins + 2)
+        sum_x  += np.bincount(index, weights=energies, minlength=bins + 2)
+        sum_x2 += np.bincount(index, weights=energies ** 2, minlength=bins + 2)
+
+    with open(fileName, "w") as file:
+        file.write("#class tools::histo::h1d\n")
+        file.write("#title Energy Deposit\n")
+        file.write("#dimension 1\n")
+        file.write(f"#axis fixed {bins} {x_min:g} {x_max:g}\n")
+        file.write("#annotation axis_x.title \n")
+        file.write(f"#bin_number {bins + 2}\n")
+        file.write("entries,Sw,Sw2,Sxw0,Sx2w0\n")
+        np.savetxt(file, np.column_stack([counts, counts, counts, sum_x, sum_x2]), fmt="%d,%d,%d,%.10g,%.10g")
+    return counts
+
+
+# ::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::
+# :::                                    NTUPLE                                    :::
+# ::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::
+
+def write_ntuple(fileName, rows=10**5, steps_per_event=5, half_size=(2.5, 2.5, 12.5), seed=0, pdg=False):
+    """Write an ntuple .csv file with `rows` steps grouped in events (increasing iEvent) inside a box detector (+ PDG column)."""
+    rng = np.random.default_rng(seed)
+
+    with open(fileName, "w") as file:
+        file.write("#class tools::wcsv::ntuple\n")
+        file.write("#title Photons\n")
+        file.write("#separator 44\n")
+        file.write("#vector_separator 59\n")
+        file.write("#column int iEvent\n")
+        file.write("#column double PosX\n")
+        file.write("#column double PosY\n")
+        file.write("#column double PosZ\n")
+        file.write("#column double fEnergyDeposited\n")
+        if pdg:
+            file.write("#column int PDG\n")
+
+        first_event = 0
+        for start in range(0, rows, CHUNK_ROWS):
+            n = min(CHUNK_ROWS, rows - start)
+            new_event = rng.random(n) < 1.0 / steps_per_event                 # A new event starts with this probability
+            new_event[0] = start == 0 or new_event[0]
+            event = first_event + np.cumsum(new_event) - 1
+            first_event = event[-1] + 1
+            position = rng.uniform(-1, 1, (n, 3)) * np.asarray(half_size)
+            energy = rng.exponential(0.5, n)
+            columns, fmt = [event, position, energy], "%d,%.6g,%.6g,%.6g,%.6g"
+            if pdg:                                                       # Mostly electrons, some gammas, alphas and recoils
+                codes = rng.choice(PDG_CODES, n, p=PDG_WEIGHTS)
+                columns, fmt = columns + [codes], fmt + ",%d"
+                energy[codes == 1000020040] *= 10
+            np.savetxt(file, np.column_stack(columns), fmt=fmt)
+
+
+def write_events(fileName, rows=10**4, steps_per_event=5, half_size=(2.5, 2.5, 12.5), seed=0):
+    """Write an event summary .csv file (/adapt/output/hits events) with `rows` events that deposited energy."""
+    rng = np.random.default_rng(seed)
+
+    with open(fileName, "w") as file:
+        file.write("#class tools::wcsv::ntuple\n")
+        file.write("#title Events\n")
+        file.write("#separator 44\n")
+        file.write("#vector_separator 59\n")
+        file.write("#column int iEvent\n")
+        file.write("#column double Edep\n")
+        file.write("#column int nHits\n")
+        for name in ("CentroidX", "CentroidY", "CentroidZ", "FirstX", "FirstY", "FirstZ"):
+            file.write(f"#column double {name}\n")
+
+        first_event = 0
+        for start in range(0, rows, CHUNK_ROWS):
+            n = min(CHUNK_ROWS, rows - start)
+            event = first_event + np.cumsum(rng.geometric(0.5, n)) - 1      # Events without a deposit have no row
+            first_event = event[-1] + 1
+            hits = rng.geometric(1.0 / steps_per_event, n)
+            energy = rng.gamma(hits, 0.5)
+            first = rng.uniform(-1, 1, (n, 3)) * np.asarray(half_size)
+            centroid = np.clip(first + rng.normal(0, 0.2, (n, 3)), -np.asarray(half_size), np.asarray(half_size))
+            np.savetxt(file, np.column_stack([event, energy, hits, centroid, first]), fmt="%d,%.6g,%d" + ",%.6g" * 6)
+    return first_event
+
+
+# ::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::
+# :::                                SCORING MESHES                                :::
+# ::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::
+
+def _write_mesh(fileName, indices, quantity, seed):
+    # Columns: 3 indices, total(value), total(val^2), entry. The last index runs fastest, as in /score/dumpQuantityToFile
+    rng = np.random.default_rng(seed)
+    shape = tuple(indices.values())
+    n_voxels = int(np.prod(shape))
+
+    with open(fileName, "w") as file:
+        file.write("# mesh name: DetScoringVolume\n")
+        file.write(f"# primitive scorer name: {quantity}\n")
+        unit = "Gy" if "Dose" in quantity else "MeV"                 # doseDeposit scorers are dumped in Gy
+        file.write(f"# {', '.join(indices)}, total(value) [{unit}], total(val^2), entry\n")
+        for start in range(0, n_voxels, CHUNK_ROWS):
+            flat = np.arange(start, min(start + CHUNK_ROWS, n_voxels))
+            idx = np.unravel_index(flat, shape)
+            entries = rng.poisson(20, flat.size)
+            value = rng.gamma(np.maximum(entries, 1), 0.05) * (entries > 0)
+            value2 = value ** 2 / np.maximum(entries, 1) * (1 + rng.random(flat.size))
+            np.savetxt(file, np.column_stack(idx + (value, value2, entries)), fmt="%d,%d,%d,%.8g,%.8g,%d")
+
+
+def mesh_bins_for_rows(rows, shape="Box"):
+    """Number of voxels per axis giving about `rows` voxels: (nX, nY, nZ) for a box or (nR, nZ, nPhi) for a cylinder."""
+    if shape == "Box":
+        n = max(int(round(rows ** (1 / 3))), 1)
+        return (n, n, n)
+    n = max(int(round((rows / 360) ** 0.5)), 1)                     # 360 phi bins, like the GUI
+    return (n, n, 360)
+
+
+def write_box_mesh(fileName, n_bin=(10, 10, 10), quantity="EnergyDep", seed=0):
+    _write_mesh(fileName, {"iX": n_bin[0], "iY": n_bin[1], "iZ": n_bin[2]}, quantity, seed)
+
+
+def write_cylinder_mesh(fileName, n_bin=(10, 10, 360), quantity="EnergyDep", seed=0):
+    # n_bin follows /score/mesh/nBin for cylinders (R Z Phi); the dump is ordered iZ, iPhi, iR
+    _write_mesh(fileName, {"iZ": n_bin[1], "iPHI": n_bin[2], "iR": n_bin[0]}, quantity, seed)
+
+
+# ::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::
+# :::                                  MACRO FILE                                  :::
+# ::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::
+
+def write_macro(fileName, shape="Box", size=(2.5, 2.5, 12.5), n_bin=(10, 10, 10), beam_on=10**5):
+    """Write a macro file laid out like the GUI-generated one (mesh size on line 22, nBin on line 23)."""
+    if shape == "Box":
+        mesh = (f"/score/create/boxMesh             DetScoringVolume\n"
+                f"/score/mesh/boxSize               {size[0]:.2f} {size[1]:.2f} {size[2]:.2f} mm\n"
+                f"/score/mesh/nBin                  {n_bin[0]} {n_bin[1]} {n_bin[2]}\n")
+    else:
+        mesh = (f"/score/create/cylinderMesh        DetScoringVolume\n"
+                f"/score/mesh/cylinderSize          {size[0]} {size[1]:.2f} mm\n"
+                f"/score/mesh/nBin                  {n_bin[0]} {n_bin[1]} {n_bin[2]}               # R Z Phi\n")
+
+    with open(fileName, "w") as file:
+        file.write("# ::::::::::::::::::::::::::::::::::\n" * 2)
+        file.write("# :::                            :::\n")
+        file.write("# :::   ADAPTnGUIDE macrofile    :::\n")
+        file.write("# :::                            :::\n")
+        file.write("# ::::::::::::::::::::::::::::::::::\n" * 2)
+        file.write("\n#/run/numberOfThreads 16   # If you enabled multithreaded mode\n\n")
+        file.write("/run/initialize \n/control/verbose   0\n/run/verbose       0\n/tracking/verbose  0\n\n\n")
+        file.write("# ::::::::::::::::::::::::::::::::::::::::::::\n")
+        file.write("# :::         Command-Based Scoring        :::\n")
+        file.write("# ::::::::::::::::::::::::::::::::::::::::::::\n\n")
+        file.write(mesh)
+        file.write("/score/mesh/translate/xyz         0 0 0 mm\n\n")
+        file.write("/score/quantity/energyDeposit      EnergyDep MeV\n/score/filter/particle gammaFilter gamma\n/score/close \n\n")
+        file.write(f"/run/beamOn               {beam_on} \n")
+
+
+# ::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::
+# :::                                  DATASETS                                    :::
+# ::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::
+
+def generate_dataset(directory, rows=10**5, shape="Box", events=None, bins=10000, seed=0):
+    """Write a complete set of output files in `directory`. `rows` sets the ntuple length and the number of mesh voxels."""
+    os.makedirs(directory, exist_ok=True)
+    events = rows if events is None else events
+    n_bin = mesh_bins_for_rows(rows, shape)
+    size = (2.5, 2.5, 12.5) if shape == "Box" else (2.5, 12.5)
+
+    files = {
+        "h1":     os.path.join(directory, "ADAPT_Results_h1_Energy_Deposit.csv"),
+        "ntuple": os.path.join(directory, "ADAPT_Results_nt_Photons.csv"),
+        "macro":  os.path.join(directory, "ADAPT.mac"),
+        "mesh":   os.path.join(directory, "GammaEnergyDep.csv" if shape == "Box" else "CylinderGammaEnergyDep.csv"),
+    }
+    write_h1(files["h1"], events=events, bins=bins, seed=seed)
+    write_ntuple(files["ntuple"], rows=rows, seed=seed + 1)
+    write_macro(files["macro"], shape=shape, size=size, n_bin=n_bin, beam_on=events)
+    if shape == "Box":
+        write_box_mesh(files["mesh"], n_bin=n_bin, seed=seed + 2)
+    else:
+        write_cylinder_mesh(files["mesh"], n_bin=n_bin, seed=seed + 2)
+    return files
+
+
+# ::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::
+# :::                             STAND-IN EXECUTABLE                              :::
+# ::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::::
+
+def split_threads(fileName, threads):
+    """Ntuple of a multithreaded run: one <name>_t<N>.csv per worker thread (events dealt to the threads), as Geant4 writes them."""
+    stem, ext = os.path.splitext(fileName)
+    outputs = [open(f"{stem}_t{thread}{ext}", "w") for thread in range(threads)]
+    try:
+        with open(fileName, "r") as f:
+            for line in f:
+                if line.startswith("#"):
+                    for out in outputs:
+                        out.write(line)                             # Every thread file has the metadata
+                else:
+                    outputs[int(line.split(",", 1)[0]) % threads].write(line)
+    finally:
+        for out in outputs:
+            out.close()
+    os.remove(fileName)
+
+
+def read_commands(macFile):
+    """Commands of a macro file in execution order, following /control/execute (paths relative to the current folder)."""
+    commands = []
+    with open(macFile, "r") as f:
+        for line in f:
+            tokens = line.split("#")[0].split()
+            if not tokens:
+                continue
+            if tokens[0] == "/control/execute" and len(tokens) > 1:
+                commands.extend(read_commands(tokens[1]))
+            else:
+                commands.append(tokens)
+    return commands
+
+
+def main(argv=None):
+    import argparse
+    parser = argparse.ArgumentParser(description="Stand-in for the ADAPT executable: synthetic outputs of every /run/beamOn.")
+    parser.add_argument("macro", help="Macro file")
+    parser.add_argument("seed", nargs="?", type=int, default=0, help="Seed (as given to ADAPT by run.sh)")
+    parser.add_argument("--events-per-second", type=float, default=1e5, help="Simulated speed (default: 1e5 events/s)")
+    parser.add_argument("--fail", type=float, default=0.0, help="Probability of crashing in the middle of a run")
+    parser.add_argument("--max-voxels", type=float, default=1e6, help="Larger mesh dumps are written without rows (default: 1e6)")
+    args = parser.parse_args(argv)
+
+    rng = np.random.default_rng(args.seed)
+    per_run, steps, summary, pdg, progress, run_id, mesh, n_bin = False, True, False, False, 0, 0, "Box", (10, 10, 10)
+    threads = 1
+    for tokens in read_commands(args.macro):
+        command, values = tokens[0], tokens[1:]
+        if command == "/adapt/output/perRun":
+            per_run = values[:1] in (["true"], ["1"])
+        elif command == "/adapt/output/hits":
+            steps = values[:1] not in (["none"], ["events"])           # none: histogram only, the ntuple has no rows
+            summary = values[:1] == ["events"]                         # events: one row per event in the Events ntuple
+        elif command == "/adapt/output/columns":
+            pdg = "pdg" in ",".join(values).split(",")                 # Only the PDG column is written
+        elif command in ("/score/create/boxMesh", "/score/create/cylinderMesh"):
+            mesh = "Box" if command.endswith("boxMesh") else "Cylinder"
+        elif command == "/score/mesh/nBin" and len(values) > 2:
+            n_bin = tuple(int(float(v)) for v in values[:3])
+        elif command == "/score/dumpQuantityToFile" and len(values) > 2:
+            write_mesh = write_box_mesh if mesh == "Box" else write_cylinder_mesh
+            size = n_bin if np.prod(n_bin) <= args.max_voxels else (0, 0, 0)   # Larger meshes: header only
+            write_mesh(values[2], n_bin=size, quantity=values[1], seed=int(rng.integers(2**31)))
+        elif command == "/run/numberOfThreads" and values:
+            threads = int(values[0])
+        elif command == "/run/printProgress" and values:
+            progress = int(values[0])
+        elif command == "/random/setSeeds" and values:
+            rng = np.random.default_rng([int(v) for v in values])
+        elif command == "/run/beamOn" and values:
+            events = int(values[0])
+            crash = np.random.default_rng().random() < args.fail       # Machine failures do not follow the seeds
+            step = progress or max(events, 1)
+            for event in range(0, events, step):
+                if progress:
+                    print(f"--> Event {event} starts.", flush=True)
+                if crash and event + step > events // 2:                   # Crash in the middle of the run
+                    print("*** G4Exception: stand-in crash", file=sys.stderr, flush=True)
+                    return 134
+                time.sleep(min(step, events - event) / args.events_per_second)
+            prefix = f"ADAPT_Results_run{run_id}" if per_run else "ADAPT_Results"
+            write_h1(f"{prefix}_h1_Energy_Deposit.csv", events=events, seed=int(rng.integers(2**31)))
+            write_ntuple(f"{prefix}_nt_Photons.csv", rows=max(events // 10, 1) if steps else 0, seed=int(rng.integers(2**31)),
+                         pdg=pdg)
+            if summary:
+                write_events(f"{prefix}_nt_Events.csv", rows=max(events // 50, 1), seed=int(rng.integers(2**31)))
+            if threads > 1:                                            # Worker threads write their own ntuple files
+                split_threads(f"{prefix}_nt_Photons.csv", threads)
+                if summary:
+                    split_threads(f"{prefix}_nt_Events.csv", threads)
+            print(f"Run terminated.\n Run Summary\n  Number of events processed : {events}", flush=True)
+            print(":::         Simulation Finished       :::", flush=True)
+            run_id += 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
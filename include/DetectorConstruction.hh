@@ -28,6 +28,7 @@
 #include "G4SDManager.hh"
 
 #include "SensitiveDetector.hh"           // Sensitive Detector user class
+#include "DetectorMessenger.hh"           // /adapt/... macro commands
 
 // ::::::::::::::::::::::::::::::::
 // :::    Class definition      :::
@@ -41,6 +42,13 @@ public:
 
     virtual G4VPhysicalVolume *Construct();   // Main function that takes over the construction of the detector
 
+    void SetGeometryFile(G4String fileName);  // Runtime geometry file (/adapt/geometry/file). Empty = geometry compiled in Construct()
+
+    // ::: Changes between runs of the same process (/adapt/source/position, /adapt/detector/...) :::
+    void SetSourcePosition(G4ThreeVector position);
+    void SetDetectorPosition(G4ThreeVector position);
+    void SetDetectorDimensions(G4ThreeVector dimensions);   // x y z (Box) or inner radius, outer radius, length (Cylinder)
+
 
     // We can define the Solid, Logical, and physical volumes variables here (Just to make the source code more neat)
 
@@ -72,6 +80,11 @@ private: // We want to access the detector outside the contruct function
 
     virtual void ConstructSDandField(); // Important function that will construct any Sensitive Detector or Field (e.g. Magnetic Field)
 
+    G4VPhysicalVolume *ConstructFromFile(const G4String &fileName);  // Builds the geometry from the runtime file (DetectorConstructionFromFile.cc)
+
+    G4String           fGeometryFile = "";
+    DetectorMessenger *fMessenger    = nullptr;
+
 };
 
 #endif
\ No newline at end of file
@@ -0,0 +1,45 @@
+// :::::::::::::::::::::::::::::::::::::::::::::::::::::
+// :::                                               :::
+// :::      Header file for Detector Messenger       :::
+// :::                                               :::
+// :::::::::::::::::::::::::::::::::::::::::::::::::::::
+
+#ifndef DETECTORMESSENGER_HH
+#define DETECTORMESSENGER_HH
+
+// Include needed libraries
+#include "G4UImessenger.hh"               // Main class from which we will inherit
+#include "G4UIdirectory.hh"
+#include "G4UIcmdWithAString.hh"
+#include "G4UIcmdWith3VectorAndUnit.hh"
+
+class DetectorConstruction;
+
+
+// ::::::::::::::::::::::::::::::::
+// :::    Class definition      :::
+// ::::::::::::::::::::::::::::::::
+
+class DetectorMessenger : public G4UImessenger
+{
+public:
+    DetectorMessenger(DetectorConstruction *);  // Constructor
+    virtual ~DetectorMessenger();               // Destructor
+
+    virtual void SetNewValue(G4UIcommand *, G4String);   // Called by Geant4 when one of the commands below is used in a macro
+
+private:
+    DetectorConstruction *fDetector;
+
+    G4UIdirectory        *fAdaptDir,
+                         *fGeometryDir,
+                         *fSourceDir,
+                         *fDetectorDir;
+
+    G4UIcmdWithAString          *fGeometryFileCmd;         // /adapt/geometry/file
+    G4UIcmdWith3VectorAndUnit   *fSourcePositionCmd,       // /adapt/source/position
+                                *fDetectorPositionCmd,     // /adapt/detector/position
+                                *fDetectorDimensionsCmd;   // /adapt/detector/dimensions
+};
+
+#endif
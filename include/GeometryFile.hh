@@ -0,0 +1,68 @@
+// :::::::::::::::::::::::::::::::::::::::::::::::::::::
+// :::                                               :::
+// :::         Header file for Geometry File         :::
+// :::                                               :::
+// :::::::::::::::::::::::::::::::::::::::::::::::::::::
+
+#ifndef GEOMETRYFILE_HH
+#define GEOMETRYFILE_HH
+
+// Include needed libraries
+#include "G4String.hh"
+#include "G4ThreeVector.hh"               // Deals with the position
+#include "G4SystemOfUnits.hh"             // Library to use units like m, ev, etc.
+
+#include <vector>
+
+
+/* Runtime geometry description written by ADAPTnGUIDEGenerator.py (ADAPT_Geometry.txt). One volume per line, lengths in mm:
+ *
+ *      # volume    shape     material      dimensions (x y z or r1 r2 length)    position (x y z)
+ *      world       Box       G4_AIR        2000 2000 2000                        0 0 0
+ *      source      Cylinder  G4_Am         0 1 0.5                               0 0 0
+ *      detector    Box       G4_WATER      10 10 5                               0 0 5
+ *      # cad       name      material      file (.stl or .obj)                   offset (x y z)
+ *      cad         Skull     G4_WATER      /path/to/Stl/Skull.stl                0 0 0
+ *
+ * Lines starting with # are ignored. File names cannot contain spaces.
+ */
+
+
+// ::::::::::::::::::::::::::::::::
+// :::    Class definition      :::
+// ::::::::::::::::::::::::::::::::
+
+struct VolumeDescription
+{
+    G4String      Shape;                  // Box or Cylinder
+    G4String      Material;               // NIST or user-defined material name
+    G4double      Dimensions[3];          // Full lengths (Box) or inner radius, outer radius and full length (Cylinder)
+    G4ThreeVector Position;
+};
+
+struct CADDescription
+{
+    G4String      Name;
+    G4String      Material;
+    G4String      File;                   // .stl (ASCII) or .obj
+    G4ThreeVector Offset;
+};
+
+class GeometryFile
+{
+public:
+    GeometryFile(G4String fileName);      // Reads the file. Stops the run (G4Exception) if the file is missing or invalid
+
+    VolumeDescription World,
+                      Source,
+                      Detector;
+
+    std::vector<CADDescription> CAD;
+
+private:
+    G4String fFileName;
+
+    void Fail(G4int lineNumber, G4String message);
+};
+
+#endif
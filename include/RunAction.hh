@@ -13,6 +13,24 @@
 #include "G4AnalysisManager.hh"  // Libray to handle the histograms and Ntuples
 #include "G4SystemOfUnits.hh"
 #include "G4UnitsTable.hh"
+#include "G4GenericMessenger.hh"   // /adapt/output/ macro commands
+
+// ::::::::::::::::::::::::::::::::
+// :::    Hits ntuple layout    :::
+// ::::::::::::::::::::::::::::::::
+
+// What the sensitive detector writes per step (/adapt/output/hits and /adapt/output/columns, read by SensitiveDetector at every event)
+struct HitColumns
+{
+    G4bool steps      = true;   // false (hits none or events): no row per step in the Photons ntuple
+    G4bool events     = false;  // true (hits events): one row per event in the Events ntuple (Edep, hits, centroid, first hit)
+    G4int  time       = -1,     // Ntuple column of each optional value, -1 when it is not written
+           momentum   = -1,
+           wavelength = -1,
+           particle   = -1,     // Particle name (string column)
+           pdg        = -1;     // PDG encoding (integer column: a few bytes per row instead of the name)
+};
+
 
 // ::::::::::::::::::::::::::::::::
 // :::    Class definition      :::
@@ -26,6 +44,19 @@ public:
 
     virtual void BeginOfRunAction(const G4Run *);
     virtual void EndOfRunAction(const G4Run *);
+
+    const HitColumns &GetHitColumns() const {return fColumns;}
+
+private:
+    void BookNtuple();          // Ntuple columns are only known once the worker threads have replayed the /adapt/output/ commands
+
+    G4GenericMessenger *fMessenger = nullptr;
+    G4bool              fPerRun    = false;   // true: one set of output files per /run/beamOn (ADAPT_Results_run<N>_...)
+    G4String            fHits      = "steps"; // steps: one ntuple row per step with an energy deposit, events: one row per event, none: histogram only
+    G4String            fExtra     = "";      // Optional ntuple columns: time, momentum, wavelength, particle, pdg
+    G4bool              fBooked    = false;
+    G4String            fLayout    = "";      // hits and columns the ntuples were booked with
+    HitColumns          fColumns;
 };
 
 #endif
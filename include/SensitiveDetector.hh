@@ -13,6 +13,7 @@
 #include "G4RunManager.hh"                // Library to get the event number
 #include "G4SystemOfUnits.hh"             // Library to use units like m, ev, etc.
 #include "G4UnitsTable.hh"
+#include "RunAction.hh"                   // HitColumns: hits mode and optional ntuple columns
 
 
 // ::::::::::::::::::::::::::::::::
@@ -27,6 +28,17 @@ public:
 
 private:
     G4double fTotalEnergyDeposited; // Tot energy deposited epr event
+
+    // ::: Cached at the start of every event, so ProcessHits does the minimum work per step :::
+    G4int              fEventID         = 0;
+    HitColumns         fColumns;
+    G4AnalysisManager *fAnalysisManager = nullptr;
+
+    // ::: Event summary (/adapt/output/hits events), written once at the end of the event :::
+    G4int              fHitCount        = 0;
+    G4ThreeVector      fWeightedPosition;                          // Sum of Edep x position
+    G4ThreeVector      fFirstPosition;
+    G4double           fFirstTime       = 0.;
     
     virtual void Initialize(G4HCofThisEvent *) override;           // Called by Geant4 when a new event starts. HC = Hits Collection
     virtual void EndOfEvent(G4HCofThisEvent *) override;           // Called when the event is compelated
@@ -11,6 +11,34 @@
 #include "G4UserStackingAction.hh"        // Main class from which we will inherit
 #include "G4ParticleDefinition.hh"
 #include "G4Track.hh"
+#include "G4GenericMessenger.hh"          // /adapt/stack/ macro commands
+
+#include <unordered_map>
+#include <vector>
+
+
+// ::::::::::::::::::::::::::::::::
+// :::     Classification rule  :::
+// ::::::::::::::::::::::::::::::::
+
+// One line of the rule table, e.g. "/adapt/stack/rule kill particle=1000020040 primary=0 source=1000882240".
+// Particles are PDG encodings (ions: 100ZZZAAAI, I = 0 ground state, 9 excited); "100ZZZAAA0*" matches every state of the nucleus.
+// Every condition given must hold; the first matching rule of the table classifies the track.
+struct ParticleCode
+{
+    G4int  code;
+    G4bool anyLevel;                                 // Ion code ending in "*": the last digit (excitation level) is ignored
+};
+
+struct StackingRule
+{
+    G4ClassificationOfNewTrack classification = fUrgent;
+    std::vector<ParticleCode> particles, parents, sources;  // Empty: any
+    G4int    primary = -1;                           // -1: any, 0: secondaries only, 1: primaries only
+    G4double eMin    = -1.,                          // Kinetic energy range [eMin, eMax) (negative: not set)
+             eMax    = -1.;
+    G4String process = "";                           // Creator process name ("" : any)
+};
 
 
 // ::::::::::::::::::::::::::::::::
@@ -19,21 +47,28 @@
 
 class StackingAction : public G4UserStackingAction
 {
-public: 
+public:
     StackingAction();           // Constructor
     virtual ~StackingAction();  // Destructor
 
     virtual G4ClassificationOfNewTrack ClassifyNewTrack(const G4Track *aTrack);
-    
-    G4ClassificationOfNewTrack classification;
+    virtual void PrepareNewEvent();
 
-//private: 
+    void AddRule(G4String);     // /adapt/stack/rule
+    void ClearRules();          // /adapt/stack/clear
 
-    bool isDaRTSimulation;      // Boolean flag to check if we are running a DaRT simulation
+private:
+    G4bool Matches(const StackingRule &, const G4Track *, G4int code) const;
 
+    G4GenericMessenger        *fMessenger  = nullptr;
+    std::vector<StackingRule>  fRules;
+    G4bool                     fNeedParents = false;   // A rule uses parent=: the PDG code of every track of the event is kept
+    std::unordered_map<G4int, G4int> fCodes;           // Track ID -> PDG encoding (only with fNeedParents)
+    G4int                      fSource  = 0;           // PDG encoding of the primary of the current event
+    G4int                      fVerbose = 0;           // 1: prints every new track and its classification (slow)
 };
 
 
 
 
-#endif
\ No newline at end of file
+#endif
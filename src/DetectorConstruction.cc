@@ -14,7 +14,9 @@
 // ::::::::::::::::::::::::::::::::
 
 DetectorConstruction::DetectorConstruction()
-{}
+{
+    fMessenger = new DetectorMessenger(this);   // /adapt/... macro commands
+}
 
 
 // ::::::::::::::::::::::::::::::::
@@ -22,7 +24,9 @@ DetectorConstruction::DetectorConstruction()
 // ::::::::::::::::::::::::::::::::
 
 DetectorConstruction::~DetectorConstruction()
-{}
+{
+    delete fMessenger;
+}
 
 
 // ::::::::::::::::::::::::::::::::::
@@ -131,6 +135,15 @@ G4VPhysicalVolume *DetectorConstruction::Construct()
     PEEK->AddElement( O , 3  );
 
 
+    // :::::::::::::::::::::::::::::::::::::::::
+    // :::  Runtime geometry file (optional) :::
+    // :::::::::::::::::::::::::::::::::::::::::
+
+    // If a geometry file was given with /adapt/geometry/file (before /run/initialize), the volumes are built from it
+    // (see DetectorConstructionFromFile.cc) and the geometry below is not used. The materials above can be used in the file.
+    if (!fGeometryFile.empty()) return ConstructFromFile(fGeometryFile);
+
+
     // ::::::::::::::::::::::::::::::::
     // :::         Geometry         :::
     // ::::::::::::::::::::::::::::::::
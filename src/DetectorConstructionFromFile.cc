@@ -0,0 +1,154 @@
+// :::::::::::::::::::::::::::::::::::::::::::::::::::::
+// :::                                               :::
+// :::   Source file for the runtime geometry of     :::
+// :::            Detector Construction              :::
+// :::                                               :::
+// :::::::::::::::::::::::::::::::::::::::::::::::::::::
+
+/* This file is NOT generated by the GUI. It builds the world, source, detector and CAD volumes from the geometry file given
+ * with /adapt/geometry/file (see GeometryFile.hh), so a single compiled ADAPT can run any geometry written by
+ * ADAPTnGUIDEGenerator.py. The volumes, rotations and colours are the same as in the GUI-generated DetectorConstruction.cc.
+ *
+ * It also moves the source and detector (and resizes the detector) between runs, for both the compiled and the file
+ * geometry. Only the geometry is re-optimised before the next /run/beamOn; the physics tables are kept.
+ */
+
+// Include user-made and needed libraries
+#include "DetectorConstruction.hh"
+#include "GeometryFile.hh"
+#include "CADMesh.hh"               // To import CAD files
+#include "G4Exception.hh"
+#include "G4RunManager.hh"
+
+
+// ::::::::::::::::::::::::::::::::
+// :::   Functions definition   :::
+// ::::::::::::::::::::::::::::::::
+
+void DetectorConstruction::SetGeometryFile(G4String fileName)
+{
+    fGeometryFile = fileName;
+}
+
+
+// :::::::::::::::::::::::::::::::::::::::::::::::::
+// :::   Placement changes between /run/beamOn   :::
+// :::::::::::::::::::::::::::::::::::::::::::::::::
+
+void DetectorConstruction::SetSourcePosition(G4ThreeVector position)
+{
+    Pos2 = position;
+    Source_phys->SetTranslation(position);
+    G4RunManager::GetRunManager()->GeometryHasBeenModified();   // Geometry-only re-optimisation before the next run
+}
+
+
+void DetectorConstruction::SetDetectorPosition(G4ThreeVector position)
+{
+    Pos3 = position;
+    Detector_phys->SetTranslation(position);
+    G4RunManager::GetRunManager()->GeometryHasBeenModified();
+}
+
+
+void DetectorConstruction::SetDetectorDimensions(G4ThreeVector dimensions)
+{
+    G4VSolid *solid = Detector_log->GetSolid();
+    if (G4Box *box = dynamic_cast<G4Box *>(solid))
+    {
+        box->SetXHalfLength(dimensions.x()/2.);                  // Geant4 takes half lengths
+        box->SetYHalfLength(dimensions.y()/2.);
+        box->SetZHalfLength(dimensions.z()/2.);
+    }
+    else if (G4Tubs *tubs = dynamic_cast<G4Tubs *>(solid))
+    {
+        tubs->SetInnerRadius(dimensions.x());
+        tubs->SetOuterRadius(dimensions.y());
+        tubs->SetZHalfLength(dimensions.z()/2.);
+    }
+    else
+    {
+        G4Exception("DetectorConstruction::SetDetectorDimensions()", "ADAPT_Geometry", JustWarning,
+                    "Only Box and Cylinder detectors can be resized. The dimensions were not changed.");
+        return;
+    }
+    G4RunManager::GetRunManager()->GeometryHasBeenModified();
+}
+
+
+static G4Material *FindMaterial(const G4String &name)
+{
+    G4Material *material = G4Material::GetMaterial(name, false);                 // User-defined materials (LYSO, PEEK, ...) first
+    if (!material) material = G4NistManager::Instance()->FindOrBuildMaterial(name);
+    if (!material)
+    {
+        G4String description = "Unknown material " + name + " in the geometry file.";
+        G4Exception("DetectorConstruction::ConstructFromFile()", "ADAPT_Geometry", FatalException, description.c_str());
+    }
+    return material;
+}
+
+
+static G4VSolid *MakeSolid(const G4String &name, const VolumeDescription &volume)
+{
+    const G4double *d = volume.Dimensions;
+    if (volume.Shape == "Box") return new G4Box(name, d[0]/2., d[1]/2., d[2]/2.);                     // Geant4 takes half lengths
+    return new G4Tubs(name, d[0], d[1], d[2]/2., 0.*deg, 360*deg);
+}
+
+
+// :::::::::::::::::::::::::::::::::::::
+// ::: Physical volume from the file :::
+// :::::::::::::::::::::::::::::::::::::
+
+G4VPhysicalVolume *DetectorConstruction::ConstructFromFile(const G4String &fileName)
+{
+    G4bool checkOverlaps = true;                                 // Command to check for geometries overlaps
+    GeometryFile geometry(fileName);
+
+    G4cout << "Building the geometry from " << fileName << G4endl;
+
+    // ::: Positions :::
+    Pos1 = geometry.World.Position;       // World position
+    Pos2 = geometry.Source.Position;      // Source
+    Pos3 = geometry.Detector.Position;    // Detector
+
+    // :::::: World ::::::
+    World      = new G4Box("World", geometry.World.Dimensions[0]/2., geometry.World.Dimensions[1]/2., geometry.World.Dimensions[2]/2.);
+    World_log  = new G4LogicalVolume(World, FindMaterial(geometry.World.Material), "World_log");
+    World_phys = new G4PVPlacement(0, Pos1, World_log, "World_phys", 0, false, 0, checkOverlaps);
+
+    // :::::: Source ::::::
+    Rotation = new G4RotationMatrix();    // Cylindrical sources are aligned with the Y axis, as in the GUI geometry
+    Rotation->rotateX(90.*deg);
+
+    Source_log  = new G4LogicalVolume(MakeSolid("Source", geometry.Source), FindMaterial(geometry.Source.Material), "Source_log");
+    Source_phys = new G4PVPlacement(geometry.Source.Shape == "Cylinder" ? Rotation : nullptr, Pos2, Source_log, "Source_phys", World_log, false, 0, checkOverlaps);
+
+    // :::::: Detector ::::::
+    Detector_log  = new G4LogicalVolume(MakeSolid("Detector", geometry.Detector), FindMaterial(geometry.Detector.Material), "Detector_log");
+    Detector_phys = new G4PVPlacement(0, Pos3, Detector_log, "Detector_phys", World_log, false, 0, checkOverlaps);
+
+    // :::::: CAD Geometries ::::::
+    for (const CADDescription &cad : geometry.CAD)
+    {
+        auto mesh = G4StrUtil::ends_with(cad.File, ".obj") ? CADMesh::TessellatedMesh::FromOBJ(cad.File)
+                                                           : CADMesh::TessellatedMesh::FromSTL(cad.File);   // stl geometries MUST BE SAVED IN ASCII STL
+        mesh->SetScale(1);
+        mesh->SetOffset(cad.Offset);
+
+        auto CAD_log = new G4LogicalVolume(mesh->GetSolid(), FindMaterial(cad.Material), cad.Name + "_log", 0, 0, 0);
+                       new G4PVPlacement(0, Pos1, CAD_log, cad.Name, World_log, false, 0, checkOverlaps);
+    }
+
+    // :::::: Visualisation Attributes ::::::
+    G4VisAttributes *DetVisAtt = new G4VisAttributes(G4Color(0.0, 0.0, 1.0, 0.5)); // Blue
+    DetVisAtt->SetForceSolid(true);
+    Detector_log->SetVisAttributes(DetVisAtt);
+
+    G4VisAttributes *SrcVisAtt = new G4VisAttributes(G4Color(1.0, 0.0, 0.0, 0.5)); // Red
+    SrcVisAtt->SetForceSolid(true);
+    Source_log->SetVisAttributes(SrcVisAtt);
+
+    return World_phys;  // Always return the physical World
+}
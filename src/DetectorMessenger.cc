@@ -0,0 +1,86 @@
+// :::::::::::::::::::::::::::::::::::::::::::::::::::::
+// :::                                               :::
+// :::      Source file for Detector Messenger       :::
+// :::                                               :::
+// :::::::::::::::::::::::::::::::::::::::::::::::::::::
+
+// Include user-made and needed libraries
+#include "DetectorMessenger.hh"
+#include "DetectorConstruction.hh"
+#include "G4ApplicationState.hh"
+
+
+// ::::::::::::::::::::::::::::::::
+// :::  Constructor definition  :::
+// ::::::::::::::::::::::::::::::::
+
+DetectorMessenger::DetectorMessenger(DetectorConstruction *detector) : fDetector(detector)
+{
+    fAdaptDir = new G4UIdirectory("/adapt/");
+    fAdaptDir->SetGuidance("ADAPTnGUIDE commands.");
+
+    fGeometryDir = new G4UIdirectory("/adapt/geometry/");
+    fGeometryDir->SetGuidance("Geometry of the world, source and detector.");
+
+    // ::: Runtime geometry file (must be given before /run/initialize) :::
+    fGeometryFileCmd = new G4UIcmdWithAString("/adapt/geometry/file", this);
+    fGeometryFileCmd->SetGuidance("Builds the geometry from a file written by ADAPTnGUIDEGenerator.py instead of the compiled one.");
+    fGeometryFileCmd->SetParameterName("fileName", false);
+    fGeometryFileCmd->AvailableForStates(G4State_PreInit);
+
+    // ::: Placement changes between runs (after /run/initialize) :::
+    fSourceDir = new G4UIdirectory("/adapt/source/");
+    fSourceDir->SetGuidance("Radioactive source volume.");
+
+    fDetectorDir = new G4UIdirectory("/adapt/detector/");
+    fDetectorDir->SetGuidance("Detector volume.");
+
+    fSourcePositionCmd = new G4UIcmdWith3VectorAndUnit("/adapt/source/position", this);
+    fSourcePositionCmd->SetGuidance("Moves the source (centre position) before the next /run/beamOn.");
+    fSourcePositionCmd->SetParameterName("x", "y", "z", false);
+    fSourcePositionCmd->SetDefaultUnit("mm");
+    fSourcePositionCmd->AvailableForStates(G4State_Idle);
+
+    fDetectorPositionCmd = new G4UIcmdWith3VectorAndUnit("/adapt/detector/position", this);
+    fDetectorPositionCmd->SetGuidance("Moves the detector (centre position) before the next /run/beamOn.");
+    fDetectorPositionCmd->SetParameterName("x", "y", "z", false);
+    fDetectorPositionCmd->SetDefaultUnit("mm");
+    fDetectorPositionCmd->AvailableForStates(G4State_Idle);
+
+    fDetectorDimensionsCmd = new G4UIcmdWith3VectorAndUnit("/adapt/detector/dimensions", this);
+    fDetectorDimensionsCmd->SetGuidance("Resizes the detector before the next /run/beamOn.");
+    fDetectorDimensionsCmd->SetGuidance("Box: x y z full lengths. Cylinder: inner radius, outer radius and length.");
+    fDetectorDimensionsCmd->SetParameterName("d1", "d2", "d3", false);
+    fDetectorDimensionsCmd->SetDefaultUnit("mm");
+    fDetectorDimensionsCmd->AvailableForStates(G4State_Idle);
+}
+
+
+// ::::::::::::::::::::::::::::::::
+// :::  Destructor definition   :::
+// ::::::::::::::::::::::::::::::::
+
+DetectorMessenger::~DetectorMessenger()
+{
+    delete fGeometryFileCmd;
+    delete fSourcePositionCmd;
+    delete fDetectorPositionCmd;
+    delete fDetectorDimensionsCmd;
+    delete fGeometryDir;
+    delete fSourceDir;
+    delete fDetectorDir;
+    delete fAdaptDir;
+}
+
+
+// ::::::::::::::::::::::::::::::::
+// :::   Functions definition   :::
+// ::::::::::::::::::::::::::::::::
+
+void DetectorMessenger::SetNewValue(G4UIcommand *command, G4String newValue)
+{
+    if      (command == fGeometryFileCmd)       {fDetector->SetGeometryFile(newValue);}
+    else if (command == fSourcePositionCmd)     {fDetector->SetSourcePosition(fSourcePositionCmd->GetNew3VectorValue(newValue));}
+    else if (command == fDetectorPositionCmd)   {fDetector->SetDetectorPosition(fDetectorPositionCmd->GetNew3VectorValue(newValue));}
+    else if (command == fDetectorDimensionsCmd) {fDetector->SetDetectorDimensions(fDetectorDimensionsCmd->GetNew3VectorValue(newValue));}
+}
@@ -0,0 +1,81 @@
+// :::::::::::::::::::::::::::::::::::::::::::::::::::::
+// :::                                               :::
+// :::         Source file for Geometry File         :::
+// :::                                               :::
+// :::::::::::::::::::::::::::::::::::::::::::::::::::::
+
+// Include user-made and needed libraries
+#include "GeometryFile.hh"
+#include "G4Exception.hh"
+
+#include <fstream>
+#include <sstream>
+
+
+// ::::::::::::::::::::::::::::::::
+// :::  Constructor definition  :::
+// ::::::::::::::::::::::::::::::::
+
+GeometryFile::GeometryFile(G4String fileName) : fFileName(fileName)
+{
+    std::ifstream file(fileName);
+    if (!file.is_open()) Fail(0, "cannot open the file");
+
+    // ::: Default world (same as the GUI): 2 x 2 x 2 m3 of air :::
+    World.Shape    = "Box";
+    World.Material = "G4_AIR";
+    World.Dimensions[0] = World.Dimensions[1] = World.Dimensions[2] = 2.*m;
+    World.Position = G4ThreeVector(0, 0, 0);
+
+    G4bool hasSource = false, hasDetector = false;
+    std::string line;
+    G4int lineNumber = 0;
+
+    while (std::getline(file, line))
+    {
+        lineNumber++;
+        std::istringstream tokens(line);
+        std::string keyword;
+        if (!(tokens >> keyword) || keyword[0] == '#') continue;         // Blank lines and comments
+
+        if (keyword == "cad")
+        {
+            CADDescription cad;
+            std::string name, material, path;
+            G4double x, y, z;
+            if (!(tokens >> name >> material >> path >> x >> y >> z)) Fail(lineNumber, "expected: cad name material file x y z (file path without spaces)");
+            cad.Name = name; cad.Material = material; cad.File = path;
+            cad.Offset = G4ThreeVector(x*mm, y*mm, z*mm);
+            CAD.push_back(cad);
+            continue;
+        }
+
+        VolumeDescription volume;
+        std::string shape, material;
+        G4double d1, d2, d3, x, y, z;
+        if (!(tokens >> shape >> material >> d1 >> d2 >> d3 >> x >> y >> z)) Fail(lineNumber, "expected: volume shape material d1 d2 d3 x y z");
+        if (shape != "Box" && shape != "Cylinder") Fail(lineNumber, "the shape must be Box or Cylinder");
+        volume.Shape = shape; volume.Material = material;
+        volume.Dimensions[0] = d1*mm; volume.Dimensions[1] = d2*mm; volume.Dimensions[2] = d3*mm;
+        volume.Position = G4ThreeVector(x*mm, y*mm, z*mm);
+
+        if      (keyword == "world")    {World    = volume;}
+        else if (keyword == "source")   {Source   = volume; hasSource   = true;}
+        else if (keyword == "detector") {Detector = volume; hasDetector = true;}
+        else Fail(lineNumber, "unknown volume '" + keyword + "' (world, source, detector or cad)");
+    }
+
+    if (!hasSource || !hasDetector) Fail(lineNumber, "the source and the detector must be defined");
+}
+
+
+// ::::::::::::::::::::::::::::::::
+// :::   Functions definition   :::
+// ::::::::::::::::::::::::::::::::
+
+void GeometryFile::Fail(G4int lineNumber, G4String message)
+{
+    std::ostringstream description;
+    description << "Geometry file " << fFileName << " (line " << lineNumber << "): " << message;
+    G4Exception("GeometryFile::GeometryFile()", "ADAPT_Geometry", FatalException, description.str().c_str());
+}
@@ -7,6 +7,11 @@
 // Include user-made and needed libraries
 #include "RunAction.hh"
 
+#include "G4Exception.hh"
+#include "G4Threading.hh"
+
+#include <sstream>
+
 
 // ::::::::::::::::::::::::::::::::
 // :::  Constructor definition  :::
@@ -19,6 +24,32 @@ RunAction::RunAction()
     // ::: 1D Histograms :::
     analysisManager->CreateH1("Energy_Deposit", "Energy Deposit", 10000, 0., 10 *MeV); // Energy deposited histogram with 100 bins from 0-1.1 MeV
 
+    // ::: Output naming :::
+    fMessenger = new G4GenericMessenger(this, "/adapt/output/", "Output files of the simulation.");
+    fMessenger->DeclareProperty("perRun", fPerRun, "Writes the results of every /run/beamOn to ADAPT_Results_run<runID>_... "
+                                                   "instead of overwriting ADAPT_Results_...").SetStates(G4State_PreInit, G4State_Idle);
+
+    // ::: Hits ntuple (fixed by the first /run/beamOn for the whole process) :::
+    // Idle as well as PreInit: in multithreaded mode the worker threads replay the commands of the master after their own
+    // initialisation, so a PreInit-only command would leave them with the default layout
+    fMessenger->DeclareProperty("hits", fHits, "steps: one ntuple row per step that deposits energy (default), "
+                                               "events: one row per event in the Events ntuple (total Edep, hit count, "
+                                               "energy-weighted centroid, first hit), none: only the energy deposit histogram (fastest). "
+                                               "Only effective before the first /run/beamOn.")
+              .SetCandidates("steps events none").SetStates(G4State_PreInit, G4State_Idle);
+    fMessenger->DeclareProperty("columns", fExtra, "Optional ntuple columns after iEvent, PosX, PosY, PosZ, fEnergyDeposited "
+                                                   "(comma separated): time, momentum, wavelength, particle (name), pdg (PDG encoding). "
+                                                   "Only effective before the first /run/beamOn.")
+              .SetStates(G4State_PreInit, G4State_Idle);
+}
+
+
+void RunAction::BookNtuple()
+{
+    G4AnalysisManager *analysisManager = G4AnalysisManager::Instance();
+    fColumns.steps  = (fHits == "steps");
+    fColumns.events = (fHits == "events");
+
     // ::: Ntuples :::
     analysisManager->CreateNtuple("Photons", "Photons");  // Name
     analysisManager->CreateNtupleIColumn("iEvent");       // I = integers
@@ -26,8 +57,35 @@ RunAction::RunAction()
     analysisManager->CreateNtupleDColumn("PosY");
     analysisManager->CreateNtupleDColumn("PosZ");
     analysisManager->CreateNtupleDColumn("fEnergyDeposited");
-    //analysisManager->CreateNtupleSColumn("Particle_Name");
+
+    // ::: Optional columns, in this order whatever the order given :::
+    G4String extra = "," + fExtra + ",";
+    for (char &c : extra) {if (c == ' ') {c = ',';}}
+    G4int column = 5;
+    if (extra.find(",time,") != std::string::npos)       {analysisManager->CreateNtupleDColumn("GlobalTime"); fColumns.time       = column++;}
+    if (extra.find(",momentum,") != std::string::npos)   {analysisManager->CreateNtupleDColumn("Momentum");   fColumns.momentum   = column++;}
+    if (extra.find(",wavelength,") != std::string::npos) {analysisManager->CreateNtupleDColumn("Wavelength"); fColumns.wavelength = column++;}
+    if (extra.find(",particle,") != std::string::npos)   {analysisManager->CreateNtupleSColumn("Particle_Name"); fColumns.particle = column++;}
+    if (extra.find(",pdg,") != std::string::npos)        {analysisManager->CreateNtupleIColumn("PDG");        fColumns.pdg        = column++;}
     analysisManager->FinishNtuple(0);                     // Definitions of Ntuples is compleated
+
+    // ::: Event summary (hits events): one row per event with an energy deposit instead of one per step :::
+    if (fColumns.events)
+    {
+        analysisManager->CreateNtuple("Events", "Events");
+        analysisManager->CreateNtupleIColumn("iEvent");
+        analysisManager->CreateNtupleDColumn("Edep");         // Total energy deposited in the event
+        analysisManager->CreateNtupleIColumn("nHits");        // Steps with an energy deposit
+        analysisManager->CreateNtupleDColumn("CentroidX");    // Energy-weighted mean position of the deposits
+        analysisManager->CreateNtupleDColumn("CentroidY");
+        analysisManager->CreateNtupleDColumn("CentroidZ");
+        analysisManager->CreateNtupleDColumn("FirstX");       // Position of the earliest deposit (global time)
+        analysisManager->CreateNtupleDColumn("FirstY");
+        analysisManager->CreateNtupleDColumn("FirstZ");
+        analysisManager->FinishNtuple(1);
+    }
+    fLayout = fHits + " " + fExtra;
+    fBooked = true;
 }
 
 
@@ -36,7 +94,9 @@ RunAction::RunAction()
 // ::::::::::::::::::::::::::::::::
 
 RunAction::~RunAction()
-{}
+{
+    delete fMessenger;
+}
 
 
 // ::::::::::::::::::::::::::::::::::::::::::::::
@@ -51,13 +111,24 @@ void RunAction::BeginOfRunAction(const G4Run *run)
     G4String OutputFileName = "ADAPT_Results.csv";
     //G4String OutputFileName = "ADAPT_Results.hdf5";
     //G4String OutputFileName = "ADAPT_Results.xml";
-    
+
+    // With /adapt/output/perRun true, every run keeps its own files (ADAPT_Results_run0_h1_Energy_Deposit.csv, ...), so several
+    // /run/beamOn of the same macro are not overwritten by the next one
+    if (fPerRun)
+    {
+        std::stringstream strRunID;  // We include the runID into the file name
+        strRunID << run->GetRunID();
+        OutputFileName = "ADAPT_Results_run" + strRunID.str() + ".csv";
+    }
+
+    if (!fBooked) {BookNtuple();}  // First run only
+    else if (fHits + " " + fExtra != fLayout && G4Threading::IsMasterThread())
+    {
+        G4Exception("RunAction::BeginOfRunAction()", "ADAPT_Output", JustWarning,
+                    "/adapt/output/hits and /adapt/output/columns only apply before the first /run/beamOn. The ntuples keep their first layout.");
+        fLayout = fHits + " " + fExtra;                            // Warned once per change
+    }
     analysisManager->OpenFile(OutputFileName);
-    
-    //G4int runID = run->GetRunID();
-    //std::stringstream strRunID;  // We include the runID into the root file name 
-    //strRunID << runID;
-    //analysisManager->OpenFile("ADAPT_Output" + strRunID.str() + ".root"); 
 }
 
 
@@ -32,6 +32,14 @@ SensitiveDetector::~SensitiveDetector()
 void SensitiveDetector::Initialize(G4HCofThisEvent *)
 {
     fTotalEnergyDeposited = 0.0; // We set the energy variable as 0 to start "filling it"
+    fHitCount             = 0;
+    fWeightedPosition     = G4ThreeVector();
+
+    // Event ID, analysis manager and ntuple layout once per event instead of once per step
+    G4RunManager *runManager = G4RunManager::GetRunManager();
+    fEventID         = runManager->GetCurrentEvent()->GetEventID();
+    fAnalysisManager = G4AnalysisManager::Instance();
+    fColumns         = static_cast<const RunAction *>(runManager->GetUserRunAction())->GetHitColumns();
 }
 
 
@@ -41,45 +49,64 @@ void SensitiveDetector::Initialize(G4HCofThisEvent *)
 
 G4bool SensitiveDetector::ProcessHits(G4Step *aStep, G4TouchableHistory *)
 {
-    G4int eventID = G4RunManager::GetRunManager()->GetCurrentEvent()->GetEventID();    // Variable for the eventID
-    G4AnalysisManager *analysisManager = G4AnalysisManager::Instance();
+    G4double fEnergyDeposited = aStep->GetTotalEnergyDeposit();                         // For each step, we get the total energy deposited per particle
+    if (fEnergyDeposited <= 0) {return false;}                                          // Steps without an energy deposit are not scored
+
+    fTotalEnergyDeposited += fEnergyDeposited;
+    if (!fColumns.steps && !fColumns.events) {return true;}                             // /adapt/output/hits none: histogram only
 
     G4StepPoint *preStepPoint = aStep->GetPreStepPoint();                              // Includes all information of the first interaction in one step
-    G4double      fGlobalTime = preStepPoint->GetGlobalTime();
-    G4double fEnergyDeposited = aStep->GetTotalEnergyDeposit();                         // For each step, we get the total energy deposited per particle
-    G4ThreeVector   posPhoton = preStepPoint->GetPosition();                             // For the photon position
-    G4ThreeVector   momPhoton = preStepPoint->GetMomentum();                             // For the photon momentum
-    G4double    fMomPhotonMag = momPhoton.mag();                                         // Moment Magnitude
-    G4double            fWlen = (1.239841939 *eV / fMomPhotonMag)*1E+03;                 // Wavelength calculation
-    G4Track *track = aStep->GetTrack();
-    const G4ParticleDefinition* pdef = track->GetParticleDefinition();
-    const G4String pname = pdef->GetParticleName();   // "gamma", "e-", "proton", "opticalphoton", etc. 
+    const G4ThreeVector &posPhoton = preStepPoint->GetPosition();                        // For the photon position
 
-    // ::: Filling up the Ntuples :::
-    analysisManager->FillNtupleIColumn(0, 0, eventID);
-    analysisManager->FillNtupleDColumn(0, 1, posPhoton[0]);                             // First position of the photon position
-    analysisManager->FillNtupleDColumn(0, 2, posPhoton[1]);
-    analysisManager->FillNtupleDColumn(0, 3, posPhoton[2]);
-    analysisManager->FillNtupleDColumn(0, 4, fEnergyDeposited);
-    //analysisManager->FillNtupleSColumn(0, 5, pname);
-    analysisManager->AddNtupleRow(0);                                                    // First row is compleated, now for every photon interaction we get another row
-
-    if(fEnergyDeposited > 0)                                    // Conditional for the fTotalEnergyDeposited (= 0) to be increased according to fEnergyDeposited... if fEnergyDeposited is > 0 
+    // ::: Event summary (/adapt/output/hits events): only sums here, the row is written in EndOfEvent :::
+    if (fColumns.events)
     {
-        fTotalEnergyDeposited += fEnergyDeposited;
+        fWeightedPosition += fEnergyDeposited * posPhoton;
+        G4double time = preStepPoint->GetGlobalTime();                                  // Tracks are not processed in time order
+        if (fHitCount == 0 || time < fFirstTime) {fFirstTime = time; fFirstPosition = posPhoton;}
+        fHitCount++;
+        return true;
     }
 
+    // ::: Filling up the Ntuples :::
+    fAnalysisManager->FillNtupleIColumn(0, 0, fEventID);
+    fAnalysisManager->FillNtupleDColumn(0, 1, posPhoton[0]);                            // First position of the photon position
+    fAnalysisManager->FillNtupleDColumn(0, 2, posPhoton[1]);
+    fAnalysisManager->FillNtupleDColumn(0, 3, posPhoton[2]);
+    fAnalysisManager->FillNtupleDColumn(0, 4, fEnergyDeposited);
+
+    // ::: Optional columns (/adapt/output/columns) :::
+    if (fColumns.time >= 0)       {fAnalysisManager->FillNtupleDColumn(0, fColumns.time, preStepPoint->GetGlobalTime());}
+    if (fColumns.momentum >= 0)   {fAnalysisManager->FillNtupleDColumn(0, fColumns.momentum, preStepPoint->GetMomentum().mag());}
+    if (fColumns.wavelength >= 0) {fAnalysisManager->FillNtupleDColumn(0, fColumns.wavelength, (1.239841939 *eV / preStepPoint->GetMomentum().mag())*1E+03);}   // Wavelength calculation
+    if (fColumns.particle >= 0)   {fAnalysisManager->FillNtupleSColumn(0, fColumns.particle, aStep->GetTrack()->GetParticleDefinition()->GetParticleName());}  // "gamma", "e-", "proton", etc.
+    if (fColumns.pdg >= 0)        {fAnalysisManager->FillNtupleIColumn(0, fColumns.pdg, aStep->GetTrack()->GetParticleDefinition()->GetPDGEncoding());}   // 22, 11, 1000020040, etc.
+    fAnalysisManager->AddNtupleRow(0);                                                   // First row is compleated, now for every photon interaction we get another row
+
     return true;
 }
 
 void SensitiveDetector::EndOfEvent(G4HCofThisEvent *)
 {
-    G4int eventID = G4RunManager::GetRunManager()->GetCurrentEvent()->GetEventID();    // Variable for the eventID
-    G4AnalysisManager *analysisManager = G4AnalysisManager::Instance();
-
     // ::: Filling up the Histograms :::
-    analysisManager->FillH1(0, fTotalEnergyDeposited);
+    fAnalysisManager->FillH1(0, fTotalEnergyDeposited);
+
+    // ::: Event summary: one row per event that deposited energy :::
+    if (fColumns.events && fHitCount > 0)
+    {
+        G4ThreeVector centroid = fWeightedPosition / fTotalEnergyDeposited;
+        fAnalysisManager->FillNtupleIColumn(1, 0, fEventID);
+        fAnalysisManager->FillNtupleDColumn(1, 1, fTotalEnergyDeposited);
+        fAnalysisManager->FillNtupleIColumn(1, 2, fHitCount);
+        fAnalysisManager->FillNtupleDColumn(1, 3, centroid[0]);
+        fAnalysisManager->FillNtupleDColumn(1, 4, centroid[1]);
+        fAnalysisManager->FillNtupleDColumn(1, 5, centroid[2]);
+        fAnalysisManager->FillNtupleDColumn(1, 6, fFirstPosition[0]);
+        fAnalysisManager->FillNtupleDColumn(1, 7, fFirstPosition[1]);
+        fAnalysisManager->FillNtupleDColumn(1, 8, fFirstPosition[2]);
+        fAnalysisManager->AddNtupleRow(1);
+    }
 
     // ::: Printing the deposited energy inside the crystal :::
-    //G4cout << "Event " << eventID << " deposited energy: " << fTotalEnergyDeposited << " MeV." << G4endl;  // We print in the terminal the total energy deposited per event as soon as it finishes   
+    //G4cout << "Event " << fEventID << " deposited energy: " << fTotalEnergyDeposited << " MeV." << G4endl;  // We print in the terminal the total energy deposited per event as soon as it finishes   
 }
\ No newline at end of file
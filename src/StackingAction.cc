@@ -6,6 +6,12 @@
 
 // Include user-made and needed libraries
 #include "StackingAction.hh"
+#include "G4Exception.hh"
+#include "G4SystemOfUnits.hh"
+#include "G4VProcess.hh"
+
+#include <sstream>
+#include <stdexcept>
 
 
 // ::::::::::::::::::::::::::::::::
@@ -13,7 +19,31 @@
 // ::::::::::::::::::::::::::::::::
 
 StackingAction::StackingAction()
-{}
+{
+    /* Classifications:
+     * fUrgent   = All tracks are put into the urgent stack, let's say in a "priority" stack
+     * fWaiting  = Once the Urgent stack is empty, all the tracks that were put into the waiting stack will be sent into the Urgent stack
+     * fPostpone = The track will be postponed to the next event
+     * fKill     = The track is deleted immediately and not stored in any stack.
+     */
+
+    // ::: Default rules (the former hard-coded classification), replaced with /adapt/stack/clear :::
+    AddRule("kill   particle=1000020040 primary=0 source=1000882240");     // Ra-224 (DaRT): kill alphas to save computational time since they will not be able to escape the applicator
+    AddRule("urgent particle=1000952410,1000932379 source=1000952410");    // Am-241: follow Am-241 and the excited Np-237 states
+    AddRule("kill   source=1000952410");                                   // Kill the rest, e.g. Np-237 since it's an extremelly long-lived radionuclide and its radioactive products are never seen experimentally
+
+    // ::: Macro commands (after /run/initialize in multithreaded mode, where the worker threads own the stacking actions) :::
+    fMessenger = new G4GenericMessenger(this, "/adapt/stack/", "Classification of new tracks (kill, urgent, waiting, postpone).");
+    fMessenger->DeclareMethod("rule", &StackingAction::AddRule,
+                              "Appends a rule: <kill|urgent|waiting|postpone> [particle=PDG,...] [parent=PDG,...] [source=PDG,...] "
+                              "[primary=0|1] [emin=keV] [emax=keV] [process=name]. PDG 100ZZZAAA0* matches every state of a nucleus. "
+                              "The first matching rule classifies the track, tracks without a matching rule are urgent.")
+              .SetStates(G4State_PreInit, G4State_Idle);
+    fMessenger->DeclareMethod("clear", &StackingAction::ClearRules, "Removes every rule (also the default ones).")
+              .SetStates(G4State_PreInit, G4State_Idle);
+    fMessenger->DeclareProperty("verbose", fVerbose, "1: prints every new track and its classification (slows the simulation down).")
+              .SetStates(G4State_PreInit, G4State_Idle);
+}
 
 
 // ::::::::::::::::::::::::::::::::
@@ -21,56 +51,138 @@ StackingAction::StackingAction()
 // ::::::::::::::::::::::::::::::::
 
 StackingAction::~StackingAction()
-{}
+{
+    delete fMessenger;
+}
 
 
-G4ClassificationOfNewTrack StackingAction::ClassifyNewTrack(const G4Track * aTrack)
+// ::::::::::::::::::::::::::::::::
+// :::   Functions definition   :::
+// ::::::::::::::::::::::::::::::::
+
+static std::vector<ParticleCode> ParseCodes(const G4String &list)
 {
-    G4ParticleDefinition *Particle = aTrack   -> GetDefinition();     // We get the particle definition
-    G4String                  Name = Particle -> GetParticleName();   // The particle name
-                    classification = fUrgent;                         // We classifiy the stacks as Wating
+    std::vector<ParticleCode> codes;
+    std::stringstream stream(list);
+    G4String item;
+    while (std::getline(stream, item, ','))
+    {
+        G4bool anyLevel = !item.empty() && item.back() == '*';
+        if (anyLevel) {item.pop_back();}
+        codes.push_back({std::stoi(item), anyLevel});
+    }
+    return codes;
+}
 
 
-    /* Classifications:
-     * fUrgent   = All tracks are put into the urgent stack, let's say in a "priority" stack
-     * fWaiting  = Once the Urgent stack is empty, all the tracks that were put into the waiting stack will be sent into the Urgent stack
-     * fPostpone = The track will be postponed to the next event
-     * fKill     = The track is deleted immediately and not stored in any stack.
-     */
+static G4bool InCodes(const std::vector<ParticleCode> &codes, G4int code)
+{
+    if (codes.empty()) {return true;}
+    for (const ParticleCode &c : codes)
+    {
+        if (c.code == code || (c.anyLevel && c.code / 10 == code / 10)) {return true;}
+    }
+    return false;
+}
 
-    // If this is a primary particle (i.e., the radioactive nucleus itself)
-    if (aTrack->GetParentID() == 0)
+
+void StackingAction::AddRule(G4String line)
+{
+    std::istringstream tokens(line);
+    G4String action, token;
+    tokens >> action;
+
+    StackingRule rule;
+    if      (action == "kill")     {rule.classification = fKill;}
+    else if (action == "urgent")   {rule.classification = fUrgent;}
+    else if (action == "waiting")  {rule.classification = fWaiting;}
+    else if (action == "postpone") {rule.classification = fPostpone;}
+    else
     {
-        if (Name == "Ra224")       {isDaRTSimulation = true;}
-        else if (Name == "Am241")  {isDaRTSimulation = false;}
+        G4Exception("StackingAction::AddRule()", "ADAPT_Stacking", FatalException, ("Unknown classification in: " + line).c_str());
+        return;
     }
 
-    G4cout << "Particle " << Name << G4endl;
-    
-    // ::::::::::::::::::::::::::::::::
-    // :::           DaRT           :::
-    // ::::::::::::::::::::::::::::::::
-    if (isDaRTSimulation)
+    try
     {
-        if (aTrack->GetParentID() != 0)                          // If it's a secondary particle
+        while (tokens >> token)
         {
-            // ::: Radiation products :::
-            if (Name == "alpha")      {classification = fKill;}  // Kill alphas to save computational time since they will not be able to escape the applicator.
-            //else if (Name == "-e" || Name == "gamma") {classification = fUrgent;}
-            //G4cout << "Particle " << Name << G4endl;
+            std::size_t equal = token.find('=');
+            G4String key   = token.substr(0, equal),
+                     value = equal == std::string::npos ? "" : token.substr(equal + 1);
+            if      (key == "particle") {rule.particles = ParseCodes(value);}
+            else if (key == "parent")   {rule.parents   = ParseCodes(value);}
+            else if (key == "source")   {rule.sources   = ParseCodes(value);}
+            else if (key == "primary")  {rule.primary   = std::stoi(value) != 0;}
+            else if (key == "emin")     {rule.eMin      = std::stod(value) * keV;}
+            else if (key == "emax")     {rule.eMax      = std::stod(value) * keV;}
+            else if (key == "process")  {rule.process   = value;}
+            else {throw std::invalid_argument(key);}
         }
     }
+    catch (const std::exception &)                               // Unknown key or value that is not a number
+    {
+        G4Exception("StackingAction::AddRule()", "ADAPT_Stacking", FatalException, ("Invalid condition " + token + " in: " + line).c_str());
+        return;
+    }
 
+    fRules.push_back(rule);
+    if (!rule.parents.empty()) {fNeedParents = true;}
+}
 
-    // :::::::::::::::::::::::::::::::
-    // :::         Am-241          :::
-    // :::::::::::::::::::::::::::::::
-    else
+
+void StackingAction::ClearRules()
+{
+    fRules.clear();
+    fNeedParents = false;
+}
+
+
+void StackingAction::PrepareNewEvent()
+{
+    fCodes.clear();
+    fSource = 0;
+}
+
+
+G4bool StackingAction::Matches(const StackingRule &rule, const G4Track *aTrack, G4int code) const
+{
+    // Cheapest conditions first: integer comparisons, then the energy, then the creator process name
+    if (!InCodes(rule.particles, code) || !InCodes(rule.sources, fSource)) {return false;}
+    if (rule.primary >= 0 && (aTrack->GetParentID() == 0) != (rule.primary == 1)) {return false;}
+    if (!rule.parents.empty())
     {
-        if (Name == "Am241" || Name == "Np237[158.497]" 
-         || Name == "Np237[59.541]" || Name == "Np237[102.959]") { classification = fUrgent;}  // Kill Np-237 since it's an extremelly long-lived radionuclide and its radioactive products are never seen experimentally 
-        else {classification = fKill;}
+        auto parent = fCodes.find(aTrack->GetParentID());
+        if (parent == fCodes.end() || !InCodes(rule.parents, parent->second)) {return false;}
     }
+    G4double energy = aTrack->GetKineticEnergy();
+    if ((rule.eMin >= 0. && energy < rule.eMin) || (rule.eMax >= 0. && energy >= rule.eMax)) {return false;}
+    if (!rule.process.empty())
+    {
+        const G4VProcess *creator = aTrack->GetCreatorProcess();
+        if (creator == nullptr || creator->GetProcessName() != rule.process) {return false;}
+    }
+    return true;
+}
 
+
+G4ClassificationOfNewTrack StackingAction::ClassifyNewTrack(const G4Track * aTrack)
+{
+    G4int code = aTrack->GetDefinition()->GetPDGEncoding();   // Integer comparisons instead of particle names
+
+    // If this is a primary particle (i.e., the radioactive nucleus itself)
+    if (aTrack->GetParentID() == 0 && fSource == 0) {fSource = code;}
+    if (fNeedParents) {fCodes[aTrack->GetTrackID()] = code;}
+
+    G4ClassificationOfNewTrack classification = fUrgent;      // Tracks without a matching rule go to the urgent stack
+    for (const StackingRule &rule : fRules)
+    {
+        if (Matches(rule, aTrack, code)) {classification = rule.classification; break;}
+    }
+
+    if (fVerbose > 0)
+    {
+        G4cout << "Particle " << aTrack->GetDefinition()->GetParticleName() << " (" << code << ") -> " << classification << G4endl;
+    }
     return classification;
-}
\ No newline at end of file
+}
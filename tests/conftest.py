@@ -0,0 +1,14 @@
+# :::::: Shared fixtures of the tests: the modules of the repository and SyntheticOutputs.py as a stand-in for ADAPT ::::::
+import os
+import sys
+
+import pytest
+
+REPOSITORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPOSITORY)                                      # The modules are scripts at the top of the repository
+
+
+@pytest.fixture
+def stand_in():
+    """Command of the stand-in ADAPT executable (append the options, e.g. --fail 1)."""
+    return [sys.executable, os.path.join(REPOSITORY, "SyntheticOutputs.py"), "--events-per-second", "1e7"]
@@ -0,0 +1,36 @@
+# :::::: ADAPTnGUIDEAnalysis.py: ntuples of a multithreaded run (one file per worker thread) read as one ::::::
+import os
+import subprocess
+
+import numpy as np
+import pytest
+
+from ADAPTnGUIDEAnalysis import ntuple_files, read_events, read_hits
+
+MACRO = """/run/numberOfThreads {threads}
+/adapt/output/hits {hits}
+/run/initialize
+/run/beamOn 20000
+"""
+
+
+def _run(folder, stand_in, threads, hits):
+    folder.mkdir()
+    (folder / "ADAPT.mac").write_text(MACRO.format(threads=threads, hits=hits))
+    subprocess.run(stand_in + ["ADAPT.mac", "5"], cwd=folder, check=True, stdout=subprocess.DEVNULL)
+    return folder
+
+
+@pytest.mark.parametrize("hits, name, read", [("events", "ADAPT_Results_nt_Events.csv", read_events),
+                                              ("steps", "ADAPT_Results_nt_Photons.csv", read_hits)])
+def test_thread_files_read_as_one_ntuple(tmp_path, stand_in, hits, name, read):
+    single = _run(tmp_path / "single", stand_in, 1, hits)
+    threads = _run(tmp_path / "threads", stand_in, 3, hits)
+    assert [os.path.basename(f) for f in ntuple_files(str(threads / name))] == [name.replace(".csv", f"_t{t}.csv") for t in range(3)]
+    assert ntuple_files(str(single / name)) == [str(single / name)]
+
+    expected, found = read(str(single / name)), read(str(threads / name))
+    order = np.argsort(found[0], kind="stable")                            # Events dealt to the threads
+    for a, b in zip(expected, found):
+        np.testing.assert_array_equal(a, b[order])
+    assert read(str(threads / name), nrows=7)[0].size == 7
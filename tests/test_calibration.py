@@ -0,0 +1,38 @@
+# :::::: ResolutionCalibration.py: a known FWHM injected into a measured spectrum is found, inside its interval ::::::
+import numpy as np
+import pytest
+
+from GaussianBroadening import broaden
+from ResolutionCalibration import calibrate_fwhm, scan_fwhm
+
+FWHM = 0.05
+
+
+def _spectra(intensity):
+    """Simulated alpha lines (h1 axis of the analysis) and a measurement broadened with FWHM, with Poisson noise."""
+    X = np.linspace(0, 10, 10000)
+    counts = np.zeros(X.size)
+    counts[[5486, 5443, 5388]] = [8.5e4, 1.3e4, 1.4e3]
+    measured = np.random.default_rng(3).poisson(np.clip(broaden(X, counts * intensity, FWHM / 2.355), 0, None)).astype(float)
+    keep = (X > 5.0) & (X < 5.8)
+    return (X, counts), (X[keep], measured[keep])
+
+
+@pytest.mark.parametrize("statistic", ["chi2", "poisson"])
+@pytest.mark.parametrize("intensity", [1.0, 0.01])
+def test_best_fit_and_interval_match_a_fine_scan(statistic, intensity):
+    simulated, measured = _spectra(intensity)
+    result = calibrate_fwhm(simulated, measured, statistic=statistic)
+    low, high = result["fwhm_interval"]
+    assert low < result["fwhm"] < high
+    assert abs(result["fwhm"] - FWHM) < 2 * (high - low)                       # The injected value is within ~2 sigma
+
+    # Brute-force scan on a very fine grid around the result: same best value and interval
+    grid = np.linspace(low - 2 * (high - low), high + 2 * (high - low), 2001)
+    profile, scale = scan_fwhm(*simulated, *measured, grid, statistic)
+    inside = grid[profile <= profile.min() + 1.0]
+    tolerance = 0.02 * (high - low)
+    assert result["fwhm"] == pytest.approx(grid[np.argmin(profile)], abs=tolerance)
+    assert low == pytest.approx(inside[0], abs=tolerance) and high == pytest.approx(inside[-1], abs=tolerance)
+    assert result["minimum"] == pytest.approx(profile.min(), abs=0.01)
+    assert result["scale"] == pytest.approx(scale[np.argmin(profile)], rel=1e-3)
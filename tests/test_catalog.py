@@ -0,0 +1,61 @@
+# :::::: ADAPTnGUIDECatalog.py: a run identical to a finished one reuses its outputs instead of being simulated again ::::::
+import json
+import os
+import subprocess
+
+import pytest
+
+from ADAPTnGUIDECatalog import Catalog
+from ADAPTnGUIDEGenerator import write_run_dir
+from RunFolders import run_paths
+
+CONFIG = {"source_choice": "Box", "detector_choice": "Cylinder", "source_material": "G4_Am", "detector_material": "G4_WATER",
+          "source_dim_values": [1, 1, 0.5], "detector_dim_values": [0, 10, 5], "source_pos_values": [0, 0, 0],
+          "detector_pos_values": [0, 0, 5], "Radionuclide": "Am-241", "Runs_input": 1000, "geometryName": "A"}
+
+
+@pytest.fixture
+def catalog(tmp_path):
+    catalog = Catalog(str(tmp_path / "ADAPT_Runs.db"))
+    yield catalog
+    catalog.close()
+
+
+@pytest.fixture
+def finished(tmp_path, catalog, stand_in):
+    """A registered run folder simulated by the stand-in and completed in the catalogue."""
+    run_dir = str(tmp_path / "first")
+    write_run_dir(CONFIG, run_dir)
+    assert catalog.register(run_dir) == "generated"
+    subprocess.run(stand_in + ["../inputs/ADAPT.mac", "1"], cwd=run_paths(run_dir)["outputs"], check=True,
+                   stdout=subprocess.DEVNULL)
+    catalog.complete(run_dir, "done", wall_time=1.5, events_per_s=666.7)
+    return run_dir
+
+
+def test_register_reuses_identical_run(tmp_path, catalog, finished):
+    run_dir = str(tmp_path / "second")
+    written = write_run_dir(CONFIG, run_dir)
+    with open(run_paths(finished)["manifest"], "r") as f:
+        assert json.load(f)["geometry_hash"] == written["geometry_hash"]
+
+    assert catalog.register(run_dir) == "reused"
+    for fileName in os.listdir(run_paths(finished)["outputs"]):
+        assert os.path.exists(os.path.join(run_paths(run_dir)["outputs"], fileName))
+    with open(run_paths(run_dir)["manifest"], "r") as f:
+        assert json.load(f)["reused_from"] == finished
+    assert catalog.results(run_dir) == catalog.results(finished) != {}
+    rows = catalog.query(columns=("state", "reused_from", "wall_time"), where=f"run_dir = '{run_dir}'")
+    assert [(r["state"], r["reused_from"], r["wall_time"]) for r in rows] == [("reused", finished, 1.5)]
+
+
+def test_register_keeps_finished_run(catalog, finished):
+    assert catalog.register(finished) == "done"
+
+
+def test_register_without_reuse_or_with_other_inputs(tmp_path, catalog, finished):
+    write_run_dir(CONFIG, str(tmp_path / "again"))
+    assert catalog.register(str(tmp_path / "again"), reuse=False) == "generated"
+    write_run_dir({**CONFIG, "Runs_input": 2000}, str(tmp_path / "longer"))        # Other macro hash
+    assert catalog.register(str(tmp_path / "longer")) == "generated"
+    assert not os.listdir(run_paths(str(tmp_path / "longer"))["outputs"])
@@ -0,0 +1,35 @@
+# :::::: Efficiency.py: detection efficiency and its uncertainty, also when no event reached the detector ::::::
+import json
+import math
+
+import pytest
+
+import ADAPTnGUIDEAnalysis
+from Efficiency import detector_efficiency, main
+
+MACRO = "/run/initialize\n/run/beamOn 1000\n"
+
+
+def _write_run(folder, entries):
+    rows = "\n".join(f"{n},{n},{n},0,0" for n in entries)
+    (folder / "ADAPT_Results_h1_Energy_Deposit.csv").write_text(
+        f"#class tools::histo::h1d\n#title Edep\n#axis fixed {len(entries) - 2} 0 10\nentries,Sw,Sw2,Sxw0,Sx2w0\n{rows}\n")
+    (folder / "ADAPT.mac").write_text(MACRO)
+
+
+def test_efficiency_and_uncertainty():
+    eff = detector_efficiency(250, 1000)
+    assert eff["DetEff"] == 25.0
+    assert eff["sigma_eff"] == pytest.approx(25.0 * math.sqrt(1 / 250 + 1 / 1000))
+
+
+def test_no_detected_event(tmp_path, capsys):
+    assert detector_efficiency(0, 1000) == {"N_simulated": 1000, "N_detected": 0, "DetEff": 0.0, "sigma_eff": None}
+    _write_run(tmp_path, [0, 900, 0, 0, 0])                         # Every event in the first bin: nothing detected
+    main(["--input-dir", str(tmp_path)])
+    assert '"sigma_eff": null' in capsys.readouterr().out          # Valid JSON, not a bare NaN
+
+    ADAPTnGUIDEAnalysis.main(["efficiency", "--input-dir", str(tmp_path), "--json"])
+    assert json.loads(capsys.readouterr().out)["sigma_eff"] is None
+    ADAPTnGUIDEAnalysis.main(["efficiency", "--input-dir", str(tmp_path)])
+    assert "0.0000 %  ±  n/a" in capsys.readouterr().out
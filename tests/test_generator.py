@@ -0,0 +1,21 @@
+# :::::: ADAPTnGUIDEGenerator.py: configurations that ADAPT could not read back are rejected before anything is written ::::::
+import pytest
+
+from ADAPTnGUIDEGenerator import render_geometry_file, validate_config
+
+CONFIG = {"source_choice": "Box", "detector_choice": "Cylinder", "source_material": "G4_Am", "detector_material": "G4_WATER",
+          "source_dim_values": [1, 1, 0.5], "detector_dim_values": [0, 10, 5], "source_pos_values": [0, 0, 0],
+          "detector_pos_values": [0, 0, 5], "Radionuclide": "Am-241", "Runs_input": 1000, "geometryName": "A",
+          "CADfile_names": ["Skull"], "CAD_materials": {"Skull": "G4_WATER"}, "runtime_geometry": True}
+
+
+def test_runtime_cad_path_without_spaces():
+    text = render_geometry_file({**CONFIG, "CAD_Folder_Path": "/data/CAD"})
+    assert [line.split() for line in text.splitlines() if line.startswith("cad ")] == \
+        [["cad", "Skull", "G4_WATER", "/data/CAD/Stl/Skull.stl", "0", "0", "0"]]   # The fields GeometryFile.cc reads
+
+
+def test_runtime_cad_path_with_spaces_is_rejected():
+    with pytest.raises(ValueError, match="CAD_Folder_Path must be a folder without spaces"):
+        validate_config({**CONFIG, "CAD_Folder_Path": "/data/my CAD"})
+    validate_config({**CONFIG, "CAD_Folder_Path": "/data/my CAD", "runtime_geometry": False})   # Compiled in: a C++ string
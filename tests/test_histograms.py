@@ -0,0 +1,85 @@
+# :::::: Histograms.py: rebinned views keep every count and every squared weight ::::::
+import numpy as np
+import pytest
+
+import Histograms
+from Histograms import Histogram1D, log_edges, read_h1, snap_edges, uniform_edges
+
+
+@pytest.fixture
+def h1():
+    rng = np.random.default_rng(1)
+    counts = rng.poisson(20, 1000).astype(float)
+    return Histogram1D(counts, counts * 1.5, np.linspace(0, 10, 1001), underflow=3, overflow=4)
+
+
+def _total(h):
+    return h.underflow + h.counts.sum() + h.overflow
+
+
+@pytest.mark.parametrize("edges", [np.linspace(0, 10, 11), np.linspace(2.003, 7.4981, 57), np.linspace(-5, 20, 4),
+                                   [0.0, 0.1, 0.5, 3.0, 10.0]])
+def test_rebin_conserves_counts_and_sumw2(h1, edges):
+    r = h1.rebin(edges)
+    assert _total(r) == pytest.approx(_total(h1))
+    inside = slice(*snap_edges(h1.edges, edges)[[0, -1]])
+    assert r.counts.sum() == pytest.approx(h1.counts[inside].sum())
+    assert r.sumw2.sum() == pytest.approx(h1.sumw2[inside].sum())
+
+
+def test_rebin_edges_are_original_edges(h1):
+    r = h1.rebin(log_edges(h1, 1e-2, 10, 40))
+    assert np.isin(r.edges, h1.edges).all()
+    assert np.all(np.diff(r.edges) > 0)
+    assert r.counts.size + 1 == r.edges.size
+
+
+def test_snap_edges_nearest_sorted_unique():
+    original = np.linspace(0, 10, 11)
+    assert snap_edges(original, [0.4, 0.6, 0.61, 9.9]).tolist() == [0, 1, 10]
+    assert snap_edges(original, [-3, 42]).tolist() == [0, 10]                  # Clipped to the axis
+
+
+def test_snap_edges_errors():
+    original = np.linspace(0, 10, 11)
+    with pytest.raises(ValueError):
+        snap_edges(original, [1.0])
+    with pytest.raises(ValueError):
+        snap_edges(original, [5.0, 5.1])                                        # Narrower than one bin
+
+
+def test_views_are_memoized(h1):
+    edges = uniform_edges(h1, 0.5)
+    assert h1.rebin(edges) is h1.rebin(edges.copy())
+    h1.clear_views()
+    assert h1.rebin(edges) is not None and len(h1._views) == 1
+
+
+def _write_h1(fileName, counts):
+    rows = "\n".join(f"{c},{c},{c},0,0" for c in [0] + list(counts) + [0])
+    fileName.write_text(f"#class tools::histo::h1d\n#title Edep\n#axis fixed {len(counts)} 0 10\nentries,Sw,Sw2,Sxw0,Sx2w0\n{rows}\n")
+    return str(fileName)
+
+
+def test_read_h1_cache_is_shared_read_only(tmp_path):
+    fileName = _write_h1(tmp_path / "h1.csv", [5, 6, 7, 8])
+    h = read_h1(fileName)
+    assert read_h1(fileName) is h and h.counts.tolist() == [0, 6, 7, 8]
+    with pytest.raises(ValueError, match="read-only"):
+        h.counts[1] = 0
+    with pytest.raises(ValueError, match="read-only"):
+        h.rebin([0, 5, 10]).sumw2[0] = 0
+
+
+def test_read_h1_cache_is_bounded(tmp_path, monkeypatch):
+    monkeypatch.setattr(Histograms, "H1_CACHE_SIZE", 2)
+    monkeypatch.setattr(Histograms, "_H1_CACHE", Histograms.OrderedDict())
+    files = [_write_h1(tmp_path / f"h1_{i}.csv", [i, i, i]) for i in range(3)]
+    first = read_h1(files[0])
+    read_h1(files[1])
+    assert read_h1(files[0]) is first                               # Used again: the second file is the oldest
+    read_h1(files[2])
+    assert [key[0] for key in Histograms._H1_CACHE] == [files[0], files[2]]
+
+    _write_h1(tmp_path / "h1_0.csv", [1, 2, 3, 4])                  # Rewritten file: parsed again, old version dropped
+    assert read_h1(files[0]).counts.tolist() == [0, 2, 3, 4] and len(Histograms._H1_CACHE) == 2
@@ -0,0 +1,86 @@
+# :::::: ScoringMesh.py: mesh dumps read chunk by chunk into (channels, i, j, k) arrays and their relative uncertainty ::::::
+import json
+
+import numpy as np
+import pytest
+
+import ADAPTnGUIDEAnalysis
+from ScoringMesh import ScoringMesh, dump_shape, parse_roi, read_scoring_mesh
+from SyntheticOutputs import write_box_mesh, write_cylinder_mesh
+
+HEADER = "# mesh name: DetScoringVolume\n# primitive scorer name: {name}\n# iX, iY, iZ, total(value) [MeV], total(val^2), entry\n"
+
+
+def _rows(fileName):
+    return np.loadtxt(fileName, delimiter=",", comments="#", ndmin=2)
+
+
+@pytest.mark.parametrize("chunk_rows", [1, 7, 60, 1000])
+def test_chunks_give_the_same_mesh(tmp_path, chunk_rows):
+    names = ["AlphaEnergyDep", "GammaEnergyDep"]
+    fileNames = [str(tmp_path / f"{name}.txt") for name in names]
+    for seed, (name, fileName) in enumerate(zip(names, fileNames)):
+        write_box_mesh(fileName, n_bin=(3, 4, 5), quantity=name, seed=seed)
+
+    mesh = read_scoring_mesh(fileNames, chunk_rows=chunk_rows)    # 7 rows: chunks end inside a row of iZ and of iY
+    assert mesh.shape == (3, 4, 5) and mesh.names == names
+    for channel, fileName in enumerate(fileNames):
+        rows = _rows(fileName)
+        index = tuple(rows[:, :3].astype(int).T)
+        np.testing.assert_array_equal(mesh.values[channel][index], rows[:, 3])
+        np.testing.assert_array_equal(mesh.sumw2[channel][index], rows[:, 4])
+        np.testing.assert_array_equal(mesh.entries[channel][index], rows[:, 5])
+
+
+def test_cylinder_axes_follow_the_dump(tmp_path):
+    fileName = str(tmp_path / "CylinderEnergyDep.txt")
+    write_cylinder_mesh(fileName, n_bin=(2, 3, 5))                  # nBin R Z Phi, dumped as iZ, iPHI, iR
+    assert dump_shape(fileName) == (3, 5, 2)
+
+    mesh = read_scoring_mesh([fileName])
+    assert mesh.axes == ("iZ", "iPHI", "iR") and mesh.shape == (3, 5, 2)
+    for iz, iphi, ir, value, _, _ in _rows(fileName):
+        assert mesh.values[0, int(iz), int(iphi), int(ir)] == value
+    image = ADAPTnGUIDEAnalysis.mesh_image(mesh.values[0], "cylinder")
+    assert image.shape == (2, 5, 3) and image[1, 4, 2] == mesh.values[0, 2, 4, 1]
+
+
+def test_header_only_dump(tmp_path, capsys):
+    fileName = tmp_path / "EnergyDep.txt"
+    fileName.write_text(HEADER.format(name="EnergyDep"))           # e.g. above --max-voxels of SyntheticOutputs.py
+    assert dump_shape(str(fileName)) == (0, 0, 0)
+
+    mesh = read_scoring_mesh([str(fileName)])
+    assert mesh.shape == (0, 0, 0) and mesh.names == ["EnergyDep"] and mesh.totals() == {"EnergyDep": 0.0}
+
+    ADAPTnGUIDEAnalysis.main(["mesh", "--input-dir", str(tmp_path), "--mesh-file", str(fileName), "--uncertainty", "--json"])
+    assert json.loads(capsys.readouterr().out)["mesh_empty"] == [str(fileName)]
+
+
+def _small_mesh():
+    # Voxel (0, 0): events scoring 1, 2 and 3 MeV; (0, 1): one event of 5 MeV; (1, 0): nothing; (1, 1): two events of 1 MeV
+    values  = [[[[6.0], [5.0]], [[0.0], [2.0]]]]
+    sumw2   = [[[[14.0], [25.0]], [[0.0], [2.0]]]]
+    entries = [[[[3], [1]], [[0], [2]]]]
+    return ScoringMesh(["EnergyDep"], values, sumw2, entries)
+
+
+def test_relative_error_by_hand():
+    mesh = _small_mesh()
+    R = mesh.relative_error(n_events=4)[0, :, :, 0]
+    assert R[0, 0] == pytest.approx(np.sqrt(14 / 6 ** 2 - 1 / 4))  # R = sqrt(sum(x^2) / sum(x)^2 - 1/N)
+    assert R[0, 1] == pytest.approx(np.sqrt(25 / 5 ** 2 - 1 / 4)) and R[1, 1] == pytest.approx(0.5)
+    assert np.isinf(R[1, 0])                                        # Nothing scored
+
+    R = mesh.relative_error()[0, :, :, 0]                           # N = entries of the voxel
+    assert R[0, 0] == pytest.approx(np.sqrt(14 / 36 - 1 / 3)) and R[0, 1] == 0 and R[1, 1] == 0
+
+
+def test_converged_fraction_and_roi():
+    mesh = _small_mesh()
+    assert mesh.converged(0.45, n_events=4)["EnergyDep"] == {"voxels": 4, "scored": 3, "converged": 1, "fraction": 0.25,
+                                                             "fraction_scored": pytest.approx(1 / 3), "R_median": 0.5}
+    column = mesh.converged(0.6, n_events=4, roi=parse_roi(":,1:2,0"))["EnergyDep"]
+    assert (column["voxels"], column["scored"], column["converged"], column["fraction"]) == (2, 2, 1, 0.5)
+    empty = mesh.converged(0.6, n_events=4, roi=parse_roi("1,0,:"))["EnergyDep"]
+    assert empty == {"voxels": 1, "scored": 0, "converged": 0, "fraction": 0.0, "fraction_scored": 0.0, "R_median": None}
@@ -0,0 +1,47 @@
+# :::::: PeakAnalysis.py: batched Gaussian + linear background fits of synthetic alpha peaks ::::::
+import numpy as np
+import pytest
+
+from PeakAnalysis import FWHM_FACTOR, analyse_peaks, fit_gaussian_background
+
+EDGES   = np.linspace(0, 10, 10001)                                 # Bin grid of the h1 histogram (1 keV)
+CENTERS = (EDGES[:-1] + EDGES[1:]) / 2
+
+
+def _spectrum(rng, centroid, sigma, area, b0=5.0, b1=0.5):
+    expected = area * np.diff(EDGES) / (sigma * np.sqrt(2 * np.pi)) * np.exp(-0.5 * ((CENTERS - centroid) / sigma) ** 2)
+    return rng.poisson(expected + b0 + b1 * CENTERS).astype(float)
+
+
+def test_fit_recovers_centroid_sigma_and_area():
+    rng = np.random.default_rng(0)
+    truth = [(5.486, 0.020, 2e4), (5.480, 0.015, 5e3), (5.490, 0.030, 1e5)]
+    counts = np.stack([_spectrum(rng, *t) for t in truth])
+    line = analyse_peaks(counts, EDGES, lines="Am-241")["Am-241"]
+    assert line["fit_ok"].all()
+    for k, (centroid, sigma, area) in enumerate(truth):
+        assert abs(line["centroid"][k] - centroid) < 4 * line["centroid_err"][k]
+        assert abs(line["fwhm"][k] - FWHM_FACTOR * sigma) < 4 * line["fwhm_err"][k]
+        assert abs(line["net_area"][k] - area) < 4 * line["net_area_err"][k]
+        assert 0.8 < line["chi2_ndf"][k] < 1.2
+
+
+def test_linear_background_is_fitted():
+    x = np.linspace(-0.1, 0.1, 201)
+    y = 1000 * np.exp(-0.5 * (x / 0.02) ** 2) + 50 + 200 * x                     # Noise-free: exact parameters
+    p, covariance, chi2 = fit_gaussian_background(x, y)
+    np.testing.assert_allclose(p[0], [1000, 0, 0.02, 50, 200], rtol=1e-6, atol=1e-9)
+    assert covariance.shape == (1, 5, 5) and chi2[0] < 1e-6
+
+
+def test_failed_fit_does_not_spoil_the_batch():
+    rng = np.random.default_rng(1)
+    good = [_spectrum(rng, 5.486, 0.02, 2e4), _spectrum(rng, 5.484, 0.02, 3e4)]
+    flat = rng.poisson(5.0 + 0.5 * CENTERS).astype(float)                         # No peak at all
+    batch = analyse_peaks(np.stack([good[0], flat, good[1], np.zeros_like(flat)]), EDGES, lines="Am-241")["Am-241"]
+    alone = analyse_peaks(np.stack(good), EDGES, lines="Am-241")["Am-241"]
+
+    assert batch["fit_ok"].tolist() == [True, False, True, False]
+    for quantity in ("centroid", "fwhm", "net_area", "net_area_err"):
+        assert np.isnan(batch[quantity][[1, 3]]).all()
+        np.testing.assert_allclose(batch[quantity][[0, 2]], alone[quantity], rtol=1e-6)   # Same fit up to the stopping tolerance
@@ -0,0 +1,50 @@
+# :::::: ADAPTnGUIDEPredictor.py: runtime model fitted on finished runs and facet count of the CAD files ::::::
+import math
+import struct
+
+import pytest
+
+from ADAPTnGUIDEPredictor import MIN_RUNS, RuntimePredictor, count_facets
+
+
+def sample(volume, material="G4_WATER", threads=1):
+    """(features, events per second, events, voxels, bytes) of a run whose rate only depends on the detector volume."""
+    values = {"log_threads": math.log(threads), "log_volume": math.log(volume), "log_voxels": 0.0, "log_facets": 0.0,
+              "Radionuclide=Am-241": 1.0, f"detector_material={material}": 1.0}
+    return values, 5e4 * volume ** -0.5, 1000, 0, None
+
+
+def test_rate_follows_the_feature_it_depends_on():
+    predictor = RuntimePredictor([sample(volume) for volume in (10, 100, 1000, 10000)])
+    assert predictor.spread == pytest.approx(1.0, abs=1e-3)
+    for volume in (30, 3000):                                       # Between the fitted points
+        assert predictor.rate(sample(volume)[0]) == pytest.approx(sample(volume)[1], rel=1e-3)
+
+
+def test_unknown_category_uses_the_average():
+    samples = [sample(volume, material) for volume in (10, 1000) for material in ("G4_WATER", "G4_Si")]
+    samples = [(values, rate * (4 if "detector_material=G4_Si" in values else 1), *rest) for values, rate, *rest in samples]
+    predictor = RuntimePredictor(samples, ridge=1e-6)
+    water, silicon = predictor.rate(sample(100)[0]), predictor.rate(sample(100, "G4_Si")[0])
+    assert silicon / water == pytest.approx(4, rel=1e-3)
+    assert predictor.rate(sample(100, "G4_Ge")[0]) == pytest.approx(math.sqrt(water * silicon), rel=1e-3)
+
+
+def test_too_few_runs():
+    with pytest.raises(ValueError, match=f"at least {MIN_RUNS}"):
+        RuntimePredictor([sample(volume) for volume in range(1, MIN_RUNS)])
+
+
+def test_count_facets(tmp_path):
+    triangle = struct.pack("<12fH", *[0.0] * 12, 0)
+    binary = tmp_path / "binary.stl"
+    binary.write_bytes(b"solid exported as binary".ljust(80, b" ") + struct.pack("<I", 3) + triangle * 3)
+    facet = "  facet normal 0 0 1\n    outer loop\n" + "      vertex 0 0 0\n" * 3 + "    endloop\n  endfacet\n"
+    ascii_stl = tmp_path / "ascii.stl"
+    ascii_stl.write_text("solid part\n" + facet * 5 + "endsolid part\n")
+    obj = tmp_path / "part.obj"
+    obj.write_text("# part\nv 0 0 0\nv 1 0 0\nv 0 1 0\nv 1 1 0\nvn 0 0 1\nf 1 2 3\nf 2 4 3\n")
+    assert count_facets(str(binary)) == 3
+    assert count_facets(str(ascii_stl)) == 5
+    assert count_facets(str(obj)) == 2
+    assert count_facets(str(tmp_path / "missing.stl")) == 0
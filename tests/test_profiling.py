@@ -0,0 +1,25 @@
+# :::::: Profiling.py: peak memory of every stage, traced with tracemalloc only when asked where the RSS peak cannot be reset ::::::
+import tracemalloc
+
+import pytest
+
+import Profiling
+from Profiling import StageProfiler
+
+
+@pytest.fixture
+def no_rss(monkeypatch, tmp_path):
+    monkeypatch.setattr(Profiling, "CLEAR_REFS_FILE", str(tmp_path / "missing" / "clear_refs"))   # As on macOS or Windows
+
+
+@pytest.mark.parametrize("trace_memory, memory", [(False, "n/a"), (True, "tracemalloc")])
+def test_memory_without_resettable_rss(no_rss, trace_memory, memory):
+    profiler = StageProfiler(trace_memory=trace_memory)
+    for name in ("parse", "fit"):
+        with profiler.stage(name, rows=10):
+            data = [0.0] * 10**5
+    assert profiler.memory == memory and len(data) == 10**5
+    for stage in profiler.stages:
+        assert stage["peak_MB"] is None if memory == "n/a" else stage["peak_MB"] > 0.5   # "-" in the table
+    assert tracemalloc.is_tracing() == trace_memory
+    tracemalloc.stop()
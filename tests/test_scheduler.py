@@ -0,0 +1,60 @@
+# :::::: ADAPTnGUIDEScheduler.py: the journal lets an interrupted or failed campaign resume with the stand-in executable ::::::
+import asyncio
+import json
+import os
+
+import pytest
+
+from ADAPTnGUIDEGenerator import create_run_dir
+from ADAPTnGUIDEScheduler import JOURNAL_FILE, Journal, run_campaign
+from RunFolders import MACRO_FILE, run_paths
+
+
+@pytest.fixture
+def runs(tmp_path):
+    """Two run folders of 200 events each."""
+    dirs = []
+    for name in ("a", "b"):
+        create_run_dir(str(tmp_path / name), {MACRO_FILE: "/run/initialize\n/run/beamOn 200\n"}, {})
+        dirs.append(str(tmp_path / name))
+    return dirs
+
+
+def _records(fileName):
+    with open(fileName, "r") as f:
+        return [json.loads(line) for line in f]
+
+
+def test_resume_skips_finished_runs(tmp_path, runs, stand_in):
+    journal_file = str(tmp_path / JOURNAL_FILE)
+    first = asyncio.run(run_campaign(runs[:1], stand_in, cpus=2, journal=Journal(journal_file)))
+    assert first["done"] == runs[:1]
+
+    journal = Journal(journal_file)                                     # Campaign started again: states read back
+    assert journal.done(runs[0]) and not journal.done(runs[1])
+    second = asyncio.run(run_campaign(runs, stand_in, cpus=2, journal=journal))
+    assert second == {"done": runs[1:], "failed": [], "skipped": runs[:1]}
+    assert [r["run"] for r in _records(journal_file)].count(runs[0]) == 2    # Not started a second time (running, done)
+
+
+def test_retry_after_failure(tmp_path, runs, stand_in):
+    journal_file = str(tmp_path / JOURNAL_FILE)
+    failed = asyncio.run(run_campaign(runs[:1], stand_in + ["--fail", "1"], cpus=1, retries=2, journal=Journal(journal_file)))
+    assert failed["failed"] == runs[:1]
+    attempts = [r for r in _records(journal_file) if r["state"] == "failed"]
+    assert [r["attempt"] for r in attempts] == [1, 2, 3]
+    assert all(r["returncode"] != 0 for r in attempts)
+
+    journal = Journal(journal_file)
+    assert journal.states[runs[0]]["state"] == "failed" and not journal.done(runs[0])
+    retried = asyncio.run(run_campaign(runs[:1], stand_in, cpus=1, journal=journal))
+    assert retried == {"done": runs[:1], "failed": [], "skipped": []}
+    assert Journal(journal_file).done(runs[0])
+    assert os.path.exists(os.path.join(run_paths(runs[0])["outputs"], "ADAPT_Results_h1_Energy_Deposit.csv"))
+
+
+def test_journal_ignores_cut_last_line(tmp_path):
+    journal_file = tmp_path / JOURNAL_FILE
+    journal_file.write_text(json.dumps({"run": "x", "state": "done"}) + "\n" + '{"run": "y", "sta')
+    journal = Journal(str(journal_file))
+    assert journal.done("x") and "y" not in journal.states
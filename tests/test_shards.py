@@ -0,0 +1,86 @@
+# :::::: ADAPTnGUIDEShards.py: split counts, then the merge of shards run by the stand-in executable ::::::
+import os
+import subprocess
+
+import numpy as np
+import pytest
+
+from ADAPTnGUIDEShards import expected_outputs, merge_shards, split_counts, split_macro
+from RunFolders import run_paths
+
+MACRO = """/run/initialize
+/score/create/boxMesh             DetScoringVolume
+/score/mesh/boxSize               1 1 1 mm
+/score/mesh/nBin                  2 3 4
+/score/quantity/energyDeposit     EnergyDep MeV
+/score/close
+/run/beamOn                       {events}
+/score/dumpQuantityToFile         DetScoringVolume EnergyDep GammaEnergyDep.csv
+"""
+
+
+def _table(fileName):
+    # Numeric rows of an output file (metadata and column names skipped)
+    with open(fileName, "r") as f:
+        rows = [line.split(",") for line in f if not line.startswith("#") and not line[:1].isalpha()]
+    return np.array(rows, dtype=float)
+
+
+@pytest.mark.parametrize("total, weights", [(1000, [1, 1, 1]), (7, [1] * 10), (10**6 + 3, [16, 16, 32, 5.5]), (0, [1, 2]),
+                                            (999, [0.1, 0.2, 0.7])])
+def test_split_counts_sum_to_total(total, weights):
+    parts = split_counts(total, weights)
+    assert sum(parts) == total
+    assert len(parts) == len(weights)
+    exact = [total * w / sum(weights) for w in weights]
+    assert all(abs(p - x) < 1 for p, x in zip(parts, exact))                     # Largest remainder: never off by a whole event
+
+
+@pytest.fixture
+def shards(tmp_path, stand_in):
+    """Three shards of a 1001-event macro, all run by the stand-in."""
+    macro = tmp_path / "ADAPT.mac"
+    macro.write_text(MACRO.format(events=1001))
+    description = split_macro(str(macro), str(tmp_path / "dart"), shards=3, seed=7)
+    for shard in description["shards"]:
+        outputs = run_paths(str(tmp_path / "dart" / shard["name"]))["outputs"]
+        subprocess.run(stand_in + ["../inputs/ADAPT.mac", "1"], cwd=outputs, check=True, stdout=subprocess.DEVNULL)
+    return tmp_path / "dart", description
+
+
+def test_merge_sums_h1_and_mesh(shards):
+    shard_dir, description = shards
+    summary = merge_shards(str(shard_dir))
+    assert summary["missing"] == [] and summary["beam_on"] == [1001]
+    folders = [run_paths(str(shard_dir / shard["name"]))["outputs"] for shard in description["shards"]]
+    merged = run_paths(str(shard_dir / "merged"))["outputs"]
+    for fileName in expected_outputs(description):
+        total = sum(_table(os.path.join(folder, fileName)) for folder in folders)
+        result = _table(os.path.join(merged, fileName))
+        if fileName == "GammaEnergyDep.csv":                                      # The voxel indices are kept, not summed
+            total[:, :3] = result[:, :3]
+        np.testing.assert_allclose(result, total, rtol=1e-9)
+
+
+def test_merge_offsets_ntuple_events(shards):
+    shard_dir, description = shards
+    merge_shards(str(shard_dir))
+    fileName, offset, expected = "ADAPT_Results_nt_Photons.csv", 0, []
+    for shard in description["shards"]:
+        events = _table(os.path.join(run_paths(str(shard_dir / shard["name"]))["outputs"], fileName))[:, 0]
+        expected.append(events + offset)
+        offset += shard["beam_on"][0]
+    merged = _table(os.path.join(run_paths(str(shard_dir / "merged"))["outputs"], fileName))[:, 0]
+    np.testing.assert_array_equal(merged, np.concatenate(expected))
+    assert all(a.max() < b.min() for a, b in zip(expected, expected[1:]))        # The shards stay apart
+
+
+def test_merge_skips_unfinished_shards(shards):
+    shard_dir, description = shards
+    last = description["shards"][-1]
+    os.remove(os.path.join(run_paths(str(shard_dir / last["name"]))["outputs"], "GammaEnergyDep.csv"))
+    summary = merge_shards(str(shard_dir))
+    assert summary["missing"] == [last["name"]]
+    assert summary["beam_on"] == [1001 - last["beam_on"][0]]
+    with open(run_paths(str(shard_dir / "merged"))["macro"], "r") as f:
+        assert f"/run/beamOn                       {summary['beam_on'][0]}" in f.read()
@@ -0,0 +1,18 @@
+# :::::: ADAPTnGUIDESweep.py: every point of a sweep gets its own seed stream, even without a master seed ::::::
+import pytest
+
+from ADAPTnGUIDEGenerator import STREAM_SEED, seed_stream
+from ADAPTnGUIDESweep import plan_sweep
+
+BASE = {"source_choice": "Box", "detector_choice": "Cylinder", "source_material": "G4_Am", "detector_material": "G4_WATER",
+        "source_dim_values": [1, 1, 0.5], "detector_dim_values": [0, 10, 5], "source_pos_values": [0, 0, 0],
+        "detector_pos_values": [0, 0, 5], "Radionuclide": "Am-241", "Runs_input": 1000, "geometryName": "A"}
+
+
+@pytest.mark.parametrize("base, master", [(BASE, STREAM_SEED), ({**BASE, "seed": 7}, 7)])
+def test_points_get_their_own_seeds(base, master):
+    runs, _ = plan_sweep({"base": base, "grid": {"Runs_input": [100, 200, 300]}})
+    for run in runs:
+        seeds = seed_stream(master, run["index"])
+        assert run["config"]["seeds"] == seeds and f"/random/setSeeds {seeds[0]} {seeds[1]}" in run["macro"]
+    assert len({tuple(run["config"]["seeds"]) for run in runs}) == 3